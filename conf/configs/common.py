@@ -149,19 +149,91 @@ REFRESH_TOKEN_PURGE_FREQUENCY_SEC = 60 * 60
 
 REMINDER_WATCHDOG_FREQUENCY_SEC = 60 * 60
 
+# Due reminders are claimed, enqueued and have their successors created this many at a time
+REMINDER_PROCESS_BATCH_SIZE = 500
+
+# When greater than 1, each reminder tick fans out to this many shard tasks (partitioned by user) that process due
+# reminders in parallel; claims are made with SKIP LOCKED, so overlapping shards or ticks never send a reminder twice
+REMINDER_DISPATCH_SHARDS = int(config('PROJECT_REMINDER_DISPATCH_SHARDS', '1'))
+
+# Grade recalculations queued by changes are coalesced per user, and run this long after the first of them
+GRADE_RECALCULATION_DEBOUNCE_SECONDS = 3
+GRADE_RECALCULATION_PENDING_TTL_SECONDS = 60 * 60 * 24
+# A scheduled recalculation that hasn't run in this long is assumed lost, so the next queued change schedules another
+GRADE_RECALCULATION_SCHEDULED_TTL_SECONDS = GRADE_RECALCULATION_DEBOUNCE_SECONDS * 10
+
 FEED_MAX_CACHEABLE_SIZE = 3000000
 
 FEED_CACHE_TTL_SECONDS = 60 * 60 * 3
+# Past FEED_CACHE_TTL_SECONDS, cached events are stale but still served (while a refresh is enqueued) for this long
+FEED_CACHE_STALE_TTL_SECONDS = 60 * 60 * 24
+# How long a stale calendar's enqueued refresh (or a course's enqueued schedule cache build) suppresses enqueuing another
+FEED_CACHE_REFRESH_LOCK_SECONDS = 60 * 5
 # Refresh cache before it expires
 FEED_CACHE_REFRESH_TTL_SECONDS = FEED_CACHE_TTL_SECONDS - (60 * 10)
 REINDEX_FEED_FREQUENCY_SEC = 300
+# Stale calendars are partitioned (by PK) across this many reindex tasks, each fetching on up to
+# FEED_REINDEX_MAX_WORKERS threads, with no more than FEED_REINDEX_MAX_CONNECTIONS_PER_HOST to one upstream host
+FEED_REINDEX_SHARD_COUNT = 4
+FEED_REINDEX_MAX_WORKERS = 8
+FEED_REINDEX_MAX_CONNECTIONS_PER_HOST = 2
+# Each feed a reindex fetches must be downloaded within this long, or it's counted as a failed sync
+FEED_REINDEX_FETCH_DEADLINE_SECONDS = 60
+# A shard being reindexed is locked for at most this long, which must outlast its longest run (bounded by
+# CELERY_TASK_REINDEX_FEEDS_SOFT_TIME_LIMIT, where set), or a later period's run could start alongside it
+FEED_REINDEX_SHARD_LOCK_SECONDS = 60 * 30
 FEED_CONSECUTIVE_FAILURE_THRESHOLD = 10
+# Bounds the threads (per process) fetching external calendars concurrently on a cache miss, and how long a request
+# aggregating them waits before responding without those still outstanding
+FEED_FETCH_MAX_WORKERS = 8
+FEED_FETCH_DEADLINE_SECONDS = 8
+# Fetched iCal feeds are spooled to disk past FEED_ICAL_SPOOL_SIZE bytes, and rejected past FEED_MAX_ICAL_SIZE bytes or
+# FEED_MAX_ICAL_EVENTS events
+FEED_ICAL_SPOOL_SIZE = 1024 * 1024
+FEED_MAX_ICAL_SIZE = 1024 * 1024 * 25
+FEED_MAX_ICAL_EVENTS = 20000
 
 # How long calendar clients may cache ICS feeds before revalidating (15 minutes).
 # ETags still ensure correctness on revalidation; this only reduces server-side
 # aggregation query load from high-frequency pollers (e.g. iOS Calendar).
 FEED_ICS_MAX_AGE_SECONDS = 60 * 15
 
+# Rendered private ICS feeds are cached for this long, keyed by the timestamp their ETag is built from, so an entry is
+# never served once the feed's data changes; when FEED_ICS_CACHE_GZIP is set, they're cached gzip-compressed and served
+# that way to clients that accept it
+FEED_ICS_CACHE_TTL_SECONDS = 60 * 60 * 24
+FEED_ICS_CACHE_GZIP = True
+
+# Imports validate each section in memory, then insert its rows this many per query
+IMPORT_BULK_CREATE_BATCH_SIZE = 1000
+
+# Files uploaded to background imports are staged to this storage until imported, and their jobs (and progress) can be
+# polled for IMPORT_JOB_TTL_SECONDS; while a job is pending or running, a resubmission of the same file is deduplicated
+# to it
+IMPORT_STORAGE_ALIAS = 'default'
+IMPORT_JOB_TTL_SECONDS = 60 * 60 * 24
+# A pending or running import job that hasn't reported progress in this long is considered lost (to a broker outage or
+# a worker that died mid-run), so it's reported as failed and a resubmission of its file starts a new job
+IMPORT_JOB_HEARTBEAT_TIMEOUT_SECONDS = 60 * 15
+
+# Exports are read, serialized and streamed this many records of a section at a time
+EXPORT_CHUNK_SIZE = 500
+
+# Background exports are written to this storage (gzip-compressed, if EXPORT_ARTIFACT_GZIP is set), spooled to disk past
+# EXPORT_SPOOL_SIZE bytes while being written; their jobs can be polled for EXPORT_JOB_TTL_SECONDS, and give out
+# download URLs signed for EXPORT_DOWNLOAD_URL_EXPIRY_SECONDS
+EXPORT_STORAGE_ALIAS = 'default'
+EXPORT_ARTIFACT_GZIP = True
+EXPORT_SPOOL_SIZE = 1024 * 1024 * 5
+EXPORT_JOB_TTL_SECONDS = 60 * 60 * 24
+# Artifacts are replaced by a user's next export, deleted with the user, and otherwise purged this often once no job can
+# still give them out
+EXPORT_ARTIFACT_PURGE_FREQUENCY_SEC = 60 * 60
+# An export job still pending after this long is considered lost (to a broker outage or a worker that died mid-run), so
+# it's reported as failed
+EXPORT_JOB_TIMEOUT_SECONDS = 60 * 60
+EXPORT_DOWNLOAD_URL_EXPIRY_SECONDS = 60 * 60
+
 DB_INTEGRITY_RETRIES = 2
 
 DB_INTEGRITY_RETRY_DELAY_SECS = 2
@@ -1,7 +1,11 @@
+import logging
+
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+logger = logging.getLogger(__name__)
+
 
 @receiver(post_save, sender=get_user_model())
 def post_save_user(sender, instance, created, **kwargs):
@@ -11,3 +15,17 @@ def post_save_user(sender, instance, created, **kwargs):
     """
     if created:
         get_user_model().objects.create_references(instance)
+
+
+@receiver(post_delete, sender=get_user_model())
+def delete_user_export_artifacts(sender, instance, **kwargs):
+    """
+    Delete the user's export artifacts in storage, as they're copies of the user's data. If storage can't be reached,
+    the deletion of the user isn't held up, as the artifacts are purged once expired anyway.
+    """
+    from helium.importexport.services import exportservice
+
+    try:
+        exportservice.delete_export_artifacts(instance.pk)
+    except Exception:
+        logger.warning(f"Failed to delete export artifacts for user {instance.pk}", exc_info=True)
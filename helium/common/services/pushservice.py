@@ -8,8 +8,13 @@ from helium.common.utils import metricutils
 logger = logging.getLogger(__name__)
 
 
-def send_notifications(push_tokens, subject, message, reminder_data):
-    """Send push notifications and return a list of token strings that are permanently invalid."""
+# The most messages FCM accepts in a single send_each request
+FCM_MAX_MESSAGES_PER_REQUEST = 500
+
+_INVALID_TOKEN_ERRORS = (messaging.UnregisteredError, messaging.SenderIdMismatchError)
+
+
+def _get_notification_fields(subject, message, reminder_data):
     # Merge the computed notification title/body into json_payload so web clients
     # (which receive data-only messages with no notification field) can display them.
     payload_data = {**reminder_data, 'notification_title': subject, 'notification_body': message}
@@ -18,16 +23,16 @@ def send_notifications(push_tokens, subject, message, reminder_data):
     # on every device.
     tag = f"reminder_{reminder_data['id']}"
 
-    multicast_message = messaging.MulticastMessage(
-        data={"json_payload": json.dumps(payload_data)},
-        android=messaging.AndroidConfig(
+    return {
+        'data': {"json_payload": json.dumps(payload_data)},
+        'android': messaging.AndroidConfig(
             notification=messaging.AndroidNotification(
                 title=subject,
                 body=message,
                 tag=tag,
             ),
         ),
-        apns=messaging.APNSConfig(
+        'apns': messaging.APNSConfig(
             headers={'apns-collapse-id': tag},
             payload=messaging.APNSPayload(
                 aps=messaging.Aps(
@@ -39,24 +44,35 @@ def send_notifications(push_tokens, subject, message, reminder_data):
                 ),
             ),
         ),
-        tokens=push_tokens
+    }
+
+
+def _record_send_response(response):
+    if response.success_count > 0:
+        metricutils.increment('action.push.sent', value=response.success_count)
+        metricutils.increment('action.reminder.sent', value=response.success_count, extra_tags=['channel:push'])
+
+    if response.failure_count > 0:
+        logger.warning(f"Failed to send {response.failure_count} push notifications")
+        metricutils.increment('action.push.failed', value=response.failure_count)
+
+
+def send_notifications(push_tokens, subject, message, reminder_data):
+    """Send push notifications and return a list of token strings that are permanently invalid."""
+    multicast_message = messaging.MulticastMessage(
+        tokens=push_tokens,
+        **_get_notification_fields(subject, message, reminder_data)
     )
 
     try:
         response = messaging.send_each_for_multicast(multicast_message)
 
-        if response.success_count > 0:
-            metricutils.increment('action.push.sent', value=response.success_count)
-            metricutils.increment('action.reminder.sent', value=response.success_count, extra_tags=['channel:push'])
-
-        if response.failure_count > 0:
-            logger.warning(f"Failed to send {response.failure_count} push notifications")
-            metricutils.increment('action.push.failed', value=response.failure_count)
+        _record_send_response(response)
 
         return [
             push_tokens[i]
             for i, r in enumerate(response.responses)
-            if not r.success and isinstance(r.exception, (messaging.UnregisteredError, messaging.SenderIdMismatchError))
+            if not r.success and isinstance(r.exception, _INVALID_TOKEN_ERRORS)
         ]
     except Exception:
         logger.error("Failed to send push notifications", exc_info=True)
@@ -64,6 +80,45 @@ def send_notifications(push_tokens, subject, message, reminder_data):
         raise
 
 
+def send_notification_batch(notifications):
+    """
+    Send many reminders' push notifications together, as one message per destination token, in as few FCM requests as
+    possible (each up to FCM's limit of FCM_MAX_MESSAGES_PER_REQUEST messages). A request that fails outright is
+    logged and counted as failed, and does not stop the rest of the batch from sending.
+
+    :param notifications: A list of dicts with the ``push_tokens``, ``subject``, ``message`` and ``reminder_data`` of
+        each notification.
+    :return: A list of the token strings that are permanently invalid, each given once.
+    """
+    # Ordered by token, so each device's messages go out together in the same request
+    messages = sorted(((token, messaging.Message(token=token,
+                                                 **_get_notification_fields(notification['subject'],
+                                                                            notification['message'],
+                                                                            notification['reminder_data'])))
+                       for notification in notifications
+                       for token in notification['push_tokens']),
+                      key=lambda m: m[0])
+
+    invalid_tokens = {}
+    for i in range(0, len(messages), FCM_MAX_MESSAGES_PER_REQUEST):
+        chunk = messages[i:i + FCM_MAX_MESSAGES_PER_REQUEST]
+
+        try:
+            response = messaging.send_each([message for _, message in chunk])
+        except Exception:
+            logger.error("Failed to send push notifications", exc_info=True)
+            metricutils.increment('action.push.failed', value=len(chunk))
+            continue
+
+        _record_send_response(response)
+
+        for (token, _), r in zip(chunk, response.responses):
+            if not r.success and isinstance(r.exception, _INVALID_TOKEN_ERRORS):
+                invalid_tokens[token] = None
+
+    return list(invalid_tokens)
+
+
 def send_dismiss(push_tokens, reminder_id):
     """Send a silent, data-only push telling clients to clear a dismissed
     reminder's notification from their tray. Returns permanently-invalid tokens."""
@@ -88,7 +143,7 @@ def send_dismiss(push_tokens, reminder_id):
         return [
             push_tokens[i]
             for i, r in enumerate(response.responses)
-            if not r.success and isinstance(r.exception, (messaging.UnregisteredError, messaging.SenderIdMismatchError))
+            if not r.success and isinstance(r.exception, _INVALID_TOKEN_ERRORS)
         ]
     except Exception:
         logger.error("Failed to send dismiss pushes", exc_info=True)
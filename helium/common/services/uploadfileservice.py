@@ -1,6 +1,9 @@
+import codecs
+import json
 import logging
 import os
 
+import icalendar
 from django.conf import settings
 from django.template.defaultfilters import filesizeformat
 from rest_framework.exceptions import ValidationError
@@ -8,17 +11,86 @@ from rest_framework.exceptions import ValidationError
 logger = logging.getLogger(__name__)
 
 
-def read(file):
-    json_str = b''
-    for chunk in file.chunks():
-        json_str += chunk
+def _raise_too_large():
+    raise ValidationError(
+        f'The uploaded file exceeds the max upload size of {filesizeformat(settings.MAX_UPLOAD_SIZE)}.')
+
 
+def validate(file):
+    """
+    Validate the given uploaded file's extension and declared size, without reading it.
+
+    :param file: The uploaded file.
+    :raises ValidationError: If the file's type isn't supported, or it's larger than MAX_UPLOAD_SIZE.
+    """
     ext = os.path.splitext(file.name)[1].removeprefix('.')
     if ext not in settings.FILE_TYPES:
         raise ValidationError(f'File type "{ext}" not supported.')
 
     if file.size > settings.MAX_UPLOAD_SIZE:
-        raise ValidationError(
-            f'The uploaded file exceeds the max upload size of {filesizeformat(settings.MAX_UPLOAD_SIZE)}.')
+        _raise_too_large()
+
+
+def _iter_chunks(file):
+    # The declared size comes from the client, so what's actually read is held to the limit too
+    read_size = 0
+    for chunk in file.chunks():
+        read_size += len(chunk)
+        if read_size > settings.MAX_UPLOAD_SIZE:
+            _raise_too_large()
+
+        yield chunk
+
+
+def iter_chunks(file):
+    """
+    Validate the given uploaded file, then read it a chunk at a time.
+
+    :param file: The uploaded file.
+    :return: An iterator of the file's bytes.
+    :raises ValidationError: If the file is invalid, as for ``validate``, or turns out to be larger than
+        MAX_UPLOAD_SIZE as it's read.
+    """
+    validate(file)
+
+    return _iter_chunks(file)
+
+
+def read(file):
+    """
+    Validate and read the given uploaded file.
+
+    :param file: The uploaded file.
+    :return: The file's bytes.
+    :raises ValidationError: If the file is invalid, as for ``iter_chunks``.
+    """
+    return b''.join(iter_chunks(file))
+
+
+def load_json(file):
+    """
+    Validate the given uploaded file and parse it as JSON, decoding it (with or without a BOM) as it's read, so the
+    raw bytes are never held in full alongside the decoded text.
+
+    :param file: The uploaded file.
+    :return: The parsed JSON.
+    :raises ValidationError: If the file is invalid, as for ``iter_chunks``.
+    :raises ValueError: If the file isn't valid UTF-8 JSON.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+
+    text = ''.join(decoder.decode(chunk) for chunk in iter_chunks(file)) + decoder.decode(b'', final=True)
+
+    return json.loads(text)
+
+
+def load_ics(file):
+    """
+    Validate the given uploaded file and parse it as an iCalendar (which the parser requires in full).
 
-    return json_str
+    :param file: The uploaded file.
+    :return: The parsed ``icalendar.Calendar``.
+    :raises ValidationError: If the file is invalid, as for ``iter_chunks``.
+    :raises ValueError: If the file isn't a valid iCalendar.
+    """
+    return icalendar.Calendar.from_ical(read(file))
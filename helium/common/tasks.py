@@ -5,7 +5,7 @@ from django.conf import settings
 from conf.celery import app
 from helium.auth.models import UserPushToken
 from helium.common.periodic import PERIODIC_TASKS
-from helium.common.services.pushservice import send_dismiss, send_notifications
+from helium.common.services.pushservice import send_dismiss, send_notification_batch, send_notifications
 from helium.common.services.sesreputationservice import process_ses_notification
 from helium.common.utils import metricutils
 
@@ -33,6 +33,26 @@ def send_pushes(self, push_tokens, username, subject, message, reminder_data):
     metricutils.task_stop(metrics)
 
 
+@app.task(bind=True)
+def send_push_batch(self, notifications):
+    published_at_ms = metricutils.get_published_at_ms(self)
+    metrics = metricutils.task_start("push.batch.sent", priority="high", published_at_ms=published_at_ms)
+
+    if settings.DISABLE_PUSH:
+        logger.warning(f'Push disabled. Batch of {len(notifications)} push(es) not sent.')
+        metricutils.task_stop(metrics, value=0)
+        return
+
+    invalid_tokens = send_notification_batch(notifications)
+
+    if invalid_tokens:
+        deleted_count, _ = UserPushToken.objects.filter(token__in=invalid_tokens).delete()
+        logger.info(f"Removed {deleted_count} invalid push token(s) after batch send failure")
+        metricutils.increment('action.push.token.purged', value=deleted_count)
+
+    metricutils.task_stop(metrics, value=len(notifications))
+
+
 @app.task(bind=True)
 def send_dismiss_pushes(self, push_tokens, reminder_id):
     published_at_ms = metricutils.get_published_at_ms(self)
@@ -1,7 +1,25 @@
 from unittest import mock
 
+from firebase_admin import messaging
+
 
 def given_urlopen_response_value(status, mock_urlopen):
     magic_mock = mock.MagicMock()
     magic_mock.getcode.return_value = status
     mock_urlopen.return_value = magic_mock
+
+
+def given_fcm_stand_in(mock_send_each, invalid_tokens=()):
+    """
+    Have the mocked ``messaging.send_each`` respond the way FCM does: messages to any of ``invalid_tokens`` fail as
+    unregistered, and the rest succeed.
+    """
+    def send_each(messages, dry_run=False, app=None):
+        return messaging.BatchResponse([
+            messaging.SendResponse(None, messaging.UnregisteredError('Requested entity was not found.'))
+            if message.token in invalid_tokens else
+            messaging.SendResponse({'name': f'projects/helium/messages/{i}'}, None)
+            for i, message in enumerate(messages)
+        ])
+
+    mock_send_each.side_effect = send_each
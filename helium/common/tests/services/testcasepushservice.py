@@ -3,6 +3,7 @@ from unittest import mock
 from django.test import TestCase
 
 from helium.common.services import pushservice
+from helium.common.tests.helpers import commonhelper
 
 
 class TestCasePushService(TestCase):
@@ -104,3 +105,35 @@ class TestCasePushService(TestCase):
             pushservice.send_notifications(push_tokens, 'Subject', 'Message', reminder_data)
 
         mock_increment.assert_called_once_with('action.push.failed', value=2)
+
+    @mock.patch('helium.common.services.pushservice.messaging.send_each')
+    def test_send_notification_batch_fans_in_to_fcm_requests(self, mock_send_each):
+        # GIVEN
+        commonhelper.given_fcm_stand_in(mock_send_each, invalid_tokens=['stale'])
+        notifications = [{'push_tokens': [f'token{i}', 'stale'], 'subject': 'Subject', 'message': 'Message',
+                          'reminder_data': {'id': i}} for i in range(300)]
+
+        # WHEN
+        invalid_tokens = pushservice.send_notification_batch(notifications)
+
+        # THEN
+        self.assertEqual([len(call[0][0]) for call in mock_send_each.call_args_list],
+                         [pushservice.FCM_MAX_MESSAGES_PER_REQUEST, 600 - pushservice.FCM_MAX_MESSAGES_PER_REQUEST])
+        self.assertEqual(invalid_tokens, ['stale'])
+        sent_tokens = [message.token for call in mock_send_each.call_args_list for message in call[0][0]]
+        self.assertEqual(sent_tokens, sorted(sent_tokens))
+
+    @mock.patch('helium.common.services.pushservice.metricutils.increment')
+    @mock.patch('helium.common.services.pushservice.messaging.send_each')
+    def test_send_notification_batch_request_failure(self, mock_send_each, mock_increment):
+        # GIVEN
+        mock_send_each.side_effect = Exception('Firebase error')
+        notifications = [{'push_tokens': ['token1', 'token2'], 'subject': 'Subject', 'message': 'Message',
+                          'reminder_data': {'id': 1}}]
+
+        # WHEN
+        invalid_tokens = pushservice.send_notification_batch(notifications)
+
+        # THEN
+        self.assertEqual(invalid_tokens, [])
+        mock_increment.assert_called_once_with('action.push.failed', value=2)
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import ValidationError
+
+from helium.common.services import uploadfileservice
+
+
+class TestCaseUploadFileService(TestCase):
+    def test_unsupported_type_rejected_before_reading(self):
+        # GIVEN
+        upload = SimpleUploadedFile('schedule.txt', b'{}')
+
+        # WHEN
+        with mock.patch.object(upload, 'chunks') as mock_chunks:
+            with self.assertRaisesMessage(ValidationError, 'File type "txt" not supported.'):
+                uploadfileservice.read(upload)
+
+        # THEN
+        mock_chunks.assert_not_called()
+
+    @override_settings(MAX_UPLOAD_SIZE=10)
+    def test_declared_size_rejected_before_reading(self):
+        # GIVEN
+        upload = SimpleUploadedFile('import.json', b'[' + b'0,' * 10 + b'0]')
+
+        # WHEN
+        with mock.patch.object(upload, 'chunks') as mock_chunks:
+            with self.assertRaisesMessage(ValidationError, 'exceeds the max upload size'):
+                uploadfileservice.read(upload)
+
+        # THEN
+        mock_chunks.assert_not_called()
+
+    @override_settings(MAX_UPLOAD_SIZE=10)
+    def test_bytes_read_over_limit_rejected(self):
+        # GIVEN
+        upload = SimpleUploadedFile('import.json', b'[' + b'0,' * 10 + b'0]')
+        # The client can declare any size, so what's read is held to the limit
+        upload.size = 2
+
+        # WHEN
+        chunks = uploadfileservice.iter_chunks(upload)
+
+        # THEN
+        with self.assertRaisesMessage(ValidationError, 'exceeds the max upload size'):
+            list(chunks)
+
+    def test_load_json_decodes_across_chunks(self):
+        # GIVEN
+        content = '﻿{"title": "Café ✓"}'.encode('utf-8')
+        upload = SimpleUploadedFile('import.json', content)
+        # Split inside the BOM and the multibyte characters
+        upload.chunks = lambda: (content[i:i + 2] for i in range(0, len(content), 2))
+
+        # WHEN
+        data = uploadfileservice.load_json(upload)
+
+        # THEN
+        self.assertEqual(data, {'title': 'Café ✓'})
+
+    def test_load_json_invalid(self):
+        # GIVEN
+        upload = SimpleUploadedFile('import.json', b'{"title": ')
+
+        # WHEN/THEN
+        self.assertRaises(ValueError, uploadfileservice.load_json, upload)
+        self.assertRaises(ValueError, uploadfileservice.load_json, SimpleUploadedFile('import.json', b'\xff\xfe'))
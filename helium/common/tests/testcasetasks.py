@@ -2,7 +2,10 @@ from unittest import mock
 
 from django.test import TestCase, override_settings
 
-from helium.common.tasks import send_pushes
+from helium.auth.models import UserPushToken
+from helium.auth.tests.helpers import userhelper
+from helium.common.tasks import send_push_batch, send_pushes
+from helium.common.tests.helpers import commonhelper
 
 
 class TestCaseTasks(TestCase):
@@ -41,3 +44,21 @@ class TestCaseTasks(TestCase):
         # THEN
         mock_send_notifications.assert_called_once_with(['token1'], 'Subject', 'Message', reminder_data)
         mock_stop.assert_called_once_with({'start': 'metrics'})
+
+    @override_settings(DISABLE_PUSH=False)
+    @mock.patch('helium.common.services.pushservice.messaging.send_each')
+    def test_send_push_batch_prunes_invalid_tokens(self, mock_send_each):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        userhelper.given_user_push_token_exists(user, token='valid')
+        userhelper.given_user_push_token_exists(user, token='stale', device_id='other')
+        commonhelper.given_fcm_stand_in(mock_send_each, invalid_tokens=['stale'])
+        notifications = [{'push_tokens': ['valid', 'stale'], 'subject': 'Subject', 'message': 'Message',
+                          'reminder_data': {'id': i}} for i in range(2)]
+
+        # WHEN
+        send_push_batch(notifications)
+
+        # THEN
+        mock_send_each.assert_called_once()
+        self.assertEqual(list(UserPushToken.objects.values_list('token', flat=True)), ['valid'])
@@ -0,0 +1,32 @@
+from django.test import RequestFactory, SimpleTestCase
+
+from helium.common.utils.httputils import accepts_gzip
+
+
+def _request_with_accept_encoding(header):
+    return RequestFactory().get('/', HTTP_ACCEPT_ENCODING=header)
+
+
+class TestCaseHttpUtils(SimpleTestCase):
+    def test_accepts_gzip_when_listed(self):
+        for header in ('gzip', 'deflate, gzip', 'GZIP;q=0.5', 'br;q=1.0, gzip ; q=0.001'):
+            # WHEN
+            accepted = accepts_gzip(_request_with_accept_encoding(header))
+
+            # THEN
+            self.assertTrue(accepted, header)
+
+    def test_accepts_gzip_refused_with_zero_quality(self):
+        for header in ('gzip;q=0', 'deflate, gzip;q=0.000', 'gzip;q=invalid', '*;q=1, gzip;q=0'):
+            # WHEN
+            accepted = accepts_gzip(_request_with_accept_encoding(header))
+
+            # THEN
+            self.assertFalse(accepted, header)
+
+    def test_accepts_gzip_falls_back_to_wildcard(self):
+        # WHEN/THEN
+        self.assertTrue(accepts_gzip(_request_with_accept_encoding('deflate, *')))
+        self.assertFalse(accepts_gzip(_request_with_accept_encoding('deflate, *;q=0')))
+        self.assertFalse(accepts_gzip(_request_with_accept_encoding('deflate, xgzip')))
+        self.assertFalse(accepts_gzip(_request_with_accept_encoding('')))
@@ -8,7 +8,7 @@ import zlib
 from decimal import Decimal
 
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import get_template
 
 from helium.auth.utils.userutils import is_staff_email
@@ -118,17 +118,17 @@ def add_to_ses_suppression_list(email: str, reason: str = 'BOUNCE') -> bool:
         return False
 
 
-def send_multipart_email(template_name, context, subject, to, bcc=None, email_type=None):
+def build_multipart_email(template_name, context, subject, to, bcc=None, email_type=None):
     """
-    Send a multipart text/html email.
+    Build (but don't send) a multipart text/html email.
 
     :param template_name: The path to the template (no extension), assuming both a .txt and .html version are present
     :param context: A dictionary of context elements to pass to the email templates
     :param subject: The subject of the email
     :param to: A list of email addresses to which to send
     :param bcc: A list of email addresses to which to BCC
-    :param email_type: The type of email for metric tagging (e.g. "reminder", "registration", "verification")
-    :return:
+    :param email_type: The type of email for SES message tagging (e.g. "reminder", "registration", "verification")
+    :return: The email message.
     """
     plaintext = get_template(f'{template_name}.txt')
     html = get_template(f'{template_name}.html')
@@ -141,6 +141,50 @@ def send_multipart_email(template_name, context, subject, to, bcc=None, email_ty
         msg.extra_headers['X-SES-MESSAGE-TAGS'] = f'email_type={email_type}'
     msg.attach_alternative(html_content, "text/html")
 
+    return msg
+
+
+def send_multipart_email(template_name, context, subject, to, bcc=None, email_type=None):
+    """
+    Send a multipart text/html email.
+
+    :param template_name: The path to the template (no extension), assuming both a .txt and .html version are present
+    :param context: A dictionary of context elements to pass to the email templates
+    :param subject: The subject of the email
+    :param to: A list of email addresses to which to send
+    :param bcc: A list of email addresses to which to BCC
+    :param email_type: The type of email for metric tagging (e.g. "reminder", "registration", "verification")
+    :return:
+    """
+    _send_email(build_multipart_email(template_name, context, subject, to, bcc, email_type), email_type)
+
+
+def send_multipart_emails(messages, email_type=None):
+    """
+    Send emails built with ``build_multipart_email`` over a single mail connection. Each failure is handled as it is
+    by ``send_multipart_email`` (including suppressing rejected recipients), but doesn't stop the rest from sending.
+
+    :param messages: The email messages to send
+    :param email_type: The type of email for metric tagging (e.g. "reminder", "registration", "verification")
+    :return: The number of emails sent
+    """
+    sent = 0
+
+    with get_connection() as connection:
+        for msg in messages:
+            msg.connection = connection
+            try:
+                _send_email(msg, email_type)
+                sent += 1
+            except Exception:
+                # The failure has already been logged and counted
+                continue
+
+    return sent
+
+
+def _send_email(msg, email_type):
+    to = msg.to
     extra_tags = [f"type:{email_type}"] if email_type else []
 
     try:
@@ -208,6 +252,27 @@ def calculate_trend(series_range, series_list):
         return None
 
 
+def calculate_trend_from_sums(count, series_sum, series_weighted_sum):
+    """
+    Calculate the same trend as `calculate_trend`, for a series over `range(count)`, from running sums of the series,
+    so the trend of a series that is only ever extended or shortened at its end can be kept up to date in O(1).
+
+    :param count: The number of items in the series.
+    :param series_sum: The sum of the items in the series.
+    :param series_weighted_sum: The sum of each item in the series multiplied by its index.
+    :return: The calculated trend of the series, or None if the determinate indicates no trend.
+    """
+    x = count * (count - 1) // 2
+    xx = (count - 1) * count * (2 * count - 1) // 6
+
+    d = xx * count - x * x
+
+    if d != 0:
+        return (series_weighted_sum * count - series_sum * x) / d
+    else:
+        return None
+
+
 def split_csv(s, delimiter=',', quotechar="'"):
     f = io.StringIO(s)
     reader = csv.reader(f, delimiter=delimiter, quotechar=quotechar)
@@ -69,3 +69,31 @@ def urlopen_secure(url: Union[str, Request], timeout: int = _DEFAULT_TIMEOUT_SEC
         return _secure_opener.open(url, timeout=timeout)
     except http.client.HTTPException as ex:
         raise URLError(str(ex)) from ex
+
+
+def accepts_gzip(request) -> bool:
+    """
+    Whether the request's ``Accept-Encoding`` allows a gzip-compressed response. A coding's
+    ``q`` value is honoured, so ``gzip;q=0`` refuses gzip; when gzip isn't listed, a ``*``
+    entry decides.
+
+    :param request: The request whose ``Accept-Encoding`` header is negotiated.
+    :return: True if gzip is acceptable with a non-zero quality.
+    """
+    qualities = {}
+    for entry in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, *params = [part.strip() for part in entry.split(';')]
+        if not coding:
+            continue
+
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
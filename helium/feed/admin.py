@@ -10,7 +10,7 @@ from helium.feed.tasks import reindex_feeds
 @logged_action
 @django_admin.action(description='Force re-index selected calendars')
 def force_reindex_calendars(modeladmin, request, queryset):
-    queryset.update(etag=None, last_modified_header=None)
+    queryset.update(etag=None, last_modified_header=None, content_hash=None)
     calendar_ids = list(queryset.values_list('id', flat=True))
     taskutils.safe_apply_async(reindex_feeds,
         kwargs={'calendar_ids': calendar_ids},
@@ -34,7 +34,7 @@ class ExternalCalendarAdmin(ObjectActionsMixin, BaseModelAdmin):
         readonly_fields = super().get_readonly_fields(request, obj)
 
         if obj:
-            return readonly_fields + self.readonly_fields + ('user', 'etag', 'last_modified_header',
+            return readonly_fields + self.readonly_fields + ('user', 'etag', 'last_modified_header', 'content_hash',
                                                                 'last_index', 'last_sync_error',
                                                                 'consecutive_failures',)
 
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.17 on 2026-10-18 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0016_alter_externalcalendar_last_sync_error'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='externalcalendar',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='A SHA-256 digest of the iCal feed body last parsed into the cache, if it was parsed by a reindex.', max_length=64, null=True),
+        ),
+    ]
@@ -30,6 +30,10 @@ class ExternalCalendar(BaseModel):
     last_modified_header = models.CharField(help_text='The Last-Modified header from the last successful iCal fetch.',
                                             max_length=255, blank=True, null=True)
 
+    content_hash = models.CharField(
+        help_text='A SHA-256 digest of the iCal feed body last parsed into the cache, if it was parsed by a reindex.',
+        max_length=64, blank=True, null=True)
+
     last_sync_error = models.TextField(help_text='Error message from the most recent failed sync attempt.',
                                        blank=True, null=True)
 
@@ -1,32 +1,45 @@
 import datetime
-import json
+import http.client
+import itertools
 import logging
+import threading
+import time
+from concurrent import futures
 from urllib.error import URLError
+from urllib.parse import urlparse
 from urllib.request import Request
 from zoneinfo import ZoneInfo
 
-import icalendar
-from dateutil import parser
 from django.conf import settings
 from django.core import validators
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db.models import Min
+from django.db.models.functions import Mod
 from django.utils import timezone
 from rest_framework import status
 
 from helium.common import enums
-from helium.common.utils import metricutils
+from helium.common.utils import metricutils, taskutils
 from helium.common.utils.commonutils import HeliumError, deterministic_id
 from helium.common.utils.httputils import urlopen_secure
 from helium.feed.models import ExternalCalendar
-from helium.feed.services.icalparseservice import parse_events
+from helium.feed.services.icalparseservice import ICalFeedTooLargeError, spool_feed, stream_events
 from helium.planner.models import Event
-from helium.planner.serializers.eventserializer import EventSerializer
+from helium.planner.utils import eventcacheutils
 
 logger = logging.getLogger(__name__)
 
 url_validator = validators.URLValidator()
 
+# Shared across requests, so concurrent fetches are bounded per process, not per request
+_fetch_executor = futures.ThreadPoolExecutor(max_workers=settings.FEED_FETCH_MAX_WORKERS,
+                                             thread_name_prefix='feed-fetch')
+
+
+# A fetch started right at its deadline is still given this long for each socket operation, rather than none at all
+_MIN_FETCH_TIMEOUT_SECONDS = 0.1
+
 
 class HeliumICalError(HeliumError):
     pass
@@ -36,6 +49,55 @@ def _get_cache_prefix(external_calendar):
     return f"users:{external_calendar.user_id}:externalcalendars:{external_calendar.pk}:events"
 
 
+def _get_refresh_lock_key(external_calendar):
+    return f"{_get_cache_prefix(external_calendar)}:refreshing"
+
+
+def _get_cached_value(external_calendar):
+    """
+    Fetch the cached events for the given external calendar. Each entry carries a soft expiry, after which it's
+    stale but still served, alongside the cache's own (hard) expiry.
+
+    :return: A tuple of the cached value (or None if nothing is cached) and whether it is stale.
+    """
+    cached = cache.get(_get_cache_prefix(external_calendar))
+    if not cached:
+        return None, False
+
+    if not isinstance(cached, tuple):
+        # Cached before entries carried a soft expiry, so it won't decode; it's returned only to be invalidated
+        return cached, False
+
+    stale_at, cached_value = cached
+
+    return cached_value, time.time() >= stale_at
+
+
+def _set_cached_value(external_calendar, cached_value):
+    cache.set(_get_cache_prefix(external_calendar),
+              (time.time() + settings.FEED_CACHE_TTL_SECONDS, cached_value),
+              settings.FEED_CACHE_TTL_SECONDS + settings.FEED_CACHE_STALE_TTL_SECONDS)
+
+
+def _refresh_stale_calendars(external_calendars):
+    """
+    Enqueue a single reindex of the given stale calendars, skipping any whose refresh is already enqueued.
+    """
+    calendar_ids = [external_calendar.pk for external_calendar in external_calendars
+                    if cache.add(_get_refresh_lock_key(external_calendar), True,
+                                 settings.FEED_CACHE_REFRESH_LOCK_SECONDS)]
+    if not calendar_ids:
+        return
+
+    logger.info(f"External Calendars {calendar_ids} served stale, refresh enqueued")
+    metricutils.increment('feed.cache.stale', value=len(calendar_ids))
+
+    from helium.feed.tasks import reindex_feeds
+
+    taskutils.safe_apply_async(reindex_feeds, kwargs={'calendar_ids': calendar_ids},
+                               priority=settings.CELERY_PRIORITY_LOW)
+
+
 def _apply_event_filters(event, _from, to, search):
     if _from and to and not (
             (_from <= event.start <= to or _from <= event.end <= to) or
@@ -55,26 +117,10 @@ def _get_events_from_cache(external_calendar, cached_value, _from=None, to=None,
     invalid_data = False
 
     try:
-        for event_data in json.loads(cached_value):
-            event = Event(id=event_data['id'],
-                          title=event_data['title'],
-                          all_day=event_data['all_day'],
-                          show_end_time=event_data['show_end_time'],
-                          start=parser.parse(event_data['start']),
-                          end=parser.parse(event_data['end']),
-                          owner_id=event_data['owner_id'],
-                          user_id=event_data['user'],
-                          calendar_item_type=event_data['calendar_item_type'],
-                          url=event_data['url'],
-                          comments=event_data['comments'],
-                          recurrence_rule=event_data.get('recurrence_rule'),
-                          exception_dates=event_data.get('exception_dates'))
-            event.color = external_calendar.color
-            event.location = event_data.get('location')
-
+        for event in eventcacheutils.decode_events(cached_value, external_calendar.color, _from, to):
             if _apply_event_filters(event, _from, to, search):
                 events.append(event)
-    except (json.JSONDecodeError, KeyError, TypeError):
+    except ValueError:
         invalid_data = True
 
     if invalid_data:
@@ -84,14 +130,29 @@ def _get_events_from_cache(external_calendar, cached_value, _from=None, to=None,
     return events, not invalid_data
 
 
-def _create_events_from_calendar(external_calendar, calendar, _from=None, to=None, search=None):
+def _stream_events(feed, time_zone):
+    try:
+        yield from stream_events(feed, time_zone)
+    except ICalFeedTooLargeError as ex:
+        logger.info(f"The ICAL feed is too large: {ex}")
+        metricutils.increment('feed.ical.failed', extra_tags=['reason:too_large'])
+        raise HeliumICalError("The iCal feed is too large.")
+    except ValueError as ex:
+        logger.info(f"The URL did not return a valid ICAL feed: {ex}")
+        metricutils.increment('feed.ical.failed', extra_tags=['reason:invalid_feed'])
+        raise HeliumICalError("The URL did not return a valid iCal feed.")
+    finally:
+        feed.close()
+
+
+def _create_events_from_calendar(external_calendar, feed, _from=None, to=None, search=None, content_hash=None):
     events = []
     events_filtered = []
 
     user = external_calendar.user
     time_zone = ZoneInfo(user.settings.time_zone)
 
-    for parsed in parse_events(calendar, time_zone):
+    for parsed in _stream_events(feed, time_zone):
         comments = parsed['description'] or ""
 
         event = Event(id=deterministic_id(external_calendar.pk, parsed['identity'], parsed['start'].isoformat()),
@@ -138,15 +199,18 @@ def _create_events_from_calendar(external_calendar, calendar, _from=None, to=Non
             if _apply_event_filters(extra_event, _from, to, search):
                 events_filtered.append(extra_event)
 
-    serializer = EventSerializer(events, many=True)
-    events_json = json.dumps(serializer.data)
-    if len(events_json.encode('utf-8')) <= settings.FEED_MAX_CACHEABLE_SIZE:
-        cache.set(_get_cache_prefix(external_calendar), events_json, settings.FEED_CACHE_TTL_SECONDS)
+    cached_value = eventcacheutils.encode_events(events)
+    if len(cached_value) <= settings.FEED_MAX_CACHEABLE_SIZE:
+        _set_cached_value(external_calendar, cached_value)
 
-        ExternalCalendar.objects.filter(pk=external_calendar.pk).update(last_index=timezone.now())
+        # The digest is only kept for the body now in the cache; when it wasn't hashed it's cleared, so the next
+        # reindex can't mistake an older body for what's cached
+        ExternalCalendar.objects.filter(pk=external_calendar.pk).update(last_index=timezone.now(),
+                                                                        content_hash=content_hash)
+        external_calendar.content_hash = content_hash
     else:
         logger.warning("Cache size {max_cache_size} exceeded max, External Calendar {id}".format(
-            max_cache_size=len(events_json.encode('utf-8')),
+            max_cache_size=len(cached_value),
             id=external_calendar.pk))
 
         metricutils.increment('task.cache.max-size-exceeded')
@@ -160,6 +224,7 @@ def invalidate_calendar_cache(external_calendar):
     ExternalCalendar.objects.filter(pk=external_calendar.pk).update(
         etag=None,
         last_modified_header=None,
+        content_hash=None,
         last_index=None,
         last_sync_error=None,
         consecutive_failures=0,
@@ -168,104 +233,171 @@ def invalidate_calendar_cache(external_calendar):
     logger.info(f"Cache invalidated for External Calendar {external_calendar.pk}")
 
 
-def validate_url(url):
+def _fetch_ical(url, deadline=None):
     """
-    Validates that a given URL maps to a valid ICAL feed. Validation includes both simple HTTP validation as well as
-    downloading and parsing the calendar itself to ensure it is valid. As such, since we parse the full calendar to
-    ensure its validity, a Calendar object is also returned if validation is successful.
-
-    :param url: The ICAL URL to validate
-    :return: The validated ICAL feed in a Calendar object
+    Downloads the iCal feed at the given URL into a spooled file, without parsing it.
+
+    :param url: The ICAL URL to fetch
+    :param deadline: The ``time.monotonic()`` by which the feed must be downloaded, if any, which also bounds each
+        socket operation of the download
+    :return: The spooled feed, positioned at its start
+    :raises HeliumICalError: If the URL is invalid or unreachable, or does not return an iCal feed
+    :raises TimeoutError: If the feed isn't downloaded by the deadline
     """
     try:
         url_validator(url)
 
-        response = urlopen_secure(url)
+        if deadline is None:
+            response = urlopen_secure(url)
+        else:
+            response = urlopen_secure(url, timeout=max(deadline - time.monotonic(), _MIN_FETCH_TIMEOUT_SECONDS))
 
         if response.getcode() != status.HTTP_200_OK:
             raise HeliumICalError("The URL did not return a valid response.")
 
-        return icalendar.Calendar.from_ical(response.read())
+        feed, _ = spool_feed(response, deadline)
+
+        return feed
     except ValidationError as ex:
         logger.info(f"The URL is invalid: {ex}")
 
         raise HeliumICalError(ex.message)
     except URLError as ex:
+        # Running out of time to connect is the deadline's doing, not the URL's
+        if deadline is not None and isinstance(ex.reason, TimeoutError):
+            raise TimeoutError("The feed was not downloaded within the deadline.") from ex
+
         logger.info(f"The URL is not reachable: {ex}")
 
         raise HeliumICalError("The URL is not reachable.")
+    except ICalFeedTooLargeError as ex:
+        logger.info(f"The ICAL feed is too large: {ex}")
+
+        raise HeliumICalError("The iCal feed is too large.")
     except ValueError as ex:
         logger.info(f"The URL did not return a valid ICAL feed: {ex}")
 
         raise HeliumICalError("The URL did not return a valid iCal feed.")
 
 
-def fetch_ical_conditional(external_calendar):
+def validate_url(url):
     """
-    Fetches an iCal feed using conditional HTTP requests (ETag/If-Modified-Since).
+    Validates that a given URL maps to a valid ICAL feed. Validation includes both simple HTTP validation as well as
+    downloading and parsing the calendar itself to ensure it is valid, one component at a time.
 
-    If the feed has not been modified since the last fetch (304 Not Modified),
-    returns None to indicate the existing cache should be used.
+    :param url: The ICAL URL to validate
+    :raises HeliumICalError: If the URL is not a valid ICAL feed
+    """
+    for _ in _stream_events(_fetch_ical(url), datetime.timezone.utc):
+        pass
 
-    If the feed has been modified or this is the first fetch, returns the parsed
-    Calendar object and updates the external_calendar's etag and last_modified_header.
 
-    :param external_calendar: The ExternalCalendar model instance
-    :return: Parsed icalendar.Calendar object, or None if not modified (304)
-    :raises HeliumICalError: If the URL is unreachable or returns invalid data
+def _fetch_ical_conditional(url, etag=None, last_modified_header=None, content_hash=None, deadline=None):
+    """
+    Fetches an iCal feed using conditional HTTP requests (ETag/If-Modified-Since), without touching the database, so it
+    is safe to run off of the calling thread.
+
+    The response body is spooled rather than parsed, to be streamed through ``stream_events``. Many servers send
+    neither an ETag nor a Last-Modified header, so it is also hashed, and when it matches ``content_hash`` it is
+    treated as not modified.
+
+    :param url: The URL of the iCal feed.
+    :param etag: The ETag from the last fetch, if any.
+    :param last_modified_header: The Last-Modified header from the last fetch, if any.
+    :param content_hash: The digest of the body from the last fetch, if any.
+    :param deadline: The ``time.monotonic()`` by which the feed must be downloaded, if any, which also bounds each
+        socket operation of the download
+    :return: A tuple of the spooled feed (or None if not modified), the ETag and Last-Modified headers of the
+        response, and the digest of its body
+    :raises HeliumICalError: If the URL is unreachable, doesn't respond by the deadline or returns invalid data
     """
     try:
-        request = Request(external_calendar.url)
+        request = Request(url)
 
         # Add conditional request headers if we have cached values
-        if external_calendar.etag:
-            request.add_header('If-None-Match', external_calendar.etag)
-        if external_calendar.last_modified_header:
-            request.add_header('If-Modified-Since', external_calendar.last_modified_header)
-
-        response = urlopen_secure(request)
+        if etag:
+            request.add_header('If-None-Match', etag)
+        if last_modified_header:
+            request.add_header('If-Modified-Since', last_modified_header)
+
+        if deadline is None:
+            response = urlopen_secure(request)
+        else:
+            response = urlopen_secure(request, timeout=max(deadline - time.monotonic(), _MIN_FETCH_TIMEOUT_SECONDS))
         response_code = response.getcode()
 
         if response_code == status.HTTP_304_NOT_MODIFIED:
-            logger.info(f"External Calendar {external_calendar.pk} not modified (304)")
-            return None
+            return None, None, None, content_hash
 
         if response_code != status.HTTP_200_OK:
             raise HeliumICalError("The URL did not return a valid response.")
 
-        # Store caching headers from the response for next time
         new_etag = response.getheader('ETag')
         new_last_modified = response.getheader('Last-Modified')
 
-        if new_etag or new_last_modified:
-            update_fields = []
-            if new_etag and new_etag != external_calendar.etag:
-                external_calendar.etag = new_etag
-                update_fields.append('etag')
-            if new_last_modified and new_last_modified != external_calendar.last_modified_header:
-                external_calendar.last_modified_header = new_last_modified
-                update_fields.append('last_modified_header')
-            if update_fields:
-                external_calendar.save(update_fields=update_fields)
+        feed, new_content_hash = spool_feed(response, deadline)
+
+        if new_content_hash == content_hash:
+            feed.close()
+            metricutils.increment('feed.ical.unchanged')
+            return None, new_etag, new_last_modified, new_content_hash
 
         metricutils.increment('feed.ical.fetched')
-        return icalendar.Calendar.from_ical(response.read())
+        return feed, new_etag, new_last_modified, new_content_hash
 
     except URLError as ex:
         logger.info(f"The URL is not reachable: {ex}")
         metricutils.increment('feed.ical.failed', extra_tags=['reason:unreachable'])
         raise HeliumICalError("The URL is not reachable.")
+    except TimeoutError as ex:
+        logger.info(f"The URL did not respond in time: {ex}")
+        metricutils.increment('feed.ical.failed', extra_tags=['reason:timeout'])
+        raise HeliumICalError("The URL did not respond in time.")
+    except (OSError, http.client.HTTPException) as ex:
+        # The connection failed part-way through the download
+        logger.info(f"The URL is not reachable: {ex}")
+        metricutils.increment('feed.ical.failed', extra_tags=['reason:unreachable'])
+        raise HeliumICalError("The URL is not reachable.")
+    except ICalFeedTooLargeError as ex:
+        logger.info(f"The ICAL feed is too large: {ex}")
+        metricutils.increment('feed.ical.failed', extra_tags=['reason:too_large'])
+        raise HeliumICalError("The iCal feed is too large.")
     except ValueError as ex:
         logger.info(f"The URL did not return a valid ICAL feed: {ex}")
         metricutils.increment('feed.ical.failed', extra_tags=['reason:invalid_feed'])
         raise HeliumICalError("The URL did not return a valid iCal feed.")
 
 
+def _fetch_ical_conditional_politely(host_semaphore, url, etag=None, last_modified_header=None, content_hash=None):
+    with host_semaphore:
+        # The deadline starts once a connection to the host is free, so waiting on the host's other fetches doesn't
+        # eat into it
+        deadline = time.monotonic() + settings.FEED_REINDEX_FETCH_DEADLINE_SECONDS
+
+        return _fetch_ical_conditional(url, etag, last_modified_header, content_hash, deadline)
+
+
+def _save_caching_headers(external_calendar, new_etag, new_last_modified):
+    # Store caching headers from the response for next time
+    update_fields = []
+    if new_etag and new_etag != external_calendar.etag:
+        external_calendar.etag = new_etag
+        update_fields.append('etag')
+    if new_last_modified and new_last_modified != external_calendar.last_modified_header:
+        external_calendar.last_modified_header = new_last_modified
+        update_fields.append('last_modified_header')
+    if update_fields:
+        external_calendar.save(update_fields=update_fields)
+
+
 def calendar_to_events(external_calendar, _from=None, to=None, search=None):
     """
     For the given external calendar model and parsed ICAL calendar, convert each item in the calendar to an event
     resources.
 
+    Once cached events pass their soft expiry, they are still returned, and a refresh of the calendar is enqueued
+    rather than fetched inline.
+
     :param external_calendar: The external calendar source that is referenced by the calendar object.
     :param _from: The earliest date by which to filter results.
     :param to: The last date by which to filter results.
@@ -275,26 +407,125 @@ def calendar_to_events(external_calendar, _from=None, to=None, search=None):
     events = []
 
     cached = False
-    cached_value = cache.get(_get_cache_prefix(external_calendar))
+    cached_value, stale = _get_cached_value(external_calendar)
     if cached_value:
         events, cached = _get_events_from_cache(external_calendar, cached_value, _from, to, search)
 
+    if cached and stale:
+        _refresh_stale_calendars([external_calendar])
+
     if not cached:
-        calendar = validate_url(external_calendar.url)
+        feed = _fetch_ical(external_calendar.url)
 
-        events = _create_events_from_calendar(external_calendar, calendar, _from, to, search)
+        events = _create_events_from_calendar(external_calendar, feed, _from, to, search)
 
     return events
 
 
-def reindex_stale_feed_caches(calendar_ids=None):
+def _close_abandoned_feed(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def calendars_to_events(external_calendars, _from=None, to=None, search=None):
+    """
+    For each of the given external calendars, convert each item in its calendar to an event resource, as
+    ``calendar_to_events`` does. Calendars that aren't cached are fetched and parsed concurrently, so a cold request
+    costs the slowest upstream rather than the sum of them. Calendars still outstanding after
+    ``FEED_FETCH_DEADLINE_SECONDS`` are skipped for this request, and a reindex of them is enqueued so their cache is
+    warm for the next.
+
+    :param external_calendars: The external calendars to convert.
+    :param _from: The earliest date by which to filter results.
+    :param to: The last date by which to filter results.
+    :param search: The search string to filter by.
+    :return: A tuple of the list of event resources and the list of calendars that are not valid ICAL feeds.
+    """
+    events_by_calendar = {}
+    invalid_calendars = []
+
+    deadline = time.monotonic() + settings.FEED_FETCH_DEADLINE_SECONDS
+    pending = {}
+    stale_calendars = []
+    for external_calendar in external_calendars:
+        cached = False
+        cached_value, stale = _get_cached_value(external_calendar)
+        if cached_value:
+            events_by_calendar[external_calendar.pk], cached = _get_events_from_cache(external_calendar, cached_value,
+                                                                                      _from, to, search)
+
+        if cached and stale:
+            stale_calendars.append(external_calendar)
+
+        if not cached:
+            pending[_fetch_executor.submit(_fetch_ical, external_calendar.url, deadline)] = external_calendar
+            # Holds the calendar's place, so events are returned in the order of the given calendars
+            events_by_calendar[external_calendar.pk] = []
+
+    if stale_calendars:
+        _refresh_stale_calendars(stale_calendars)
+
+    if pending:
+        # What's left of the deadline, as reading the cache and submitting the fetches has already taken some of it
+        done, not_done = futures.wait(pending, timeout=max(deadline - time.monotonic(), 0))
+
+        skipped = []
+        for future, external_calendar in pending.items():
+            if future not in done:
+                # A fetch that's already running can't be cancelled, but it's bound by the deadline too, and its feed
+                # is closed once it finishes
+                if not future.cancel():
+                    future.add_done_callback(_close_abandoned_feed)
+                skipped.append(external_calendar)
+                continue
+
+            try:
+                # Building the events also writes the cache and the calendar's `last_index`, so it stays on this
+                # thread (and its database connection)
+                events_by_calendar[external_calendar.pk] = _create_events_from_calendar(
+                    external_calendar, future.result(), _from, to, search)
+            except HeliumICalError:
+                invalid_calendars.append(external_calendar)
+            except TimeoutError:
+                skipped.append(external_calendar)
+
+        if skipped:
+            calendar_ids = [external_calendar.pk for external_calendar in skipped]
+
+            logger.warning(f"External Calendars {calendar_ids} not fetched within the deadline, skipped")
+            metricutils.increment('feed.ical.deadline-exceeded', value=len(calendar_ids))
+
+            from helium.feed.tasks import reindex_feeds
+
+            taskutils.safe_apply_async(reindex_feeds, kwargs={'calendar_ids': calendar_ids},
+                                       priority=settings.CELERY_PRIORITY_LOW)
+
+    events = [event for calendar_events in events_by_calendar.values() for event in calendar_events]
+
+    return events, invalid_calendars
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def reindex_stale_feed_caches(calendar_ids=None, shard=None, shard_count=None):
     """
+    Feeds are fetched concurrently, on up to ``FEED_REINDEX_MAX_WORKERS`` threads, with no more than
+    ``FEED_REINDEX_MAX_CONNECTIONS_PER_HOST`` requests to a single upstream host in flight at once. Each result is
+    then applied (cache and database writes) on the calling thread.
+
     :param calendar_ids: Optional list of ExternalCalendar PKs to reindex. When provided, bypasses
         the stale-cache check and targets only those specific calendars. When None (default),
         reindexes all calendars whose cache is stale.
+    :param shard: When given with ``shard_count``, only stale calendars whose PK falls in this shard are reindexed.
+    :param shard_count: The number of shards stale calendars are partitioned across.
     """
     reindexed = []
     not_modified = []
+    failed = []
 
     if calendar_ids is not None:
         queryset = (ExternalCalendar.objects
@@ -305,44 +536,90 @@ def reindex_stale_feed_caches(calendar_ids=None):
                     .needs_recached(timezone.now() - datetime.timedelta(seconds=settings.FEED_CACHE_REFRESH_TTL_SECONDS))
                     .select_related('user', 'user__settings'))
 
-    for external_calendar in queryset.iterator():
-        logger.info(f"Reindexing External Calendar {external_calendar.pk} feed")
-
-        try:
-            calendar = fetch_ical_conditional(external_calendar)
-
-            if calendar is None:
-                # 304 Not Modified - feed hasn't changed, just update last_index to extend cache
-                external_calendar.last_index = timezone.now()
-                external_calendar.last_sync_error = None
-                external_calendar.consecutive_failures = 0
-                external_calendar.save(update_fields=['last_index', 'last_sync_error', 'consecutive_failures'])
-                not_modified.append(external_calendar)
-            else:
-                # Feed was modified, clear cache and re-parse
-                cache.delete(_get_cache_prefix(external_calendar))
-                _create_events_from_calendar(external_calendar, calendar)
-                external_calendar.last_sync_error = None
-                external_calendar.consecutive_failures = 0
-                external_calendar.save(update_fields=['last_sync_error', 'consecutive_failures'])
-                reindexed.append(external_calendar)
-
-        except HeliumICalError as e:
-            external_calendar.consecutive_failures += 1
-            external_calendar.last_sync_error = str(e)
-            update_fields = ['consecutive_failures', 'last_sync_error']
-
-            if external_calendar.consecutive_failures >= settings.FEED_CONSECUTIVE_FAILURE_THRESHOLD:
-                logger.info(
-                    f"Disabling calendar {external_calendar.pk} after "
-                    f"{external_calendar.consecutive_failures} consecutive failures")
-                external_calendar.shown_on_calendar = False
-                update_fields.append('shown_on_calendar')
-            else:
-                logger.info(
-                    f"Calendar {external_calendar.pk} failure "
-                    f"{external_calendar.consecutive_failures}/{settings.FEED_CONSECUTIVE_FAILURE_THRESHOLD}: {e}")
-
-            external_calendar.save(update_fields=update_fields)
-
-    logger.info(f"Done reindexing: {len(reindexed)} updated, {len(not_modified)} not modified")
+        if shard is not None and shard_count:
+            queryset = queryset.annotate(shard=Mod('pk', shard_count)).filter(shard=shard)
+
+        oldest_index = queryset.aggregate(oldest_index=Min('last_index'))['oldest_index']
+        if oldest_index:
+            metricutils.gauge('feed.reindex.lag', int((timezone.now() - oldest_index).total_seconds()),
+                              extra_tags=[f'shard:{shard}'])
+
+    start = time.monotonic()
+    host_semaphores = {}
+
+    with futures.ThreadPoolExecutor(max_workers=settings.FEED_REINDEX_MAX_WORKERS,
+                                    thread_name_prefix='feed-reindex') as executor:
+        for chunk in _chunked(queryset.iterator(), settings.FEED_REINDEX_MAX_WORKERS * 4):
+            pending = []
+            for external_calendar in chunk:
+                host = urlparse(external_calendar.url).hostname
+                host_semaphore = host_semaphores.setdefault(
+                    host, threading.BoundedSemaphore(settings.FEED_REINDEX_MAX_CONNECTIONS_PER_HOST))
+
+                cached = cache.get(_get_cache_prefix(external_calendar))
+                # An unchanged body is only worth skipping if its events are still cached
+                content_hash = external_calendar.content_hash if isinstance(cached, tuple) else None
+
+                pending.append((external_calendar, cached,
+                                executor.submit(_fetch_ical_conditional_politely, host_semaphore,
+                                                external_calendar.url, external_calendar.etag,
+                                                external_calendar.last_modified_header, content_hash)))
+
+            for external_calendar, cached, future in pending:
+                logger.info(f"Reindexing External Calendar {external_calendar.pk} feed")
+
+                try:
+                    feed, new_etag, new_last_modified, new_content_hash = future.result()
+
+                    if feed is None:
+                        logger.info(f"External Calendar {external_calendar.pk} not modified")
+
+                        _save_caching_headers(external_calendar, new_etag, new_last_modified)
+
+                        # Feed hasn't changed (304, or an identical body), just update last_index to extend cache
+                        if isinstance(cached, tuple):
+                            _set_cached_value(external_calendar, cached[1])
+                        external_calendar.last_index = timezone.now()
+                        external_calendar.last_sync_error = None
+                        external_calendar.consecutive_failures = 0
+                        external_calendar.save(update_fields=['last_index', 'last_sync_error', 'consecutive_failures'])
+                        not_modified.append(external_calendar)
+                    else:
+                        _save_caching_headers(external_calendar, new_etag, new_last_modified)
+
+                        # Feed was modified, clear cache and re-parse
+                        cache.delete(_get_cache_prefix(external_calendar))
+                        _create_events_from_calendar(external_calendar, feed, content_hash=new_content_hash)
+                        external_calendar.last_sync_error = None
+                        external_calendar.consecutive_failures = 0
+                        external_calendar.save(update_fields=['last_sync_error', 'consecutive_failures'])
+                        reindexed.append(external_calendar)
+
+                except HeliumICalError as e:
+                    external_calendar.consecutive_failures += 1
+                    external_calendar.last_sync_error = str(e)
+                    update_fields = ['consecutive_failures', 'last_sync_error']
+
+                    if external_calendar.consecutive_failures >= settings.FEED_CONSECUTIVE_FAILURE_THRESHOLD:
+                        logger.info(
+                            f"Disabling calendar {external_calendar.pk} after "
+                            f"{external_calendar.consecutive_failures} consecutive failures")
+                        external_calendar.shown_on_calendar = False
+                        update_fields.append('shown_on_calendar')
+                    else:
+                        logger.info(
+                            f"Calendar {external_calendar.pk} failure "
+                            f"{external_calendar.consecutive_failures}/{settings.FEED_CONSECUTIVE_FAILURE_THRESHOLD}: {e}")
+
+                    external_calendar.save(update_fields=update_fields)
+                    failed.append(external_calendar)
+
+    elapsed_ms = int((time.monotonic() - start) * 1000)
+    for result, calendars in (('updated', reindexed), ('not_modified', not_modified), ('failed', failed)):
+        if calendars:
+            metricutils.increment('feed.reindex.calendars', value=len(calendars),
+                                  extra_tags=[f'result:{result}', f'shard:{shard}'])
+    metricutils.timing('feed.reindex.timing', elapsed_ms, extra_tags=[f'shard:{shard}'])
+
+    logger.info(f"Done reindexing: {len(reindexed)} updated, {len(not_modified)} not modified, "
+                f"{len(failed)} failed in {elapsed_ms}ms")
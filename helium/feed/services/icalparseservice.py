@@ -1,12 +1,23 @@
 import datetime
+import hashlib
 import logging
+import tempfile
+import time
 
+import icalendar
+from django.conf import settings
 from django.utils import timezone
 
 from helium.common.utils.validators import infer_byday_for_weekly_rrule, validate_recurrence_rule
 
 logger = logging.getLogger(__name__)
 
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+class ICalFeedTooLargeError(ValueError):
+    pass
+
 
 def _resolve_component_time_zone(component, default_time_zone):
     """Resolve a VTIMEZONE to a tzinfo from its own offset rules, honoring a non-IANA abbreviation
@@ -69,7 +80,7 @@ def _extract_extra_dates(component, default_time_zone):
     return extras
 
 
-def _collect_recurrence_id_overrides(calendar, default_time_zone):
+def _collect_recurrence_id_overrides(components, default_time_zone):
     """Map UID to a list of UTC ISO-8601 strings naming the original occurrence datetimes
     that any RECURRENCE-ID overrides replace.
 
@@ -79,7 +90,7 @@ def _collect_recurrence_id_overrides(calendar, default_time_zone):
     """
     overrides_by_uid = {}
     time_zone = default_time_zone
-    for component in calendar.walk():
+    for component in components:
         if component.name == "VTIMEZONE":
             time_zone = _resolve_component_time_zone(component, default_time_zone)
             continue
@@ -113,10 +124,15 @@ def parse_events(calendar, default_time_zone):
         user's).
     :return: A generator of normalized VEVENT dicts.
     """
+    recurrence_id_overrides = _collect_recurrence_id_overrides(calendar.walk(), default_time_zone)
+
+    yield from _parse_components(calendar.walk(), default_time_zone, recurrence_id_overrides)
+
+
+def _parse_components(components, default_time_zone, recurrence_id_overrides):
     time_zone = default_time_zone
-    recurrence_id_overrides = _collect_recurrence_id_overrides(calendar, time_zone)
 
-    for component in calendar.walk():
+    for component in components:
         if component.name == "VTIMEZONE":
             time_zone = _resolve_component_time_zone(component, default_time_zone)
             continue
@@ -204,3 +220,127 @@ def parse_events(calendar, default_time_zone):
             'exception_dates': exception_dates,
             'extra_starts': _extract_extra_dates(component, time_zone),
         }
+
+
+def spool_feed(response, deadline=None):
+    """Read an iCal feed from the given response in chunks into a temporary file, which is only held in memory up
+    to ``FEED_ICAL_SPOOL_SIZE``, hashing it as it goes.
+
+    :param response: A file-like HTTP response.
+    :param deadline: The ``time.monotonic()`` by which the feed must be read, if any.
+    :return: A tuple of the spooled feed, positioned at its start, and the SHA-256 hex digest of its body.
+    :raises ICalFeedTooLargeError: If the feed is larger than ``FEED_MAX_ICAL_SIZE``.
+    :raises ValueError: If the feed does not start as an iCal calendar.
+    :raises TimeoutError: If the feed isn't read by the deadline.
+    """
+    content_length = response.getheader('Content-Length')
+    if content_length and content_length.isdigit() and int(content_length) > settings.FEED_MAX_ICAL_SIZE:
+        raise ICalFeedTooLargeError(f"The feed is {content_length} bytes, over the limit.")
+
+    feed = tempfile.SpooledTemporaryFile(max_size=settings.FEED_ICAL_SPOOL_SIZE)
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        while chunk := response.read(_READ_CHUNK_SIZE):
+            if size == 0 and not chunk.lstrip(b'\xef\xbb\xbf \t\r\n').upper().startswith(b'BEGIN:VCALENDAR'):
+                raise ValueError("The feed is not an iCal calendar.")
+
+            size += len(chunk)
+            if size > settings.FEED_MAX_ICAL_SIZE:
+                raise ICalFeedTooLargeError(f"The feed is over the limit of {settings.FEED_MAX_ICAL_SIZE} bytes.")
+
+            digest.update(chunk)
+            feed.write(chunk)
+
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError("The feed was not read within the deadline.")
+    except (ValueError, TimeoutError):
+        feed.close()
+        raise
+
+    if size == 0:
+        feed.close()
+        raise ValueError("The feed is empty.")
+
+    feed.seek(0)
+
+    return feed, digest.hexdigest()
+
+
+def _iter_component_blocks(feed):
+    """Yield the name and raw lines of each VTIMEZONE and VEVENT in the spooled feed, one at a time.
+
+    As ``icalendar`` does, a VEVENT found inside a VTIMEZONE that was never closed is treated as
+    following it, rather than failing the feed.
+    """
+    feed.seek(0)
+
+    name = None
+    block = []
+    depth = 0
+    for line in feed:
+        marker = line.strip().upper()
+
+        if name is None:
+            if marker in (b'BEGIN:VEVENT', b'BEGIN:VTIMEZONE'):
+                name = marker[6:].decode()
+                block = [line]
+                depth = 1
+            continue
+
+        if name == 'VTIMEZONE' and marker == b'BEGIN:VEVENT':
+            yield name, b''.join(block) + b'END:VTIMEZONE\r\n'
+            name = 'VEVENT'
+            block = [line]
+            depth = 1
+            continue
+
+        block.append(line)
+        if marker.startswith(b'BEGIN:'):
+            depth += 1
+        elif marker.startswith(b'END:'):
+            depth -= 1
+            if depth == 0:
+                yield name, b''.join(block)
+                name = None
+
+
+def _iter_components(feed, event_filter=None):
+    for name, block in _iter_component_blocks(feed):
+        # Skips parsing any VEVENT that doesn't contain the given bytes
+        if name == 'VEVENT' and event_filter and event_filter not in block:
+            continue
+
+        yield icalendar.Calendar.from_ical(block)
+
+
+def _iter_capped_components(feed):
+    count = 0
+    for component in _iter_components(feed):
+        if component.name == "VEVENT":
+            count += 1
+            if count > settings.FEED_MAX_ICAL_EVENTS:
+                raise ICalFeedTooLargeError(f"The feed has over the limit of {settings.FEED_MAX_ICAL_EVENTS} events.")
+
+        yield component
+
+
+def stream_events(feed, default_time_zone):
+    """Yield a normalized dict for each importable VEVENT in a spooled feed, as ``parse_events`` does for a parsed
+    calendar, but parsing only one component at a time, so memory doesn't grow with the size of the feed.
+
+    The feed is read twice: first for only the VTIMEZONEs and RECURRENCE-ID overrides, which must be known before
+    the series they override is yielded, then for every VEVENT.
+
+    :param feed: A seekable, binary file-like iCal feed, as returned by ``spool_feed``.
+    :param default_time_zone: Time zone assumed for naive/floating values (typically the
+        user's).
+    :return: A generator of normalized VEVENT dicts.
+    :raises ICalFeedTooLargeError: Once more than ``FEED_MAX_ICAL_EVENTS`` VEVENTs have been read.
+    :raises ValueError: If a component is malformed.
+    """
+    recurrence_id_overrides = _collect_recurrence_id_overrides(
+        _iter_components(feed, event_filter=b'RECURRENCE-ID'), default_time_zone)
+
+    yield from _parse_components(_iter_capped_components(feed), default_time_zone, recurrence_id_overrides)
@@ -1,14 +1,19 @@
 import datetime
+import gzip
+import hashlib
 import logging
 from zoneinfo import ZoneInfo
 
 import icalendar
 from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Max, Prefetch
 from django.http import HttpResponse
 from django.utils import timezone
 from django.utils.http import http_date, parse_http_date_safe
 
+from helium.common.utils import metricutils
+from helium.common.utils.commonutils import HeliumError
 from helium.planner.models import Homework, Course, CourseSchedule, CourseGroup, Category
 
 from helium.planner.services import coursescheduleservice
@@ -16,6 +21,14 @@ from helium.planner.services import coursescheduleservice
 logger = logging.getLogger(__name__)
 
 
+class IncompleteICalFeedError(HeliumError):
+    """Raised when a feed could only be partially rendered, with what was rendered, so it's served but not cached."""
+
+    def __init__(self, ical_feed):
+        super().__init__("The iCal feed could only be partially rendered.")
+        self.ical_feed = ical_feed
+
+
 def get_events_last_modified(user) -> datetime.datetime | None:
     """
     Get the maximum updated_at timestamp from all events for a user, also
@@ -106,6 +119,56 @@ def check_conditional_request(request, etag: str, last_modified: datetime.dateti
     return None
 
 
+def _get_feed_cache_key(user, feed_type, etag, last_modified):
+    # The ETag only has second precision, so the exact timestamp it was built from is part of the key too, as are the
+    # user's settings the feed is rendered with
+    fingerprint = hashlib.sha256(
+        f'{etag}:{last_modified.isoformat() if last_modified else None}:{user.username}:{user.settings.time_zone}'
+        .encode('utf-8')).hexdigest()
+
+    return f"users:{user.pk}:feeds:private:{feed_type}:{fingerprint}"
+
+
+def get_private_ical_feed(user, feed_type, etag, last_modified, build_feed):
+    """
+    Get the rendered iCal feed of the given type for the user, from the cache if it has already been rendered for the
+    feed's current ETag. The cache is keyed by the same last-modified timestamp the ETag is, so any change to the
+    feed's data (or a deletion) moves the feed to a new key.
+
+    :param user: The user whose feed to get.
+    :param feed_type: The type of feed (e.g. "events"), for the cache key and metrics.
+    :param etag: The feed's current ETag.
+    :param last_modified: The feed's current last-modified datetime, or None for empty feeds.
+    :param build_feed: Called with the user to render the feed on a miss. A feed it could only partially render (see
+        ``IncompleteICalFeedError``) is returned, but not cached.
+    :return: A tuple of the ICS bytes and whether they are gzip-compressed.
+    """
+    key = _get_feed_cache_key(user, feed_type, etag, last_modified)
+
+    cached = cache.get(key)
+    if cached is not None:
+        metricutils.increment('feed.private.cache', extra_tags=[f'type:{feed_type}', 'result:hit'])
+        return cached
+
+    metricutils.increment('feed.private.cache', extra_tags=[f'type:{feed_type}', 'result:miss'])
+
+    try:
+        ical_feed = build_feed(user)
+    except IncompleteICalFeedError as ex:
+        # Caching it would pin the partial feed under the ETag until the data next changes
+        metricutils.increment('feed.private.cache', extra_tags=[f'type:{feed_type}', 'result:incomplete'])
+        return ex.ical_feed, False
+
+    if settings.FEED_ICS_CACHE_GZIP:
+        cached = (gzip.compress(ical_feed), True)
+    else:
+        cached = (ical_feed, False)
+
+    cache.set(key, cached, settings.FEED_ICS_CACHE_TTL_SECONDS)
+
+    return cached
+
+
 def _create_calendar(user):
     calendar = icalendar.Calendar()
 
@@ -180,9 +243,11 @@ def events_to_private_ical_feed(user):
 
     :param user: The user to generate an ICAL feed for.
     :return: An ICAL string of all the user's events.
+    :raises IncompleteICalFeedError: If an error stops the feed being fully rendered.
     """
     timezone.activate(ZoneInfo(user.settings.time_zone))
 
+    complete = True
     try:
         calendar = _create_calendar(user)
 
@@ -202,9 +267,14 @@ def events_to_private_ical_feed(user):
             calendar.add_component(calendar_event)
     except Exception:
         logger.error("An unknown error occurred.", exc_info=True)
+        complete = False
     timezone.deactivate()
 
-    return calendar.to_ical()
+    ical_feed = calendar.to_ical()
+    if not complete:
+        raise IncompleteICalFeedError(ical_feed)
+
+    return ical_feed
 
 
 def homework_to_private_ical_feed(user):
@@ -213,9 +283,11 @@ def homework_to_private_ical_feed(user):
 
     :param user: The user to generate an ICAL feed for.
     :return: An ICAL string of all the user's homework.
+    :raises IncompleteICalFeedError: If an error stops the feed being fully rendered.
     """
     timezone.activate(ZoneInfo(user.settings.time_zone))
 
+    complete = True
     try:
         calendar = _create_calendar(user)
 
@@ -235,10 +307,15 @@ def homework_to_private_ical_feed(user):
             calendar.add_component(calendar_event)
     except Exception:
         logger.error("An error occurred generating homework iCal feed.", exc_info=True)
+        complete = False
 
     timezone.deactivate()
 
-    return calendar.to_ical()
+    ical_feed = calendar.to_ical()
+    if not complete:
+        raise IncompleteICalFeedError(ical_feed)
+
+    return ical_feed
 
 
 def courseschedules_to_private_ical_feed(user):
@@ -250,6 +327,7 @@ def courseschedules_to_private_ical_feed(user):
 
     :param user: The user to generate an ICAL feed for.
     :return: An ICAL string of all the user's course schedules.
+    :raises IncompleteICalFeedError: If an error stops the feed being fully rendered.
     """
     calendar = _create_calendar(user)
 
@@ -259,6 +337,7 @@ def courseschedules_to_private_ical_feed(user):
 
     timezone.activate(ZoneInfo(user.settings.time_zone))
 
+    complete = True
     try:
         for event in events:
             calendar_event = icalendar.Event()
@@ -279,7 +358,12 @@ def courseschedules_to_private_ical_feed(user):
             calendar.add_component(calendar_event)
     except Exception:
         logger.error("An error occurred generating course schedule iCal feed.", exc_info=True)
+        complete = False
 
     timezone.deactivate()
 
-    return calendar.to_ical()
+    ical_feed = calendar.to_ical()
+    if not complete:
+        raise IncompleteICalFeedError(ical_feed)
+
+    return ical_feed
@@ -1,21 +1,46 @@
 import logging
+import uuid
 
 from django.conf import settings
+from django.core.cache import cache
 
 from conf.celery import app
 from helium.common.periodic import register_periodic
-from helium.common.utils import metricutils
+from helium.common.utils import metricutils, taskutils
 from helium.feed.services import icalexternalcalendarservice
 
 logger = logging.getLogger(__name__)
 
 
 @app.task(bind=True, soft_time_limit=settings.CELERY_TASK_REINDEX_FEEDS_SOFT_TIME_LIMIT)
-def reindex_feeds(self, calendar_ids=None):
+def reindex_feeds(self, calendar_ids=None, shard=None):
+    # A periodic run fans out one task per shard, so stale calendars are reindexed by several workers at once
+    if calendar_ids is None and shard is None and settings.FEED_REINDEX_SHARD_COUNT > 1:
+        for i in range(settings.FEED_REINDEX_SHARD_COUNT):
+            taskutils.safe_apply_async(reindex_feeds, kwargs={'shard': i}, priority=settings.CELERY_PRIORITY_LOW)
+        return
+
+    if shard is not None:
+        # Don't let a shard that is still running from a previous period be reindexed twice at once
+        lock_key = f'feed:reindex:shard:{shard}'
+        lock_token = uuid.uuid4().hex
+        if not cache.add(lock_key, lock_token, settings.FEED_REINDEX_SHARD_LOCK_SECONDS):
+            logger.info(f"Reindex of shard {shard} already in progress, skipping")
+            return
+    else:
+        lock_key = None
+
     published_at_ms = metricutils.get_published_at_ms(self)
     metrics = metricutils.task_start("feed.reindex", priority="low", published_at_ms=published_at_ms)
 
-    icalexternalcalendarservice.reindex_stale_feed_caches(calendar_ids=calendar_ids)
+    try:
+        icalexternalcalendarservice.reindex_stale_feed_caches(calendar_ids=calendar_ids,
+                                                              shard=shard,
+                                                              shard_count=settings.FEED_REINDEX_SHARD_COUNT)
+    finally:
+        # Only release the lock if it's still this run's, so a run that outlived it can't release another's
+        if lock_key and cache.get(lock_key) == lock_token:
+            cache.delete(lock_key)
 
     metricutils.task_stop(metrics)
 
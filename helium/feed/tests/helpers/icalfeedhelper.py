@@ -1,16 +1,30 @@
+import io
 import os
 from unittest import mock
 
 from rest_framework import status
 
 
+def _given_reader(data):
+    # Reads the data in chunks, as a response would, then rewinds once it's exhausted, so each fetch reads it all
+    stream = io.BytesIO(data)
+
+    def read(size=-1):
+        chunk = stream.read(size)
+        if not chunk:
+            stream.seek(0)
+        return chunk
+
+    return read
+
+
 def given_urlopen_mock_from_file(filename, mock_urlopen, status_code=status.HTTP_200_OK,
                                   etag=None, last_modified=None):
-    data = open(os.path.join(os.path.dirname(__file__), '..', filename), 'r').read()
+    data = open(os.path.join(os.path.dirname(__file__), '..', filename), 'rb').read()
 
     magic_mock = mock.MagicMock()
     magic_mock.getcode.return_value = status_code
-    magic_mock.read.return_value = data
+    magic_mock.read.side_effect = _given_reader(data)
 
     def getheader(name):
         if name == 'ETag':
@@ -1,5 +1,8 @@
+import datetime
 import logging
 import os
+import threading
+import time
 from unittest import mock
 
 from django.core.cache import cache
@@ -8,10 +11,13 @@ from django.utils import timezone
 from rest_framework import status
 
 from helium.auth.tests.helpers import userhelper
+from helium.common import enums
 from helium.feed.models import ExternalCalendar
-from helium.feed.services import icalexternalcalendarservice
+from helium.feed.services import icalexternalcalendarservice, icalparseservice
 from helium.feed.services.icalexternalcalendarservice import HeliumICalError
 from helium.feed.tests.helpers import externalcalendarhelper, icalfeedhelper
+from helium.planner.models import Event
+from helium.planner.utils import eventcacheutils
 
 logger = logging.getLogger(__name__)
 
@@ -75,62 +81,26 @@ class TestCaseFetchIcalConditional(TestCase):
         )
 
         # WHEN
-        result = icalexternalcalendarservice.fetch_ical_conditional(external_calendar)
+        feed, etag, last_modified, _ = icalexternalcalendarservice._fetch_ical_conditional(external_calendar.url)
 
         # THEN
-        self.assertIsNotNone(result)
+        self.assertIsNotNone(feed)
         # Verify it's a valid calendar object
-        self.assertEqual(result.name, 'VCALENDAR')
-
-    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
-    def test_fetch_stores_etag_header(self, mock_urlopen):
-        # GIVEN
-        external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
-        self.assertIsNone(external_calendar.etag)
-        icalfeedhelper.given_urlopen_mock_from_file(
-            os.path.join('resources', 'sample.ical'),
-            mock_urlopen,
-            etag='"new-etag-value"'
-        )
-
-        # WHEN
-        icalexternalcalendarservice.fetch_ical_conditional(external_calendar)
-
-        # THEN
-        external_calendar.refresh_from_db()
-        self.assertEqual(external_calendar.etag, '"new-etag-value"')
-
-    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
-    def test_fetch_stores_last_modified_header(self, mock_urlopen):
-        # GIVEN
-        external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
-        self.assertIsNone(external_calendar.last_modified_header)
-        icalfeedhelper.given_urlopen_mock_from_file(
-            os.path.join('resources', 'sample.ical'),
-            mock_urlopen,
-            last_modified='Wed, 01 Jan 2025 12:00:00 GMT'
-        )
-
-        # WHEN
-        icalexternalcalendarservice.fetch_ical_conditional(external_calendar)
-
-        # THEN
-        external_calendar.refresh_from_db()
-        self.assertEqual(external_calendar.last_modified_header, 'Wed, 01 Jan 2025 12:00:00 GMT')
+        self.assertTrue(feed.read().startswith(b'BEGIN:VCALENDAR'))
+        self.assertEqual(etag, '"abc123"')
+        self.assertEqual(last_modified, 'Wed, 01 Jan 2025 00:00:00 GMT')
 
     @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
     def test_fetch_sends_if_none_match_header(self, mock_urlopen):
         # GIVEN
         external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
-        external_calendar.etag = '"existing-etag"'
-        external_calendar.save()
         icalfeedhelper.given_urlopen_mock_from_file(
             os.path.join('resources', 'sample.ical'),
             mock_urlopen
         )
 
         # WHEN
-        icalexternalcalendarservice.fetch_ical_conditional(external_calendar)
+        icalexternalcalendarservice._fetch_ical_conditional(external_calendar.url, etag='"existing-etag"')
 
         # THEN
         call_args = mock_urlopen.call_args
@@ -141,15 +111,14 @@ class TestCaseFetchIcalConditional(TestCase):
     def test_fetch_sends_if_modified_since_header(self, mock_urlopen):
         # GIVEN
         external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
-        external_calendar.last_modified_header = 'Wed, 01 Jan 2025 00:00:00 GMT'
-        external_calendar.save()
         icalfeedhelper.given_urlopen_mock_from_file(
             os.path.join('resources', 'sample.ical'),
             mock_urlopen
         )
 
         # WHEN
-        icalexternalcalendarservice.fetch_ical_conditional(external_calendar)
+        icalexternalcalendarservice._fetch_ical_conditional(external_calendar.url,
+                                                            last_modified_header='Wed, 01 Jan 2025 00:00:00 GMT')
 
         # THEN
         call_args = mock_urlopen.call_args
@@ -160,15 +129,14 @@ class TestCaseFetchIcalConditional(TestCase):
     def test_fetch_returns_none_on_304_not_modified(self, mock_urlopen):
         # GIVEN
         external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
-        external_calendar.etag = '"existing-etag"'
-        external_calendar.save()
         icalfeedhelper.given_urlopen_mock_304_not_modified(mock_urlopen)
 
         # WHEN
-        result = icalexternalcalendarservice.fetch_ical_conditional(external_calendar)
+        feed, _, _, _ = icalexternalcalendarservice._fetch_ical_conditional(external_calendar.url,
+                                                                             etag='"existing-etag"')
 
         # THEN
-        self.assertIsNone(result)
+        self.assertIsNone(feed)
 
     @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
     def test_fetch_raises_on_invalid_ical(self, mock_urlopen):
@@ -181,7 +149,20 @@ class TestCaseFetchIcalConditional(TestCase):
 
         # WHEN/THEN
         with self.assertRaises(HeliumICalError):
-            icalexternalcalendarservice.fetch_ical_conditional(external_calendar)
+            icalexternalcalendarservice._fetch_ical_conditional(external_calendar.url)
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    def test_fetch_raises_on_timeout_while_downloading(self, mock_urlopen):
+        # GIVEN
+        external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
+        icalfeedhelper.given_urlopen_mock_from_file(os.path.join('resources', 'sample.ical'), mock_urlopen)
+        mock_urlopen.return_value.read.side_effect = TimeoutError('timed out')
+
+        # WHEN/THEN
+        with self.assertRaisesMessage(HeliumICalError, 'The URL did not respond in time.'):
+            icalexternalcalendarservice._fetch_ical_conditional(external_calendar.url,
+                                                                deadline=time.monotonic() + 60)
+        self.assertLessEqual(mock_urlopen.call_args[1]['timeout'], 60)
 
 
 class TestCaseReindexStaleFeedCaches(TestCase):
@@ -202,7 +183,8 @@ class TestCaseReindexStaleFeedCaches(TestCase):
         icalfeedhelper.given_urlopen_mock_from_file(
             os.path.join('resources', 'sample.ical'),
             mock_urlopen,
-            etag='"new-etag"'
+            etag='"new-etag"',
+            last_modified='Wed, 01 Jan 2025 12:00:00 GMT'
         )
 
         # WHEN
@@ -212,6 +194,7 @@ class TestCaseReindexStaleFeedCaches(TestCase):
         external_calendar.refresh_from_db()
         self.assertIsNotNone(external_calendar.last_index)
         self.assertEqual(external_calendar.etag, '"new-etag"')
+        self.assertEqual(external_calendar.last_modified_header, 'Wed, 01 Jan 2025 12:00:00 GMT')
         mock_urlopen.assert_called_once()
 
     @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
@@ -326,6 +309,185 @@ class TestCaseReindexStaleFeedCaches(TestCase):
         cached_data = cache.get(cache_key)
         self.assertEqual(cached_data, '[{"id": 1, "title": "Cached Event"}]')
 
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    @override_settings(FEED_CACHE_REFRESH_TTL_SECONDS=0, FEED_MAX_ICAL_EVENTS=3)
+    def test_reindex_fails_feed_with_too_many_events(self, mock_urlopen):
+        # GIVEN
+        external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
+        external_calendar.last_index = timezone.now() - timezone.timedelta(hours=5)
+        external_calendar.save()
+        icalfeedhelper.given_urlopen_mock_from_file(os.path.join('resources', 'sample.ical'), mock_urlopen)
+
+        # WHEN
+        icalexternalcalendarservice.reindex_stale_feed_caches()
+
+        # THEN
+        external_calendar.refresh_from_db()
+        self.assertEqual(external_calendar.consecutive_failures, 1)
+        self.assertEqual(external_calendar.last_sync_error, 'The iCal feed is too large.')
+        self.assertIsNone(cache.get(f"users:{self.user.pk}:externalcalendars:{external_calendar.pk}:events"))
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.stream_events',
+                wraps=icalexternalcalendarservice.stream_events)
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    @override_settings(FEED_CACHE_REFRESH_TTL_SECONDS=0)
+    def test_reindex_skips_parse_when_content_unchanged(self, mock_urlopen, mock_stream_events):
+        # GIVEN
+        external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
+        external_calendar.last_index = timezone.now() - timezone.timedelta(hours=5)
+        external_calendar.save()
+        icalfeedhelper.given_urlopen_mock_from_file(os.path.join('resources', 'sample.ical'), mock_urlopen)
+        icalexternalcalendarservice.reindex_stale_feed_caches()
+        external_calendar.refresh_from_db()
+        self.assertIsNotNone(external_calendar.content_hash)
+        self.assertEqual(mock_stream_events.call_count, 1)
+        old_last_index = external_calendar.last_index
+        cache_key = f"users:{self.user.pk}:externalcalendars:{external_calendar.pk}:events"
+        cached_events = cache.get(cache_key)[1]
+
+        # WHEN
+        icalexternalcalendarservice.reindex_stale_feed_caches()
+
+        # THEN
+        self.assertEqual(mock_urlopen.call_count, 2)
+        self.assertEqual(mock_stream_events.call_count, 1)
+        external_calendar.refresh_from_db()
+        self.assertGreater(external_calendar.last_index, old_last_index)
+        self.assertEqual(cache.get(cache_key)[1], cached_events)
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.stream_events',
+                wraps=icalexternalcalendarservice.stream_events)
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    @override_settings(FEED_CACHE_REFRESH_TTL_SECONDS=0)
+    def test_reindex_parses_unchanged_content_when_not_cached(self, mock_urlopen, mock_stream_events):
+        # GIVEN
+        external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
+        external_calendar.last_index = timezone.now() - timezone.timedelta(hours=5)
+        external_calendar.save()
+        icalfeedhelper.given_urlopen_mock_from_file(os.path.join('resources', 'sample.ical'), mock_urlopen)
+        icalexternalcalendarservice.reindex_stale_feed_caches()
+        cache.clear()
+
+        # WHEN
+        icalexternalcalendarservice.reindex_stale_feed_caches()
+
+        # THEN
+        self.assertEqual(mock_stream_events.call_count, 2)
+        self.assertIsNotNone(cache.get(f"users:{self.user.pk}:externalcalendars:{external_calendar.pk}:events"))
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    @override_settings(FEED_CACHE_REFRESH_TTL_SECONDS=0)
+    def test_content_hash_cleared_when_cached_without_reindex(self, mock_urlopen):
+        # GIVEN
+        external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
+        external_calendar.last_index = timezone.now() - timezone.timedelta(hours=5)
+        external_calendar.save()
+        icalfeedhelper.given_urlopen_mock_from_file(os.path.join('resources', 'sample.ical'), mock_urlopen)
+        icalexternalcalendarservice.reindex_stale_feed_caches()
+        cache.clear()
+
+        # WHEN
+        icalexternalcalendarservice.calendar_to_events(external_calendar)
+
+        # THEN
+        external_calendar.refresh_from_db()
+        self.assertIsNone(external_calendar.content_hash)
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    @override_settings(FEED_CACHE_REFRESH_TTL_SECONDS=0)
+    def test_reindex_fails_only_calendar_that_times_out(self, mock_urlopen):
+        # GIVEN
+        slow_calendar = externalcalendarhelper.given_external_calendar_exists(self.user, url='http://slow.com/feed')
+        external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
+        for calendar in (slow_calendar, external_calendar):
+            calendar.last_index = timezone.now() - timezone.timedelta(hours=5)
+            calendar.save()
+        icalfeedhelper.given_urlopen_mock_from_file(os.path.join('resources', 'sample.ical'), mock_urlopen)
+        response = mock_urlopen.return_value
+        slow_response = mock.MagicMock()
+        slow_response.getcode.return_value = status.HTTP_200_OK
+        slow_response.read.side_effect = TimeoutError('timed out')
+        mock_urlopen.side_effect = lambda request, **kwargs: (
+            slow_response if request.full_url == slow_calendar.url else response)
+
+        # WHEN
+        icalexternalcalendarservice.reindex_stale_feed_caches()
+
+        # THEN
+        slow_calendar.refresh_from_db()
+        external_calendar.refresh_from_db()
+        self.assertEqual(slow_calendar.consecutive_failures, 1)
+        self.assertEqual(slow_calendar.last_sync_error, 'The URL did not respond in time.')
+        self.assertEqual(external_calendar.consecutive_failures, 0)
+        self.assertIsNone(external_calendar.last_sync_error)
+        self.assertIsNotNone(cache.get(f"users:{self.user.pk}:externalcalendars:{external_calendar.pk}:events"))
+        for call in mock_urlopen.call_args_list:
+            self.assertLessEqual(call[1]['timeout'], 60)
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    @override_settings(FEED_CACHE_REFRESH_TTL_SECONDS=0)
+    def test_reindex_only_shard(self, mock_urlopen):
+        # GIVEN
+        external_calendars = []
+        for i in range(4):
+            external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
+            external_calendar.last_index = timezone.now() - timezone.timedelta(hours=5)
+            external_calendar.save()
+            external_calendars.append(external_calendar)
+        icalfeedhelper.given_urlopen_mock_304_not_modified(mock_urlopen)
+
+        # WHEN
+        icalexternalcalendarservice.reindex_stale_feed_caches(shard=1, shard_count=2)
+
+        # THEN
+        self.assertEqual(mock_urlopen.call_count, 2)
+        for external_calendar in external_calendars:
+            old_last_index = external_calendar.last_index
+            external_calendar.refresh_from_db()
+            if external_calendar.pk % 2 == 1:
+                self.assertGreater(external_calendar.last_index, old_last_index)
+            else:
+                self.assertEqual(external_calendar.last_index, old_last_index)
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    @override_settings(FEED_CACHE_REFRESH_TTL_SECONDS=0, FEED_REINDEX_MAX_WORKERS=4,
+                       FEED_REINDEX_MAX_CONNECTIONS_PER_HOST=2)
+    def test_reindex_limits_concurrent_requests_per_host(self, mock_urlopen):
+        # GIVEN
+        for i in range(6):
+            external_calendar = externalcalendarhelper.given_external_calendar_exists(
+                self.user, url=f'http://{"a" if i % 2 else "b"}.example.com/feed-{i}')
+            external_calendar.last_index = timezone.now() - timezone.timedelta(hours=5)
+            external_calendar.save()
+
+        lock = threading.Lock()
+        in_flight = {}
+        max_in_flight = {}
+
+        def slow_not_modified(request, timeout):
+            host = request.host
+            with lock:
+                in_flight[host] = in_flight.get(host, 0) + 1
+                max_in_flight[host] = max(max_in_flight.get(host, 0), in_flight[host])
+            time.sleep(0.05)
+            with lock:
+                in_flight[host] -= 1
+            response = mock.MagicMock()
+            response.getcode.return_value = status.HTTP_304_NOT_MODIFIED
+            return response
+
+        mock_urlopen.side_effect = slow_not_modified
+
+        # WHEN
+        icalexternalcalendarservice.reindex_stale_feed_caches()
+
+        # THEN
+        self.assertEqual(mock_urlopen.call_count, 6)
+        self.assertEqual(set(max_in_flight.keys()), {'a.example.com', 'b.example.com'})
+        self.assertLessEqual(max(max_in_flight.values()), 2)
+        self.assertEqual(ExternalCalendar.objects.filter(
+            last_index__lt=timezone.now() - timezone.timedelta(hours=1)).count(), 0)
+
 
 class TestCaseCalendarToEvents(TestCase):
     def setUp(self):
@@ -357,10 +519,12 @@ class TestCaseCalendarToEvents(TestCase):
 
         # Pre-populate cache
         cache_key = f"users:{self.user.pk}:externalcalendars:{external_calendar.pk}:events"
-        cached_events = '[{"id": 0, "title": "Cached Event", "all_day": false, "show_end_time": true, ' \
-                        '"start": "2025-01-01T10:00:00Z", "end": "2025-01-01T11:00:00Z", ' \
-                        '"owner_id": 1, "user": 1, "calendar_item_type": 3, "url": null, "comments": null}]'
-        cache.set(cache_key, cached_events, 3600)
+        cached_events = eventcacheutils.encode_events([
+            Event(id=0, title='Cached Event', all_day=False, show_end_time=True,
+                  start=datetime.datetime(2025, 1, 1, 10, 0, 0, tzinfo=datetime.timezone.utc),
+                  end=datetime.datetime(2025, 1, 1, 11, 0, 0, tzinfo=datetime.timezone.utc),
+                  owner_id=external_calendar.pk, user_id=self.user.pk, calendar_item_type=enums.EXTERNAL)])
+        cache.set(cache_key, (time.time() + 3600, cached_events), 3600)
 
         # WHEN
         events = icalexternalcalendarservice.calendar_to_events(external_calendar)
@@ -370,3 +534,219 @@ class TestCaseCalendarToEvents(TestCase):
         self.assertEqual(events[0].title, 'Cached Event')
         # urlopen should not have been called since we used cache
         mock_urlopen.assert_not_called()
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    def test_calendar_to_events_refetches_when_cache_in_legacy_format(self, mock_urlopen):
+        # GIVEN
+        external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
+        icalfeedhelper.given_urlopen_mock_from_file(
+            os.path.join('resources', 'sample.ical'),
+            mock_urlopen
+        )
+        cache_key = f"users:{self.user.pk}:externalcalendars:{external_calendar.pk}:events"
+        cache.set(cache_key, '[{"id": 0, "title": "Cached Event"}]', 3600)
+
+        # WHEN
+        events = icalexternalcalendarservice.calendar_to_events(external_calendar)
+
+        # THEN
+        self.assertGreater(len(events), 0)
+        mock_urlopen.assert_called_once()
+        self.assertEqual(cache.get(cache_key)[1][0], eventcacheutils.CACHE_FORMAT_VERSION)
+
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.taskutils.safe_apply_async')
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    def test_calendar_to_events_serves_stale_and_enqueues_one_refresh(self, mock_urlopen, mock_apply_async):
+        # GIVEN
+        external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
+        icalfeedhelper.given_urlopen_mock_from_file(
+            os.path.join('resources', 'sample.ical'),
+            mock_urlopen
+        )
+        icalexternalcalendarservice.calendar_to_events(external_calendar)
+        mock_urlopen.reset_mock()
+        cache_key = f"users:{self.user.pk}:externalcalendars:{external_calendar.pk}:events"
+        _stale_at, cached_value = cache.get(cache_key)
+        cache.set(cache_key, (time.time() - 1, cached_value), 3600)
+
+        # WHEN
+        events1 = icalexternalcalendarservice.calendar_to_events(external_calendar)
+        events2 = icalexternalcalendarservice.calendar_to_events(external_calendar)
+
+        # THEN
+        self.assertEqual(len(events1), 4)
+        self.assertEqual(len(events2), 4)
+        mock_urlopen.assert_not_called()
+        mock_apply_async.assert_called_once()
+        self.assertEqual(mock_apply_async.call_args.kwargs['kwargs'], {'calendar_ids': [external_calendar.pk]})
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    @override_settings(FEED_CACHE_REFRESH_TTL_SECONDS=0)
+    def test_reindex_extends_soft_expiry_on_304(self, mock_urlopen):
+        # GIVEN
+        external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
+        icalfeedhelper.given_urlopen_mock_from_file(
+            os.path.join('resources', 'sample.ical'),
+            mock_urlopen
+        )
+        icalexternalcalendarservice.calendar_to_events(external_calendar)
+        cache_key = f"users:{self.user.pk}:externalcalendars:{external_calendar.pk}:events"
+        _stale_at, cached_value = cache.get(cache_key)
+        cache.set(cache_key, (time.time() - 1, cached_value), 3600)
+        icalfeedhelper.given_urlopen_mock_304_not_modified(mock_urlopen)
+
+        # WHEN
+        icalexternalcalendarservice.reindex_stale_feed_caches(calendar_ids=[external_calendar.pk])
+
+        # THEN
+        stale_at, refreshed_value = cache.get(cache_key)
+        self.assertGreater(stale_at, time.time())
+        self.assertEqual(refreshed_value, cached_value)
+
+class TestCaseCalendarsToEvents(TestCase):
+    def setUp(self):
+        self.user = userhelper.given_a_user_exists()
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    def test_calendars_to_events_fetches_uncached_calendars_in_order(self, mock_urlopen):
+        # GIVEN
+        external_calendar1 = externalcalendarhelper.given_external_calendar_exists(self.user, color='#111111')
+        external_calendar2 = externalcalendarhelper.given_external_calendar_exists(self.user, color='#222222')
+        external_calendar3 = externalcalendarhelper.given_external_calendar_exists(self.user, color='#333333')
+        icalfeedhelper.given_urlopen_mock_from_file(os.path.join('resources', 'sample.ical'), mock_urlopen)
+        icalexternalcalendarservice.calendar_to_events(external_calendar2)
+        mock_urlopen.reset_mock()
+
+        # WHEN
+        events, invalid_calendars = icalexternalcalendarservice.calendars_to_events(
+            [external_calendar1, external_calendar2, external_calendar3])
+
+        # THEN
+        self.assertEqual(invalid_calendars, [])
+        self.assertEqual(mock_urlopen.call_count, 2)
+        self.assertEqual([event.color for event in events], ['#111111'] * 4 + ['#222222'] * 4 + ['#333333'] * 4)
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    def test_calendars_to_events_returns_invalid_calendars(self, mock_urlopen):
+        # GIVEN
+        external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
+        icalfeedhelper.given_urlopen_mock_from_file(os.path.join('resources', 'bad.ical'), mock_urlopen)
+
+        # WHEN
+        events, invalid_calendars = icalexternalcalendarservice.calendars_to_events([external_calendar])
+
+        # THEN
+        self.assertEqual(events, [])
+        self.assertEqual(invalid_calendars, [external_calendar])
+
+    @override_settings(FEED_FETCH_DEADLINE_SECONDS=0.1)
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.taskutils.safe_apply_async')
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    def test_calendars_to_events_skips_calendars_past_deadline(self, mock_urlopen, mock_apply_async):
+        # GIVEN
+        fast_calendar = externalcalendarhelper.given_external_calendar_exists(self.user, url='http://go.com/fast')
+        slow_calendar = externalcalendarhelper.given_external_calendar_exists(self.user, url='http://go.com/slow')
+        icalfeedhelper.given_urlopen_mock_from_file(os.path.join('resources', 'sample.ical'), mock_urlopen)
+        response = mock_urlopen.return_value
+        released = threading.Event()
+
+        def urlopen(url, timeout=None):
+            if url == slow_calendar.url:
+                released.wait(5)
+            return response
+
+        mock_urlopen.side_effect = urlopen
+
+        # WHEN
+        try:
+            events, invalid_calendars = icalexternalcalendarservice.calendars_to_events([fast_calendar, slow_calendar])
+        finally:
+            released.set()
+
+        # THEN
+        self.assertEqual(len(events), 4)
+        self.assertEqual(invalid_calendars, [])
+        mock_apply_async.assert_called_once()
+        self.assertEqual(mock_apply_async.call_args.kwargs['kwargs'], {'calendar_ids': [slow_calendar.pk]})
+
+    @override_settings(FEED_FETCH_DEADLINE_SECONDS=0.1)
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.taskutils.safe_apply_async')
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    def test_calendars_to_events_closes_feeds_fetched_past_deadline(self, mock_urlopen, mock_apply_async):
+        # GIVEN
+        slow_calendar = externalcalendarhelper.given_external_calendar_exists(self.user, url='http://go.com/slow')
+        icalfeedhelper.given_urlopen_mock_from_file(os.path.join('resources', 'sample.ical'), mock_urlopen)
+        response = mock_urlopen.return_value
+        released = threading.Event()
+        timeouts = []
+        spooled_feeds = []
+
+        def urlopen(url, timeout=None):
+            timeouts.append(timeout)
+            return response
+
+        def spool_feed(response, deadline=None):
+            # The feed is spooled, but the fetch only finishes once the request has moved on without it
+            spooled_feeds.append(icalparseservice.spool_feed(response))
+            released.wait(5)
+            return spooled_feeds[-1]
+
+        mock_urlopen.side_effect = urlopen
+
+        # WHEN
+        with mock.patch('helium.feed.services.icalexternalcalendarservice.spool_feed', side_effect=spool_feed):
+            try:
+                events, _ = icalexternalcalendarservice.calendars_to_events([slow_calendar])
+            finally:
+                released.set()
+
+        # THEN
+        self.assertEqual(events, [])
+        self.assertLessEqual(timeouts[0], 0.1)
+        feed, _ = spooled_feeds[0]
+        for _ in range(50):
+            if feed.closed:
+                break
+            time.sleep(0.1)
+        self.assertTrue(feed.closed)
+        mock_apply_async.assert_called_once()
+
+    @override_settings(FEED_FETCH_DEADLINE_SECONDS=1)
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.urlopen_secure')
+    def test_calendars_to_events_waits_only_for_rest_of_deadline(self, mock_urlopen):
+        # GIVEN
+        external_calendar = externalcalendarhelper.given_external_calendar_exists(self.user)
+        icalfeedhelper.given_urlopen_mock_from_file(os.path.join('resources', 'sample.ical'), mock_urlopen)
+        get_cached_value = icalexternalcalendarservice._get_cached_value
+
+        def slow_get_cached_value(calendar):
+            time.sleep(0.5)
+            return get_cached_value(calendar)
+
+        # WHEN
+        with mock.patch('helium.feed.services.icalexternalcalendarservice._get_cached_value',
+                        side_effect=slow_get_cached_value), \
+                mock.patch.object(icalexternalcalendarservice.futures, 'wait',
+                                  wraps=icalexternalcalendarservice.futures.wait) as mock_wait:
+            events, _ = icalexternalcalendarservice.calendars_to_events([external_calendar])
+
+        # THEN
+        self.assertEqual(len(events), 4)
+        self.assertLessEqual(mock_wait.call_args.kwargs['timeout'], 0.5)
+
+    @mock.patch('helium.feed.services.icalparseservice.time.monotonic')
+    def test_spool_feed_stops_at_deadline(self, mock_monotonic):
+        # GIVEN
+        response = mock.MagicMock()
+        response.getheader.return_value = None
+        response.read.side_effect = [b'BEGIN:VCALENDAR\r\n', b'END:VCALENDAR\r\n', b'']
+        mock_monotonic.side_effect = [1, 3]
+
+        # WHEN/THEN
+        self.assertRaises(TimeoutError, icalparseservice.spool_feed, response, 2)
+        self.assertEqual(response.read.call_count, 2)
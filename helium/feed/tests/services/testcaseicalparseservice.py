@@ -0,0 +1,80 @@
+import io
+import os
+import zoneinfo
+from unittest import mock
+
+import icalendar
+from django.test import TestCase, override_settings
+
+from helium.feed.services import icalparseservice
+from helium.feed.services.icalparseservice import ICalFeedTooLargeError
+
+
+def _given_response(data, content_length=None):
+    response = mock.MagicMock()
+    response.read.side_effect = io.BytesIO(data).read
+    response.getheader.side_effect = lambda name: content_length if name == 'Content-Length' else None
+    return response
+
+
+def _given_resource(filename):
+    return open(os.path.join(os.path.dirname(__file__), '..', 'resources', filename), 'rb').read()
+
+
+class TestCaseICalParseService(TestCase):
+    def test_stream_events_matches_parse_events(self):
+        time_zone = zoneinfo.ZoneInfo('America/Chicago')
+
+        for filename in ['sample.ical', 'sample_with_recurring.ics', 'sample_with_rrule_inference.ics']:
+            # GIVEN
+            data = _given_resource(filename)
+            feed, _ = icalparseservice.spool_feed(_given_response(data))
+
+            # WHEN
+            streamed = list(icalparseservice.stream_events(feed, time_zone))
+
+            # THEN
+            self.assertEqual(streamed, list(icalparseservice.parse_events(icalendar.Calendar.from_ical(data),
+                                                                          time_zone)))
+            self.assertGreater(len(streamed), 0)
+
+    @override_settings(FEED_ICAL_SPOOL_SIZE=16)
+    def test_spool_feed_hashes_body(self):
+        # GIVEN
+        data = _given_resource('sample.ical')
+
+        # WHEN
+        feed, content_hash = icalparseservice.spool_feed(_given_response(data))
+
+        # THEN
+        self.assertEqual(feed.read(), data)
+        self.assertEqual(len(content_hash), 64)
+        self.assertEqual(icalparseservice.spool_feed(_given_response(data))[1], content_hash)
+
+    def test_spool_feed_rejects_non_ical(self):
+        # WHEN/THEN
+        with self.assertRaises(ValueError):
+            icalparseservice.spool_feed(_given_response(_given_resource('bad.ical')))
+        with self.assertRaises(ValueError):
+            icalparseservice.spool_feed(_given_response(b''))
+
+    @override_settings(FEED_MAX_ICAL_SIZE=100)
+    def test_spool_feed_rejects_oversized_feed(self):
+        # GIVEN
+        data = _given_resource('sample.ical')
+
+        # WHEN/THEN
+        with self.assertRaises(ICalFeedTooLargeError):
+            icalparseservice.spool_feed(_given_response(data))
+        with self.assertRaises(ICalFeedTooLargeError):
+            icalparseservice.spool_feed(_given_response(data, content_length=str(len(data))))
+
+    @override_settings(FEED_MAX_ICAL_EVENTS=3)
+    def test_stream_events_rejects_too_many_events(self):
+        # GIVEN
+        feed, _ = icalparseservice.spool_feed(_given_response(_given_resource('sample.ical')))
+        events = icalparseservice.stream_events(feed, zoneinfo.ZoneInfo('UTC'))
+
+        # WHEN/THEN
+        with self.assertRaises(ICalFeedTooLargeError):
+            list(events)
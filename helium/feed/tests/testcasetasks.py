@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from helium.feed.tasks import reindex_feeds
+
+
+class TestCaseFeedTasks(TestCase):
+    def tearDown(self):
+        cache.clear()
+
+    @override_settings(FEED_REINDEX_SHARD_COUNT=3)
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.reindex_stale_feed_caches')
+    def test_reindex_feeds_fans_out_shards(self, mock_reindex_stale_feed_caches):
+        # WHEN
+        reindex_feeds()
+
+        # THEN
+        self.assertEqual(mock_reindex_stale_feed_caches.call_count, 3)
+        self.assertEqual([c.kwargs['shard'] for c in mock_reindex_stale_feed_caches.call_args_list], [0, 1, 2])
+        for c in mock_reindex_stale_feed_caches.call_args_list:
+            self.assertEqual(c.kwargs['shard_count'], 3)
+
+    @override_settings(FEED_REINDEX_SHARD_COUNT=3)
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.reindex_stale_feed_caches')
+    def test_reindex_feeds_skips_shard_in_progress(self, mock_reindex_stale_feed_caches):
+        # GIVEN
+        cache.add('feed:reindex:shard:1', True, 60)
+
+        # WHEN
+        reindex_feeds(shard=1)
+
+        # THEN
+        mock_reindex_stale_feed_caches.assert_not_called()
+
+    @override_settings(FEED_REINDEX_SHARD_COUNT=3)
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.reindex_stale_feed_caches')
+    def test_reindex_feeds_keeps_lock_taken_over_by_later_run(self, mock_reindex_stale_feed_caches):
+        # GIVEN
+        def lock_expires_and_later_run_takes_it(**kwargs):
+            cache.set('feed:reindex:shard:1', 'later-run', 60)
+
+        mock_reindex_stale_feed_caches.side_effect = lock_expires_and_later_run_takes_it
+
+        # WHEN
+        reindex_feeds(shard=1)
+
+        # THEN
+        self.assertEqual(cache.get('feed:reindex:shard:1'), 'later-run')
+
+    @override_settings(FEED_REINDEX_SHARD_COUNT=3)
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.reindex_stale_feed_caches')
+    def test_reindex_feeds_releases_lock(self, mock_reindex_stale_feed_caches):
+        # WHEN
+        reindex_feeds(shard=1)
+
+        # THEN
+        mock_reindex_stale_feed_caches.assert_called_once()
+        self.assertIsNone(cache.get('feed:reindex:shard:1'))
+
+    @override_settings(FEED_REINDEX_SHARD_COUNT=3)
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.reindex_stale_feed_caches')
+    def test_reindex_feeds_for_calendars(self, mock_reindex_stale_feed_caches):
+        # WHEN
+        reindex_feeds(calendar_ids=[1, 2])
+
+        # THEN
+        mock_reindex_stale_feed_caches.assert_called_once_with(calendar_ids=[1, 2], shard=None, shard_count=3)
@@ -1,5 +1,7 @@
+import gzip
 import logging
 import time
+from unittest import mock
 
 import icalendar
 from django.conf import settings
@@ -286,6 +288,87 @@ class TestCasePrivateViews(CacheTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertNotEqual(response['ETag'], etag)
 
+    def test_events_feed_served_from_cache_until_data_change(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        user.settings.enable_private_slug()
+        event = eventhelper.given_event_exists(user)
+        url = reverse("feed_private_events_ical", kwargs={"private_slug": user.settings.private_slug})
+        self.client.get(url)
+
+        # WHEN
+        with mock.patch('helium.feed.services.icalprivateservice.events_to_private_ical_feed') as mock_build:
+            response = self.client.get(url)
+
+        # THEN
+        mock_build.assert_not_called()
+        calendar = icalendar.Calendar.from_ical(response.content.decode('utf-8'))
+        self.assertEqual(calendar.subcomponents[0]['SUMMARY'], event.title)
+
+        # GIVEN
+        time.sleep(1.1)
+        event.title = 'Updated Title'
+        event.save()
+
+        # WHEN
+        response = self.client.get(url)
+
+        # THEN
+        calendar = icalendar.Calendar.from_ical(response.content.decode('utf-8'))
+        self.assertEqual(calendar.subcomponents[0]['SUMMARY'], 'Updated Title')
+
+    def test_events_feed_not_cached_when_incomplete(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        user.settings.enable_private_slug()
+        eventhelper.given_event_exists(user)
+        eventhelper.given_event_exists(user, title='Second Event')
+        url = reverse("feed_private_events_ical", kwargs={"private_slug": user.settings.private_slug})
+
+        # WHEN
+        with mock.patch('helium.feed.services.icalprivateservice._create_event_description',
+                        side_effect=['Description', RuntimeError]):
+            incomplete_response = self.client.get(url)
+        response = self.client.get(url)
+
+        # THEN
+        self.assertEqual(incomplete_response.status_code, 200)
+        self.assertEqual(len(icalendar.Calendar.from_ical(incomplete_response.content.decode('utf-8')).subcomponents), 1)
+        self.assertEqual(len(icalendar.Calendar.from_ical(response.content.decode('utf-8')).subcomponents), 2)
+
+    def test_events_feed_gzipped_when_accepted(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        user.settings.enable_private_slug()
+        eventhelper.given_event_exists(user)
+        url = reverse("feed_private_events_ical", kwargs={"private_slug": user.settings.private_slug})
+        plain_response = self.client.get(url)
+
+        # WHEN
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        # THEN
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain_response.content)
+        self.assertNotIn('Content-Encoding', plain_response)
+
+    def test_events_feed_not_gzipped_when_refused(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        user.settings.enable_private_slug()
+        eventhelper.given_event_exists(user)
+        url = reverse("feed_private_events_ical", kwargs={"private_slug": user.settings.private_slug})
+        self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+
+        # WHEN
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='deflate, gzip;q=0')
+
+        # THEN
+        self.assertNotIn('Content-Encoding', response)
+        calendar = icalendar.Calendar.from_ical(response.content.decode('utf-8'))
+        self.assertEqual(len(calendar.subcomponents), 1)
+
     # Homework feed conditional request tests
 
     def test_homework_feed_returns_etag_and_last_modified_headers(self):
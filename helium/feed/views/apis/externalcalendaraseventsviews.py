@@ -64,14 +64,12 @@ class UserExternalCalendarAsEventsListView(HeliumCalendarItemAPIView):
             if "to" in request.query_params else None
         search = request.query_params["search"].lower() if "search" in request.query_params else None
 
-        events = []
-        for external_calendar in external_calendars:
-            try:
-                events += icalexternalcalendarservice.calendar_to_events(external_calendar, _from, to, search)
-            except HeliumICalError:
-                external_calendar.shown_on_calendar = False
-                external_calendar.save()
-                logger.warning(f"External Calendar {external_calendar.pk} is not a valid ICAL feed, disabled.")
+        events, invalid_calendars = icalexternalcalendarservice.calendars_to_events(external_calendars, _from, to,
+                                                                                   search)
+        for external_calendar in invalid_calendars:
+            external_calendar.shown_on_calendar = False
+            external_calendar.save()
+            logger.warning(f"External Calendar {external_calendar.pk} is not a valid ICAL feed, disabled.")
 
         serializer = self.get_serializer(events, many=True)
 
@@ -1,16 +1,18 @@
+import gzip
 import logging
 from datetime import datetime, timezone as tz
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
 from django.utils.http import http_date
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from rest_framework.exceptions import NotFound
 
 from helium.auth.utils.userutils import is_staff_user
-from helium.common.utils import redisutils
+from helium.common.utils import httputils, redisutils
 from helium.common.views.base import HeliumAPIView
 from helium.feed.services import icalprivateservice
 
@@ -32,6 +34,20 @@ def _record_feed_fetch(user, private_slug):
         logger.warning("Failed to record feed fetch", exc_info=True)
 
 
+def _ical_feed_response(request, ical_feed, gzipped):
+    if gzipped and not httputils.accepts_gzip(request):
+        ical_feed = gzip.decompress(ical_feed)
+        gzipped = False
+
+    response = HttpResponse(ical_feed, content_type='text/calendar; charset=utf-8')
+    if gzipped:
+        response['Content-Encoding'] = 'gzip'
+    if settings.FEED_ICS_CACHE_GZIP:
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+    return response
+
+
 @extend_schema(
     tags=['feed.private']
 )
@@ -73,9 +89,10 @@ class PrivateEventsICALResourceView(HeliumAPIView):
             if not_modified:
                 return not_modified
 
-            ical_feed = icalprivateservice.events_to_private_ical_feed(user)
+            ical_feed, gzipped = icalprivateservice.get_private_ical_feed(
+                user, 'events', etag, last_modified, icalprivateservice.events_to_private_ical_feed)
 
-            response = HttpResponse(ical_feed, content_type='text/calendar; charset=utf-8')
+            response = _ical_feed_response(request, ical_feed, gzipped)
             response['Filename'] = 'he_' + user.username + '_events.ics'
             response['Content-Disposition'] = 'attachment; filename=Helium_' + user.username + '_events.ics'
             response['ETag'] = etag
@@ -128,9 +145,10 @@ class PrivateHomeworkICALResourceView(HeliumAPIView):
             if not_modified:
                 return not_modified
 
-            ical_feed = icalprivateservice.homework_to_private_ical_feed(user)
+            ical_feed, gzipped = icalprivateservice.get_private_ical_feed(
+                user, 'homework', etag, last_modified, icalprivateservice.homework_to_private_ical_feed)
 
-            response = HttpResponse(ical_feed, content_type='text/calendar; charset=utf-8')
+            response = _ical_feed_response(request, ical_feed, gzipped)
             response['Filename'] = 'he_' + user.username + '_homework.ics'
             response['Content-Disposition'] = 'attachment; filename=Helium_' + user.username + '_homework.ics'
             response['ETag'] = etag
@@ -183,9 +201,10 @@ class PrivateCourseSchedulesICALResourceView(HeliumAPIView):
             if not_modified:
                 return not_modified
 
-            ical_feed = icalprivateservice.courseschedules_to_private_ical_feed(user)
+            ical_feed, gzipped = icalprivateservice.get_private_ical_feed(
+                user, 'courseschedules', etag, last_modified, icalprivateservice.courseschedules_to_private_ical_feed)
 
-            response = HttpResponse(ical_feed, content_type='text/calendar; charset=utf-8')
+            response = _ical_feed_response(request, ical_feed, gzipped)
             response['Filename'] = 'he_' + user.username + 'coursescheduleevents.ics'
             response['Content-Disposition'] = 'attachment; ' \
                                               'filename=Helium_' + user.username + '_coursescheduleevents.ics'
@@ -67,3 +67,14 @@ class ExportSerializer(serializers.Serializer):
     reminders = ReminderSerializer(many=True)
 
     notes = NoteExportSerializer(many=True)
+
+
+class ExportJobSerializer(serializers.Serializer):
+    id = serializers.CharField(read_only=True, help_text='The ID of the export job, to poll for its status.')
+
+    status = serializers.ChoiceField(choices=('pending', 'complete', 'failed'), read_only=True,
+                                     help_text='The status of the export job.')
+
+    download_url = serializers.CharField(read_only=True, allow_null=True,
+                                         help_text='Once the job is complete, a URL the export can be downloaded from, '
+                                                   'which expires after a time.')
@@ -74,3 +74,25 @@ class ImportSerializer(serializers.Serializer):
     reminders = serializers.IntegerField()
 
     notes = serializers.IntegerField()
+
+
+class ImportJobProgressSerializer(serializers.Serializer):
+    done = serializers.IntegerField(help_text='The number of rows of the section imported so far.')
+
+    total = serializers.IntegerField(help_text='The number of rows of the section in the file.')
+
+
+class ImportJobSerializer(serializers.Serializer):
+    id = serializers.CharField(read_only=True, help_text='The ID of the import job, to poll for its status.')
+
+    status = serializers.ChoiceField(choices=('pending', 'running', 'complete', 'failed'), read_only=True,
+                                     help_text='The status of the import job.')
+
+    progress = serializers.DictField(child=ImportJobProgressSerializer(), read_only=True,
+                                     help_text='The progress of each section of the import, once it\'s running.')
+
+    counts = ImportSerializer(read_only=True, allow_null=True,
+                              help_text='Once the job is complete, the number of each type of model imported.')
+
+    details = serializers.JSONField(read_only=True, allow_null=True,
+                                    help_text='If the job failed, the details of why the file couldn\'t be imported.')
@@ -0,0 +1,343 @@
+import hashlib
+import hmac
+import inspect
+import logging
+import tempfile
+import time
+import uuid
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import storages
+from django.db.models import Count, Exists, Max, OuterRef, Q
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from helium.common.utils import metricutils, taskutils
+
+from helium.feed.models import ExternalCalendar
+from helium.importexport.serializers.exportserializer import ExportSerializer
+from helium.planner.models import CourseGroup, Course, CourseSchedule, Category, MaterialGroup, Material, Event, \
+    Homework, Reminder, Note
+
+logger = logging.getLogger(__name__)
+
+# The states of an export job
+PENDING = 'pending'
+COMPLETE = 'complete'
+FAILED = 'failed'
+
+# Exported fields that are written with queryset updates or bulk_update, which don't touch updated_at (grade
+# recalculation, sending and dismissing reminders, rebasing all-day items on a time zone change, adjusting the example
+# schedule), so they're fingerprinted directly
+_FINGERPRINT_VALUE_FIELDS = {
+    'course_groups': ('overall_grade', 'trend', 'start_date', 'end_date'),
+    'courses': ('current_grade', 'trend', 'start_date', 'end_date'),
+    'categories': ('average_grade', 'grade_by_weight', 'trend'),
+    'events': ('start', 'end'),
+    'homework': ('start', 'end'),
+    'reminders': ('start_of_range', 'sent', 'dismissed'),
+}
+
+
+def get_export_querysets(user):
+    """
+    Get the queryset of each section of the given user's export, keyed by the ExportSerializer field it's rendered
+    with.
+
+    :param user: The user whose data to export.
+    :return: A dict of section names to querysets, in the order the sections are exported.
+    """
+    return {
+        'external_calendars': ExternalCalendar.objects.for_user(user.pk),
+        'course_groups': CourseGroup.objects.for_user(user.pk).annotate(
+            annotated_num_homework=Count('courses__homework', distinct=True),
+            annotated_num_homework_completed=Count('courses__homework', filter=Q(courses__homework__completed=True), distinct=True),
+            annotated_num_homework_graded=Count('courses__homework', filter=Q(courses__homework__completed=True, courses__homework__grade_earned__isnull=False), distinct=True),
+        ),
+        'courses': Course.objects.for_user(user.pk).annotate(
+            annotated_num_homework=Count('homework', distinct=True),
+            annotated_num_homework_completed=Count('homework', filter=Q(homework__completed=True), distinct=True),
+            annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True, homework__grade_earned__isnull=False), distinct=True),
+            annotated_has_weighted_grading=Exists(Category.objects.filter(course_id=OuterRef('pk'), weight__gt=0)),
+        ),
+        'course_schedules': CourseSchedule.objects.for_user(user.pk),
+        'categories': Category.objects.for_user(user.pk).annotate(
+            annotated_num_homework=Count('homework'),
+            annotated_num_homework_completed=Count('homework', filter=Q(homework__completed=True)),
+            annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True, homework__grade_earned__isnull=False)),
+        ),
+        'resource_groups': MaterialGroup.objects.for_user(user.pk),
+        'resources': Material.objects.for_user(user.pk),
+        'events': Event.objects.for_user(user.pk),
+        'homework': Homework.objects.for_user(user.pk),
+        'reminders': Reminder.objects.for_user(user.pk),
+        'notes': Note.objects.for_user(user.pk).prefetch_related('homework', 'events', 'resources'),
+    }
+
+
+def _iter_keyset_chunks(queryset, chunk_size):
+    last_pk = None
+    while True:
+        chunk_queryset = queryset.order_by('pk')
+        if last_pk is not None:
+            chunk_queryset = chunk_queryset.filter(pk__gt=last_pk)
+
+        chunk = list(chunk_queryset[:chunk_size])
+        if not chunk:
+            return
+
+        yield chunk
+
+        if len(chunk) < chunk_size:
+            return
+        last_pk = chunk[-1].pk
+
+
+def iter_export_json(user, chunk_size=None):
+    """
+    Render the given user's export as JSON, a chunk at a time. Each section is read in keyset-paginated chunks (ordered
+    by primary key) and serialized with the same serializer ExportSerializer uses for it, so no more than one chunk of
+    the account's data is held at once. The rendered bytes are identical to rendering the whole ExportSerializer.
+
+    :param user: The user whose data to export.
+    :param chunk_size: The number of records to read and serialize at a time, defaulting to EXPORT_CHUNK_SIZE.
+    :return: A generator of the rendered JSON bytes.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    renderer = JSONRenderer()
+    fields = ExportSerializer().fields
+
+    yield b'{'
+    for i, (section, queryset) in enumerate(get_export_querysets(user).items()):
+        yield (b',' if i else b'') + renderer.render(section) + b':['
+
+        serializer_class = fields[section].child.__class__
+        for j, chunk in enumerate(_iter_keyset_chunks(queryset, chunk_size)):
+            # Render the chunk as a list, stripping its brackets so it can be joined with the section's other chunks
+            yield (b',' if j else b'') + renderer.render(serializer_class(chunk, many=True).data)[1:-1]
+
+        yield b']'
+    yield b'}'
+
+
+def gzip_stream(chunks):
+    """
+    Gzip-compress a stream of bytes incrementally.
+
+    :param chunks: An iterable of bytes.
+    :return: A generator of the gzip-compressed bytes.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
+
+
+def get_export_fingerprint(user):
+    """
+    Fingerprint the state of everything in the given user's export: the count and latest update of each section, the
+    values of the fields written without an update (see ``_FINGERPRINT_VALUE_FIELDS``), the user's last deletion and
+    the version of the code rendering it. Two exports with the same fingerprint have the same contents, so long as
+    every other write to exported data goes through ``save()``.
+
+    :param user: The user whose export to fingerprint.
+    :return: A hex digest.
+    """
+    state = [settings.PROJECT_VERSION, user.settings.last_deletion_at]
+    for section, queryset in get_export_querysets(user).items():
+        queryset = queryset.model.objects.for_user(user.pk).order_by()
+        state.append((section, queryset.aggregate(count=Count('pk'), updated_at=Max('updated_at'))))
+        if section in _FINGERPRINT_VALUE_FIELDS:
+            state.append(list(queryset.order_by('pk').values_list('pk', *_FINGERPRINT_VALUE_FIELDS[section])))
+
+    return hashlib.sha256(repr(state).encode('utf-8')).hexdigest()
+
+
+def _get_storage():
+    return storages[settings.EXPORT_STORAGE_ALIAS]
+
+
+def _get_artifact_dir(user_id):
+    return f"exports/{user_id}"
+
+
+def _get_artifact_name(user, fingerprint):
+    # Keyed with the secret key, so an artifact's name can't be derived from what's known about the account
+    digest = hmac.new(settings.SECRET_KEY.encode('utf-8'), f'{user.pk}:{fingerprint}'.encode('utf-8'),
+                      hashlib.sha256).hexdigest()
+
+    return f"{_get_artifact_dir(user.pk)}/{digest}.json{'.gz' if settings.EXPORT_ARTIFACT_GZIP else ''}"
+
+
+def delete_export_artifacts(user_id, keep=None, older_than=None):
+    """
+    Delete the given user's export artifacts from storage.
+
+    :param user_id: The ID of the user whose artifacts to delete.
+    :param keep: The name of an artifact to keep, if any.
+    :param older_than: If given, only artifacts last modified before this datetime are deleted.
+    :return: The number of artifacts deleted.
+    """
+    storage = _get_storage()
+    artifact_dir = _get_artifact_dir(user_id)
+
+    try:
+        _, filenames = storage.listdir(artifact_dir)
+    except FileNotFoundError:
+        return 0
+
+    num_deleted = 0
+    for filename in filenames:
+        name = f"{artifact_dir}/{filename}"
+        if name == keep or (older_than is not None and storage.get_modified_time(name) >= older_than):
+            continue
+
+        storage.delete(name)
+        num_deleted += 1
+
+    return num_deleted
+
+
+def purge_export_artifacts():
+    """
+    Delete every export artifact older than twice EXPORT_JOB_TTL_SECONDS. An artifact is only reused by jobs started
+    within EXPORT_JOB_TTL_SECONDS of its creation, so by then every job that gives it out has expired.
+
+    :return: The number of artifacts deleted.
+    """
+    try:
+        user_dirs, _ = _get_storage().listdir('exports')
+    except FileNotFoundError:
+        return 0
+
+    older_than = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TTL_SECONDS * 2)
+
+    return sum(delete_export_artifacts(user_id, older_than=older_than) for user_id in user_dirs)
+
+
+def create_export_artifact(user):
+    """
+    Write the given user's export to storage, unless an artifact of the account in its current state was written
+    within EXPORT_JOB_TTL_SECONDS, in which case that is reused. Artifacts are named by a fingerprint of the account, so
+    a change to it leads to a new artifact, which replaces the user's previous ones.
+
+    :param user: The user whose data to export.
+    :return: The name of the artifact in storage.
+    """
+    from helium.planner.services import gradingservice
+
+    # Grades reflect every change before they're exported (and fingerprinted)
+    gradingservice.recalculate_pending_grades(user.pk)
+
+    storage = _get_storage()
+    name = _get_artifact_name(user, get_export_fingerprint(user))
+
+    if storage.exists(name):
+        if timezone.now() - storage.get_modified_time(name) < timedelta(seconds=settings.EXPORT_JOB_TTL_SECONDS):
+            metricutils.increment('action.export.artifact', user=user, extra_tags=['result:reused'])
+            return name
+
+        # Too old to be given out by another job without it being purged first, so it's written anew
+        storage.delete(name)
+
+    content = iter_export_json(user)
+    if settings.EXPORT_ARTIFACT_GZIP:
+        content = gzip_stream(content)
+
+    with tempfile.SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_SIZE) as artifact:
+        for chunk in content:
+            artifact.write(chunk)
+        artifact.seek(0)
+
+        name = storage.save(name, File(artifact))
+
+    delete_export_artifacts(user.pk, keep=name)
+
+    metricutils.increment('action.export.artifact', user=user, extra_tags=['result:created'])
+
+    return name
+
+
+def get_export_download_url(name):
+    """
+    Get a URL the given export artifact can be downloaded from, signed to expire after
+    EXPORT_DOWNLOAD_URL_EXPIRY_SECONDS by storages that sign their URLs (e.g. S3).
+
+    :param name: The name of the artifact in storage.
+    :return: The URL.
+    """
+    storage = _get_storage()
+
+    if 'expire' in inspect.signature(storage.url).parameters:
+        return storage.url(name, expire=settings.EXPORT_DOWNLOAD_URL_EXPIRY_SECONDS)
+
+    return storage.url(name)
+
+
+def _get_job_cache_key(user_id, job_id):
+    return f"users:{user_id}:exports:{job_id}"
+
+
+def start_export_job(user):
+    """
+    Enqueue a background export of the given user's data. If the export can't be enqueued, the job is failed straight
+    away.
+
+    :param user: The user whose data to export.
+    :return: The job's ID, to poll with ``get_export_job``.
+    """
+    from helium.importexport.tasks import export_user_data
+
+    job_id = uuid.uuid4().hex
+
+    cache.set(_get_job_cache_key(user.pk, job_id), {'status': PENDING, 'started_at': time.time()},
+              settings.EXPORT_JOB_TTL_SECONDS)
+
+    try:
+        result = taskutils.safe_apply_async(export_user_data, args=(user.pk, job_id),
+                                            priority=settings.CELERY_PRIORITY_LOW)
+    except Exception:
+        logger.error(f"An error occurred enqueuing export job {job_id} for user {user.pk}.", exc_info=True)
+        result = None
+
+    if result is None:
+        set_export_job_result(user.pk, job_id, FAILED)
+
+    return job_id
+
+
+def set_export_job_result(user_id, job_id, status, name=None):
+    cache.set(_get_job_cache_key(user_id, job_id), {'status': status, 'name': name}, settings.EXPORT_JOB_TTL_SECONDS)
+
+
+def get_export_job(user, job_id):
+    """
+    Get the state of one of the given user's export jobs.
+
+    :param user: The user who started the job.
+    :param job_id: The job's ID.
+    :return: A dict of the job's ``id`` and ``status`` (failed if it's been pending for longer than
+        EXPORT_JOB_TIMEOUT_SECONDS), and its ``download_url`` once complete, or None if no such job exists (or it has
+        expired).
+    """
+    job = cache.get(_get_job_cache_key(user.pk, job_id))
+    if job is None:
+        return None
+
+    # A job pending for this long was lost (to a broker outage or a worker that died mid-run), and will never finish
+    if job['status'] == PENDING and time.time() - job['started_at'] > settings.EXPORT_JOB_TIMEOUT_SECONDS:
+        job = {'status': FAILED}
+
+    return {
+        'id': job_id,
+        'status': job['status'],
+        'download_url': get_export_download_url(job['name']) if job['status'] == COMPLETE else None,
+    }
@@ -0,0 +1,283 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import storages
+from django.http import HttpRequest
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+from helium.common.services import uploadfileservice
+from helium.common.utils import metricutils, taskutils
+from helium.importexport.services import icsimportservice, importservice
+from helium.planner.services import reminderservice
+
+logger = logging.getLogger(__name__)
+
+# The kinds of import job
+JSON = 'json'
+ICS = 'ics'
+
+# The states of an import job
+PENDING = 'pending'
+RUNNING = 'running'
+COMPLETE = 'complete'
+FAILED = 'failed'
+
+# The sections of an import, as named in ImportSerializer (and in the order import_user returns their counts)
+SECTIONS = (
+    'external_calendars', 'course_groups', 'courses', 'course_schedules', 'categories', 'resource_groups', 'resources',
+    'events', 'homework', 'reminders', 'notes',
+)
+
+# The details of a job that failed for a reason other than the file itself
+_ERROR_DETAILS = {'details': 'An error occurred importing the file.'}
+
+# An ICS import's rows all come from the calendar's events, which become Events or Homework
+_ICS_SECTIONS = ('courses', 'events', 'homework')
+
+
+def _get_storage():
+    return storages[settings.IMPORT_STORAGE_ALIAS]
+
+
+def _get_job_cache_key(user_id, job_id):
+    return f"users:{user_id}:imports:{job_id}"
+
+
+def _get_job_id(user, kind, upload, params):
+    # Derived from what's imported, so a resubmission of the same file (with the same options) finds the same job
+    digest = hashlib.sha256()
+    digest.update(f'{user.pk}:{kind}:{json.dumps(params, sort_keys=True)}:'.encode('utf-8'))
+    for chunk in uploadfileservice.iter_chunks(upload):
+        digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _get_import_request(user):
+    request = Request(HttpRequest(), parser_context={'kwargs': {}})
+    request.user = user
+
+    return request
+
+
+def _is_stalled(job):
+    # A job that's still pending or running but hasn't been touched in a while was lost (to a broker outage or a worker
+    # that died mid-run), and will never finish
+    return (job['status'] in (PENDING, RUNNING) and
+            time.time() - job['heartbeat'] > settings.IMPORT_JOB_HEARTBEAT_TIMEOUT_SECONDS)
+
+
+def _is_deduplicable(job):
+    # Only a job that's still in flight absorbs a resubmission; once it's finished, resubmitting the file (for instance
+    # after deleting what it imported) imports it again
+    return job is not None and job['status'] in (PENDING, RUNNING) and not _is_stalled(job)
+
+
+def _update_job(user_id, job_id, **fields):
+    key = _get_job_cache_key(user_id, job_id)
+
+    job = cache.get(key)
+    if job is None:
+        return None
+
+    job.update(fields, heartbeat=time.time())
+    cache.set(key, job, settings.IMPORT_JOB_TTL_SECONDS)
+
+    return job
+
+
+def start_import_job(user, kind, upload, params=None):
+    """
+    Stage the given uploaded file to storage and enqueue a background import of it for the given user. A job for the
+    same content (and options) that's still pending or running (and hasn't stalled) is returned rather than started
+    again, so resubmitting a file, for instance after a timeout, doesn't import it twice. If the import can't be enqueued, the job is failed
+    straight away.
+
+    :param user: The user importing the file.
+    :param kind: The kind of file, ``JSON`` (an export) or ``ICS`` (a calendar).
+    :param upload: The uploaded file, which is read a chunk at a time (and so can't exceed MAX_UPLOAD_SIZE).
+    :param params: The options of the import, for ``ICS`` the keyword arguments of ``icsimportservice.import_ics``.
+    :return: The job's ID, to poll with ``get_import_job``.
+    :raises ValidationError: If the uploaded file is invalid, as for ``uploadfileservice.iter_chunks``.
+    """
+    from helium.importexport.tasks import import_user_data
+
+    params = params or {}
+    filename = upload.name
+    job_id = _get_job_id(user, kind, upload, params)
+    key = _get_job_cache_key(user.pk, job_id)
+
+    if _is_deduplicable(cache.get(key)):
+        metricutils.increment('action.import.job', user=user, extra_tags=['result:deduplicated'])
+        return job_id
+
+    # Staged before the job is recorded, so a job never refers to a file that failed to save
+    storage = _get_storage()
+    name = storage.save(f'imports/{user.pk}/{job_id}{os.path.splitext(filename)[1]}', upload)
+
+    job = {
+        'status': PENDING,
+        'kind': kind,
+        'name': name,
+        'filename': filename,
+        'params': params,
+        'progress': {},
+        'counts': None,
+        'details': None,
+        'heartbeat': time.time(),
+    }
+
+    # Added atomically, so of concurrent submissions of the same file, only one starts a job
+    if not cache.add(key, job, settings.IMPORT_JOB_TTL_SECONDS):
+        existing = cache.get(key)
+        if _is_deduplicable(existing):
+            storage.delete(name)
+
+            metricutils.increment('action.import.job', user=user, extra_tags=['result:deduplicated'])
+            return job_id
+
+        # A stalled job's file may not have been deleted (though a failed job's name may since have been reused)
+        if existing is not None and existing['name'] != name:
+            storage.delete(existing['name'])
+        cache.set(key, job, settings.IMPORT_JOB_TTL_SECONDS)
+
+    try:
+        result = taskutils.safe_apply_async(import_user_data, args=(user.pk, job_id),
+                                            priority=settings.CELERY_PRIORITY_LOW)
+    except Exception:
+        logger.error(f"An error occurred enqueuing import job {job_id} for user {user.pk}.", exc_info=True)
+        result = None
+
+    if result is None:
+        storage.delete(name)
+        fail_import_job(user.pk, job_id)
+
+        metricutils.increment('action.import.job', user=user, extra_tags=['result:failed'])
+        return job_id
+
+    metricutils.increment('action.import.job', user=user, extra_tags=['result:started'])
+
+    return job_id
+
+
+def _import_json(user, job_id, staged, filename):
+    try:
+        data = uploadfileservice.load_json(staged)
+    except ValueError:
+        raise ValidationError({'details': f'Invalid JSON in file: {filename}.'})
+
+    if not isinstance(data, dict):
+        raise ValidationError({'details': f'Invalid JSON structure: {filename}.'})
+
+    progress = {section: {'done': 0, 'total': len(data.get(section) or [])} for section in SECTIONS}
+    # The legacy names of the resource sections are imported in their place
+    progress['resource_groups']['total'] = len(data.get('resource_groups', data.get('material_groups')) or [])
+    progress['resources']['total'] = len(data.get('resources', data.get('materials')) or [])
+    _update_job(user.pk, job_id, progress=progress)
+
+    def report_progress(section, done):
+        progress[section]['done'] = done
+        _update_job(user.pk, job_id, progress=progress)
+
+    counts = importservice.import_user(_get_import_request(user), data, progress=report_progress)
+
+    reminderservice.process_push_reminders(True)
+
+    return dict(zip(SECTIONS, counts))
+
+
+def _import_ics(user, job_id, staged, filename, params):
+    try:
+        calendar = uploadfileservice.load_ics(staged)
+    except ValueError:
+        raise ValidationError({'details': f'Invalid iCalendar in file: {filename}.'})
+
+    courses_count, events_count, homework_count = icsimportservice.import_ics(
+        _get_import_request(user), calendar, **params)
+
+    counts = dict.fromkeys(SECTIONS, 0) | {'courses': courses_count, 'events': events_count,
+                                           'homework': homework_count}
+    _update_job(user.pk, job_id, progress={section: {'done': counts[section], 'total': counts[section]}
+                                           for section in _ICS_SECTIONS})
+
+    return counts
+
+
+def run_import_job(user, job_id):
+    """
+    Import the file staged for the given job, recording the job's progress as each section is imported, then its
+    counts, or the details of why the file couldn't be imported. The staged file is deleted either way.
+
+    :param user: The user who started the job.
+    :param job_id: The job's ID.
+    :return: True if the file was imported, False otherwise (including when the job has expired, or is no longer
+        pending, for instance having been failed when it couldn't be enqueued).
+    """
+    job = cache.get(_get_job_cache_key(user.pk, job_id))
+    if job is None or job['status'] != PENDING:
+        logger.info(f'Import job {job_id} for user {user.pk} has expired or is no longer pending. Nothing to do.')
+        return False
+
+    job = _update_job(user.pk, job_id, status=RUNNING)
+    if job is None:
+        return False
+
+    storage = _get_storage()
+    try:
+        with storage.open(job['name']) as staged:
+            if job['kind'] == ICS:
+                counts = _import_ics(user, job_id, staged, job['filename'], job['params'])
+            else:
+                counts = _import_json(user, job_id, staged, job['filename'])
+
+        _update_job(user.pk, job_id, status=COMPLETE, counts=counts)
+
+        return True
+    except ValidationError as ex:
+        _update_job(user.pk, job_id, status=FAILED, details=ex.detail)
+
+        return False
+    finally:
+        storage.delete(job['name'])
+
+
+def fail_import_job(user_id, job_id):
+    _update_job(user_id, job_id, status=FAILED, details=_ERROR_DETAILS)
+
+
+def get_import_job(user, job_id):
+    """
+    Get the state of one of the given user's import jobs.
+
+    :param user: The user who started the job.
+    :param job_id: The job's ID.
+    :return: A dict of the job's ``id``, ``status``, ``progress`` (the rows ``done`` and ``total`` of each section),
+        ``counts`` once complete and error ``details`` if failed (or stalled), or None if no such job exists (or it
+        has expired).
+    """
+    job = cache.get(_get_job_cache_key(user.pk, job_id))
+    if job is None:
+        return None
+
+    if _is_stalled(job):
+        return {
+            'id': job_id,
+            'status': FAILED,
+            'progress': job['progress'],
+            'counts': None,
+            'details': _ERROR_DETAILS,
+        }
+
+    return {
+        'id': job_id,
+        'status': job['status'],
+        'progress': job['progress'],
+        'counts': job['counts'],
+        'details': job['details'],
+    }
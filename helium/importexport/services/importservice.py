@@ -1,4 +1,5 @@
 import datetime
+import collections
 import json
 import logging
 import os
@@ -7,7 +8,7 @@ from decimal import Decimal
 from zoneinfo import ZoneInfo
 
 from django.conf import settings
-from django.db import transaction
+from django.db import connection, transaction
 from django.db.models.signals import post_save
 from django.http import HttpRequest
 from django.utils import timezone
@@ -22,7 +23,7 @@ from helium.common.utils.course_exception_helpers import get_course_exceptions
 from helium.feed.serializers.externalcalendarserializer import ExternalCalendarSerializer
 from helium.feed.models import ExternalCalendar
 from helium.planner.models import CourseGroup, Course, CourseSchedule, Homework, Event, Category, Reminder, \
-    MaterialGroup, Material
+    MaterialGroup, Material, Note
 from helium.planner.serializers.categoryserializer import CategorySerializer
 from helium.planner.serializers.coursegroupserializer import CourseGroupSerializer
 from helium.planner.serializers.coursescheduleserializer import CourseScheduleSerializer
@@ -103,9 +104,9 @@ def _validate_section_ids(data):
 
 def _resolve_parent(remap, raw_id, section, parent_key):
     """
-    Resolve a parent FK id via the remap dict. Raises ValidationError if the id is missing or
-    doesn't resolve — surfaces hand-rolled broken references as 400 rather than letting them
-    crash deeper in the stack as IntegrityError → 500.
+    Resolve a parent FK id to the instance created for it via the remap dict. Raises ValidationError
+    if the id is missing or doesn't resolve — surfaces hand-rolled broken references as 400 rather
+    than letting them crash deeper in the stack as IntegrityError → 500.
     """
     if raw_id is None:
         raise ValidationError(
@@ -142,18 +143,142 @@ def _create_note_from_payload(payload, user, example_schedule, section):
     raise ValidationError({section: serializer.errors})
 
 
+class _CreatedInstances:
+    """
+    Stands in for a related field's queryset while a section is validated, resolving the (already remapped) ids of
+    the section's parents to the instances created earlier in the import, rather than querying for each row.
+    """
+
+    def __init__(self, model, instances):
+        self.model = model
+        self._instances = {instance.pk: instance for instance in instances}
+
+    def get(self, pk):
+        try:
+            return self._instances[int(pk)]
+        except KeyError:
+            raise self.model.DoesNotExist()
+
+
+class _ImportNoteSerializer(NoteSerializer):
+    """
+    Notes are only linked to entities created earlier in the same import, so whether an entity already has a note is
+    tracked in the serializer's ``linked_notes`` context, not queried for each note.
+    """
+
+    def has_linked_note(self, field_name, entities):
+        return any((field_name, entity.pk) in self.context['linked_notes'] for entity in entities)
+
+
+def _use_created_instances(serializer, **lookups):
+    for field_name, lookup in lookups.items():
+        field = serializer.fields[field_name]
+        getattr(field, 'child_relation', field).queryset = lookup
+
+
+def _validate_row(serializer, row, section):
+    if not serializer.is_valid():
+        raise ValidationError({
+            section: {
+                row['id']: serializer.errors
+            }
+        })
+
+    return dict(serializer.validated_data)
+
+
+def _build_instance(model, validated_data, **kwargs):
+    """
+    Build an unsaved instance from a row's validated data, separating out its many-to-many values, which can only be
+    set once the instance is created.
+
+    :return: A tuple of the instance and a dict of its many-to-many values.
+    """
+    m2m = {field.name: validated_data.pop(field.name) for field in model._meta.many_to_many
+           if field.name in validated_data}
+
+    return model(**validated_data, **kwargs), m2m
+
+
+def _get_inserted_pks(count):
+    """
+    Read back the keys of the rows inserted by the last multi-row INSERT on this connection, for databases that can't
+    return them from the insert (MySQL).
+
+    A multi-row ``INSERT ... VALUES`` is a "simple insert", so InnoDB reserves its auto-increment values all at once,
+    and they're consecutive (stepped by ``auto_increment_increment``) however other connections' inserts interleave.
+    MySQL's ``LAST_INSERT_ID()`` is the first of them; SQLite's ``last_insert_rowid()`` is the last.
+
+    :param count: The number of rows the INSERT created.
+    :return: A range of the inserted rows' keys, in insertion order.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute('SELECT LAST_INSERT_ID(), @@auto_increment_increment')
+            first_pk, step = cursor.fetchone()
+        else:
+            cursor.execute('SELECT last_insert_rowid()')
+            first_pk, step = cursor.fetchone()[0] - count + 1, 1
+
+    return range(first_pk, first_pk + count * step, step)
+
+
+def _bulk_create(model, instances):
+    """
+    Insert the given instances, IMPORT_BULK_CREATE_BATCH_SIZE rows per query, setting each one's primary key.
+
+    Databases that can't return the keys of inserted rows (MySQL) have each batch inserted by a single INSERT, whose
+    keys are then read back with ``_get_inserted_pks``, so the import's query count stays flat as its rows grow. As
+    with ``bulk_create``, the model's ``save()`` isn't called, and the only post_save receivers of the imported models
+    either are suppressed or ignore created rows.
+
+    :param model: The model to insert.
+    :param instances: The unsaved instances.
+    :return: The instances.
+    """
+    if not instances:
+        return instances
+
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(instances, batch_size=settings.IMPORT_BULK_CREATE_BATCH_SIZE)
+
+    # Batch no larger than bulk_create would, so that each batch is exactly one INSERT
+    batch_size = min(settings.IMPORT_BULK_CREATE_BATCH_SIZE,
+                     max(connection.ops.bulk_batch_size(model._meta.concrete_fields, instances), 1))
+    for i in range(0, len(instances), batch_size):
+        batch = instances[i:i + batch_size]
+        model.objects.bulk_create(batch, batch_size=len(batch))
+        for instance, pk in zip(batch, _get_inserted_pks(len(batch))):
+            instance.pk = pk
+
+    return instances
+
+
+def _bulk_create_m2m(model, created):
+    """
+    Insert the many-to-many rows of the given created instances, a query per relation.
+
+    :param model: The model of the instances.
+    :param created: A list of tuples of each instance and its many-to-many values, as given by ``_build_instance``.
+    """
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        rows = [through(**{f'{field.m2m_field_name()}_id': instance.pk,
+                           f'{field.m2m_reverse_field_name()}_id': related.pk})
+                for instance, m2m in created for related in m2m.get(field.name, ())]
+
+        if rows:
+            through.objects.bulk_create(rows, batch_size=settings.IMPORT_BULK_CREATE_BATCH_SIZE)
+
+
 def _import_external_calendars(external_calendars, user, example_schedule):
+    instances = []
     for external_calendar in external_calendars:
-        serializer = ExternalCalendarSerializer(data=external_calendar)
+        validated_data = _validate_row(ExternalCalendarSerializer(data=external_calendar), external_calendar,
+                                       'external_calendars')
+        instances.append(ExternalCalendar(**validated_data, user=user, example_schedule=example_schedule))
 
-        if serializer.is_valid():
-            serializer.save(user=user, example_schedule=example_schedule)
-        else:
-            raise ValidationError({
-                'external_calendars': {
-                    external_calendar['id']: serializer.errors
-                }
-            })
+    ExternalCalendar.objects.bulk_create(instances, batch_size=settings.IMPORT_BULK_CREATE_BATCH_SIZE)
 
     logger.info(f"Imported {len(external_calendars)} external calendars.")
 
@@ -161,75 +286,54 @@ def _import_external_calendars(external_calendars, user, example_schedule):
 
 
 def _import_course_groups(course_groups, user, example_schedule):
-    course_group_remap = {}
-
+    instances = []
     for course_group in course_groups:
         # Field named remapped for legacy purposes
         if 'average_grade' in course_group:
             course_group['overall_grade'] = course_group['average_grade']
-        serializer = CourseGroupSerializer(data=course_group)
 
-        if serializer.is_valid():
-            instance = serializer.save(user=user, example_schedule=example_schedule)
-            course_group_remap[course_group['id']] = instance.pk
-        else:
-            raise ValidationError({
-                'course_groups': {
-                    course_group['id']: serializer.errors
-                }
-            })
+        validated_data = _validate_row(CourseGroupSerializer(data=course_group), course_group, 'course_groups')
+        instances.append(CourseGroup(**validated_data, user=user, example_schedule=example_schedule))
 
-    logger.info(f"Imported {len(course_groups)} course groups.")
+    _bulk_create(CourseGroup, instances)
 
-    return course_group_remap
+    logger.info(f"Imported {len(course_groups)} course groups.")
 
+    return {course_group['id']: instance for course_group, instance in zip(course_groups, instances)}
 
-def _import_courses(courses, course_group_remap):
-    course_remap = {}
 
+def _import_courses(courses, course_group_remap, user):
+    instances = []
     for course in courses:
         course.pop('template', None)
 
-        course_group_id = _resolve_parent(
-            course_group_remap, course.get('course_group'), 'courses', 'course_group')
-        course['course_group'] = course_group_id
+        course_group = _resolve_parent(course_group_remap, course.get('course_group'), 'courses', 'course_group')
+        course['course_group'] = course_group.pk
 
-        serializer = CourseSerializer(data=course)
+        validated_data = _validate_row(CourseSerializer(data=course), course, 'courses')
+        instances.append(Course(**validated_data, course_group=course_group))
 
-        if serializer.is_valid():
-            instance = serializer.save(course_group_id=course_group_id)
-            course_remap[course['id']] = instance.pk
-        else:
-            raise ValidationError({
-                'courses': {
-                    course['id']: serializer.errors
-                }
-            })
+    _bulk_create(Course, instances)
 
     logger.info(f"Imported {len(courses)} courses.")
 
-    return course_remap
+    return {course['id']: instance for course, instance in zip(courses, instances)}
 
 
 def _import_course_schedules(course_schedules, course_remap):
+    instances = []
     for course_schedule in course_schedules:
-        course_id = _resolve_parent(
-            course_remap, course_schedule.get('course'), 'course_schedules', 'course')
-        course_schedule['course'] = course_id
+        course = _resolve_parent(course_remap, course_schedule.get('course'), 'course_schedules', 'course')
+        course_schedule['course'] = course.pk
 
         view = CourseGroupCourseCourseSchedulesApiListView()
-        view.kwargs = {'course': course_id}
-        context = {'view': view}
-        serializer = CourseScheduleSerializer(data=course_schedule, context=context)
+        view.kwargs = {'course': course.pk}
+        serializer = CourseScheduleSerializer(data=course_schedule, context={'view': view})
 
-        if serializer.is_valid():
-            serializer.save(course_id=course_id)
-        else:
-            raise ValidationError({
-                'course_schedules': {
-                    course_schedule['id']: serializer.errors
-                }
-            })
+        validated_data = _validate_row(serializer, course_schedule, 'course_schedules')
+        instances.append(CourseSchedule(**validated_data, course=course))
+
+    CourseSchedule.objects.bulk_create(instances, batch_size=settings.IMPORT_BULK_CREATE_BATCH_SIZE)
 
     logger.info(f"Imported {len(course_schedules)} course schedules.")
 
@@ -237,59 +341,90 @@ def _import_course_schedules(course_schedules, course_remap):
 
 
 def _import_categories(categories, request, course_remap):
-    category_remap = {}
-
+    instances = []
+    titles = set()
+    weights = collections.Counter()
     for category in categories:
-        course_id = _resolve_parent(course_remap, category.get('course'), 'categories', 'course')
-        request.parser_context['kwargs']['course'] = course_id
+        course = _resolve_parent(course_remap, category.get('course'), 'categories', 'course')
+        request.parser_context['kwargs']['course'] = course.pk
 
         serializer = CategorySerializer(data=category, context={'request': request})
+        validated_data = _validate_row(serializer, category, 'categories')
 
-        if serializer.is_valid():
-            instance = serializer.save(course_id=course_id)
-            category_remap[category['id']] = instance.pk
-        else:
+        # The serializer only validates against the course's saved categories, so the section's own are checked here
+        if (course.pk, validated_data['title']) in titles:
             raise ValidationError({
                 'categories': {
-                    category['id']: serializer.errors
+                    category['id']: {'title': [f"This class already has a category named \"{validated_data['title']}\"."]}
                 }
             })
+        weights[course.pk] += validated_data.get('weight', 0)
+        if weights[course.pk] > 100:
+            raise ValidationError({
+                'categories': {
+                    category['id']: {'weight': ["The cumulative weights of all categories associated with a class "
+                                                "cannot exceed 100%."]}
+                }
+            })
+        titles.add((course.pk, validated_data['title']))
+
+        instances.append(Category(**validated_data, course=course))
+
+    _bulk_create(Category, instances)
 
     logger.info(f"Imported {len(categories)} categories.")
 
-    return category_remap
+    return {category['id']: instance for category, instance in zip(categories, instances)}
+
 
+def _get_uncategorized_categories(courses, user, exclude_categorized=False):
+    """
+    Get each of the given courses' "Uncategorized" category, creating those that don't exist yet.
 
-def _ensure_courses_have_categories(course_remap):
-    for course_id in course_remap.values():
-        if not Category.objects.filter(course_id=course_id).exists():
-            Category.objects.get_uncategorized(course_id)
+    :param courses: The courses.
+    :param user: The user who owns the courses.
+    :param exclude_categorized: If True, courses that already have any category are skipped.
+    :return: A dict of course IDs to their "Uncategorized" category.
+    """
+    course_ids = {course.pk for course in courses}
+    if exclude_categorized:
+        course_ids -= set(Category.objects.filter(course_id__in=course_ids).values_list('course_id', flat=True))
 
+    categories = {category.course_id: category for category in
+                  Category.objects.filter(course_id__in=course_ids, title='Uncategorized')}
 
-def _import_material_groups(material_groups, user, example_schedule):
-    material_group_remap = {}
+    missing = [Category(title='Uncategorized', weight=0, course_id=course_id) for course_id in sorted(course_ids)
+               if course_id not in categories]
+    for category in _bulk_create(Category, missing):
+        categories[category.course_id] = category
 
+    return categories
+
+
+def _ensure_courses_have_categories(course_remap, user):
+    _get_uncategorized_categories(course_remap.values(), user, exclude_categorized=True)
+
+
+def _import_material_groups(material_groups, user, example_schedule):
+    instances = []
     for material_group in material_groups:
-        serializer = MaterialGroupSerializer(data=material_group)
+        validated_data = _validate_row(MaterialGroupSerializer(data=material_group), material_group,
+                                       'material_groups')
+        instances.append(MaterialGroup(**validated_data, user=user, example_schedule=example_schedule))
 
-        if serializer.is_valid():
-            instance = serializer.save(user=user, example_schedule=example_schedule)
-            material_group_remap[material_group['id']] = instance.pk
-        else:
-            raise ValidationError({
-                'material_groups': {
-                    material_group['id']: serializer.errors
-                }
-            })
+    _bulk_create(MaterialGroup, instances)
 
     logger.info(f"Imported {len(material_groups)} resource groups.")
 
-    return material_group_remap
+    return {material_group['id']: instance for material_group, instance in zip(material_groups, instances)}
 
 
-def _import_materials(materials, material_group_remap, course_remap, user, example_schedule):
-    material_remap = {}
+def _import_materials(materials, material_group_remap, course_remap, user, legacy_notes):
+    material_groups = _CreatedInstances(MaterialGroup, material_group_remap.values())
+    courses = _CreatedInstances(Course, course_remap.values())
 
+    created = []
+    legacy_notes_contents = []
     for material in materials:
         if 'resource_group' in material:
             raw_group = material.get('resource_group')
@@ -297,77 +432,67 @@ def _import_materials(materials, material_group_remap, course_remap, user, examp
         else:
             raw_group = material.get('material_group')
             parent_key = 'material_group'
-        material_group_id = _resolve_parent(
-            material_group_remap, raw_group, 'materials', parent_key)
-        material['material_group'] = material_group_id
+        material['material_group'] = _resolve_parent(
+            material_group_remap, raw_group, 'materials', parent_key).pk
         material.pop('resource_group', None)
 
-        courses = material.get('courses') or []
-        if not isinstance(courses, list):
+        material_courses = material.get('courses') or []
+        if not isinstance(material_courses, list):
             raise ValidationError({'materials': "Field `courses` must be a list."})
-        for i, course in enumerate(courses):
-            courses[i] = _resolve_parent(course_remap, course, 'materials', 'courses')
-        material['courses'] = courses
+        material['courses'] = [_resolve_parent(course_remap, course, 'materials', 'courses').pk
+                               for course in material_courses]
+
+        legacy_notes_contents.append(_extract_legacy_notes(material, legacy_field='details'))
 
-        legacy_notes_content = _extract_legacy_notes(material, legacy_field='details')
         serializer = MaterialSerializer(data=material)
+        _use_created_instances(serializer, material_group=material_groups, courses=courses)
+        created.append(_build_instance(Material, _validate_row(serializer, material, 'materials')))
 
-        if serializer.is_valid():
-            instance = serializer.save(material_group_id=material_group_id)
-            material_remap[material['id']] = instance.pk
+    _bulk_create(Material, [instance for instance, _ in created])
+    _bulk_create_m2m(Material, created)
 
-            if legacy_notes_content:
-                _create_note_from_payload(
-                    _build_legacy_note_payload(legacy_notes_content, resource_id=instance.pk),
-                    user, example_schedule, 'materials')
-        else:
-            raise ValidationError({
-                'materials': {
-                    material['id']: serializer.errors
-                }
-            })
+    for (instance, _), legacy_notes_content in zip(created, legacy_notes_contents):
+        if legacy_notes_content:
+            legacy_notes.append(('materials', _build_legacy_note_payload(legacy_notes_content, resource_id=instance.pk)))
 
     logger.info(f"Imported {len(materials)} resources.")
 
-    return material_remap
-
+    return {material['id']: instance for material, (instance, _) in zip(materials, created)}
 
-def _import_events(events, user, example_schedule):
-    event_remap = {}
 
+def _import_events(events, user, example_schedule, legacy_notes):
+    instances = []
+    legacy_notes_contents = []
     for event in events:
-        legacy_notes_content = _extract_legacy_notes(event, legacy_field='comments')
-        serializer = EventSerializer(data=event)
+        legacy_notes_contents.append(_extract_legacy_notes(event, legacy_field='comments'))
 
-        if serializer.is_valid():
-            instance = serializer.save(user=user, example_schedule=example_schedule)
-            event_remap[event['id']] = instance.pk
+        validated_data = _validate_row(EventSerializer(data=event), event, 'events')
+        instances.append(Event(**validated_data, user=user, example_schedule=example_schedule))
 
-            if legacy_notes_content:
-                _create_note_from_payload(
-                    _build_legacy_note_payload(legacy_notes_content, event_id=instance.pk),
-                    user, example_schedule, 'events')
-        else:
-            raise ValidationError({
-                'events': {
-                    event['id']: serializer.errors
-                }
-            })
+    _bulk_create(Event, instances)
+
+    for instance, legacy_notes_content in zip(instances, legacy_notes_contents):
+        if legacy_notes_content:
+            legacy_notes.append(('events', _build_legacy_note_payload(legacy_notes_content, event_id=instance.pk)))
 
     logger.info(f"Imported {len(events)} events.")
 
-    return event_remap
+    return {event['id']: instance for event, instance in zip(events, instances)}
 
 
-def _import_homework(homework, course_remap, category_remap, material_remap, user, example_schedule):
-    homework_remap = {}
+def _import_homework(homework, course_remap, category_remap, material_remap, user, example_schedule, legacy_notes):
+    courses = _CreatedInstances(Course, course_remap.values())
+    categories = _CreatedInstances(Category, category_remap.values())
+    materials = _CreatedInstances(Material, material_remap.values())
+    now = timezone.now()
 
+    created = []
+    legacy_notes_contents = []
     for h in homework:
-        course_id = _resolve_parent(course_remap, h.get('course'), 'homework', 'course')
-        h['course'] = course_id
+        h['course'] = _resolve_parent(course_remap, h.get('course'), 'homework', 'course').pk
 
         if h.get('category'):
-            h['category'] = _resolve_parent(category_remap, h.get('category'), 'homework', 'category')
+            h['category'] = _resolve_parent(category_remap, h.get('category'), 'homework', 'category').pk
         else:
             h['category'] = None
 
@@ -375,47 +500,58 @@ def _import_homework(homework, course_remap, category_remap, material_remap, use
             raise ValidationError(
                 {'homework': "Provide either 'resources' or 'materials' on a homework row, not both."})
         field_key = 'resources' if 'resources' in h else 'materials'
-        materials = h.pop('resources', None) if 'resources' in h else h.get('materials')
-        materials = materials or []
-        if not isinstance(materials, list):
+        h_materials = h.pop('resources', None) if 'resources' in h else h.get('materials')
+        h_materials = h_materials or []
+        if not isinstance(h_materials, list):
             raise ValidationError({'homework': f"Field `{field_key}` must be a list."})
-        for i, material in enumerate(materials):
-            materials[i] = _resolve_parent(material_remap, material, 'homework', field_key)
-        h['materials'] = materials
+        h['materials'] = [_resolve_parent(material_remap, material, 'homework', field_key).pk
+                          for material in h_materials]
+
+        legacy_notes_contents.append(_extract_legacy_notes(h, legacy_field='comments'))
 
-        legacy_notes_content = _extract_legacy_notes(h, legacy_field='comments')
         serializer = HomeworkSerializer(data=h)
+        _use_created_instances(serializer, course=courses, category=categories, materials=materials)
+        instance, m2m = _build_instance(Homework, _validate_row(serializer, h, 'homework'))
 
-        if serializer.is_valid():
-            instance = serializer.save(course_id=course_id)
-            homework_remap[h['id']] = instance.pk
-
-            # completed_at is read-only (inferred by Homework.save() the first time completed flips true),
-            # so the serializer ignores it. Restore the original value from a user's own export rather
-            # than letting save() re-stamp it to import time. Seed imports keep the fresh stamp.
-            completed_at = parse_datetime(h['completed_at']) if h.get('completed_at') else None
-            if completed_at and not example_schedule:
-                Homework.objects.filter(pk=instance.pk).update(completed_at=completed_at)
-
-            if legacy_notes_content:
-                _create_note_from_payload(
-                    _build_legacy_note_payload(legacy_notes_content, homework_id=instance.pk),
-                    user, example_schedule, 'homework')
-        else:
-            raise ValidationError({
-                'homework': {
-                    h['id']: serializer.errors
-                }
-            })
+        # completed_at is read-only (inferred by Homework.save() the first time completed flips true), so the
+        # serializer ignores it. Restore the original value from a user's own export rather than stamping it to
+        # import time. Seed imports keep the fresh stamp.
+        completed_at = parse_datetime(h['completed_at']) if h.get('completed_at') else None
+        if completed_at and not example_schedule:
+            instance.completed_at = completed_at
+        elif instance.completed:
+            instance.completed_at = now
+
+        instance.sync_grade_values()
+
+        created.append((instance, m2m))
+
+    # Homework without a category belongs to its course's "Uncategorized" category, as in Homework.save()
+    uncategorized = _get_uncategorized_categories(
+        [instance.course for instance, _ in created if instance.category is None], user)
+    for instance, _ in created:
+        if instance.category is None:
+            instance.category = uncategorized[instance.course_id]
+
+    _bulk_create(Homework, [instance for instance, _ in created])
+    _bulk_create_m2m(Homework, created)
+
+    for (instance, _), legacy_notes_content in zip(created, legacy_notes_contents):
+        if legacy_notes_content:
+            legacy_notes.append(('homework', _build_legacy_note_payload(legacy_notes_content, homework_id=instance.pk)))
 
     logger.info(f"Imported {len(homework)} homework.")
 
-    return homework_remap
+    return {h['id']: instance for h, (instance, _) in zip(homework, created)}
 
 
 def _import_reminders(reminders, user, event_remap, homework_remap, course_remap):
+    events = _CreatedInstances(Event, event_remap.values())
+    homework = _CreatedInstances(Homework, homework_remap.values())
+    courses = _CreatedInstances(Course, course_remap.values())
+
     seen = set()
-    created = 0
+    instances = []
     for reminder in reminders:
         # Forward-migrate deprecated reminder types (POPUP=0, TEXT=2) to PUSH so legacy exports
         # keep importing cleanly.
@@ -423,13 +559,13 @@ def _import_reminders(reminders, user, event_remap, homework_remap, course_remap
             reminder['type'] = enums.PUSH
 
         reminder['homework'] = _resolve_parent(
-            homework_remap, reminder.get('homework'), 'reminders', 'homework') \
+            homework_remap, reminder.get('homework'), 'reminders', 'homework').pk \
             if reminder.get('homework') else None
         reminder['event'] = _resolve_parent(
-            event_remap, reminder.get('event'), 'reminders', 'event') \
+            event_remap, reminder.get('event'), 'reminders', 'event').pk \
             if reminder.get('event') else None
         reminder['course'] = _resolve_parent(
-            course_remap, reminder.get('course'), 'reminders', 'course') \
+            course_remap, reminder.get('course'), 'reminders', 'course').pk \
             if reminder.get('course') else None
 
         # Skip exact duplicates: legacy exports paired a Popup and a Push reminder that now
@@ -441,31 +577,29 @@ def _import_reminders(reminders, user, event_remap, homework_remap, course_remap
             continue
         seen.add(key)
 
+        # The serializer computes start_of_range from the reminder's parent, as Reminder.save() would
         serializer = ReminderSerializer(data=reminder)
+        _use_created_instances(serializer, event=events, homework=homework, course=courses)
+        instances.append(Reminder(**_validate_row(serializer, reminder, 'reminders'), user=user))
 
-        if serializer.is_valid():
-            serializer.save(user=user)
-            created += 1
-        else:
-            raise ValidationError({
-                'reminders': {
-                    reminder.get('id'): serializer.errors
-                }
-            })
+    Reminder.objects.bulk_create(instances, batch_size=settings.IMPORT_BULK_CREATE_BATCH_SIZE)
 
-    logger.info(f"Imported {created} reminders.")
+    logger.info(f"Imported {len(instances)} reminders.")
 
-    return created
+    return len(instances)
 
 
-def _import_notes(notes, user, homework_remap, event_remap, material_remap, example_schedule):
+def _import_notes(notes, user, homework_remap, event_remap, material_remap, example_schedule, legacy_notes=()):
     """
     Import notes via NoteSerializer, including those linked to entities. Handles both standalone
     notes and notes linked to homework/events/materials/resources. Entity ids are remapped to
     their newly-created values before serializer validation, so an unresolved id surfaces as a
     clean 400 rather than silently dropping the link.
+
+    Notes built from the legacy fields of other sections (given as ``legacy_notes``, tuples of the section and the
+    note's payload) are imported first, so a note in `notes` linked to the same entity is rejected.
     """
-    notes_count = 0
+    pending = list(legacy_notes)
 
     for note_data in notes:
         if not isinstance(note_data, dict):
@@ -484,27 +618,55 @@ def _import_notes(notes, user, homework_remap, event_remap, material_remap, exam
             'title': note_data.get('title', ''),
             'content': note_data.get('content') or {},
             'homework': [
-                _resolve_parent(homework_remap, raw_id, 'notes', 'homework')
+                _resolve_parent(homework_remap, raw_id, 'notes', 'homework').pk
                 for raw_id in (note_data.get('homework') or [])
             ],
             'events': [
-                _resolve_parent(event_remap, raw_id, 'notes', 'events')
+                _resolve_parent(event_remap, raw_id, 'notes', 'events').pk
                 for raw_id in (note_data.get('events') or [])
             ],
             'resources': [
-                _resolve_parent(material_remap, raw_id, 'notes', 'resources')
+                _resolve_parent(material_remap, raw_id, 'notes', 'resources').pk
                 for raw_id in (resources_input or [])
             ],
         }
 
-        _create_note_from_payload(payload, user, example_schedule, 'notes')
-        notes_count += 1
+        pending.append(('notes', payload))
+
+    lookups = {
+        'homework': _CreatedInstances(Homework, homework_remap.values()),
+        'events': _CreatedInstances(Event, event_remap.values()),
+        'resources': _CreatedInstances(Material, material_remap.values()),
+    }
+    linked_notes = set()
+
+    created = []
+    for section, payload in pending:
+        serializer = _ImportNoteSerializer(data=payload, context={'linked_notes': linked_notes})
+        _use_created_instances(serializer, **lookups)
+        if not serializer.is_valid():
+            raise ValidationError({section: serializer.errors})
+
+        instance, m2m = _build_instance(Note, dict(serializer.validated_data), user=user,
+                                        example_schedule=example_schedule)
+        linked_notes.update((field_name, entity.pk) for field_name, entities in m2m.items() for entity in entities)
+        created.append((instance, m2m))
+
+    _bulk_create(Note, [instance for instance, _ in created])
+    _bulk_create_m2m(Note, created)
+
+    notes_count = len(created) - len(legacy_notes)
 
     logger.info(f"Imported {notes_count} notes.")
 
     return notes_count
 
 
+def _report_progress(progress, section, rows):
+    if progress:
+        progress(section, len(rows))
+
+
 @contextmanager
 def _suppress_post_save_signals():
     sender_ids = {id(s) for s in _SUPPRESSED_SENDERS}
@@ -544,7 +706,7 @@ def _bulk_import_example_schedule(data, user):
             example_schedule=True,
             user=user,
         )
-        course_group_remap[cg['id']] = instance.pk
+        course_group_remap[cg['id']] = instance
 
     # --- Course ---
     for c in data.get('courses', []):
@@ -562,9 +724,9 @@ def _bulk_import_example_schedule(data, user):
             start_date=c['start_date'],
             end_date=c['end_date'],
             exceptions=c.get('exceptions', ''),
-            course_group_id=course_group_remap[c['course_group']],
+            course_group_id=course_group_remap[c['course_group']].pk,
         )
-        course_remap[c['id']] = instance.pk
+        course_remap[c['id']] = instance
 
     # --- CourseSchedule ---
     schedule_objects = []
@@ -585,7 +747,7 @@ def _bulk_import_example_schedule(data, user):
             fri_end_time=cs['fri_end_time'],
             sat_start_time=cs['sat_start_time'],
             sat_end_time=cs['sat_end_time'],
-            course_id=course_remap[cs['course']],
+            course_id=course_remap[cs['course']].pk,
         ))
     CourseSchedule.objects.bulk_create(schedule_objects)
 
@@ -598,9 +760,9 @@ def _bulk_import_example_schedule(data, user):
             average_grade=Decimal(cat.get('average_grade', '-1')),
             grade_by_weight=Decimal(cat.get('grade_by_weight', '0')),
             trend=cat.get('trend'),
-            course_id=course_remap[cat['course']],
+            course_id=course_remap[cat['course']].pk,
         )
-        category_remap[cat['id']] = instance.pk
+        category_remap[cat['id']] = instance
 
     # --- MaterialGroup ---
     for mg in _resolve_top_level_resource_groups(data):
@@ -610,7 +772,7 @@ def _bulk_import_example_schedule(data, user):
             example_schedule=True,
             user=user,
         )
-        material_group_remap[mg['id']] = instance.pk
+        material_group_remap[mg['id']] = instance
 
     # --- Material (with M2M courses + legacy details→notes) ---
     MaterialCourseThrough = Material.courses.through
@@ -623,10 +785,10 @@ def _bulk_import_example_schedule(data, user):
             condition=m.get('condition', enums.BRAND_NEW),
             website=m.get('website') or None,
             price=m.get('price', ''),
-            material_group_id=material_group_remap[raw_group],
+            material_group_id=material_group_remap[raw_group].pk,
         )
-        material_remap[m['id']] = instance.pk
-        for course_id in [course_remap[c] for c in m.get('courses', [])]:
+        material_remap[m['id']] = instance
+        for course_id in [course_remap[c].pk for c in m.get('courses', [])]:
             m2m_rows.append(MaterialCourseThrough(material_id=instance.pk, course_id=course_id))
 
         legacy_content = _extract_legacy_notes(m, legacy_field='details')
@@ -665,7 +827,7 @@ def _bulk_import_example_schedule(data, user):
             example_schedule=True,
             user=user,
         )
-        event_remap[e['id']] = instance.pk
+        event_remap[e['id']] = instance
 
     # --- Homework (individual save for auto-category + completed_at) ---
     hw_material_m2m = []
@@ -682,13 +844,13 @@ def _bulk_import_example_schedule(data, user):
             url=h.get('url') or None,
             current_grade=h.get('current_grade', ''),
             completed=h.get('completed', False),
-            category_id=category_remap.get(h['category']) if h.get('category') else None,
-            course_id=course_remap[h['course']],
+            category_id=category_remap[h['category']].pk if h.get('category') else None,
+            course_id=course_remap[h['course']].pk,
         )
         instance.save()
-        homework_remap[h['id']] = instance.pk
+        homework_remap[h['id']] = instance
         hw_resources_field = h['resources'] if 'resources' in h else h.get('materials', [])
-        hw_material_m2m.append((instance.pk, [material_remap[m] for m in hw_resources_field]))
+        hw_material_m2m.append((instance.pk, [material_remap[m].pk for m in hw_resources_field]))
         hw_legacy_notes.append((instance, legacy_notes_content))
 
     HomeworkMaterialThrough = Homework.materials.through
@@ -715,9 +877,9 @@ def _bulk_import_example_schedule(data, user):
             type=r.get('type', enums.PUSH),
             sent=r.get('sent', False),
             dismissed=r.get('dismissed', False),
-            homework_id=homework_remap[r['homework']] if r.get('homework') else None,
-            event_id=event_remap[r['event']] if r.get('event') else None,
-            course_id=course_remap[r['course']] if r.get('course') else None,
+            homework_id=homework_remap[r['homework']].pk if r.get('homework') else None,
+            event_id=event_remap[r['event']].pk if r.get('event') else None,
+            course_id=course_remap[r['course']].pk if r.get('course') else None,
             user=user,
         )
         instance.save()
@@ -774,13 +936,19 @@ def _resolve_top_level_resource_groups(data):
 
 
 @transaction.atomic
-def import_user(request, data, example_schedule=False):
+def import_user(request, data, example_schedule=False, progress=None):
     """
     Parse the given JSON string and import its associated data for the given user. Each model will be imported in a
     schema matching that of the documented APIs.
 
+    Each section's rows are validated in memory (references to other sections resolving to the instances already
+    created for them), then inserted together, along with their many-to-many rows, so the number of queries grows with
+    the number of sections rather than rows.
+
     :param request: The request performing the import.
     :param data: The data that will be imported for the user.
+    :param progress: If given, called with the name of each section (as in ImportSerializer) and the number of its
+        rows processed, as each section is imported.
     """
     if not isinstance(data, dict):
         raise ValidationError("Import payload must be a JSON object.")
@@ -797,43 +965,57 @@ def import_user(request, data, example_schedule=False):
         external_calendars = data.get('external_calendars', [])
         external_calendar_count = _import_external_calendars(external_calendars, request.user,
                                                              example_schedule) if external_calendars else 0
+        _report_progress(progress, 'external_calendars', external_calendars)
 
         course_groups = data.get('course_groups', [])
         course_group_remap = _import_course_groups(course_groups, request.user, example_schedule) if course_groups else {}
+        _report_progress(progress, 'course_groups', course_groups)
 
         courses = data.get('courses', [])
-        course_remap = _import_courses(courses, course_group_remap) if courses else {}
+        course_remap = _import_courses(courses, course_group_remap, request.user) if courses else {}
+        _report_progress(progress, 'courses', courses)
 
         course_schedules = data.get('course_schedules', [])
         course_schedules_count = _import_course_schedules(course_schedules, course_remap) if course_schedules else 0
+        _report_progress(progress, 'course_schedules', course_schedules)
 
         categories = data.get('categories', [])
         category_remap = _import_categories(categories, request, course_remap) if categories else {}
 
-        _ensure_courses_have_categories(course_remap)
+        _ensure_courses_have_categories(course_remap, request.user)
+        _report_progress(progress, 'categories', categories)
 
         material_groups = data.get('material_groups', [])
         material_group_remap = _import_material_groups(material_groups, request.user,
                                                        example_schedule) if material_groups else {}
+        _report_progress(progress, 'resource_groups', material_groups)
+
+        # Notes converted from the legacy fields of resources, events and homework, imported with the notes
+        legacy_notes = []
 
         material_remap = _import_materials(materials, material_group_remap, course_remap, request.user,
-                                           example_schedule) if materials else {}
+                                           legacy_notes) if materials else {}
+        _report_progress(progress, 'resources', materials)
 
         events = data.get('events', [])
-        event_remap = _import_events(events, request.user, example_schedule) if events else {}
+        event_remap = _import_events(events, request.user, example_schedule, legacy_notes) if events else {}
+        _report_progress(progress, 'events', events)
 
         homework = data.get('homework', [])
         homework_remap = _import_homework(homework, course_remap, category_remap, material_remap, request.user,
-                                          example_schedule) if homework else {}
+                                          example_schedule, legacy_notes) if homework else {}
+        _report_progress(progress, 'homework', homework)
 
         reminders = data.get('reminders', [])
         reminders_count = _import_reminders(reminders, request.user, event_remap, homework_remap, course_remap) if reminders else 0
+        _report_progress(progress, 'reminders', reminders)
 
         notes = data.get('notes', [])
         notes_count = _import_notes(notes, request.user, homework_remap, event_remap, material_remap,
-                                    example_schedule) if notes else 0
+                                    example_schedule, legacy_notes) if notes or legacy_notes else 0
+        _report_progress(progress, 'notes', notes)
 
-    for course_id in set(course_remap.values()):
+    for course_id in {course.pk for course in course_remap.values()}:
         taskutils.safe_apply_async(recalculate_category_grades_for_course,
             args=(course_id,), priority=settings.CELERY_PRIORITY_LOW)
 
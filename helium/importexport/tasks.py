@@ -5,8 +5,9 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 
 from conf.celery import app
+from helium.common.periodic import register_periodic
 from helium.common.utils import metricutils
-from helium.importexport.services import importservice
+from helium.importexport.services import exportservice, importjobservice, importservice
 
 logger = logging.getLogger(__name__)
 
@@ -41,3 +42,72 @@ def import_example_schedule(self, user_id, example_schedule=True):
         value = 0
 
     metricutils.task_stop(metrics, user=user, value=value)
+
+
+@app.task(bind=True)
+def export_user_data(self, user_id, job_id):
+    UserModel = get_user_model()
+
+    published_at_ms = metricutils.get_published_at_ms(self)
+    metrics = metricutils.task_start("user.export", priority="low", published_at_ms=published_at_ms)
+
+    user = None
+    try:
+        user = UserModel.objects.get(pk=user_id)
+
+        name = exportservice.create_export_artifact(user)
+        exportservice.set_export_job_result(user_id, job_id, exportservice.COMPLETE, name)
+
+        value = 1
+    except UserModel.DoesNotExist:
+        logger.info(f'User {user_id} does not exist. Nothing to do.')
+        exportservice.set_export_job_result(user_id, job_id, exportservice.FAILED)
+
+        value = 0
+    except Exception:
+        logger.error(f"An error occurred exporting data for user {user_id}.", exc_info=True)
+        exportservice.set_export_job_result(user_id, job_id, exportservice.FAILED)
+
+        value = 0
+
+    metricutils.task_stop(metrics, user=user, value=value)
+
+
+@app.task(bind=True)
+def import_user_data(self, user_id, job_id):
+    UserModel = get_user_model()
+
+    published_at_ms = metricutils.get_published_at_ms(self)
+    metrics = metricutils.task_start("user.import", priority="low", published_at_ms=published_at_ms)
+
+    user = None
+    try:
+        user = UserModel.objects.get(pk=user_id)
+
+        value = 1 if importjobservice.run_import_job(user, job_id) else 0
+    except UserModel.DoesNotExist:
+        logger.info(f'User {user_id} does not exist. Nothing to do.')
+
+        value = 0
+    except Exception:
+        logger.error(f"An error occurred importing data for user {user_id}.", exc_info=True)
+        importjobservice.fail_import_job(user_id, job_id)
+
+        value = 0
+
+    metricutils.task_stop(metrics, user=user, value=value)
+
+
+@app.task(bind=True)
+def purge_export_artifacts(self):
+    published_at_ms = metricutils.get_published_at_ms(self)
+    metrics = metricutils.task_start("user.export.purge", priority="low", published_at_ms=published_at_ms)
+
+    num_deleted = exportservice.purge_export_artifacts()
+
+    metricutils.task_stop(metrics, value=num_deleted)
+
+
+register_periodic(purge_export_artifacts, settings.EXPORT_ARTIFACT_PURGE_FREQUENCY_SEC,
+                  priority=settings.CELERY_PRIORITY_LOW,
+                  description="Purge expired export artifacts")
@@ -0,0 +1,147 @@
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from helium.auth.tests.helpers import userhelper
+from helium.common.tests.test import CacheTestCase
+from helium.importexport.serializers.exportserializer import ExportSerializer
+from helium.importexport.services import exportservice
+from helium.planner.tests.helpers import categoryhelper, coursegrouphelper, coursehelper, eventhelper, \
+    homeworkhelper
+
+
+def _age_artifact(media_root, name, seconds):
+    path = os.path.join(media_root, name)
+    modified_at = time.time() - seconds
+    os.utime(path, (modified_at, modified_at))
+
+
+class TestCaseExportService(CacheTestCase):
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _get_artifacts(self, user):
+        artifact_dir = os.path.join(self.media_root.name, 'exports', str(user.pk))
+        return os.listdir(artifact_dir) if os.path.isdir(artifact_dir) else []
+
+    def test_chunked_export_matches_serializer(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        course = coursehelper.given_course_exists(course_group)
+        category = categoryhelper.given_category_exists(course)
+        for i in range(5):
+            eventhelper.given_event_exists(user, title=f'Event {i}')
+            homeworkhelper.given_homework_exists(course, title=f'Homework {i}', category=category, completed=True,
+                                                 current_grade=f'{i}/5')
+
+        # WHEN
+        content = b''.join(exportservice.iter_export_json(user, chunk_size=2))
+
+        # THEN
+        expected = JSONRenderer().render(ExportSerializer(exportservice.get_export_querysets(user)).data)
+        self.assertEqual(content, expected)
+
+    def test_chunks_bounded_by_chunk_size(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        for i in range(5):
+            eventhelper.given_event_exists(user, title=f'Event {i}')
+
+        # WHEN
+        chunks = list(exportservice._iter_keyset_chunks(exportservice.get_export_querysets(user)['events'], 2))
+
+        # THEN
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual([event.title for chunk in chunks for event in chunk], [f'Event {i}' for i in range(5)])
+
+    @mock.patch('helium.importexport.services.exportservice.taskutils.safe_apply_async', return_value=None)
+    def test_export_job_failed_when_not_enqueued(self, mock_safe_apply_async):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+
+        # WHEN
+        job_id = exportservice.start_export_job(user)
+
+        # THEN
+        self.assertEqual(exportservice.get_export_job(user, job_id)['status'], exportservice.FAILED)
+
+    @mock.patch('helium.importexport.services.exportservice.taskutils.safe_apply_async')
+    def test_export_job_failed_when_pending_too_long(self, mock_safe_apply_async):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        job_id = exportservice.start_export_job(user)
+
+        # WHEN
+        pending_job = exportservice.get_export_job(user, job_id)
+        with mock.patch('helium.importexport.services.exportservice.time') as mock_time:
+            mock_time.time.return_value = time.time() + 60 * 60 * 2
+            stalled_job = exportservice.get_export_job(user, job_id)
+
+        # THEN
+        self.assertEqual(pending_job['status'], exportservice.PENDING)
+        self.assertEqual(stalled_job['status'], exportservice.FAILED)
+        self.assertIsNone(stalled_job['download_url'])
+
+    def test_new_artifact_replaces_previous(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        first_name = exportservice.create_export_artifact(user)
+
+        # WHEN
+        eventhelper.given_event_exists(user)
+        second_name = exportservice.create_export_artifact(user)
+
+        # THEN
+        self.assertNotEqual(first_name, second_name)
+        self.assertEqual(self._get_artifacts(user), [os.path.basename(second_name)])
+
+    def test_artifact_not_reused_once_older_than_job_ttl(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        name = exportservice.create_export_artifact(user)
+        _age_artifact(self.media_root.name, name, 60 * 60 * 25)
+
+        # WHEN
+        rewritten_name = exportservice.create_export_artifact(user)
+
+        # THEN
+        self.assertEqual(rewritten_name, name)
+        self.assertLess(time.time() - os.path.getmtime(os.path.join(self.media_root.name, name)), 60)
+        self.assertEqual(len(self._get_artifacts(user)), 1)
+
+    def test_purge_deletes_only_expired_artifacts(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        other_user = userhelper.given_a_user_exists(username='user2', email='test2@email.com')
+        expired_name = exportservice.create_export_artifact(user)
+        _age_artifact(self.media_root.name, expired_name, 60 * 60 * 49)
+        fresh_name = exportservice.create_export_artifact(other_user)
+        _age_artifact(self.media_root.name, fresh_name, 60 * 60 * 47)
+
+        # WHEN
+        num_deleted = exportservice.purge_export_artifacts()
+
+        # THEN
+        self.assertEqual(num_deleted, 1)
+        self.assertEqual(self._get_artifacts(user), [])
+        self.assertEqual(self._get_artifacts(other_user), [os.path.basename(fresh_name)])
+
+    def test_artifacts_deleted_with_user(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        exportservice.create_export_artifact(user)
+
+        # WHEN
+        user.delete()
+
+        # THEN
+        self.assertEqual(self._get_artifacts(user), [])
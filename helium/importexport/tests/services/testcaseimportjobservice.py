@@ -0,0 +1,105 @@
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+
+from helium.auth.tests.helpers import userhelper
+from helium.common.tests.test import CacheTestCase
+from helium.importexport.services import importjobservice
+
+
+def _given_upload():
+    return SimpleUploadedFile('import.json', b'{}')
+
+
+class TestCaseImportJobService(CacheTestCase):
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _get_staged_files(self, user):
+        staged_dir = os.path.join(self.media_root.name, 'imports', str(user.pk))
+        return os.listdir(staged_dir) if os.path.isdir(staged_dir) else []
+
+    @mock.patch('helium.importexport.services.importjobservice.taskutils.safe_apply_async', return_value=None)
+    def test_job_failed_when_not_enqueued(self, mock_safe_apply_async):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+
+        # WHEN
+        job_id = importjobservice.start_import_job(user, importjobservice.JSON, _given_upload())
+
+        # THEN
+        self.assertEqual(importjobservice.get_import_job(user, job_id)['status'], importjobservice.FAILED)
+        self.assertEqual(self._get_staged_files(user), [])
+
+        # WHEN
+        mock_safe_apply_async.return_value = mock.MagicMock()
+        resubmitted_job_id = importjobservice.start_import_job(user, importjobservice.JSON, _given_upload())
+
+        # THEN
+        self.assertEqual(resubmitted_job_id, job_id)
+        self.assertEqual(mock_safe_apply_async.call_count, 2)
+        self.assertEqual(importjobservice.get_import_job(user, job_id)['status'], importjobservice.PENDING)
+        self.assertEqual(len(self._get_staged_files(user)), 1)
+
+    @mock.patch('helium.importexport.services.importjobservice.taskutils.safe_apply_async',
+                side_effect=RuntimeError)
+    def test_job_failed_when_enqueue_raises(self, mock_safe_apply_async):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+
+        # WHEN
+        job_id = importjobservice.start_import_job(user, importjobservice.JSON, _given_upload())
+
+        # THEN
+        self.assertEqual(importjobservice.get_import_job(user, job_id)['status'], importjobservice.FAILED)
+        self.assertEqual(self._get_staged_files(user), [])
+
+    @mock.patch('helium.importexport.services.importjobservice.taskutils.safe_apply_async')
+    def test_no_job_when_staging_fails(self, mock_safe_apply_async):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+
+        # WHEN
+        with mock.patch('django.core.files.storage.FileSystemStorage.save', side_effect=OSError):
+            with self.assertRaises(OSError):
+                importjobservice.start_import_job(user, importjobservice.JSON, _given_upload())
+        job_id = importjobservice.start_import_job(user, importjobservice.JSON, _given_upload())
+
+        # THEN
+        mock_safe_apply_async.assert_called_once()
+        self.assertEqual(importjobservice.get_import_job(user, job_id)['status'], importjobservice.PENDING)
+
+    @mock.patch('helium.importexport.services.importjobservice.taskutils.safe_apply_async')
+    def test_stalled_job_not_deduplicated(self, mock_safe_apply_async):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        job_id = importjobservice.start_import_job(user, importjobservice.JSON, _given_upload())
+
+        # WHEN
+        with mock.patch('helium.importexport.services.importjobservice.time') as mock_time:
+            mock_time.time.return_value = time.time() + 60
+            deduplicated_job_id = importjobservice.start_import_job(user, importjobservice.JSON, _given_upload())
+
+            # THEN
+            self.assertEqual(deduplicated_job_id, job_id)
+            self.assertEqual(mock_safe_apply_async.call_count, 1)
+
+            # WHEN
+            mock_time.time.return_value = time.time() + 60 * 60
+            stalled_job = importjobservice.get_import_job(user, job_id)
+            resubmitted_job_id = importjobservice.start_import_job(user, importjobservice.JSON, _given_upload())
+
+        # THEN
+        self.assertEqual(stalled_job['status'], importjobservice.FAILED)
+        self.assertEqual(resubmitted_job_id, job_id)
+        self.assertEqual(mock_safe_apply_async.call_count, 2)
+        self.assertEqual(importjobservice.get_import_job(user, job_id)['status'], importjobservice.PENDING)
+        self.assertEqual(len(self._get_staged_files(user)), 1)
@@ -1,16 +1,49 @@
 import datetime
 from unittest.mock import patch
 
+from django.db import connection
+from django.http import HttpRequest
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
 
 from helium.auth.tests.helpers import userhelper
 from helium.common import enums
 from helium.importexport.services import importservice
 from helium.importexport.services.importservice import import_example_schedule
-from helium.planner.models import CourseGroup, CourseSchedule
+from helium.planner.models import CourseGroup, CourseSchedule, Homework, Note, Reminder
 from helium.planner.tests.helpers import coursegrouphelper, coursehelper, courseschedulehelper, reminderhelper
 
 
+def _given_import_payload(num_rows):
+    return {
+        'course_groups': [{'id': 1, 'title': 'Fall', 'start_date': '2017-01-06', 'end_date': '2017-05-08'}],
+        'courses': [{'id': 1, 'title': 'Biology', 'credits': '5.00', 'start_date': '2017-01-06',
+                     'end_date': '2017-05-08', 'course_group': 1}],
+        'categories': [{'id': 1, 'title': 'Exams', 'weight': '50.00', 'course': 1}],
+        'resource_groups': [{'id': 1, 'title': 'Books'}],
+        'resources': [{'id': i, 'title': f'Book {i}', 'status': 3, 'condition': 7, 'details': f'Return {i}',
+                       'material_group': 1, 'courses': [1]} for i in range(1, num_rows + 1)],
+        'events': [{'id': i, 'title': f'Event {i}', 'start': '2017-05-08T12:00:00Z', 'end': '2017-05-08T14:00:00Z'}
+                   for i in range(1, num_rows + 1)],
+        'homework': [{'id': i, 'title': f'Homework {i}', 'start': '2017-05-08T16:00:00Z',
+                      'end': '2017-05-08T18:00:00Z', 'comments': f'Comment {i}', 'current_grade': '20/30',
+                      'completed': True, 'completed_at': '2017-05-07T10:00:00Z', 'category': 1 if i % 2 else None,
+                      'materials': [i], 'course': 1} for i in range(1, num_rows + 1)],
+        'reminders': [{'id': i, 'title': f'Reminder {i}', 'message': 'Due soon', 'offset': 15, 'offset_type': 0,
+                       'type': 3, 'homework': i} for i in range(1, num_rows + 1)],
+        'notes': [{'id': i, 'title': f'Note {i}', 'content': {'ops': [{'insert': f'Note {i}\n'}]}, 'events': [i]}
+                  for i in range(1, num_rows + 1)],
+    }
+
+
+def _given_import_request(user):
+    request = Request(HttpRequest(), parser_context={'kwargs': {}})
+    request.user = user
+    return request
+
+
 class TestCaseImportService(TestCase):
     def _create_user_with_timezone(self, tz_name):
         user = userhelper.given_a_user_exists()
@@ -98,3 +131,100 @@ class TestCaseImportService(TestCase):
         # THEN
         expected = datetime.datetime.combine(target_day, datetime.time(14, 0, 0), tzinfo=datetime.timezone.utc)
         self.assertEqual(result, expected)
+
+    def test_import_user_bulk_creates_sections(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+
+        # WHEN
+        counts = importservice.import_user(_given_import_request(user), _given_import_payload(3))
+
+        # THEN
+        self.assertEqual(counts, (0, 1, 1, 0, 1, 1, 3, 3, 3, 3, 3))
+        homework = list(Homework.objects.for_user(user.pk).order_by('title').prefetch_related('materials'))
+        self.assertEqual([h.category.title for h in homework], ['Exams', 'Uncategorized', 'Exams'])
+        self.assertEqual([[m.title for m in h.materials.all()] for h in homework], [['Book 1'], ['Book 2'], ['Book 3']])
+        self.assertEqual(homework[0].grade_earned, 20)
+        self.assertEqual(homework[0].completed_at, datetime.datetime(2017, 5, 7, 10, tzinfo=datetime.timezone.utc))
+        for reminder in Reminder.objects.for_user(user.pk).select_related('homework'):
+            self.assertEqual(reminder.start_of_range, reminder.homework.start - datetime.timedelta(minutes=15))
+        # Each resource and homework row's legacy field becomes a linked note, alongside the imported notes
+        self.assertEqual(Note.objects.for_user(user.pk).filter(resources__isnull=False).count(), 3)
+        self.assertEqual(Note.objects.for_user(user.pk).filter(homework__isnull=False).count(), 3)
+        self.assertEqual(Note.objects.for_user(user.pk).filter(events__isnull=False).count(), 3)
+
+    def test_import_user_queries_scale_with_sections_not_rows(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        other_user = userhelper.given_a_user_exists(username='user2', email='test2@email.com')
+
+        # WHEN
+        with CaptureQueriesContext(connection) as small_import:
+            importservice.import_user(_given_import_request(user), _given_import_payload(2))
+        with CaptureQueriesContext(connection) as large_import:
+            importservice.import_user(_given_import_request(other_user), _given_import_payload(20))
+
+        # THEN
+        self.assertEqual(len(large_import), len(small_import))
+        self.assertEqual(Homework.objects.for_user(other_user.pk).count(), 20)
+
+    def test_import_user_queries_scale_with_sections_not_rows_when_bulk_insert_returns_none(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        other_user = userhelper.given_a_user_exists(username='user2', email='test2@email.com')
+
+        # WHEN
+        with patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            with CaptureQueriesContext(connection) as small_import:
+                importservice.import_user(_given_import_request(user), _given_import_payload(2))
+            with CaptureQueriesContext(connection) as large_import:
+                importservice.import_user(_given_import_request(other_user), _given_import_payload(20))
+
+        # THEN
+        self.assertEqual(len(large_import), len(small_import))
+        for homework in Homework.objects.for_user(other_user.pk).prefetch_related('materials'):
+            self.assertEqual(homework.materials.get().title, f"Book {homework.title.split(' ')[1]}")
+            self.assertEqual(homework.reminders.get().title, f"Reminder {homework.title.split(' ')[1]}")
+
+    def test_import_user_keys_rows_when_bulk_insert_returns_none(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        other_course_group = coursegrouphelper.given_course_group_exists(user, title='Other tab')
+        other_courses = []
+
+        def create_course_in_other_tab(execute, sql, params, many, context):
+            # The user creates a course in another tab just before the import inserts its own
+            if sql.startswith('INSERT INTO "planner_course" ') and not other_courses:
+                other_courses.append(None)
+                other_courses[0] = coursehelper.given_course_exists(other_course_group, title='Chemistry')
+            return execute(sql, params, many, context)
+
+        # WHEN
+        with patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False), \
+                connection.execute_wrapper(create_course_in_other_tab):
+            importservice.import_user(_given_import_request(user), _given_import_payload(3))
+
+        # THEN
+        self.assertFalse(other_courses[0].categories.exists())
+        self.assertFalse(other_courses[0].homework.exists())
+        for homework in Homework.objects.for_user(user.pk).prefetch_related('materials', 'notes_set'):
+            i = homework.title.split(' ')[1]
+            self.assertEqual(homework.course.title, 'Biology')
+            self.assertEqual(homework.category.course_id, homework.course_id)
+            self.assertEqual(homework.materials.get().title, f'Book {i}')
+            self.assertEqual(homework.notes_set.get().content['ops'][0]['insert'], f'Comment {i}')
+            self.assertEqual(homework.reminders.get().title, f'Reminder {i}')
+
+    def test_import_user_rejects_duplicate_categories_in_payload(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        data = _given_import_payload(1)
+        data['categories'].append({'id': 2, 'title': 'Exams', 'weight': '10.00', 'course': 1})
+
+        # WHEN
+        with self.assertRaises(ValidationError) as context:
+            importservice.import_user(_given_import_request(user), data)
+
+        # THEN
+        self.assertIn(2, context.exception.detail['categories'])
+        self.assertFalse(CourseGroup.objects.for_user(user.pk).exists())
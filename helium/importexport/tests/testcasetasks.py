@@ -1,12 +1,16 @@
 import datetime
+import tempfile
 from unittest.mock import patch
 
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
 from django.utils import timezone
 from rest_framework.test import APITestCase
 
 from helium.auth.tests.helpers import userhelper
 from helium.importexport.services.importservice import _adjust_schedule_relative_to
-from helium.importexport.tasks import import_example_schedule
+from helium.importexport.services import exportservice, importjobservice
+from helium.importexport.tasks import import_example_schedule, export_user_data
 from helium.planner.models import Event, Homework
 from helium.planner.tests.helpers import coursegrouphelper, coursehelper, homeworkhelper
 
@@ -31,6 +35,34 @@ class TestCaseImportExportTasks(APITestCase):
         # WHEN / THEN (should not raise)
         import_example_schedule(nonexistent_user_id)
 
+    @patch('helium.importexport.services.exportservice.create_export_artifact', side_effect=OSError)
+    def test_export_user_data_marks_job_failed(self, mock_create_export_artifact):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+
+        # WHEN
+        export_user_data(user.pk, 'job-id')
+
+        # THEN
+        job = exportservice.get_export_job(user, 'job-id')
+        self.assertEqual(job['status'], exportservice.FAILED)
+        self.assertIsNone(job['download_url'])
+
+    @patch('helium.importexport.services.importservice.import_user', side_effect=RuntimeError)
+    def test_import_user_data_marks_job_failed(self, mock_import_user):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+
+        # WHEN
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            job_id = importjobservice.start_import_job(user, importjobservice.JSON,
+                                                       SimpleUploadedFile('import.json', b'{}'))
+
+        # THEN
+        job = importjobservice.get_import_job(user, job_id)
+        self.assertEqual(job['status'], importjobservice.FAILED)
+        self.assertEqual(job['details'], {'details': 'An error occurred importing the file.'})
+
     def test_adjust_schedule_preserves_local_wall_clock_time_across_dst(self):
         # GIVEN
         user = userhelper.given_a_user_exists()
@@ -1,4 +1,5 @@
 import datetime
+import gzip
 import json
 import os
 import tempfile
@@ -7,7 +8,9 @@ from zoneinfo import ZoneInfo
 
 from dateutil.relativedelta import relativedelta
 from django.contrib.auth import get_user_model
+from django.core.files.storage import storages
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
@@ -15,6 +18,7 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 
 from helium.auth.tests.helpers import userhelper
+from helium.common.tests.test import CacheTestCase
 from helium.common import enums
 from helium.feed.models import ExternalCalendar
 from helium.feed.tests.helpers import externalcalendarhelper
@@ -24,7 +28,7 @@ from helium.planner.tests.helpers import coursegrouphelper, coursehelper, course
     materialgrouphelper, materialhelper, eventhelper, homeworkhelper, attachmenthelper, reminderhelper
 
 
-class TestCaseImportExportViews(APITestCase):
+class TestCaseImportExportViews(APITestCase, CacheTestCase):
     def test_importexport_login_required(self):
         # GIVEN
         userhelper.given_a_user_exists()
@@ -433,7 +437,7 @@ class TestCaseImportExportViews(APITestCase):
 
         # WHEN
         response = self.client.get(reverse('importexport_export'))
-        data = json.loads(response.content.decode('utf-8'))
+        data = json.loads(response.getvalue().decode('utf-8'))
 
         # THEN
         course_group1.refresh_from_db()
@@ -482,6 +486,210 @@ class TestCaseImportExportViews(APITestCase):
         self.assertEqual(data['categories'][1]['num_homework_completed'], 0)
         self.assertEqual(data['categories'][1]['num_homework_graded'], 0)
 
+    def test_export_gzipped_when_accepted(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists_and_is_authenticated(self.client)
+        eventhelper.given_event_exists(user)
+        plain_content = self.client.get(reverse('importexport_export')).getvalue()
+
+        # WHEN
+        response = self.client.get(reverse('importexport_export'), HTTP_ACCEPT_ENCODING='gzip')
+
+        # THEN
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.getvalue()), plain_content)
+        self.assertEqual(len(json.loads(plain_content)['events']), 1)
+
+    def test_export_not_gzipped_when_refused(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists_and_is_authenticated(self.client)
+        eventhelper.given_event_exists(user)
+
+        # WHEN
+        response = self.client.get(reverse('importexport_export'), HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+
+        # THEN
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(len(json.loads(response.getvalue())['events']), 1)
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.validate_url')
+    def test_import_job_reports_progress_and_counts(self, mock_validate_url):
+        # GIVEN
+        user = userhelper.given_a_user_exists_and_is_authenticated(self.client)
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            # WHEN
+            with open(os.path.join(os.path.dirname(__file__), '../../resources', 'sample.json')) as fp:
+                response = self.client.post(reverse('importexport_import_jobs'), {'file[]': [fp]})
+            job_response = self.client.get(reverse('importexport_import_jobs_detail',
+                                                   kwargs={'job_id': response.data['id']}))
+
+            # THEN
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertEqual(job_response.status_code, status.HTTP_200_OK)
+            self.assertEqual(job_response.data['status'], 'complete')
+            self.assertEqual(
+                {'external_calendars': 1, 'course_groups': 2, 'courses': 2, 'course_schedules': 2, 'categories': 2,
+                 'resource_groups': 1, 'resources': 1, 'events': 2, 'homework': 2, 'reminders': 2, 'notes': 0},
+                job_response.data['counts'])
+            self.assertEqual(job_response.data['progress']['homework'], {'done': 2, 'total': 2})
+            self.assertEqual(job_response.data['progress']['notes'], {'done': 0, 'total': 0})
+            self.assertEqual(CourseGroup.objects.for_user(user.pk).count(), 2)
+            # The staged upload is removed once imported
+            self.assertEqual(os.listdir(os.path.join(media_root, 'imports', str(user.pk))), [])
+
+    @mock.patch('helium.importexport.services.importjobservice.taskutils.safe_apply_async')
+    def test_import_job_deduplicates_resubmission_while_in_flight(self, mock_safe_apply_async):
+        # GIVEN
+        userhelper.given_a_user_exists_and_is_authenticated(self.client)
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            with open(os.path.join(os.path.dirname(__file__), '../../resources', 'sample.json')) as fp:
+                response1 = self.client.post(reverse('importexport_import_jobs'), {'file[]': [fp]})
+
+            # WHEN
+            with open(os.path.join(os.path.dirname(__file__), '../../resources', 'sample.json')) as fp:
+                response2 = self.client.post(reverse('importexport_import_jobs'), {'file[]': [fp]})
+
+        # THEN
+        self.assertEqual(response2.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response1.data['id'], response2.data['id'])
+        self.assertEqual(response2.data['status'], 'pending')
+        mock_safe_apply_async.assert_called_once()
+
+    @mock.patch('helium.feed.services.icalexternalcalendarservice.validate_url')
+    def test_import_job_reimports_resubmission_once_complete(self, mock_validate_url):
+        # GIVEN
+        user = userhelper.given_a_user_exists_and_is_authenticated(self.client)
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            with open(os.path.join(os.path.dirname(__file__), '../../resources', 'sample.json')) as fp:
+                response1 = self.client.post(reverse('importexport_import_jobs'), {'file[]': [fp]})
+            CourseGroup.objects.for_user(user.pk).delete()
+
+            # WHEN
+            with open(os.path.join(os.path.dirname(__file__), '../../resources', 'sample.json')) as fp:
+                response2 = self.client.post(reverse('importexport_import_jobs'), {'file[]': [fp]})
+
+        # THEN
+        self.assertEqual(response1.data['status'], 'complete')
+        self.assertEqual(response2.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response2.data['status'], 'complete')
+        self.assertEqual(CourseGroup.objects.for_user(user.pk).count(), 2)
+
+    def test_import_job_invalid_json_fails(self):
+        # GIVEN
+        userhelper.given_a_user_exists_and_is_authenticated(self.client)
+        upload = SimpleUploadedFile('broken.json', b'{"course_groups": [', content_type='application/json')
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            # WHEN
+            response = self.client.post(reverse('importexport_import_jobs'), {'file[]': [upload]})
+
+        # THEN
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'failed')
+        self.assertEqual(response.data['details'], {'details': 'Invalid JSON in file: broken.json.'})
+        self.assertIsNone(response.data['counts'])
+
+    def test_import_job_not_found_for_other_user(self):
+        # GIVEN
+        userhelper.given_a_user_exists_and_is_authenticated(self.client)
+        upload = SimpleUploadedFile('empty.json', b'{}', content_type='application/json')
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            job_id = self.client.post(reverse('importexport_import_jobs'), {'file[]': [upload]}).data['id']
+        self.client.logout()
+        userhelper.given_a_user_exists_and_is_authenticated(self.client, username='user2',
+                                                            email='test2@email.com')
+
+        # WHEN
+        response = self.client.get(reverse('importexport_import_jobs_detail', kwargs={'job_id': job_id}))
+
+        # THEN
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_job_delivers_export_through_storage(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists_and_is_authenticated(self.client)
+        eventhelper.given_event_exists(user)
+        plain_content = self.client.get(reverse('importexport_export')).getvalue()
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            # WHEN
+            response = self.client.post(reverse('importexport_export_jobs'))
+            job_response = self.client.get(reverse('importexport_export_jobs_detail',
+                                                   kwargs={'job_id': response.data['id']}))
+
+            # THEN
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertEqual(response.data['status'], 'pending')
+            self.assertEqual(job_response.status_code, status.HTTP_200_OK)
+            self.assertEqual(job_response.data['status'], 'complete')
+            name = job_response.data['download_url'].removeprefix('/media/')
+            with storages['default'].open(name) as artifact:
+                self.assertEqual(gzip.decompress(artifact.read()), plain_content)
+
+    def test_export_job_reuses_artifact_when_unchanged(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists_and_is_authenticated(self.client)
+        eventhelper.given_event_exists(user)
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            first_job_id = self.client.post(reverse('importexport_export_jobs')).data['id']
+
+            # WHEN
+            second_job_id = self.client.post(reverse('importexport_export_jobs')).data['id']
+            eventhelper.given_event_exists(user, title='Changed')
+            third_job_id = self.client.post(reverse('importexport_export_jobs')).data['id']
+
+            # THEN
+            urls = [self.client.get(reverse('importexport_export_jobs_detail', kwargs={'job_id': job_id}))
+                    .data['download_url'] for job_id in (first_job_id, second_job_id, third_job_id)]
+            self.assertEqual(urls[0], urls[1])
+            self.assertNotEqual(urls[0], urls[2])
+            self.assertEqual(os.listdir(os.path.join(media_root, 'exports', str(user.pk))),
+                             [os.path.basename(urls[2])])
+
+    def test_export_job_reflects_dismissed_reminders(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists_and_is_authenticated(self.client)
+        event = eventhelper.given_event_exists(user)
+        reminderhelper.given_reminder_exists(user, event=event, sent=True)
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            self.client.post(reverse('importexport_export_jobs'))
+
+            # WHEN
+            self.client.patch(reverse('planner_reminders_dismiss_all'))
+            second_job_id = self.client.post(reverse('importexport_export_jobs')).data['id']
+
+            # THEN
+            name = self.client.get(reverse('importexport_export_jobs_detail', kwargs={'job_id': second_job_id})) \
+                .data['download_url'].removeprefix('/media/')
+            with storages['default'].open(name) as artifact:
+                self.assertTrue(json.loads(gzip.decompress(artifact.read()))['reminders'][0]['dismissed'])
+
+    def test_export_job_not_found_for_other_user(self):
+        # GIVEN
+        userhelper.given_a_user_exists_and_is_authenticated(self.client)
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            job_id = self.client.post(reverse('importexport_export_jobs')).data['id']
+        self.client.logout()
+        userhelper.given_a_user_exists_and_is_authenticated(self.client, username='user2',
+                                                            email='test2@email.com')
+
+        # WHEN
+        responses = [
+            self.client.get(reverse('importexport_export_jobs_detail', kwargs={'job_id': job_id})),
+            self.client.get(reverse('importexport_export_jobs_detail', kwargs={'job_id': 'unknown'})),
+        ]
+
+        # THEN
+        for response in responses:
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_export_import_preserves_event_recurrence(self):
         # GIVEN
         user = userhelper.given_a_user_exists_and_is_authenticated(self.client)
@@ -495,7 +703,7 @@ class TestCaseImportExportViews(APITestCase):
         # WHEN
         export_response = self.client.get(reverse('importexport_export'))
         self.assertEqual(export_response.status_code, status.HTTP_200_OK)
-        export_data = json.loads(export_response.content.decode('utf-8'))
+        export_data = json.loads(export_response.getvalue().decode('utf-8'))
 
         # THEN
         self.assertEqual(len(export_data['events']), 1)
@@ -549,7 +757,7 @@ class TestCaseImportExportViews(APITestCase):
         # WHEN
         export_response = self.client.get(reverse('importexport_export'))
         self.assertEqual(export_response.status_code, status.HTTP_200_OK)
-        export_data = json.loads(export_response.content.decode('utf-8'))
+        export_data = json.loads(export_response.getvalue().decode('utf-8'))
 
         # THEN
         self.assertEqual(len(export_data['course_schedules']), 2)
@@ -585,7 +793,7 @@ class TestCaseImportExportViews(APITestCase):
         # WHEN
         export_response = self.client.get(reverse('importexport_export'))
         self.assertEqual(export_response.status_code, status.HTTP_200_OK)
-        export_data = json.loads(export_response.content.decode('utf-8'))
+        export_data = json.loads(export_response.getvalue().decode('utf-8'))
 
         # THEN
         self.assertEqual(len(export_data['course_schedules']), 1)
@@ -615,7 +823,7 @@ class TestCaseImportExportViews(APITestCase):
         # WHEN
         export_response = self.client.get(reverse('importexport_export'))
         self.assertEqual(export_response.status_code, status.HTTP_200_OK)
-        export_data = json.loads(export_response.content.decode('utf-8'))
+        export_data = json.loads(export_response.getvalue().decode('utf-8'))
 
         # THEN
         self.assertEqual(len(export_data['course_schedules']), 1)
@@ -647,7 +855,7 @@ class TestCaseImportExportViews(APITestCase):
         # WHEN
         export_response = self.client.get(reverse('importexport_export'))
         self.assertEqual(export_response.status_code, status.HTTP_200_OK)
-        export_data = json.loads(export_response.content.decode('utf-8'))
+        export_data = json.loads(export_response.getvalue().decode('utf-8'))
 
         # THEN
         self.assertEqual(export_data['course_schedules'][0]['start_date'], '2026-03-09')
@@ -676,7 +884,7 @@ class TestCaseImportExportViews(APITestCase):
         # WHEN
         export_response = self.client.get(reverse('importexport_export'))
         self.assertEqual(export_response.status_code, status.HTTP_200_OK)
-        export_data = json.loads(export_response.content.decode('utf-8'))
+        export_data = json.loads(export_response.getvalue().decode('utf-8'))
 
         # THEN
         self.assertEqual(export_data['course_schedules'][0]['template'], enums.AB_DAY)
@@ -706,7 +914,7 @@ class TestCaseImportExportViews(APITestCase):
         # WHEN
         export_response = self.client.get(reverse('importexport_export'))
         self.assertEqual(export_response.status_code, status.HTTP_200_OK)
-        export_data = json.loads(export_response.content.decode('utf-8'))
+        export_data = json.loads(export_response.getvalue().decode('utf-8'))
 
         # THEN
         self.assertEqual(len(export_data['homework']), 1)
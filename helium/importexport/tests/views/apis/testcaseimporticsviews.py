@@ -1,22 +1,43 @@
 import datetime
 import os
+import tempfile
 
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from helium.auth.tests.helpers import userhelper
+from helium.common.tests.test import CacheTestCase
 from helium.planner.models import Course, Event, Homework
 from helium.planner.tests.helpers import coursegrouphelper, coursehelper
 
 
-class TestCaseImportICSViews(APITestCase):
+class TestCaseImportICSViews(APITestCase, CacheTestCase):
     def _post_ics(self, filename, **fields):
         path = os.path.join(os.path.dirname(__file__), '../../resources', filename)
         with open(path, 'rb') as fp:
             return self.client.post(reverse('importexport_import_ics'), {'file[]': [fp], **fields})
 
+    def test_import_ics_job(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists_and_is_authenticated(self.client)
+        path = os.path.join(os.path.dirname(__file__), '../../resources', 'import_generic.ics')
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            # WHEN
+            with open(path, 'rb') as fp:
+                response = self.client.post(reverse('importexport_import_ics_jobs'),
+                                            {'file[]': [fp], 'target_type': 'events'})
+
+        # THEN
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'complete')
+        self.assertEqual(response.data['counts']['events'], 3)
+        self.assertEqual(response.data['progress']['events'], {'done': 3, 'total': 3})
+        self.assertEqual(Event.objects.for_user(user.pk).count(), 3)
+
     def test_import_ics_login_required(self):
         # GIVEN
         userhelper.given_a_user_exists()
@@ -9,8 +9,18 @@ urlpatterns = [
          name='importexport_import'),
     path('importexport/import/ics/', ImportResourceView.as_view({'post': 'import_ics_data'}),
          name='importexport_import_ics'),
+    path('importexport/import/jobs/', ImportResourceView.as_view({'post': 'start_import_job'}),
+         name='importexport_import_jobs'),
+    path('importexport/import/ics/jobs/', ImportResourceView.as_view({'post': 'start_ics_import_job'}),
+         name='importexport_import_ics_jobs'),
+    path('importexport/import/jobs/<str:job_id>/', ImportResourceView.as_view({'get': 'get_import_job'}),
+         name='importexport_import_jobs_detail'),
     path('importexport/export/', ExportResourceView.as_view({'get': 'export_data'}),
          name='importexport_export'),
+    path('importexport/export/jobs/', ExportResourceView.as_view({'post': 'start_export_job'}),
+         name='importexport_export_jobs'),
+    path('importexport/export/jobs/<str:job_id>/', ExportResourceView.as_view({'get': 'get_export_job'}),
+         name='importexport_export_jobs_detail'),
 
     path('importexport/import/exampleschedule/', ImportResourceView.as_view({'post': 'import_exampleschedule'}),
          name='importexport_import_exampleschedule'),
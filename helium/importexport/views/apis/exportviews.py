@@ -2,18 +2,19 @@ import logging
 from datetime import datetime
 
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Exists, OuterRef, Q
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
 from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
+from helium.common.utils import httputils
 from helium.common.views.base import HeliumAPIView
-from helium.feed.models import ExternalCalendar
-from helium.importexport.serializers.exportserializer import ExportSerializer
-from helium.planner.models import CourseGroup, Course, CourseSchedule, Category, MaterialGroup, Material, Event, \
-    Homework, Reminder, Note
+from helium.importexport.serializers.exportserializer import ExportSerializer, ExportJobSerializer
+from helium.importexport.services import exportservice
 
 logger = logging.getLogger(__name__)
 
@@ -31,43 +32,50 @@ class ExportResourceView(ViewSet, HeliumAPIView):
         (the local-part is the segment of the account email before `@`), so a browser will save it
         as a dated download.
 
-        The exported data for each model type will match that of the documented APIs.
+        The exported data for each model type will match that of the documented APIs. The response
+        is streamed, and is gzip-compressed when the request's `Accept-Encoding` allows it.
         """
         user = self.request.user
 
-        serializer = ExportSerializer({
-            'external_calendars': ExternalCalendar.objects.for_user(user.pk),
-            'course_groups': CourseGroup.objects.for_user(user.pk).annotate(
-                annotated_num_homework=Count('courses__homework', distinct=True),
-                annotated_num_homework_completed=Count('courses__homework', filter=Q(courses__homework__completed=True), distinct=True),
-                annotated_num_homework_graded=Count('courses__homework', filter=Q(courses__homework__completed=True) & ~Q(courses__homework__current_grade='-1/100'), distinct=True),
-            ),
-            'courses': Course.objects.for_user(user.pk).annotate(
-                annotated_num_homework=Count('homework', distinct=True),
-                annotated_num_homework_completed=Count('homework', filter=Q(homework__completed=True), distinct=True),
-                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True) & ~Q(homework__current_grade='-1/100'), distinct=True),
-                annotated_has_weighted_grading=Exists(Category.objects.filter(course_id=OuterRef('pk'), weight__gt=0)),
-            ),
-            'course_schedules': CourseSchedule.objects.for_user(user.pk),
-            'categories': Category.objects.for_user(user.pk).annotate(
-                annotated_num_homework=Count('homework'),
-                annotated_num_homework_completed=Count('homework', filter=Q(homework__completed=True)),
-                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True) & ~Q(homework__current_grade='-1/100')),
-            ),
-            'resource_groups': MaterialGroup.objects.for_user(user.pk),
-            'resources': Material.objects.for_user(user.pk),
-            'events': Event.objects.for_user(user.pk),
-            'homework': Homework.objects.for_user(user.pk),
-            'reminders': Reminder.objects.for_user(user.pk),
-            'notes': Note.objects.for_user(user.pk).prefetch_related('homework', 'events', 'resources'),
-        })
-
-        json_str = JSONRenderer().render(serializer.data)
-
         email_local = user.email.split('@')[0] if user.email else 'backup'
         filename = f"Helium_{email_local}_{datetime.now().strftime('%Y-%m-%d')}.json"
 
-        response = HttpResponse(json_str, content_type='application/json; charset=utf-8')
+        content = exportservice.iter_export_json(user)
+        accepts_gzip = httputils.accepts_gzip(request)
+        if accepts_gzip:
+            content = exportservice.gzip_stream(content)
+
+        response = StreamingHttpResponse(content, content_type='application/json; charset=utf-8')
+        if accepts_gzip:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
         response['Filename'] = filename
         response['Content-Disposition'] = f'attachment; filename={filename}'
         return response
+
+    @extend_schema(summary='Start a background export of all User data', request=None,
+                   responses={202: ExportJobSerializer})
+    def start_export_job(self, request, *args, **kwargs):
+        """
+        Start a background export of all non-sensitive data for the authenticated account, the same data as
+        `GET /importexport/export/`, written to storage rather than streamed. Poll the returned job's `id` with
+        `GET /importexport/export/jobs/<id>/` for a `download_url` to the (gzip-compressed) export once it's
+        `complete`. If the account hasn't changed since a previous export, that export is reused.
+        """
+        job_id = exportservice.start_export_job(request.user)
+
+        serializer = ExportJobSerializer({'id': job_id, 'status': exportservice.PENDING, 'download_url': None})
+
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @extend_schema(summary='Get the status of a background export', responses={200: ExportJobSerializer})
+    def get_export_job(self, request, job_id, *args, **kwargs):
+        """
+        Return the status of a background export started by the authenticated account, and a `download_url` for it
+        once it's `complete`. The URL expires after a time; poll again for a fresh one.
+        """
+        job = exportservice.get_export_job(request.user, job_id)
+        if job is None:
+            raise NotFound('No export job matches the given query.')
+
+        return Response(ExportJobSerializer(job).data)
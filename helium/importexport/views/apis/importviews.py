@@ -1,11 +1,9 @@
-import json
 import logging
 import os
 
-import icalendar
 from drf_spectacular.utils import extend_schema, OpenApiExample
 from rest_framework import status
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -14,8 +12,8 @@ from rest_framework.viewsets import ViewSet
 from helium.common.services import uploadfileservice
 from helium.common.views.base import HeliumAPIView
 from helium.importexport.serializers.importerializer import ImportCreateSerializer, \
-    ICSImportCreateSerializer, ImportSerializer
-from helium.importexport.services import importservice
+    ICSImportCreateSerializer, ImportSerializer, ImportJobSerializer
+from helium.importexport.services import importjobservice, importservice
 from helium.importexport.services import icsimportservice
 from helium.planner.services import reminderservice
 
@@ -211,8 +209,7 @@ class ImportResourceView(ViewSet, HeliumAPIView):
 
         for upload in uploads:
             try:
-                json_str = uploadfileservice.read(upload).decode('utf-8-sig')
-                data = json.loads(json_str)
+                data = uploadfileservice.load_json(upload)
 
                 if isinstance(data, list):
                     raise ValidationError({
@@ -288,7 +285,7 @@ class ImportResourceView(ViewSet, HeliumAPIView):
 
         upload = uploads[0]
         try:
-            calendar = icalendar.Calendar.from_ical(uploadfileservice.read(upload))
+            calendar = uploadfileservice.load_ics(upload)
         except ValueError:
             raise ValidationError({'details': f'Invalid iCalendar in file: {upload}.'})
 
@@ -316,6 +313,76 @@ class ImportResourceView(ViewSet, HeliumAPIView):
 
         return Response(serializer.data)
 
+    @extend_schema(
+        summary='Start a background import of User data from JSON',
+        request=ImportCreateSerializer,
+        responses={202: ImportJobSerializer},
+    )
+    def start_import_job(self, request, *args, **kwargs):
+        """
+        Start a background import of the uploaded file for the authenticated account, the same import as
+        `POST /importexport/import/`, without waiting on it. Exactly one file must be uploaded per request in the
+        `file[]` field; submitting zero or more than one file returns `400`.
+
+        Poll the returned job's `id` with `GET /importexport/import/jobs/<id>/` for its `progress` (the rows `done`
+        and `total` of each section) and, once it's `complete`, its `counts`. Resubmitting the same file returns the
+        same job rather than importing it again, unless that job `failed`.
+        """
+        uploads = request.data.getlist('file[]')
+        if len(uploads) != 1:
+            logger.warning(f'Rejected import job from user {request.user.pk} with {len(uploads)} files.')
+            raise ValidationError({'details': 'Upload exactly one file per request.'})
+
+        upload = uploads[0]
+        job_id = importjobservice.start_import_job(request.user, importjobservice.JSON, upload)
+
+        return Response(ImportJobSerializer(importjobservice.get_import_job(request.user, job_id)).data,
+                        status=status.HTTP_202_ACCEPTED)
+
+    @extend_schema(
+        summary='Start a background import of a calendar (.ics) file',
+        request=ICSImportCreateSerializer,
+        responses={202: ImportJobSerializer},
+    )
+    def start_ics_import_job(self, request, *args, **kwargs):
+        """
+        Start a background import of the uploaded `.ics` file for the authenticated account, the same import as
+        `POST /importexport/import/ics/`, without waiting on it. Poll the returned job's `id` with
+        `GET /importexport/import/jobs/<id>/`, as for a JSON import.
+        """
+        uploads = request.data.getlist('file[]')
+        if len(uploads) != 1:
+            logger.warning(f'Rejected .ics import job from user {request.user.pk} with {len(uploads)} files.')
+            raise ValidationError({'details': 'Upload exactly one file per request.'})
+
+        serializer = ICSImportCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        target = serializer.validated_data
+
+        upload = uploads[0]
+        job_id = importjobservice.start_import_job(request.user, importjobservice.ICS, upload, {
+                                                       'target_type': target['target_type'],
+                                                       'course_id': target.get('course'),
+                                                       'course_group_id': target.get('course_group'),
+                                                       'default_course_title':
+                                                           os.path.splitext(upload.name or '')[0] or None,
+                                                   })
+
+        return Response(ImportJobSerializer(importjobservice.get_import_job(request.user, job_id)).data,
+                        status=status.HTTP_202_ACCEPTED)
+
+    @extend_schema(summary='Get the status of a background import', responses={200: ImportJobSerializer})
+    def get_import_job(self, request, job_id, *args, **kwargs):
+        """
+        Return the status and progress of a background import started by the authenticated account, and the number
+        of each type of model imported once it's `complete`, or the `details` of why it `failed`.
+        """
+        job = importjobservice.get_import_job(request.user, job_id)
+        if job is None:
+            raise NotFound('No import job matches the given query.')
+
+        return Response(ImportJobSerializer(job).data)
+
     @extend_schema(exclude=True)
     def import_exampleschedule(self, request, *args, **kwargs):
         importservice.import_example_schedule(request.user)
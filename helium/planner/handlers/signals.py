@@ -9,9 +9,8 @@ from helium.common import enums
 from helium.common.utils import taskutils
 from helium.planner.models import Category, Course, CourseGroup, Event, Homework, CourseSchedule, Attachment, Material, \
     Reminder
-from helium.planner.services import coursescheduleservice
-from helium.planner.tasks import recalculate_category_grades_for_course, recalculate_category_grade, \
-    adjust_reminder_times, recalculate_course_grades_for_course_group, recalculate_course_grade
+from helium.planner.services import coursescheduleservice, gradingservice
+from helium.planner.tasks import adjust_reminder_times
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +24,21 @@ def _mark_user_data_deleted(instance):
         logger.warning("Failed to update last_deletion_at after delete.", exc_info=True)
 
 
+def _get_course_user_id(course_id):
+    return Course.objects.filter(pk=course_id).values_list('course_group__user_id', flat=True).first()
+
+
+def _queue_grade_recalculation(user_id, **kwargs):
+    # The owning entities may already be gone when this follows a cascading delete, in which case there is nothing
+    # left to recalculate
+    if user_id:
+        gradingservice.queue_grade_recalculation(user_id, **kwargs)
+
+
 @receiver(post_save, sender=Course)
 def save_course(sender, instance, **kwargs):
     coursescheduleservice.clear_cached_course_schedule(instance)
-    recalculate_course_grade.apply(args=(instance.pk,))
+    _queue_grade_recalculation(_get_course_user_id(instance.pk), course_ids=[instance.pk])
 
     if not Reminder.objects.for_calendar_item(instance.pk, enums.COURSE).exists():
         return
@@ -40,7 +50,9 @@ def save_course(sender, instance, **kwargs):
 @receiver(post_delete, sender=Course)
 def delete_course(sender, instance, **kwargs):
     _mark_user_data_deleted(instance)
-    recalculate_course_grades_for_course_group.apply(args=(instance.course_group_id,))
+    _queue_grade_recalculation(
+        CourseGroup.objects.filter(pk=instance.course_group_id).values_list('user_id', flat=True).first(),
+        course_group_ids=[instance.course_group_id])
 
 
 @receiver(post_save, sender=CourseSchedule)
@@ -56,23 +68,30 @@ def save_course_schedule(sender, instance, **kwargs):
 
 @receiver(post_save, sender=Category)
 def save_category(sender, instance, **kwargs):
-    recalculate_category_grade.apply(args=(instance.pk,))
+    _queue_grade_recalculation(_get_course_user_id(instance.course_id), category_ids=[instance.pk])
 
 
 @receiver(post_delete, sender=Category)
 def delete_category(sender, instance, **kwargs):
     _mark_user_data_deleted(instance)
-    recalculate_category_grades_for_course.apply(args=(instance.course_id,))
+    _queue_grade_recalculation(_get_course_user_id(instance.course_id), course_ids=[instance.course_id])
 
 
 @receiver(post_delete, sender=Homework)
 def delete_homework(sender, instance, **kwargs):
     _mark_user_data_deleted(instance)
     try:
-        if instance.category:
-            recalculate_category_grade.apply(args=(instance.category.pk,))
+        if not instance.category:
+            return
     except Category.DoesNotExist:
         logger.info(f"Category does not exist for Homework {instance.pk}. Nothing to do.")
+        return
+
+    user_id = _get_course_user_id(instance.course_id)
+    if (user_id and gradingservice.has_pending_grade_recalculations(user_id)) or \
+            not gradingservice.apply_homework_grade_change(
+                instance, instance.loaded_grade_state or instance.get_grade_state(), deleted=True):
+        _queue_grade_recalculation(user_id, category_ids=[instance.category_id])
 
 
 @receiver(post_save, sender=Event)
@@ -85,9 +104,16 @@ def save_event(sender, instance, **kwargs):
 
 
 @receiver(post_save, sender=Homework)
-def save_homework(sender, instance, **kwargs):
+def save_homework(sender, instance, created, **kwargs):
+    # A change to the grade of the latest homework is applied to the grade aggregates directly, anything else (or a
+    # save of an instance whose previous state isn't known, or while the aggregates are waiting on a queued
+    # recalculation anyway) queues a full recalculation
     if instance.category:
-        recalculate_category_grade.apply(args=(instance.category.pk,))
+        user_id = _get_course_user_id(instance.course_id)
+        old_grade_state = None if created else instance.loaded_grade_state
+        if (not created and old_grade_state is None) or gradingservice.has_pending_grade_recalculations(user_id) or \
+                not gradingservice.apply_homework_grade_change(instance, old_grade_state):
+            _queue_grade_recalculation(user_id, category_ids=[instance.category_id])
 
     if not Reminder.objects.for_calendar_item(instance.pk, instance.calendar_item_type).exists():
         return
@@ -160,6 +186,30 @@ def delete_event(sender, instance, **kwargs):
 def delete_course_schedule(sender, instance, **kwargs):
     _mark_user_data_deleted(instance)
 
+    try:
+        course = instance.course
+    except Course.DoesNotExist:
+        logger.info(f"Course does not exist for CourseSchedule {instance.pk}. Nothing to do.")
+        return
+
+    coursescheduleservice.clear_cached_course_schedule(course)
+
+    if not Reminder.objects.for_calendar_item(course.pk, enums.COURSE).exists():
+        return
+    taskutils.safe_apply_async(adjust_reminder_times,
+        args=(course.pk, enums.COURSE), priority=settings.CELERY_PRIORITY_LOW
+    )
+
+
+@receiver(post_save, sender=CourseGroup)
+def save_course_group(sender, instance, created, **kwargs):
+    if created:
+        return
+
+    # The course group's exceptions (holidays) apply to the class meetings of all of its courses
+    for course in instance.courses.all():
+        coursescheduleservice.clear_cached_course_schedule(course)
+
 
 @receiver(post_delete, sender=CourseGroup)
 def delete_course_group(sender, instance, **kwargs):
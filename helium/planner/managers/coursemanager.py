@@ -38,7 +38,7 @@ class CourseQuerySet(BaseQuerySet):
     def num_homework_graded(self):
         return self.aggregate(
             homework_count=Count(Case(
-                When(Q(homework__completed=True) & ~Q(homework__current_grade='-1/100'), then=1))))['homework_count']
+                When(Q(homework__completed=True, homework__grade_earned__isnull=False), then=1))))['homework_count']
 
     def num_attachments(self):
         return self.aggregate(attachments_count=Count('attachments'))['attachments_count']
@@ -22,7 +22,7 @@ class HomeworkQuerySet(BaseQuerySet):
         return self.filter(category_id=category_id)
 
     def graded(self):
-        return self.completed().exclude(current_grade='-1/100')
+        return self.completed().filter(grade_earned__isnull=False)
 
     def completed(self, completed=True):
         return self.filter(completed=completed)
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.17 on 2026-10-18 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0066_fix_note_newline_termination'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='grade_count',
+            field=models.PositiveIntegerField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='grade_series_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='grade_series_weighted_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='grade_total_earned',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='grade_total_possible',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='grade_count',
+            field=models.PositiveIntegerField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='grade_series_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='grade_series_weighted_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='grade_total_earned',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='grade_total_possible',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='coursegroup',
+            name='grade_count',
+            field=models.PositiveIntegerField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='coursegroup',
+            name='grade_series_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='coursegroup',
+            name='grade_series_weighted_sum',
+            field=models.FloatField(default=0),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.17 on 2026-10-18 19:18
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def _parse_grade(current_grade):
+    try:
+        earned, possible = (float(value) for value in current_grade.split('/'))
+    except (AttributeError, ValueError):
+        return None, None
+
+    return (None if current_grade == '-1/100' else earned), possible
+
+
+def backfill_homework_grade_values(apps, schema_editor):
+    """Populate grade_earned/grade_possible from each homework's current_grade.
+
+    Mirrors Homework.sync_grade_values, which keeps them in sync on save from
+    here on.
+    """
+    Homework = apps.get_model('planner', 'Homework')
+
+    batch = []
+    backfilled = 0
+    for homework in Homework.objects.only('pk', 'current_grade').order_by('pk').iterator(chunk_size=BATCH_SIZE):
+        homework.grade_earned, homework.grade_possible = _parse_grade(homework.current_grade)
+        batch.append(homework)
+
+        if len(batch) >= BATCH_SIZE:
+            Homework.objects.bulk_update(batch, ['grade_earned', 'grade_possible'])
+            backfilled += len(batch)
+            batch = []
+
+    if batch:
+        Homework.objects.bulk_update(batch, ['grade_earned', 'grade_possible'])
+        backfilled += len(batch)
+
+    if backfilled:
+        print(f"\n  Backfilled grade values for {backfilled} homework")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0067_grade_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='homework',
+            name='grade_earned',
+            field=models.FloatField(blank=True, editable=False, help_text='The numerator of `current_grade`, or null if the homework is ungraded. Kept in sync with `current_grade` on save; not user-supplied.', null=True),
+        ),
+        migrations.AddField(
+            model_name='homework',
+            name='grade_possible',
+            field=models.FloatField(blank=True, editable=False, help_text='The denominator of `current_grade`. Kept in sync with `current_grade` on save; not user-supplied.', null=True),
+        ),
+        migrations.RunPython(backfill_homework_grade_values, migrations.RunPython.noop),
+    ]
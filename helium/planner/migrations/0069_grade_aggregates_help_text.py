@@ -0,0 +1,78 @@
+# Generated by Django 5.2.17 on 2026-10-18 20:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0068_homework_grade_values'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='grade_count',
+            field=models.PositiveIntegerField(blank=True, default=None, help_text='The number of points in the grade series, or `null` until a full recalculation of the grade sets its running aggregates.', null=True),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='grade_series_sum',
+            field=models.FloatField(default=0, help_text='Running sum of the points in the grade series.'),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='grade_series_weighted_sum',
+            field=models.FloatField(default=0, help_text='Running sum of the points in the grade series, each weighted by its position.'),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='grade_total_earned',
+            field=models.FloatField(default=0, help_text='Running total of the grade earned by graded homework.'),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='grade_total_possible',
+            field=models.FloatField(default=0, help_text='Running total of the grade possible for graded homework.'),
+        ),
+        migrations.AlterField(
+            model_name='course',
+            name='grade_count',
+            field=models.PositiveIntegerField(blank=True, default=None, help_text='The number of points in the grade series, or `null` until a full recalculation of the grade sets its running aggregates.', null=True),
+        ),
+        migrations.AlterField(
+            model_name='course',
+            name='grade_series_sum',
+            field=models.FloatField(default=0, help_text='Running sum of the points in the grade series.'),
+        ),
+        migrations.AlterField(
+            model_name='course',
+            name='grade_series_weighted_sum',
+            field=models.FloatField(default=0, help_text='Running sum of the points in the grade series, each weighted by its position.'),
+        ),
+        migrations.AlterField(
+            model_name='course',
+            name='grade_total_earned',
+            field=models.FloatField(default=0, help_text='Running total of the grade earned by graded homework.'),
+        ),
+        migrations.AlterField(
+            model_name='course',
+            name='grade_total_possible',
+            field=models.FloatField(default=0, help_text='Running total of the grade possible for graded homework.'),
+        ),
+        migrations.AlterField(
+            model_name='coursegroup',
+            name='grade_count',
+            field=models.PositiveIntegerField(blank=True, default=None, help_text='The number of points in the grade series, or `null` until a full recalculation of the grade sets its running aggregates.', null=True),
+        ),
+        migrations.AlterField(
+            model_name='coursegroup',
+            name='grade_series_sum',
+            field=models.FloatField(default=0, help_text='Running sum of the points in the grade series.'),
+        ),
+        migrations.AlterField(
+            model_name='coursegroup',
+            name='grade_series_weighted_sum',
+            field=models.FloatField(default=0, help_text='Running sum of the points in the grade series, each weighted by its position.'),
+        ),
+    ]
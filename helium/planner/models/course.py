@@ -33,6 +33,22 @@ class Course(BaseModel):
 
     trend = models.FloatField(default=None, blank=True, null=True)
 
+    grade_count = models.PositiveIntegerField(
+        help_text='The number of points in the grade series, or `null` until a full recalculation of the grade sets '
+                  'its running aggregates.',
+        default=None, blank=True, null=True)
+
+    grade_total_earned = models.FloatField(help_text='Running total of the grade earned by graded homework.',
+                                           default=0)
+
+    grade_total_possible = models.FloatField(help_text='Running total of the grade possible for graded homework.',
+                                             default=0)
+
+    grade_series_sum = models.FloatField(help_text='Running sum of the points in the grade series.', default=0)
+
+    grade_series_weighted_sum = models.FloatField(
+        help_text='Running sum of the points in the grade series, each weighted by its position.', default=0)
+
     teacher_name = models.CharField(help_text='A display name for the teacher.',
                                     max_length=255, blank=True, default='')
 
@@ -23,6 +23,16 @@ class CourseGroup(BaseModel):
 
     trend = models.FloatField(default=None, blank=True, null=True)
 
+    grade_count = models.PositiveIntegerField(
+        help_text='The number of points in the grade series, or `null` until a full recalculation of the grade sets '
+                  'its running aggregates.',
+        default=None, blank=True, null=True)
+
+    grade_series_sum = models.FloatField(help_text='Running sum of the points in the grade series.', default=0)
+
+    grade_series_weighted_sum = models.FloatField(
+        help_text='Running sum of the points in the grade series, each weighted by its position.', default=0)
+
     private_slug = models.SlugField(unique=True, blank=True, null=True)
 
     example_schedule = models.BooleanField(help_text='Whether it is part of the example schedule.',
@@ -19,6 +19,15 @@ class Homework(BaseCalendar):
         ),
         max_length=255, validators=[validate_fraction])
 
+    grade_earned = models.FloatField(
+        help_text='The numerator of `current_grade`, or null if the homework is ungraded. Kept in sync with '
+                  '`current_grade` on save; not user-supplied.',
+        null=True, blank=True, editable=False)
+
+    grade_possible = models.FloatField(
+        help_text='The denominator of `current_grade`. Kept in sync with `current_grade` on save; not user-supplied.',
+        null=True, blank=True, editable=False)
+
     completed = models.BooleanField(
         help_text=(
             'Whether the homework has been completed. Once `completed=true` and '
@@ -50,6 +59,11 @@ class Homework(BaseCalendar):
 
     objects = HomeworkManager()
 
+    GRADE_STATE_FIELDS = ('category_id', 'completed', 'grade_earned', 'grade_possible', 'start', 'title')
+
+    # The grade state as it was last loaded from or saved to the database, or None if not known
+    loaded_grade_state = None
+
     class Meta:
         verbose_name = 'Assignment'
         ordering = ('start', 'title')
@@ -57,9 +71,40 @@ class Homework(BaseCalendar):
             models.Index(fields=['course', 'completed'], name='homework_grading_aggregation'),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+
+        if all(field in field_names for field in cls.GRADE_STATE_FIELDS):
+            instance.loaded_grade_state = instance.get_grade_state()
+
+        return instance
+
     def get_user(self):
         return self.course.get_user()
 
+    def get_grade_state(self):
+        """
+        The fields that determine this homework's place in its category's grade series, so a save can apply just the
+        change to them (see `gradingservice.apply_homework_grade_change`).
+        """
+        return {field: getattr(self, field) for field in self.GRADE_STATE_FIELDS}
+
+    def sync_grade_values(self):
+        """
+        Set `grade_earned` and `grade_possible` from `current_grade`, which remains the representation exposed by the
+        API, so grading can filter and aggregate on numbers rather than parsing the fraction of every row.
+        """
+        try:
+            earned, possible = (float(value) for value in self.current_grade.split('/'))
+        except (AttributeError, ValueError):
+            self.grade_earned = None
+            self.grade_possible = None
+            return
+
+        self.grade_earned = None if self.current_grade == '-1/100' else earned
+        self.grade_possible = possible
+
     @property
     def calendar_item_type(self) -> int:
         return enums.HOMEWORK
@@ -89,4 +134,11 @@ class Homework(BaseCalendar):
         if self.completed and self.completed_at is None:
             self.completed_at = timezone.now()
 
+        self.sync_grade_values()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'current_grade' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'grade_earned', 'grade_possible'}
+
         super().save(*args, **kwargs)
+
+        self.loaded_grade_state = self.get_grade_state()
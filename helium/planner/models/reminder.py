@@ -1,4 +1,3 @@
-import datetime
 from datetime import timedelta
 from zoneinfo import ZoneInfo
 
@@ -10,7 +9,6 @@ from django.utils import timezone
 
 from helium.common import enums
 from helium.common.models import BaseModel
-from helium.common.utils.course_exception_helpers import get_course_exceptions
 from helium.planner.managers.remindermanager import ReminderManager
 
 
@@ -109,58 +107,22 @@ class Reminder(BaseModel):
         Returns None if no qualifying future occurrence exists within the course date range.
         """
         course = self.course
-        course_schedules = list(course.schedules.all())
-        if not course_schedules:
-            return None
-
-        user_tz = ZoneInfo(course.get_user().settings.time_zone)
-        now = timezone.now().astimezone(user_tz)
-        today = now.date()
+        now = timezone.now()
 
         if after_datetime is not None:
-            cutoff = after_datetime.astimezone(user_tz)
-            use_window_check = False
-            if course.end_date < today:
+            if course.end_date < now.astimezone(ZoneInfo(course.get_user().settings.time_zone)).date():
                 return None
-            day = max(course.start_date, cutoff.date())
+            cutoff = after_datetime
         else:
-            cutoff = now
-            use_window_check = True
-            day = max(today, course.start_date)
-
-        exceptions = get_course_exceptions(course)
-        # Local import avoids a model↔service import cycle; this shared resolver is the single
-        # source of truth for "when does this schedule meet on this day" (weekly or cycle).
-        from helium.planner.services.coursescheduleservice import schedule_meeting_times_for_day
-
-        while day <= course.end_date:
-            if day in exceptions:
-                day += datetime.timedelta(days=1)
-                continue
-
-            # Multiple schedules can meet the same day (lecture + lab, or a cycle-day slot) — take
-            # the soonest qualifying start.
-            candidates = []
-            for course_schedule in course_schedules:
-                for start_time, _end_time in schedule_meeting_times_for_day(course_schedule, day, exceptions):
-                    local_start = datetime.datetime.combine(day, start_time).replace(tzinfo=user_tz)
-
-                    if use_window_check:
-                        offset_delta = datetime.timedelta(
-                            **{enums.REMINDER_OFFSET_TYPE_CHOICES[self.offset_type][1]: int(self.offset)})
-                        reminder_time = local_start - offset_delta
-                        if local_start > now and reminder_time > now:
-                            candidates.append(local_start)
-                    else:
-                        if local_start > cutoff:
-                            candidates.append(local_start)
-
-            if candidates:
-                return min(candidates).astimezone(datetime.timezone.utc)
-
-            day += datetime.timedelta(days=1)
-
-        return None
+            # A class qualifies only if its reminder time (class start - offset) is still ahead
+            cutoff = now + timedelta(
+                **{enums.REMINDER_OFFSET_TYPE_CHOICES[self.offset_type][1]: int(self.offset)})
+
+        # Local import avoids a model↔service import cycle; the course's index of class meeting starts is built from
+        # the same resolver as its schedule events, and cached (and invalidated) next to them
+        from helium.planner.services.coursescheduleservice import get_next_course_occurrence_start
+
+        return get_next_course_occurrence_start(course, cutoff)
 
     @staticmethod
     def should_reset_sent(new_start_of_range):
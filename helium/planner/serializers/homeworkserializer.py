@@ -8,7 +8,7 @@ from helium.common.serializers.fields import TzAwareDateTimeField
 from helium.planner.models import Homework, Category, Material, Course
 from helium.planner.serializers.attachmentserializer import AttachmentSerializer
 from helium.planner.serializers.reminderserializer import ReminderSerializer
-from helium.planner.tasks import recalculate_category_grade
+from helium.planner.services import gradingservice
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +62,7 @@ class HomeworkSerializer(serializers.ModelSerializer):
         instance = super().update(instance, validated_data)
 
         if old_category:
-            recalculate_category_grade(old_category.pk)
+            gradingservice.queue_grade_recalculation(instance.get_user().pk, category_ids=[old_category.pk])
 
         return instance
 
@@ -78,34 +78,28 @@ class NoteSerializer(serializers.ModelSerializer):
             )
 
         # Enforce one-to-one from entity side: entity can only have one linked note
-        exclude_pk = self.instance.pk if self.instance else None
-        if homework:
-            existing = Note.objects.filter(homework__in=homework)
-            if exclude_pk:
-                existing = existing.exclude(pk=exclude_pk)
-            if existing.exists():
-                raise ValidationError(
-                    'This homework assignment already has a linked note.'
-                )
-        if events:
-            existing = Note.objects.filter(events__in=events)
-            if exclude_pk:
-                existing = existing.exclude(pk=exclude_pk)
-            if existing.exists():
-                raise ValidationError(
-                    'This event already has a linked note.'
-                )
-        if resources:
-            existing = Note.objects.filter(resources__in=resources)
-            if exclude_pk:
-                existing = existing.exclude(pk=exclude_pk)
-            if existing.exists():
-                raise ValidationError(
-                    'This resource already has a linked note.'
-                )
+        if homework and self.has_linked_note('homework', homework):
+            raise ValidationError(
+                'This homework assignment already has a linked note.'
+            )
+        if events and self.has_linked_note('events', events):
+            raise ValidationError(
+                'This event already has a linked note.'
+            )
+        if resources and self.has_linked_note('resources', resources):
+            raise ValidationError(
+                'This resource already has a linked note.'
+            )
 
         return attrs
 
+    def has_linked_note(self, field_name, entities):
+        """Return True if any of the given entities is already linked to a note other than this one."""
+        existing = Note.objects.filter(**{f'{field_name}__in': entities})
+        if self.instance:
+            existing = existing.exclude(pk=self.instance.pk)
+        return existing.exists()
+
     def should_delete_on_empty_content(self, instance, validated_data):
         """Return True if `content` was cleared while the note is linked to an entity."""
         if 'content' not in validated_data:
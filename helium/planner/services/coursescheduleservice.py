@@ -1,20 +1,20 @@
+import bisect
 import datetime
 import json
 import logging
 from dataclasses import dataclass
 from zoneinfo import ZoneInfo
 
-from dateutil import parser
 from django.conf import settings
 from django.core.cache import cache
 
 from helium.common import enums
-from helium.common.utils import metricutils
+from helium.common.utils import metricutils, taskutils
 from helium.common.utils.commonutils import HeliumError, deterministic_id
 from helium.common.utils.course_exception_helpers import get_course_exceptions
 from helium.common.utils.validators import WEEKDAY_TO_ICAL
 from helium.planner.models import Event
-from helium.planner.serializers.eventserializer import EventSerializer
+from helium.planner.utils import eventcacheutils
 
 logger = logging.getLogger(__name__)
 
@@ -103,6 +103,51 @@ def _get_cache_prefix(course):
     return f"users:{course.course_group.user_id}:courses:{course.pk}:coursescheduleevents:"
 
 
+def _get_cache_index_key(course):
+    return f"{_get_cache_prefix(course)}index"
+
+
+def _get_cache_occurrences_key(course):
+    return f"{_get_cache_prefix(course)}occurrences"
+
+
+def _get_cache_uncacheable_key(course):
+    return f"{_get_cache_prefix(course)}uncacheable"
+
+
+def _get_cache_build_queued_key(course):
+    return f"{_get_cache_prefix(course)}buildqueued"
+
+
+def _get_cache_bucket_key(course, month):
+    return f"{_get_cache_prefix(course)}{month}"
+
+
+def _get_month(value):
+    return f"{value.year:04d}{value.month:02d}"
+
+
+def _get_months(first_day, last_day):
+    months = []
+
+    day = first_day.replace(day=1)
+    while day <= last_day:
+        months.append(_get_month(day))
+        day = (day + datetime.timedelta(days=32)).replace(day=1)
+
+    return months
+
+
+def _get_months_in_window(_from, to):
+    """
+    The month buckets that may hold an event overlapping ``_from``/``to``. Events are bucketed by the UTC month of
+    their start, and no class meeting spans more than a day, so the window is widened by a day at its start to
+    catch an event that begins at the end of the previous month.
+    """
+    return _get_months((_from.astimezone(datetime.timezone.utc) - datetime.timedelta(days=1)).date(),
+                       to.astimezone(datetime.timezone.utc).date())
+
+
 def _apply_event_filters(event, _from, to, search):
     if _from and to and not (
             (_from <= event.start <= to or _from <= event.end <= to) or
@@ -117,37 +162,98 @@ def _apply_event_filters(event, _from, to, search):
     return True
 
 
-def _get_events_from_cache(course, cache_prefix, cached_value, _from=None, to=None, search=None):
+def _get_events_from_cache(course, cached_values, _from=None, to=None, search=None):
     events = []
     invalid_data = False
 
     try:
-        for event in json.loads(cached_value):
-            event = Event(id=event['id'],
-                          title=event['title'],
-                          all_day=event['all_day'],
-                          show_end_time=event['show_end_time'],
-                          start=parser.parse(event['start']),
-                          end=parser.parse(event['end']),
-                          url=event['url'],
-                          owner_id=event['owner_id'],
-                          user_id=event['user'],
-                          calendar_item_type=event['calendar_item_type'],
-                          comments=event['comments'])
-            event.color = course.color
-
-            if _apply_event_filters(event, _from, to, search):
-                events.append(event)
-    except (json.JSONDecodeError, KeyError, TypeError):
+        for cached_value in cached_values:
+            for event in eventcacheutils.decode_events(cached_value, course.color, _from, to):
+                if _apply_event_filters(event, _from, to, search):
+                    events.append(event)
+    except ValueError:
         invalid_data = True
 
     if invalid_data:
         events = []
-        cache.delete(cache_prefix)
+        clear_cached_course_schedule(course)
 
     return events, not invalid_data
 
 
+def _get_cached_values(course, _from=None, to=None):
+    """
+    Fetch the cached month buckets for the given course — only those overlapping ``_from``/``to``, when a window is
+    given. The index of the term's months is fetched alongside the buckets, so a windowed read is a single round
+    trip.
+
+    :return: A list of cached bucket values, or None if the cache is cold or a bucket has been evicted (in which case
+        the rest of the course's cached keys are cleared, so the term is rebuilt).
+    """
+    index_key = _get_cache_index_key(course)
+
+    if _from and to:
+        month_keys = {_get_cache_bucket_key(course, month): month for month in _get_months_in_window(_from, to)}
+        cached = cache.get_many([index_key, *month_keys])
+        if index_key not in cached:
+            return None
+        try:
+            cached_months = set(json.loads(cached[index_key]))
+        except (json.JSONDecodeError, TypeError):
+            clear_cached_course_schedule(course)
+            return None
+        # Months outside the term simply have no bucket; a missing bucket for a month inside the term means it was
+        # evicted on its own, so the cache can't be trusted
+        month_keys = [key for key, month in month_keys.items() if month in cached_months]
+    else:
+        cached_index = cache.get(index_key)
+        if not cached_index:
+            return None
+        try:
+            month_keys = [_get_cache_bucket_key(course, month) for month in json.loads(cached_index)]
+        except (json.JSONDecodeError, TypeError):
+            clear_cached_course_schedule(course)
+            return None
+        cached = cache.get_many(month_keys)
+
+    if any(key not in cached for key in month_keys):
+        clear_cached_course_schedule(course)
+        return None
+
+    return [cached[key] for key in month_keys]
+
+
+def _set_cached_values(course, events):
+    """
+    Cache the given events in month buckets, keyed by the (UTC) month of each event's start, alongside an index of
+    the months that were written. Every month in the course's range gets a bucket (empty months included), so a
+    windowed read can tell an empty month from an evicted one.
+    """
+    # A class meeting's UTC date can be a day off its local date, so the buckets span a day past each end of the term
+    buckets = {month: [] for month in _get_months(course.start_date - datetime.timedelta(days=1),
+                                                   course.end_date + datetime.timedelta(days=1))}
+    for event in events:
+        buckets.setdefault(_get_month(event.start), []).append(event)
+
+    cached_values = {_get_cache_bucket_key(course, month): eventcacheutils.encode_events(bucket)
+                     for month, bucket in buckets.items()}
+
+    cache_size = sum(len(cached_value) for cached_value in cached_values.values())
+    if cache_size <= settings.FEED_MAX_CACHEABLE_SIZE:
+        cache.set_many(cached_values, settings.FEED_CACHE_TTL_SECONDS)
+        # The index is written last, so a reader never sees an index whose buckets aren't yet in place
+        cache.set(_get_cache_index_key(course), json.dumps(sorted(buckets)), settings.FEED_CACHE_TTL_SECONDS)
+    else:
+        logger.warning("Cache size {max_cache_size} exceeded max, External Calendar {id}".format(
+            max_cache_size=cache_size,
+            id=course.pk))
+
+        metricutils.increment('task.cache.max-size-exceeded')
+
+        # Remembered (until the schedule changes, which clears it), so a build isn't queued for every request
+        cache.set(_get_cache_uncacheable_key(course), True, settings.FEED_CACHE_TTL_SECONDS)
+
+
 def schedule_meeting_times_for_day(course_schedule, day, exceptions):
     """
     The (start_time, end_time) slots a schedule meets on ``day`` — 0 or 1 tuple. Resolved by:
@@ -186,6 +292,53 @@ def schedule_meeting_times_for_day(course_schedule, day, exceptions):
     return []
 
 
+def _iter_course_meetings(schedule_list, first_day, last_day, exceptions, user_tz):
+    """
+    Yield a ``(course_schedule, start, end)`` tuple, in UTC, for each class meeting of ``schedule_list`` on the days
+    ``first_day`` through ``last_day`` (inclusive), skipping exception dates. The walk is bounded only by the given
+    days, so a caller after a narrow window pays for the days in that window, not the whole term.
+    """
+    day = first_day
+    while day <= last_day:
+        if day in exceptions:
+            day += datetime.timedelta(days=1)
+            continue
+
+        for course_schedule in schedule_list:
+            for start_time, end_time in schedule_meeting_times_for_day(course_schedule, day, exceptions):
+                start = datetime.datetime.combine(day, start_time).replace(
+                    tzinfo=user_tz).astimezone(datetime.timezone.utc)
+                end = datetime.datetime.combine(day, end_time).replace(
+                    tzinfo=user_tz).astimezone(datetime.timezone.utc)
+
+                yield course_schedule, start, end
+
+        day += datetime.timedelta(days=1)
+
+
+def _expand_course_schedules(course, schedule_list, first_day, last_day, exceptions, user_tz, course_user,
+                             comments):
+    """
+    Yield an event for each class meeting of ``schedule_list`` on the days ``first_day`` through ``last_day``
+    (inclusive), skipping exception dates.
+    """
+    for course_schedule, start, end in _iter_course_meetings(schedule_list, first_day, last_day, exceptions, user_tz):
+        event = Event(id=deterministic_id(course_user.pk, course_schedule.pk, start.isoformat(), end.isoformat()),
+                      title=course.title,
+                      all_day=False,
+                      show_end_time=True,
+                      start=start,
+                      end=end,
+                      url=course.website,
+                      owner_id=course.pk,
+                      user=course_user,
+                      calendar_item_type=enums.COURSE,
+                      comments=comments)
+        event.color = course.color
+
+        yield event
+
+
 def _create_events_from_course_schedules(course, course_schedules, _from=None, to=None, search=None):
     events = []
     events_filtered = []
@@ -197,57 +350,118 @@ def _create_events_from_course_schedules(course, course_schedules, _from=None, t
 
     schedule_list = list(course_schedules.all())
 
-    day = course.start_date
-    while day <= course.end_date:
-        if day in exceptions:
-            day += datetime.timedelta(days=1)
-            continue
+    for event in _expand_course_schedules(course, schedule_list, course.start_date, course.end_date, exceptions,
+                                          user_tz, course_user, comments):
+        events.append(event)
 
-        for course_schedule in schedule_list:
-            for start_time, end_time in schedule_meeting_times_for_day(course_schedule, day, exceptions):
-                start = datetime.datetime.combine(day, start_time).replace(
-                    tzinfo=user_tz).astimezone(datetime.timezone.utc)
-                end = datetime.datetime.combine(day, end_time).replace(
-                    tzinfo=user_tz).astimezone(datetime.timezone.utc)
+        if _apply_event_filters(event, _from, to, search):
+            events_filtered.append(event)
 
-                event = Event(id=deterministic_id(course_user.pk, course_schedule.pk, start.isoformat(),
-                                                  end.isoformat()),
-                              title=course.title,
-                              all_day=False,
-                              show_end_time=True,
-                              start=start,
-                              end=end,
-                              url=course.website,
-                              owner_id=course.pk,
-                              user=course_user,
-                              calendar_item_type=enums.COURSE,
-                              comments=comments)
-                event.color = course.color
-
-                events.append(event)
+    _set_cached_values(course, events)
+    _set_cached_occurrences(course, [event.start for event in events])
 
-                if _apply_event_filters(event, _from, to, search):
-                    events_filtered.append(event)
+    return events_filtered
 
-        day += datetime.timedelta(days=1)
 
-    serializer = EventSerializer(events, many=True)
-    events_json = json.dumps(serializer.data)
-    if len(events_json.encode('utf-8')) <= settings.FEED_MAX_CACHEABLE_SIZE:
-        cache.set(_get_cache_prefix(course), events_json, settings.FEED_CACHE_TTL_SECONDS)
-    else:
-        logger.warning("Cache size {max_cache_size} exceeded max, External Calendar {id}".format(
-            max_cache_size=len(events_json.encode('utf-8')),
-            id=course.pk))
+def _create_events_in_window(course, course_schedules, _from, to, search=None):
+    """
+    Expand only the class meetings that fall within ``_from``/``to``, without building or caching the rest of the
+    term. Every occurrence is contained in a single local day, so only the local days the window touches (clamped
+    to the course's dates) need to be walked.
+    """
+    events = []
 
-        metricutils.increment('task.cache.max-size-exceeded')
+    exceptions = get_course_exceptions(course)
+    course_user = course.get_user()
+    user_tz = ZoneInfo(course_user.settings.time_zone)
+    comments = _get_comments(course)
 
-    return events_filtered
+    first_day = max(course.start_date, _from.astimezone(user_tz).date())
+    last_day = min(course.end_date, to.astimezone(user_tz).date())
+
+    schedule_list = list(course_schedules.all())
+
+    for event in _expand_course_schedules(course, schedule_list, first_day, last_day, exceptions, user_tz,
+                                          course_user, comments):
+        if _apply_event_filters(event, _from, to, search):
+            events.append(event)
+
+    return events
+
+
+def build_course_schedule_cache(course):
+    """
+    Build and cache the full term of course schedule events for the given course, unless a cached value already
+    exists (for instance, filled by a request that raced this one).
+
+    :param course: The course to build the cache for.
+    :return: True if the cache was built, False if it was already populated.
+    """
+    try:
+        if cache.get(_get_cache_index_key(course)):
+            return False
+
+        _create_events_from_course_schedules(course, course.schedules)
+
+        return True
+    finally:
+        cache.delete(_get_cache_build_queued_key(course))
+
+
+def _set_cached_occurrences(course, starts):
+    occurrences = sorted({int(start.timestamp()) for start in starts})
+
+    cache.set(_get_cache_occurrences_key(course), json.dumps(occurrences), settings.FEED_CACHE_TTL_SECONDS)
+
+    return occurrences
+
+
+def get_course_occurrences(course):
+    """
+    The start of every class meeting in the given course's term, as a sorted list of UTC epoch seconds. The list is
+    cached next to the course's schedule events (and so invalidated along with them whenever the schedule changes),
+    and built from the course's schedules only when that cache is cold.
+
+    :param course: The course whose class meetings to list.
+    :return: A sorted list of epoch seconds.
+    """
+    cached = cache.get(_get_cache_occurrences_key(course))
+    if cached is not None:
+        try:
+            return json.loads(cached)
+        except (json.JSONDecodeError, TypeError):
+            logger.warning(f"Invalid cached occurrences for Course {course.pk}, rebuilding")
+
+    metricutils.increment('course.occurrences.build')
+
+    exceptions = get_course_exceptions(course)
+    user_tz = ZoneInfo(course.get_user().settings.time_zone)
+
+    return _set_cached_occurrences(course, [start for _, start, _ in _iter_course_meetings(
+        list(course.schedules.all()), course.start_date, course.end_date, exceptions, user_tz)])
+
+
+def get_next_course_occurrence_start(course, after):
+    """
+    The start of the given course's first class meeting strictly after ``after``.
+
+    :param course: The course whose class meetings to search.
+    :param after: The (timezone-aware) instant the class meeting must start after.
+    :return: The start of the class meeting in UTC, or None if no class meeting in the course's term starts after it.
+    """
+    occurrences = get_course_occurrences(course)
+
+    i = bisect.bisect_right(occurrences, after.timestamp())
+    if i == len(occurrences):
+        return None
+
+    return datetime.datetime.fromtimestamp(occurrences[i], datetime.timezone.utc)
 
 
 def clear_cached_course_schedule(course):
     """
-    For a given course, clear all cached keys for course schedule events.
+    For a given course, clear all cached keys for course schedule events, including every month bucket and the index
+    of class meeting starts.
 
     :param course: The course to clear keys for.
     """
@@ -257,10 +471,30 @@ def clear_cached_course_schedule(course):
     cache.delete_many(cached_keys)
 
 
+def _queue_course_schedule_cache_build(course):
+    """
+    Enqueue a build of the given course's full-term cache, unless one is already enqueued, or the last build found the
+    term too large to cache.
+    """
+    if cache.get(_get_cache_uncacheable_key(course)):
+        return
+
+    if not cache.add(_get_cache_build_queued_key(course), True, settings.FEED_CACHE_REFRESH_LOCK_SECONDS):
+        return
+
+    from helium.planner.tasks import cache_course_schedule_events
+
+    taskutils.safe_apply_async(cache_course_schedule_events, args=(course.pk,),
+                               priority=settings.CELERY_PRIORITY_LOW)
+
+
 def course_schedules_to_events(course, course_schedules, _from=None, to=None, search=None):
     """
     For the given course schedule model, generate an event for each class time within the course's start/end window.
 
+    When both ``_from`` and ``to`` are given and nothing is cached yet, only the class meetings within that window
+    are generated, and building the full-term cache is deferred to a background task.
+
     :param course: The course with a start/end date range to iterate over.
     :param course_schedules: A list of course schedules to generate the events for.
     :param _from: The earliest date by which to filter results.
@@ -271,13 +505,19 @@ def course_schedules_to_events(course, course_schedules, _from=None, to=None, se
     events = []
 
     cached = False
-    cache_prefix = _get_cache_prefix(course)
-    cached_value = cache.get(_get_cache_prefix(course))
-    if cached_value:
-        events, cached = _get_events_from_cache(course, cache_prefix, cached_value, _from, to, search)
+    cached_values = _get_cached_values(course, _from, to)
+    if cached_values is not None:
+        events, cached = _get_events_from_cache(course, cached_values, _from, to, search)
 
     if not cached:
-        events = _create_events_from_course_schedules(course, course_schedules, _from, to, search)
+        if _from and to:
+            # Only the requested window is expanded on the request thread; the full-term cache is filled
+            # separately, so a cold week view doesn't pay for every class meeting in the term
+            events = _create_events_in_window(course, course_schedules, _from, to, search)
+
+            _queue_course_schedule_cache_build(course)
+        else:
+            events = _create_events_from_course_schedules(course, course_schedules, _from, to, search)
 
     return events
 
@@ -334,6 +574,28 @@ def _is_school_day(date, exceptions):
     return date.weekday() in _SCHOOL_WEEKDAYS and date not in exceptions
 
 
+def _count_school_days(start, end, exceptions):
+    """
+    The number of school days from ``start`` through ``end`` (inclusive), computed from whole weeks plus the
+    leftover days rather than by walking the range, so resolving a date deep into a term doesn't cost a day-by-day
+    walk from the anchor.
+    """
+    if end < start:
+        return 0
+
+    full_weeks, remaining_days = divmod((end - start).days + 1, 7)
+
+    school_days = full_weeks * len(_SCHOOL_WEEKDAYS)
+    for offset in range(remaining_days):
+        if (start.weekday() + offset) % 7 in _SCHOOL_WEEKDAYS:
+            school_days += 1
+
+    school_days -= sum(1 for exception in exceptions
+                       if start <= exception <= end and exception.weekday() in _SCHOOL_WEEKDAYS)
+
+    return school_days
+
+
 def resolve_cycle_index(course_schedule, date, exceptions):
     """
     For a cycle (rotating / A-B / block) schedule, return the 1-based cycle-day index
@@ -352,12 +614,7 @@ def resolve_cycle_index(course_schedule, date, exceptions):
     if date < course_schedule.anchor_date or not _is_school_day(date, exceptions):
         return None
 
-    school_days = 0
-    day = course_schedule.anchor_date
-    while day <= date:
-        if _is_school_day(day, exceptions):
-            school_days += 1
-        day += datetime.timedelta(days=1)
+    school_days = _count_school_days(course_schedule.anchor_date, date, exceptions)
 
     return (school_days - 1) % course_schedule.cycle_length + 1
 
@@ -6,42 +6,72 @@
 # here, audit grade_helpers.dart for consistency. Both sides have their own
 # test suites covering the math at their respective layers.
 
+import itertools
 import logging
+from fractions import Fraction
 
-from django.db.models import F, Count, Q, Case, When, Exists, OuterRef, FloatField, Value
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import F, Count, Q, Case, When, Exists, OuterRef, FloatField, Value, Sum
 
-from helium.common.utils import commonutils
+from helium.common.utils import commonutils, metricutils, taskutils
 from helium.planner.models import CourseGroup, Course, Category, Homework
 
 logger = logging.getLogger(__name__)
 
 
 def get_grade_points_for_course_group(course_group_id):
-    course_grade_points = []
     courses = (Course.objects.for_course_group(course_group_id)
                .annotate(annotated_has_weighted_grading=Exists(
                    Category.objects.filter(course_id=OuterRef('pk'), weight__gt=0)
                )))
     has_weighted_by_course = {course.id: course.annotated_has_weighted_grading for course in courses}
     grade_points_by_course = get_grade_points_by_course_for_group(course_group_id, has_weighted_by_course)
-    for course in courses:
-        course_grade_points += grade_points_by_course.get(course.id, [])
-    course_grade_points = sorted(course_grade_points, key=lambda x: x[0])
 
-    # Now average the grades of all courses as each grade point to build the group's points
-    course_grades = {}
+    return _get_course_group_grade_points([grade_points_by_course.get(course.id, []) for course in courses])
+
+
+class _RunningAverageGrade:
+    """
+    The average of the latest grade of each course, updated in constant time as a course's grade changes. The total is
+    kept as an exact fraction, so however many times it's updated, it's the exact sum of the latest grades.
+    """
+
+    def __init__(self):
+        self._grades = {}
+        self._total = Fraction(0)
+
+    def update(self, course_id, grade):
+        """
+        :param course_id: The course whose latest grade this is.
+        :param grade: The course's latest grade.
+        :return: The average of every course's latest grade, to four decimal places.
+        """
+        previous = self._grades.get(course_id)
+        if previous is not None:
+            self._total -= Fraction(previous)
+        self._total += Fraction(grade)
+        self._grades[course_id] = grade
+
+        return round(float(self._total / len(self._grades)), 4)
+
+
+def _get_course_group_grade_points(course_grade_points):
+    """
+    Merge the grade points of each of a course group's courses into the group's, where each point is the average of
+    the latest grade of every course graded so far. Only the latest grade of each course is kept, rather than its
+    whole history.
+
+    :param course_grade_points: The grade points of each course, in course order.
+    :return: The course group's grade points.
+    """
+    average_grade = _RunningAverageGrade()
     grade_points = []
-    for item in course_grade_points:
-        if item[6] not in course_grades:
-            course_grades[item[6]] = []
-        course_grades[item[6]].append(item[1])
-
-        sum = 0
-        for course_id in course_grades.keys():
-            sum += course_grades[course_id][-1]
-        overall_grade = round(sum / len(course_grades.keys()), 4)
+    for item in sorted(itertools.chain.from_iterable(course_grade_points), key=lambda x: x[0]):
         grade_points.append([item[0],
-                             overall_grade,
+                             average_grade.update(item[6], item[1]),
                              item[2],
                              item[3],
                              item[4],
@@ -54,15 +84,15 @@ def get_grade_points_for_course_group(course_group_id):
 def _graded_grade_point_values(homework_queryset):
     return (homework_queryset
             .graded()
-            .annotate(weight=F('category__weight'),
-                      grade=F('current_grade'))
+            .annotate(weight=F('category__weight'))
             .values('id',
                     'title',
                     'category',
                     'course',
                     'weight',
                     'start',
-                    'grade'))
+                    'grade_earned',
+                    'grade_possible'))
 
 
 def get_grade_points_for_course(course_id, has_weighted_grading=None):
@@ -91,7 +121,7 @@ def get_homework_series_for_course(course_id, has_weighted_grading=None):
                           annotated_num_homework=Count('homework', distinct=True),
                           annotated_num_homework_graded=Count(
                               'homework',
-                              filter=Q(homework__completed=True) & ~Q(homework__current_grade='-1/100'),
+                              filter=Q(homework__completed=True, homework__grade_earned__isnull=False),
                               distinct=True
                           )
                       )
@@ -108,20 +138,23 @@ def get_homework_series_for_course(course_id, has_weighted_grading=None):
         })
     raw_ungraded = list(Homework.objects
                         .for_course(course_id)
-                        .filter(current_grade='-1/100')
+                        .filter(grade_earned__isnull=True, grade_possible__isnull=False)
                         .order_by('start')
                         .values('id', 'title', 'start', 'course_id', 'category_id', 'current_grade'))
     return _build_homework_series(grade_points, has_weighted_grading, cat_dicts, raw_ungraded)
 
 
 def get_grade_points_for(query_set, has_weighted_grading):
+    return _get_grade_series(query_set, has_weighted_grading)[0]
+
+
+def _get_grade_series(query_set, has_weighted_grading):
     total_earned = 0
     total_possible = 0
     grade_series = []
     for item in query_set:
-        earned, possible = item['grade'].split('/')
-        earned = float(earned)
-        possible = float(possible)
+        earned = item['grade_earned']
+        possible = item['grade_possible']
         if possible <= 0:
             logger.warning(f'Skipping Homework {item["id"]} with non-positive denominator in current_grade')
             continue
@@ -146,164 +179,130 @@ def get_grade_points_for(query_set, has_weighted_grading):
                              item['category'],
                              item['course']])
 
-    return grade_series
+    return grade_series, total_earned, total_possible
+
+
+def _new_grade_holder(holder):
+    holder['num_homework'] = 0
+    holder['num_homework_completed'] = 0
+    holder['num_homework_graded'] = 0
+
+    return holder
 
 
 def get_grade_data(user_id):
-    # Annotate course groups with homework counts to avoid N+1 queries
-    course_groups = (CourseGroup.objects
+    """
+    Build the grade summary of the user's course groups, each with its courses, each with its categories.
+
+    Rather than querying counts and grade points per course group, course and category, a single narrow projection
+    of all the user's homework is taken, and every count, grade series and homework series is built from it in one
+    ordered pass, so the number of queries doesn't grow with the user's history.
+
+    :param user_id: The user whose grades to summarize.
+    :return: A dict with the list of the user's `course_groups`.
+    """
+    course_groups = [_new_grade_holder(course_group) for course_group in
+                     (CourseGroup.objects
+                      .for_user(user_id)
+                      .values('id', 'title', 'overall_grade', 'trend')
+                      .order_by('start_date', 'title'))]
+
+    courses = []
+    courses_by_id = {}
+    for course in (Course.objects
+                   .for_user(user_id)
+                   .values('id', 'title', 'color', 'current_grade', 'trend', 'course_group')
+                   .order_by('start_date', 'title')):
+        course = _new_grade_holder(course)
+        course['overall_grade'] = course.pop('current_grade')
+        course['has_weighted_grading'] = False
+        course['categories'] = []
+        courses.append(course)
+        courses_by_id[course['id']] = course
+
+    categories_by_id = {}
+    for category in (Category.objects
                      .for_user(user_id)
-                     .annotate(
-                         annotated_num_homework=Count('courses__homework', distinct=True),
-                         annotated_num_homework_completed=Count(
-                             'courses__homework',
-                             filter=Q(courses__homework__completed=True),
-                             distinct=True
-                         ),
-                         annotated_num_homework_graded=Count(
-                             'courses__homework',
-                             filter=Q(courses__homework__completed=True) & ~Q(courses__homework__current_grade='-1/100'),
-                             distinct=True
-                         )
-                     )
-                     .values('id',
-                             'title',
-                             'overall_grade',
-                             'trend',
-                             'annotated_num_homework',
-                             'annotated_num_homework_completed',
-                             'annotated_num_homework_graded')
-                     .order_by('start_date', 'title'))
+                     .values('id', 'title', 'weight', 'color', 'average_grade', 'grade_by_weight', 'trend', 'course')
+                     .order_by('title')):
+        category = _new_grade_holder(category)
+        category['overall_grade'] = category.pop('average_grade')
+        category['grade_points'] = []
+        course = courses_by_id[category.pop('course')]
+        course['categories'].append(category)
+        if category['weight'] > 0:
+            course['has_weighted_grading'] = True
+        categories_by_id[category['id']] = category
+
+    # Homework is projected in its default (start, title) order, which each course's grade series is cumulative in
+    graded_by_course = {}
+    ungraded_by_course = {}
+    for pk, title, start, course_id, category_id, completed, current_grade, earned, possible in (
+            Homework.objects
+                    .for_user(user_id)
+                    .values_list('id', 'title', 'start', 'course_id', 'category_id', 'completed', 'current_grade',
+                                 'grade_earned', 'grade_possible')):
+        category = categories_by_id.get(category_id)
+        is_ungraded = earned is None and possible is not None
+        graded = completed and earned is not None
+
+        for holder in (courses_by_id[course_id], category):
+            if holder is not None:
+                holder['num_homework'] += 1
+                holder['num_homework_completed'] += completed
+                holder['num_homework_graded'] += graded
+
+        if graded:
+            graded_by_course.setdefault(course_id, []).append({'id': pk,
+                                                               'title': title,
+                                                               'category': category_id,
+                                                               'course': course_id,
+                                                               'weight': category['weight'] if category else None,
+                                                               'start': start,
+                                                               'grade_earned': earned,
+                                                               'grade_possible': possible})
+        elif is_ungraded:
+            ungraded_by_course.setdefault(course_id, []).append({'id': pk,
+                                                                 'title': title,
+                                                                 'start': start,
+                                                                 'course_id': course_id,
+                                                                 'category_id': category_id,
+                                                                 'current_grade': current_grade})
+
+    courses_by_course_group = {}
+    for course in courses:
+        courses_by_course_group.setdefault(course.pop('course_group'), []).append(course)
+
+        course['grade_points'] = get_grade_points_for(graded_by_course.get(course['id'], []),
+                                                      course['has_weighted_grading'])
+        for grade_point in course['grade_points']:
+            category = categories_by_id.get(grade_point[5])
+            if category is not None:
+                category['grade_points'].append(grade_point)
+
+        course['homework_series'] = _build_homework_series(
+            course['grade_points'],
+            course['has_weighted_grading'],
+            course['categories'],
+            ungraded_by_course.get(course['id'], [])
+        )
+
+        category_homework_series = {}
+        for item in course['homework_series']:
+            category_homework_series.setdefault(item['category_id'], []).append(item)
+
+        for category in course['categories']:
+            category['homework_series'] = category_homework_series.get(category['id'], [])
 
     for course_group in course_groups:
-        course_group['num_homework'] = course_group['annotated_num_homework']
-        course_group['num_homework_completed'] = course_group['annotated_num_homework_completed']
-        course_group['num_homework_graded'] = course_group['annotated_num_homework_graded']
-        # Remove the annotated_ prefixed keys
-        course_group.pop('annotated_num_homework')
-        course_group.pop('annotated_num_homework_completed')
-        course_group.pop('annotated_num_homework_graded')
-        course_group['grade_points'] = get_grade_points_for_course_group(course_group['id'])
-
-        # Annotate courses with homework counts and has_weighted_grading to avoid N+1 queries
-        course_group['courses'] = (Course.objects.for_user(user_id)
-                                   .for_course_group(course_group['id'])
-                                   .annotate(
-                                       annotated_num_homework=Count('homework', distinct=True),
-                                       annotated_num_homework_completed=Count(
-                                           'homework',
-                                           filter=Q(homework__completed=True),
-                                           distinct=True
-                                       ),
-                                       annotated_num_homework_graded=Count(
-                                           'homework',
-                                           filter=Q(homework__completed=True) & ~Q(homework__current_grade='-1/100'),
-                                           distinct=True
-                                       ),
-                                       annotated_has_weighted_grading=Exists(
-                                           Category.objects.filter(course_id=OuterRef('pk'), weight__gt=0)
-                                       )
-                                   )
-                                   .values('id',
-                                           'title',
-                                           'color',
-                                           'current_grade',
-                                           'trend',
-                                           'annotated_num_homework',
-                                           'annotated_num_homework_completed',
-                                           'annotated_num_homework_graded',
-                                           'annotated_has_weighted_grading')
-                                   .order_by('start_date', 'title'))
-        # Batch-fetch all ungraded homework for this group's courses in one query
-        # to avoid an N+1 when computing homework_series per course.
-        ungraded_by_course = {}
-        for hw in (Homework.objects
-                   .filter(course__course_group_id=course_group['id'],
-                           current_grade='-1/100')
-                   .order_by('start')
-                   .values('id', 'title', 'start', 'course_id', 'category_id', 'current_grade')):
-            ungraded_by_course.setdefault(hw['course_id'], []).append(hw)
-
-        # Batch grade points and categories for every course in one query each, rather than per course.
-        has_weighted_by_course = {course['id']: course['annotated_has_weighted_grading']
-                                  for course in course_group['courses']}
-        grade_points_by_course = get_grade_points_by_course_for_group(course_group['id'], has_weighted_by_course)
-
-        categories_by_course = {}
-        for category in (Category.objects.for_user(user_id)
-                         .filter(course__course_group_id=course_group['id'])
-                         .annotate(
-                             annotated_num_homework=Count('homework', distinct=True),
-                             annotated_num_homework_completed=Count(
-                                 'homework',
-                                 filter=Q(homework__completed=True),
-                                 distinct=True
-                             ),
-                             annotated_num_homework_graded=Count(
-                                 'homework',
-                                 filter=Q(homework__completed=True) & ~Q(homework__current_grade='-1/100'),
-                                 distinct=True
-                             )
-                         )
-                         .values('id', 'title', 'weight', 'color', 'average_grade', 'grade_by_weight', 'trend',
-                                 'course', 'annotated_num_homework', 'annotated_num_homework_completed',
-                                 'annotated_num_homework_graded')
-                         .order_by('title')):
-            categories_by_course.setdefault(category.pop('course'), []).append(category)
-
-        course_group_num_homework = 0
+        course_group['courses'] = courses_by_course_group.get(course_group['id'], [])
         for course in course_group['courses']:
-            course['overall_grade'] = course['current_grade']
-            course['num_homework'] = course['annotated_num_homework']
-            course_group_num_homework += course['num_homework']
-            course['num_homework_completed'] = course['annotated_num_homework_completed']
-            course['num_homework_graded'] = course['annotated_num_homework_graded']
-            course['has_weighted_grading'] = course['annotated_has_weighted_grading']
-            # Remove the annotated_ prefixed keys
-            course.pop('annotated_num_homework')
-            course.pop('annotated_num_homework_completed')
-            course.pop('annotated_num_homework_graded')
-            course.pop('annotated_has_weighted_grading')
-            course.pop('current_grade')
-            course['grade_points'] = grade_points_by_course.get(course['id'], [])
-
-            course['categories'] = categories_by_course.get(course['id'], [])
-
-            category_grade_points = {}
-            for grade_point in course['grade_points']:
-                category_id = grade_point[5]
-                if category_id not in category_grade_points:
-                    category_grade_points[category_id] = []
-
-                category_grade_points[category_id].append(grade_point)
-
-            for category in course['categories']:
-                category['overall_grade'] = category['average_grade']
-                category['num_homework'] = category['annotated_num_homework']
-                category['num_homework_completed'] = category['annotated_num_homework_completed']
-                category['num_homework_graded'] = category['annotated_num_homework_graded']
-                # Remove the annotated_ prefixed keys
-                category.pop('annotated_num_homework')
-                category.pop('annotated_num_homework_completed')
-                category.pop('annotated_num_homework_graded')
-                category.pop('average_grade')
-                category['grade_points'] = category_grade_points.get(category['id'], [])
-
-            course['homework_series'] = _build_homework_series(
-                course['grade_points'],
-                course['has_weighted_grading'],
-                list(course['categories']),
-                ungraded_by_course.get(course['id'], [])
-            )
-
-            category_homework_series = {}
-            for item in course['homework_series']:
-                category_homework_series.setdefault(item['category_id'], []).append(item)
-
-            for category in course['categories']:
-                category['homework_series'] = category_homework_series.get(category['id'], [])
-
-        course_group['num_homework'] = course_group_num_homework
+            course_group['num_homework'] += course['num_homework']
+            course_group['num_homework_completed'] += course['num_homework_completed']
+            course_group['num_homework_graded'] += course['num_homework_graded']
+
+        course_group['grade_points'] = _get_course_group_grade_points(
+            [course['grade_points'] for course in course_group['courses']])
         course_group['homework_series'] = _build_course_group_homework_series(course_group['courses'])
 
     return {
@@ -402,7 +401,7 @@ def _build_course_group_homework_series(courses):
     """
     Build course_group-level homework_series by merging per-course series and averaging
     cumulative_grade across courses at each graded point. Parallels
-    get_grade_points_for_course_group() logic.
+    _get_course_group_grade_points() logic.
 
     Ungraded items pass through with cumulative_grade=None and no averaging.
     """
@@ -417,16 +416,10 @@ def _build_course_group_homework_series(courses):
 
     all_graded = sorted(all_graded, key=lambda x: x['start'])
 
-    course_grades = {}
+    average_grade = _RunningAverageGrade()
     series = []
     for item in all_graded:
-        course_id = item['course_id']
-        if course_id not in course_grades:
-            course_grades[course_id] = []
-        course_grades[course_id].append(item['cumulative_grade'])
-
-        total = sum(grades[-1] for grades in course_grades.values())
-        overall_grade = round(total / len(course_grades), 4)
+        overall_grade = average_grade.update(item['course_id'], item['cumulative_grade'])
         series.append({
             'id': item['id'],
             'title': item['title'],
@@ -456,11 +449,15 @@ def recalculate_course_group_grade(course_group_id):
     logger.debug(f'Course Group {course_group_id} trend recalculated to {trend}')
 
     # Update the values in the datastore, circumventing signals
-    CourseGroup.objects.filter(pk=course_group_id).update(overall_grade=overall_grade, trend=trend)
+    CourseGroup.objects.filter(pk=course_group_id).update(overall_grade=overall_grade, trend=trend,
+                                                          **_get_series_aggregates(grade_points))
 
 
 def recalculate_course_grade(course_id):
-    grade_points = [(points[1] / 100) for points in get_grade_points_for_course(course_id) if points]
+    grade_series, total_earned, total_possible = _get_grade_series(
+        _graded_grade_point_values(Homework.objects.for_course(course_id)),
+        Course.objects.has_weighted_grading(course_id))
+    grade_points = [(points[1] / 100) for points in grade_series if points]
     current_grade = grade_points[-1] * 100 if len(grade_points) > 0 else -1
     trend = commonutils.calculate_trend(range(len(grade_points)), grade_points)
 
@@ -469,43 +466,32 @@ def recalculate_course_grade(course_id):
     logger.debug(f'Course {course_id} trend recalculated to {trend}')
 
     # Update the values in the datastore, circumventing signals
-    Course.objects.filter(pk=course_id).update(current_grade=current_grade, trend=trend)
+    Course.objects.filter(pk=course_id).update(current_grade=current_grade, trend=trend,
+                                               grade_total_earned=total_earned, grade_total_possible=total_possible,
+                                               **_get_series_aggregates(grade_points))
 
-    # Also recalculate category weight breakdown
-    category_totals = {}
-    for category_id, grade, weight in (Homework.objects
+    # Also recalculate category weight breakdown, with each weighted category's totals summed in the database
+    weighted_category_ids = []
+    whens = []
+    for category_id, weight, total_earned, total_possible in (Homework.objects
             .for_course(course_id)
             .graded()
-            .values_list('category_id',
-                         'current_grade',
-                         'category__weight')):
-        earned, possible = grade.split('/')
-        earned = float(earned)
-        possible = float(possible)
-        if possible <= 0:
-            logger.warning(f'Skipping Homework in category {category_id} with non-positive denominator in current_grade')
-            continue
-
-        if category_id not in category_totals:
-            category_totals[category_id] = {'weight': weight, 'total_earned': 0, 'total_possible': 0}
-
-        category_totals[category_id]['total_earned'] += earned
-        category_totals[category_id]['total_possible'] += possible
-
-    whens = []
-    for category_id, totals in category_totals.items():
-        if totals['weight']:
-            grade_by_weight = (((totals['total_earned'] / totals['total_possible']) * (
-                    float(totals['weight']) / 100)) * 100)
+            .filter(grade_possible__gt=0, category__weight__gt=0)
+            .order_by()
+            .values('category_id', 'category__weight')
+            .annotate(total_earned=Sum('grade_earned'), total_possible=Sum('grade_possible'))
+            .values_list('category_id', 'category__weight', 'total_earned', 'total_possible')):
+        grade_by_weight = (((total_earned / total_possible) * (float(weight) / 100)) * 100)
 
-            logger.debug(f'Course triggered category {category_id} '
-                         f'recalculation of grade_by_weight to {grade_by_weight}')
+        logger.debug(f'Course triggered category {category_id} '
+                     f'recalculation of grade_by_weight to {grade_by_weight}')
 
-            whens.append(When(pk=category_id, then=Value(grade_by_weight, output_field=FloatField())))
+        weighted_category_ids.append(category_id)
+        whens.append(When(pk=category_id, then=Value(grade_by_weight, output_field=FloatField())))
 
     if whens:
         Category.objects.filter(
-            pk__in=[cid for cid, t in category_totals.items() if t['weight']]
+            pk__in=weighted_category_ids
         ).update(grade_by_weight=Case(*whens, output_field=FloatField()))
 
     Category.objects.for_course(course_id).filter(weight=0).update(grade_by_weight=0)
@@ -515,13 +501,11 @@ def recalculate_category_grade(category_id):
     total_earned = 0
     total_possible = 0
     grades = []
-    for pk, grade in Homework.objects.for_category(category_id).graded().values_list('pk', 'current_grade'):
-        earned, possible = grade.split('/')
-        earned = float(earned)
-        possible = float(possible)
-        if possible <= 0:
-            logger.warning(f'Skipping Homework {pk} with non-positive denominator in current_grade')
-            continue
+    for earned, possible in (Homework.objects
+                             .for_category(category_id)
+                             .graded()
+                             .filter(grade_possible__gt=0)
+                             .values_list('grade_earned', 'grade_possible')):
         total_earned += earned
         total_possible += possible
         grades.append(total_earned / total_possible)
@@ -533,4 +517,327 @@ def recalculate_category_grade(category_id):
     logger.debug(f'Category {category_id} trend recalculated to {trend}')
 
     # Update the values in the datastore, circumventing signals
-    Category.objects.filter(pk=category_id).update(average_grade=average_grade, trend=trend)
+    Category.objects.filter(pk=category_id).update(average_grade=average_grade, trend=trend,
+                                                   grade_total_earned=total_earned, grade_total_possible=total_possible,
+                                                   **_get_series_aggregates(grades))
+
+
+# Categories, courses and course groups keep running aggregates of their grade series: the number of points, their sum
+# and position-weighted sum (all the trend's regression needs) and, for categories and courses, the totals earned and
+# possible. They're set by a full recalculation, after which a change to the latest graded homework is applied to them
+# as a delta by apply_homework_grade_change; until then, `grade_count` is None
+def _get_series_aggregates(grade_points):
+    series_sum = 0
+    series_weighted_sum = 0
+    for i, point in enumerate(grade_points):
+        series_sum += point
+        series_weighted_sum += i * point
+
+    return {'grade_count': len(grade_points),
+            'grade_series_sum': series_sum,
+            'grade_series_weighted_sum': series_weighted_sum}
+
+
+def _pop_grade_point(entity, point):
+    entity.grade_count -= 1
+    if entity.grade_count:
+        entity.grade_series_sum -= point
+        entity.grade_series_weighted_sum -= entity.grade_count * point
+    else:
+        entity.grade_series_sum = 0
+        entity.grade_series_weighted_sum = 0
+
+
+def _push_grade_point(entity, point):
+    entity.grade_series_sum += point
+    entity.grade_series_weighted_sum += entity.grade_count * point
+    entity.grade_count += 1
+
+
+def _get_trend(entity):
+    return commonutils.calculate_trend_from_sums(entity.grade_count, entity.grade_series_sum,
+                                                 entity.grade_series_weighted_sum)
+
+
+def _get_grade_contribution(grade_state):
+    if grade_state is None or not grade_state['completed'] or grade_state['grade_earned'] is None or \
+            grade_state['grade_possible'] <= 0:
+        return None
+
+    return grade_state['grade_earned'], grade_state['grade_possible']
+
+
+def _get_course_grade_contribution(contribution, weight, has_weighted_grading):
+    if contribution is None or not has_weighted_grading:
+        return contribution
+
+    # If no weight present, this category is ungraded
+    if not weight:
+        return None
+
+    earned, possible = contribution
+    return ((earned / possible) * (float(weight) / 100)) * 100, float(weight)
+
+
+def _apply_contribution(entity, old, new):
+    if old:
+        entity.grade_total_earned -= old[0]
+        entity.grade_total_possible -= old[1]
+    if new:
+        entity.grade_total_earned += new[0]
+        entity.grade_total_possible += new[1]
+    elif not entity.grade_count:
+        entity.grade_total_earned = 0
+        entity.grade_total_possible = 0
+
+
+def _get_course_group_grade_point(course_group_id, course):
+    current_grades = [float(grade) for grade in (Course.objects
+                                                 .for_course_group(course_group_id)
+                                                 .exclude(pk=course.pk)
+                                                 .filter(current_grade__gte=0)
+                                                 .values_list('current_grade', flat=True))]
+    if course.grade_count:
+        current_grades.append(float(course.current_grade))
+
+    return round(sum(current_grades) / len(current_grades), 4) / 100 if current_grades else None
+
+
+def apply_homework_grade_change(homework, old_grade_state, deleted=False):
+    """
+    Apply a change to a single homework's grade to the running aggregates of its category, course and course group,
+    rather than recalculating them from every graded homework.
+
+    Each grade series is cumulative in due order, so a change can only be applied this way if the homework is (and
+    was) the latest graded homework in its course group, or if it doesn't change the series at all. Otherwise, or if
+    the aggregates have not yet been set by a full recalculation, nothing is applied, and the caller should fall back
+    to `recalculate_category_grade`.
+
+    :param homework: The homework, as saved or deleted.
+    :param old_grade_state: The homework's grade state (see `Homework.get_grade_state`) before the change, or None
+        if it was just created.
+    :param deleted: True if the homework was deleted.
+    :return: True if the change has been applied, False if a full recalculation is needed.
+    """
+    new_grade_state = None if deleted else homework.get_grade_state()
+
+    if old_grade_state and old_grade_state['category_id'] != homework.category_id:
+        return False
+
+    old = _get_grade_contribution(old_grade_state)
+    new = _get_grade_contribution(new_grade_state)
+
+    if old is None and new is None:
+        return True
+
+    if old is not None and new_grade_state and (old_grade_state['start'] != new_grade_state['start'] or
+                                                old_grade_state['title'] != new_grade_state['title']):
+        return False
+
+    if old == new:
+        return True
+
+    with transaction.atomic():
+        try:
+            category = Category.objects.select_for_update().get(pk=homework.category_id)
+            course = Course.objects.select_for_update().get(pk=category.course_id)
+            course_group = CourseGroup.objects.select_for_update().get(pk=course.course_group_id)
+        except ObjectDoesNotExist:
+            return False
+
+        if None in (category.grade_count, course.grade_count, course_group.grade_count):
+            return False
+
+        if (Homework.objects
+                .for_course_group(course_group.pk)
+                .graded()
+                .exclude(pk=homework.pk)
+                .filter(Q(start__gt=homework.start) | Q(start=homework.start, title__gte=homework.title))
+                .exists()):
+            return False
+
+        # The category's series is of its cumulative grade, the last point of which is its average
+        if old:
+            _pop_grade_point(category, category.grade_total_earned / category.grade_total_possible)
+        _apply_contribution(category, old, new)
+        if new:
+            _push_grade_point(category, category.grade_total_earned / category.grade_total_possible)
+
+        # The course's series is of its cumulative (possibly weighted) grade, rounded, the last point of which is its
+        # current grade
+        has_weighted_grading = Course.objects.has_weighted_grading(course.pk)
+        course_old = _get_course_grade_contribution(old, category.weight, has_weighted_grading)
+        course_new = _get_course_grade_contribution(new, category.weight, has_weighted_grading)
+
+        # The course group's series is of the average of the latest grade of each course with one
+        old_course_group_point = _get_course_group_grade_point(course_group.pk, course)
+
+        if course_old:
+            _pop_grade_point(course, float(course.current_grade) / 100)
+        _apply_contribution(course, course_old, course_new)
+        if course_new:
+            _push_grade_point(course, round((course.grade_total_earned / course.grade_total_possible * 100), 4) / 100)
+        course.current_grade = (round((course.grade_total_earned / course.grade_total_possible * 100), 4)
+                                if course.grade_count else -1)
+
+        if course_old:
+            _pop_grade_point(course_group, old_course_group_point)
+        new_course_group_point = _get_course_group_grade_point(course_group.pk, course)
+        if course_new:
+            _push_grade_point(course_group, new_course_group_point)
+
+        average_grade = (category.grade_total_earned / category.grade_total_possible) * 100 \
+            if category.grade_total_possible > 0 else -1
+        category_values = {'average_grade': average_grade,
+                           'trend': _get_trend(category),
+                           'grade_count': category.grade_count,
+                           'grade_total_earned': category.grade_total_earned,
+                           'grade_total_possible': category.grade_total_possible,
+                           'grade_series_sum': category.grade_series_sum,
+                           'grade_series_weighted_sum': category.grade_series_weighted_sum}
+        if not category.weight:
+            category_values['grade_by_weight'] = 0
+        elif category.grade_total_possible > 0:
+            category_values['grade_by_weight'] = (((category.grade_total_earned / category.grade_total_possible) * (
+                float(category.weight) / 100)) * 100)
+
+        logger.debug(f'Category {category.pk} average grade updated to {average_grade} with '
+                     f'{category.grade_count} homework, course {course.pk} current grade updated to '
+                     f'{course.current_grade}')
+
+        # Update the values in the datastore, circumventing signals
+        Category.objects.filter(pk=category.pk).update(**category_values)
+        Course.objects.filter(pk=course.pk).update(current_grade=course.current_grade,
+                                                   trend=_get_trend(course),
+                                                   grade_count=course.grade_count,
+                                                   grade_total_earned=course.grade_total_earned,
+                                                   grade_total_possible=course.grade_total_possible,
+                                                   grade_series_sum=course.grade_series_sum,
+                                                   grade_series_weighted_sum=course.grade_series_weighted_sum)
+        CourseGroup.objects.filter(pk=course_group.pk).update(
+            overall_grade=new_course_group_point * 100 if new_course_group_point is not None else -1,
+            trend=_get_trend(course_group),
+            grade_count=course_group.grade_count,
+            grade_series_sum=course_group.grade_series_sum,
+            grade_series_weighted_sum=course_group.grade_series_weighted_sum)
+
+    return True
+
+
+def _get_pending_prefix(user_id):
+    return f"users:{user_id}:grades:pending:"
+
+
+def _get_pending_queued_key(user_id):
+    return f"users:{user_id}:grades:queued"
+
+
+def _get_pending_scheduled_key(user_id):
+    return f"users:{user_id}:grades:scheduled"
+
+
+def has_pending_grade_recalculations(user_id):
+    return bool(cache.get(_get_pending_queued_key(user_id)))
+
+
+def queue_grade_recalculation(user_id, category_ids=(), course_ids=(), course_group_ids=()):
+    """
+    Mark the given categories, courses and course groups as needing their grades recalculated. Marks are coalesced
+    per user, and recalculated once, by a task run ``GRADE_RECALCULATION_DEBOUNCE_SECONDS`` after the first of them,
+    so a burst of changes (for instance, marking many homework completed) recalculates each entity only once. The task
+    is only considered scheduled for ``GRADE_RECALCULATION_SCHEDULED_TTL_SECONDS``, so if it's lost (for instance, to
+    a worker restart), the next change schedules another.
+
+    A recalculated category also recalculates its course, and a recalculated course its course group.
+
+    :param user_id: The user the entities belong to.
+    :param category_ids: The categories to recalculate.
+    :param course_ids: The courses to recalculate.
+    :param course_group_ids: The course groups to recalculate.
+    """
+    prefix = _get_pending_prefix(user_id)
+
+    pending = {}
+    for kind, ids in (('category', category_ids), ('course', course_ids), ('coursegroup', course_group_ids)):
+        for pk in ids:
+            pending[f"{prefix}{kind}:{pk}"] = True
+    if not pending:
+        return
+
+    pending[_get_pending_queued_key(user_id)] = True
+    cache.set_many(pending, settings.GRADE_RECALCULATION_PENDING_TTL_SECONDS)
+
+    scheduled = cache.add(_get_pending_scheduled_key(user_id), True,
+                          settings.GRADE_RECALCULATION_SCHEDULED_TTL_SECONDS)
+    if scheduled is None:
+        # The cache is unavailable, so rather than lose the marks, recalculate now
+        recalculate_grades(category_ids, course_ids, course_group_ids)
+    elif scheduled:
+        from helium.planner.tasks import recalculate_pending_grades
+
+        taskutils.safe_apply_async(recalculate_pending_grades, args=(user_id,),
+                                   countdown=settings.GRADE_RECALCULATION_DEBOUNCE_SECONDS,
+                                   priority=settings.CELERY_PRIORITY_LOW, critical=True)
+
+
+def pop_pending_grade_recalculations(user_id):
+    """
+    Take the user's queued grade recalculations, so any queued after this schedule another run.
+
+    :param user_id: The user whose queued recalculations to take.
+    :return: A tuple of the lists of category, course and course group IDs queued.
+    """
+    cache.delete_many([_get_pending_queued_key(user_id), _get_pending_scheduled_key(user_id)])
+
+    prefix = _get_pending_prefix(user_id)
+    keys = cache.keys(prefix + "*")
+    cache.delete_many(keys)
+
+    pending = {'category': [], 'course': [], 'coursegroup': []}
+    for key in keys:
+        kind, pk = key[len(prefix):].split(':')
+        pending[kind].append(int(pk))
+
+    return pending['category'], pending['course'], pending['coursegroup']
+
+
+def recalculate_grades(category_ids=(), course_ids=(), course_group_ids=()):
+    """
+    Recalculate the grades of the given categories, then of their courses and the given courses, then of their course
+    groups and the given course groups, each only once.
+
+    :return: The number of entities recalculated.
+    """
+    course_ids = set(course_ids)
+    course_group_ids = set(course_group_ids)
+
+    for category_id in category_ids:
+        recalculate_category_grade(category_id)
+    course_ids.update(Category.objects.filter(pk__in=category_ids).values_list('course_id', flat=True))
+
+    for course_id in course_ids:
+        recalculate_course_grade(course_id)
+    course_group_ids.update(Course.objects.filter(pk__in=course_ids).values_list('course_group_id', flat=True))
+
+    for course_group_id in course_group_ids:
+        recalculate_course_group_grade(course_group_id)
+
+    return len(category_ids) + len(course_ids) + len(course_group_ids)
+
+
+def recalculate_pending_grades(user_id):
+    """
+    If the user has grade recalculations queued, run them now, rather than waiting for the queued task, so a read
+    following a change sees its effect on grades.
+
+    :param user_id: The user whose queued recalculations to run.
+    :return: True if any recalculations were queued (and so have been run), False otherwise.
+    """
+    if not has_pending_grade_recalculations(user_id):
+        return False
+
+    metricutils.increment('grade.recalculate.pending.inline')
+
+    recalculate_grades(*pop_pending_grade_recalculations(user_id))
+
+    return True
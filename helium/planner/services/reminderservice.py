@@ -1,12 +1,19 @@
+import functools
 import logging
+import operator
+import time
 from datetime import timedelta
 from zoneinfo import ZoneInfo
 
+from celery import group
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import Mod
 from django.utils import timezone
 
 from helium.common import enums
-from helium.common.tasks import send_pushes
+from helium.common.tasks import send_push_batch
 from helium.common.utils.commonutils import format_short_time
 from helium.common.utils import metricutils, taskutils
 from helium.planner.models import Reminder
@@ -14,6 +21,12 @@ from helium.planner.serializers.reminderserializer import ReminderExtendedSerial
 
 logger = logging.getLogger(__name__)
 
+# The fields that identify a repeating course reminder series
+_SERIES_FIELDS = ('course_id', 'user_id', 'type', 'offset', 'offset_type')
+
+# Broken series are loaded this many at a time, bounding the number of series OR'd into any one query
+_HEAL_BATCH_SIZE = 500
+
 
 def _push_body(reminder):
     if reminder.homework:
@@ -52,81 +65,102 @@ def get_subject(reminder):
     return subject
 
 
+def _get_series_filter(series):
+    return Q(**dict(zip(_SERIES_FIELDS, series)))
+
+
+def _get_series(reminder):
+    return tuple(getattr(reminder, field) for field in _SERIES_FIELDS)
+
+
+def _get_template_order(reminder):
+    # A series' template is its latest reminder by start_of_range (nulls sorting first), ties going to the newest
+    return reminder.start_of_range.timestamp() if reminder.start_of_range else float('-inf'), reminder.pk
+
+
 def heal_orphaned_repeating_reminders(user_id=None):
     """
-    Periodic maintenance for repeating course reminder series.
+    Periodic maintenance for repeating course reminder series, reconciled as a set rather than series by series.
 
-    Phase 1 — collect series state and build delete list: for each series, examine the unsent
-    undismissed reminder (at most one per series). If it is stale (start_of_range past the send
-    window), mark it for deletion. Sent reminders are intentionally past their window and are
-    never touched here. Templates for series that will have no active unsent reminder after
-    cleanup are collected before any deletions occur.
+    Phase 1 — classify: a single grouped query finds every series without a live reminder (unsent, undismissed and
+    not yet past the send window). Those are the series whose unsent reminder is stale, and those with none at all.
+    Healthy series are never loaded, so the rest of the work scales with the number of broken series. Sent reminders
+    are intentionally past their window and are never touched here. The template for each broken series (its latest
+    reminder) is loaded before anything is deleted.
 
-    Phase 2 — delete stale unsent reminders.
+    Phase 2 — delete every stale unsent reminder in a single statement.
 
-    Phase 3 — recreate missing successors: any series that ends up with no active
-    (unsent + undismissed) reminder gets a new occurrence created using the template
-    collected in phase 1.
+    Phase 3 — recreate missing successors: each broken series (that hasn't since regained an active reminder, for
+    instance from a concurrent worker) gets its next occurrence built from its template, and all are created with
+    one bulk insert. A successor a concurrent worker creates between the check and the insert is left in place, rather
+    than failing the insert for every other series.
 
     :param user_id: Optional user ID to scope the operation to a single user. When None (default),
         operates globally across all users.
+    :return: The number of successors built (some of which may have been skipped as a concurrent worker's conflict).
     """
     now = timezone.now()
     window_start = now - timedelta(minutes=settings.REMINDER_SEND_WINDOW_MINUTES)
 
-    base_filter = {'course__isnull': False}
+    course_reminders = Reminder.objects.filter(course__isnull=False)
     if user_id is not None:
-        base_filter['user'] = user_id
-
-    all_series = list(
-        Reminder.objects
-        .filter(**base_filter)
-        .values('course', 'user', 'type', 'offset', 'offset_type')
-        .distinct()
-    )
-
-    to_delete_pks = []
-    successor_templates = []
+        course_reminders = course_reminders.filter(user_id=user_id)
+
+    active = Q(sent=False, dismissed=False)
+    stale = active & (Q(start_of_range__isnull=True) | Q(start_of_range__lte=window_start))
+
+    broken_series = list(course_reminders
+                         .order_by()
+                         .values(*_SERIES_FIELDS)
+                         .annotate(num_live=Count('pk', filter=active & Q(start_of_range__gt=window_start)))
+                         .filter(num_live=0)
+                         .values_list(*_SERIES_FIELDS))
+    metricutils.gauge('reminder.watchdog.broken-series', len(broken_series))
+    if not broken_series:
+        return 0
+
+    batches = [broken_series[i:i + _HEAL_BATCH_SIZE] for i in range(0, len(broken_series), _HEAL_BATCH_SIZE)]
+
+    templates = {}
+    for batch in batches:
+        for reminder in (course_reminders
+                         .filter(functools.reduce(operator.or_, map(_get_series_filter, batch)))
+                         .select_related('user', 'course', 'course__course_group__user__settings')):
+            series = _get_series(reminder)
+            if series not in templates or _get_template_order(reminder) > _get_template_order(templates[series]):
+                templates[series] = reminder
+
+    deleted, _ = course_reminders.filter(stale).delete()
+    if deleted:
+        logger.info(f'Deleted {deleted} stale reminder(s)')
+
+    successors = []
+    for batch in batches:
+        # A concurrent worker may have created a successor since the series were classified
+        recovered = set(course_reminders
+                        .filter(active)
+                        .filter(functools.reduce(operator.or_, map(_get_series_filter, batch)))
+                        .values_list(*_SERIES_FIELDS))
+
+        for series in batch:
+            # The series' reminders may also have been deleted since, leaving nothing to heal it from
+            template = templates.get(series)
+            if series in recovered or template is None:
+                continue
+            try:
+                successor = _build_next_repeating_reminder(template)
+            except Exception:
+                logger.error("An error occurred healing orphaned repeating reminder.", exc_info=True)
+                continue
+            if successor:
+                logger.info(
+                    f'Healing orphaned repeating reminder series for course {template.course_id}, '
+                    f'user {template.user_id}')
+                successors.append(successor)
 
-    for combo in all_series:
-        unsent = (
-            Reminder.objects
-            .filter(dismissed=False, sent=False, **combo)
-            .first()
-        )
+    _bulk_create_successors(successors)
 
-        stale = unsent and (unsent.start_of_range is None or unsent.start_of_range <= window_start)
-
-        if stale:
-            to_delete_pks.append(unsent.pk)
-
-        if stale or not unsent:
-            template = (
-                Reminder.objects
-                .filter(**combo)
-                .select_related('user', 'user__settings', 'course', 'course__course_group')
-                .prefetch_related('course__schedules')
-                .order_by('-start_of_range')
-                .first()
-            )
-            if template:
-                successor_templates.append(template)
-
-    if to_delete_pks:
-        logger.info(f'Deleting {len(to_delete_pks)} stale reminder(s)')
-        Reminder.objects.filter(pk__in=to_delete_pks).delete()
-
-    for reminder in successor_templates:
-        series_filter = dict(course=reminder.course, user=reminder.user, type=reminder.type,
-                             offset=reminder.offset, offset_type=reminder.offset_type)
-        if Reminder.objects.filter(sent=False, dismissed=False, **series_filter).exists():
-            continue
-        try:
-            logger.info(
-                f'Healing orphaned repeating reminder series for course {reminder.course_id}, user {reminder.user_id}')
-            create_next_repeating_reminder(reminder)
-        except Exception:
-            logger.error("An error occurred healing orphaned repeating reminder.", exc_info=True)
+    return len(successors)
 
 
 def clone_reminders(source, target):
@@ -178,6 +212,19 @@ def create_next_repeating_reminder(reminder):
     if Reminder.objects.filter(sent=False, dismissed=False, **series_filter).exclude(pk=reminder.pk).exists():
         return None
 
+    new_reminder = _build_next_repeating_reminder(reminder)
+    if new_reminder:
+        new_reminder.save()
+
+    return new_reminder
+
+
+def _build_next_repeating_reminder(reminder):
+    """
+    Build (but don't save) the occurrence of the given repeating reminder's series that follows it.
+
+    :return: The unsaved reminder, or None if the course has no class after the one the given reminder is for.
+    """
     # Compute the start time of the class that just fired so we skip it when searching.
     offset_delta = timedelta(**{enums.REMINDER_OFFSET_TYPE_CHOICES[reminder.offset_type][1]: int(reminder.offset)})
     fired_class_start = reminder.start_of_range + offset_delta if reminder.start_of_range else None
@@ -197,158 +244,279 @@ def create_next_repeating_reminder(reminder):
     next_start = new_reminder._get_next_course_occurrence_start(after_datetime=fired_class_start)
     if next_start:
         new_reminder.start_of_range = next_start - offset_delta
-        new_reminder.save()
         return new_reminder
 
     return None
 
 
-def _delete_excess_past_reminders(just_fired):
+def _delete_excess_past_reminders(fired):
     """
-    After a repeating course reminder fires, delete any other sent+undismissed reminders for
-    the same course/user/type. Only the reminder that just fired is kept as the single past
-    record visible in notifications. Intentionally does not filter by offset/offset_type so
-    that stale reminders from a previous offset (e.g. after a reminder edit) are also cleaned up.
+    After repeating course reminders fire, delete any other sent+undismissed reminders for the same course/user/type,
+    in a single statement. Only the latest reminder to fire for each is kept as the single past record visible in
+    notifications. Intentionally does not filter by offset/offset_type so that stale reminders from a previous offset
+    (e.g. after a reminder edit) are also cleaned up.
     """
-    Reminder.objects.filter(
-        course=just_fired.course,
-        user=just_fired.user,
-        type=just_fired.type,
-        sent=True,
-        dismissed=False,
-    ).exclude(pk=just_fired.pk).delete()
+    keep = {}
+    for reminder in fired:
+        keep[(reminder.course_id, reminder.user_id, reminder.type)] = reminder.pk
 
+    (Reminder.objects
+     .filter(functools.reduce(operator.or_, (Q(course_id=course_id, user_id=user_id, type=type)
+                                   for course_id, user_id, type in keep)),
+             sent=True,
+             dismissed=False)
+     .exclude(pk__in=keep.values())
+     .delete())
 
-def process_email_reminders():
-    from helium.planner.tasks import send_email_reminder
 
-    rate_per_sec = settings.EMAIL_SEND_RATE_PER_SEC
-    queued_count = 0
+def _bulk_create_successors(successors):
+    """
+    Create the given successor reminders with a single bulk insert. A series given an active reminder since its
+    successor was built (by a concurrent processor, the watchdog or ``adjust_reminder_times``) would violate
+    ``reminder_one_active_per_course_series``, so those conflicting rows are skipped, keeping the concurrent worker's
+    reminder, rather than failing the insert for every other series.
+    """
+    Reminder.objects.bulk_create(successors, ignore_conflicts=True)
 
-    for reminder in (Reminder.objects
-                     .with_type(enums.EMAIL)
-                     .unsent()
-                     .for_today()
-                     .select_related('user', 'user__settings', 'homework', 'homework__course', 'event',
-                                     'course', 'course__course_group')
-                     .prefetch_related('course__schedules')
-                     .iterator(chunk_size=2000)):
-        user = reminder.get_user()
 
-        timezone.activate(ZoneInfo(user.settings.time_zone))
+def _create_next_repeating_reminders(fired, label):
+    """
+    Create the next occurrence for each series of the given fired repeating course reminders with a single bulk
+    insert. Series that already have an active (unsent + undismissed) reminder, for instance from a concurrent worker,
+    are found with one query and skipped.
+    """
+    active_series = set(Reminder.objects
+                        .filter(sent=False, dismissed=False)
+                        .filter(functools.reduce(operator.or_, (_get_series_filter(_get_series(r)) for r in fired)))
+                        .values_list(*_SERIES_FIELDS))
+
+    successors = {}
+    for reminder in fired:
+        series = _get_series(reminder)
+        if series in active_series or series in successors:
+            continue
 
         try:
-            if user.email and user.is_active:
-                subject = get_subject(reminder)
-
-                if not subject:
-                    logger.warning(f'Reminder {reminder.pk} was not processed, as it appears to be orphaned.')
-                else:
-                    if reminder.event:
-                        calendar_item_id = reminder.event.pk
-                        calendar_item_type = enums.EVENT
-                    elif reminder.homework:
-                        calendar_item_id = reminder.homework.pk
-                        calendar_item_type = enums.HOMEWORK
-                    elif reminder.course:
-                        calendar_item_id = reminder.course.pk
-                        calendar_item_type = enums.COURSE
-                    else:
-                        logger.warning(f'Reminder {reminder.pk} was not for a homework, event, or course. Nothing to do.')
-                        continue
-
-                    logger.info(f'Sending email reminder {reminder.pk} for user {user.pk}')
-
-                    metricutils.increment('task', user=user, extra_tags=['name:reminder.queue.email'])
-
-                    taskutils.safe_apply_async(send_email_reminder,
-                        args=(user.email, subject, reminder.pk, calendar_item_id, calendar_item_type),
-                        countdown=queued_count / rate_per_sec,
-                        priority=settings.CELERY_PRIORITY_HIGH,
-                    )
-                    queued_count += 1
-            else:
-                logger.warning(
-                    f'Reminder {reminder.pk} was not processed, as the account appears to be inactive for user {user.pk}')
-
-            if not Reminder.objects.filter(pk=reminder.pk, sent=False).update(sent=True):
-                continue
-            reminder.sent = True
+            successor = _build_next_repeating_reminder(reminder)
         except Exception:
-            logger.error("An error occurred processing email reminder.", exc_info=True)
+            logger.error(f"An error occurred creating next repeating {label} reminder.", exc_info=True)
             continue
 
-        if reminder.course_id:
-            _delete_excess_past_reminders(reminder)
-            try:
-                new_reminder = create_next_repeating_reminder(reminder)
-                if new_reminder is None:
-                    logger.info(
-                        f'No next occurrence for repeating email reminder series (course ended): '
-                        f'course={reminder.course_id}, user={reminder.user_id}')
-            except Exception:
-                logger.error("An error occurred creating next repeating email reminder.", exc_info=True)
+        if successor is None:
+            logger.info(
+                f'No next occurrence for repeating {label} reminder series (course ended): '
+                f'course={reminder.course_id}, user={reminder.user_id}')
+        else:
+            successors[series] = successor
 
-        timezone.deactivate()
+    _bulk_create_successors(successors.values())
 
 
-def process_push_reminders(mark_sent_only=False):
-    for reminder in (Reminder.objects
-                     .with_type(enums.PUSH)
-                     .unsent()
-                     .for_today()
-                     .select_related('user', 'user__settings', 'homework', 'homework__course', 'event',
-                                     'course', 'course__course_group')
-                     .prefetch_related('course__schedules', 'user__push_tokens')
-                     .iterator(chunk_size=2000)):
-        user = reminder.get_user()
+def _iter_due_reminder_batches(queryset):
+    batch = []
+    for reminder in queryset.iterator(chunk_size=settings.REMINDER_PROCESS_BATCH_SIZE):
+        batch.append(reminder)
+        if len(batch) == settings.REMINDER_PROCESS_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-        timezone.activate(ZoneInfo(user.settings.time_zone))
 
-        try:
-            if not mark_sent_only:
-                subject = get_subject(reminder)
-
-                if not subject:
-                    logger.info(f'Reminder {reminder.pk} was not processed, as it appears to be orphaned')
-                else:
-                    logger.info(f'Sending pushes for reminder {reminder.pk} for user {user.pk}')
-
-                    push_tokens = list({t.device_id: t.token for t in user.push_tokens.all()}.values())
-
-                    if len(push_tokens) > 0:
-                        metricutils.increment('task', value=len(push_tokens), user=reminder.user,
-                                              extra_tags=['name:reminder.queue.push'])
-
-                        serializer = ReminderExtendedSerializer(reminder)
-                        reminder_data = serializer.data
-
-                        taskutils.safe_apply_async(send_pushes,
-                            args=(push_tokens, user.username, subject, _push_body(reminder), reminder_data),
-                            priority=settings.CELERY_PRIORITY_HIGH,
-                        )
-                    else:
-                        logger.info(
-                            f'Reminder {reminder.pk} was not pushed, as there are no active push tokens for user {user.pk}')
-            else:
-                logger.info(f"Marking reminder {reminder.pk} as sent without performing other actions")
-
-            if not Reminder.objects.filter(pk=reminder.pk, sent=False).update(sent=True):
-                continue
+def _for_shard(queryset, shard, num_shards):
+    """
+    Partition reminders by user, so all of a user's reminders (and so every reminder a fired one's cleanup or successor
+    could touch) are processed by the same shard.
+    """
+    return queryset.annotate(shard=Mod('user_id', num_shards)).filter(shard=shard)
+
+
+def _claim_reminders(reminders):
+    """
+    Claim the given reminders for this worker by marking them as sent in a single statement. The rows are locked
+    first, skipping any a concurrent worker holds, so the update claims exactly the reminders that were still unsent.
+
+    :return: The reminders that were claimed.
+    """
+    with transaction.atomic():
+        claimed = set(Reminder.objects
+                      .select_for_update(skip_locked=True)
+                      .filter(pk__in=[reminder.pk for reminder in reminders], sent=False)
+                      .values_list('pk', flat=True))
+        if claimed:
+            Reminder.objects.filter(pk__in=claimed, sent=False).update(sent=True)
+
+    claimed_reminders = []
+    for reminder in reminders:
+        if reminder.pk in claimed:
             reminder.sent = True
-        except Exception:
-            logger.error("An error occurred processing push reminder.", exc_info=True)
-            continue
+            claimed_reminders.append(reminder)
+
+    return claimed_reminders
+
+
+def _process_due_reminders(reminder_type, label, prepare, dispatch, record_queued, prefetch_related=(), shard=0,
+                           num_shards=1):
+    """
+    Process every due reminder of the given type a batch at a time: each batch is claimed with a single update,
+    its sends are enqueued together, and the repeating reminders in it have their past reminders cleaned up and their
+    successors created in bulk.
+
+    :param reminder_type: The type of reminder to process.
+    :param label: The name of the reminder type, for logs and metrics.
+    :param prepare: Called for each reminder with its user's time zone active, returning what's needed to send it, or
+        None if nothing should be sent (it is still marked as sent). A reminder for which this raises is left unsent,
+        to be retried on the next run.
+    :param dispatch: Called with everything prepared for a batch's claimed reminders and the number of sends queued by
+        earlier batches, returning the signatures of the tasks that send them.
+    :param record_queued: Called for each claimed reminder whose send was queued, with what was prepared for it, to
+        record it in metrics. Reminders a concurrent worker claimed first aren't counted.
+    :param prefetch_related: Additional relations ``prepare`` needs prefetched.
+    :param shard: The shard of due reminders to process, when they are split across ``num_shards`` workers.
+    :param num_shards: The number of shards due reminders are split across.
+    """
+    queued_count = 0
 
-        if reminder.course_id:
-            _delete_excess_past_reminders(reminder)
+    due_reminders = Reminder.objects.with_type(reminder_type).unsent().for_today()
+    if num_shards > 1:
+        due_reminders = _for_shard(due_reminders, shard, num_shards)
+
+    for batch in _iter_due_reminder_batches(due_reminders
+                                            .select_related('user', 'user__settings', 'homework', 'homework__course',
+                                                            'event', 'course', 'course__course_group')
+                                            .prefetch_related('course__schedules', *prefetch_related)):
+        start = time.time()
+
+        prepared = []
+        sends_by_pk = {}
+        for reminder in batch:
+            timezone.activate(ZoneInfo(reminder.get_user().settings.time_zone))
             try:
-                new_reminder = create_next_repeating_reminder(reminder)
-                if new_reminder is None:
-                    logger.info(
-                        f'No next occurrence for repeating push reminder series (course ended): '
-                        f'course={reminder.course_id}, user={reminder.user_id}')
+                sends_by_pk[reminder.pk] = prepare(reminder)
+                prepared.append(reminder)
             except Exception:
-                logger.error("An error occurred creating next repeating push reminder.", exc_info=True)
+                logger.error(f"An error occurred processing {label} reminder.", exc_info=True)
+            finally:
+                timezone.deactivate()
+
+        claimed = _claim_reminders(prepared) if prepared else []
+
+        sends = [sends_by_pk[reminder.pk] for reminder in claimed if sends_by_pk[reminder.pk] is not None]
+        if sends:
+            taskutils.safe_apply_async(group(dispatch(sends, queued_count)))
+            queued_count += len(sends)
+
+            for reminder in claimed:
+                if sends_by_pk[reminder.pk] is not None:
+                    record_queued(reminder, sends_by_pk[reminder.pk])
+
+        fired = [reminder for reminder in claimed if reminder.course_id]
+        if fired:
+            _delete_excess_past_reminders(fired)
+            _create_next_repeating_reminders(fired, label)
+
+        batch_tags = [f'type:{label}', f'shard:{shard}']
+        metricutils.timing('reminder.batch.timing', int((time.time() - start) * 1000), extra_tags=batch_tags)
+        metricutils.distribution('reminder.batch.claimed', len(claimed), extra_tags=batch_tags)
+        metricutils.distribution('reminder.batch.queued', len(sends), extra_tags=batch_tags)
+
+
+def _prepare_email_reminder(reminder):
+    user = reminder.get_user()
+
+    if not (user.email and user.is_active):
+        logger.warning(
+            f'Reminder {reminder.pk} was not processed, as the account appears to be inactive for user {user.pk}')
+        return None
+
+    subject = get_subject(reminder)
+    if not subject:
+        logger.warning(f'Reminder {reminder.pk} was not processed, as it appears to be orphaned.')
+        return None
+
+    if reminder.event:
+        calendar_item_id = reminder.event.pk
+        calendar_item_type = enums.EVENT
+    elif reminder.homework:
+        calendar_item_id = reminder.homework.pk
+        calendar_item_type = enums.HOMEWORK
+    else:
+        calendar_item_id = reminder.course.pk
+        calendar_item_type = enums.COURSE
+
+    logger.info(f'Sending email reminder {reminder.pk} for user {user.pk}')
+
+    return user.email, subject, reminder.pk, calendar_item_id, calendar_item_type
+
+
+def _record_email_reminder_queued(reminder, email):
+    metricutils.increment('task', user=reminder.get_user(), extra_tags=['name:reminder.queue.email'])
+
+
+def _dispatch_email_reminders(emails, queued_count, rate_per_sec):
+    from helium.planner.tasks import send_email_reminders
+
+    # Each task sends up to a second's worth of emails over one connection, starting once the emails queued before it
+    # have had their share of the send rate
+    per_task = max(1, int(rate_per_sec))
+
+    return [send_email_reminders.signature(args=(emails[i:i + per_task],),
+                                           countdown=(queued_count + i) / rate_per_sec,
+                                           priority=settings.CELERY_PRIORITY_HIGH)
+            for i in range(0, len(emails), per_task)]
+
+
+def _prepare_push_reminder(reminder):
+    user = reminder.get_user()
+
+    subject = get_subject(reminder)
+    if not subject:
+        logger.info(f'Reminder {reminder.pk} was not processed, as it appears to be orphaned')
+        return None
+
+    logger.info(f'Sending pushes for reminder {reminder.pk} for user {user.pk}')
+
+    push_tokens = list({t.device_id: t.token for t in user.push_tokens.all()}.values())
+
+    if not push_tokens:
+        logger.info(f'Reminder {reminder.pk} was not pushed, as there are no active push tokens for user {user.pk}')
+        return None
+
+    serializer = ReminderExtendedSerializer(reminder)
+    reminder_data = serializer.data
+
+    return {
+        'push_tokens': push_tokens,
+        'subject': subject,
+        'message': _push_body(reminder),
+        'reminder_data': reminder_data,
+    }
+
+
+def _record_push_reminder_queued(reminder, notification):
+    metricutils.increment('task', value=len(notification['push_tokens']), user=reminder.user,
+                          extra_tags=['name:reminder.queue.push'])
+
+
+def _dispatch_push_reminders(notifications, queued_count):
+    # A batch's pushes are sent together by one task, which fans them in to as few FCM requests as it can
+    return [send_push_batch.signature(args=(notifications,), priority=settings.CELERY_PRIORITY_HIGH)]
+
+
+def _mark_push_reminder_sent(reminder):
+    logger.info(f"Marking reminder {reminder.pk} as sent without performing other actions")
+    return None
+
+
+def process_email_reminders(shard=0, num_shards=1):
+    _process_due_reminders(enums.EMAIL, 'email', _prepare_email_reminder,
+                           # Each shard is sent by its own worker, so the rate is split between them
+                           functools.partial(_dispatch_email_reminders,
+                                             rate_per_sec=settings.EMAIL_SEND_RATE_PER_SEC / num_shards),
+                           record_queued=_record_email_reminder_queued, shard=shard, num_shards=num_shards)
+
 
-        timezone.deactivate()
+def process_push_reminders(mark_sent_only=False, shard=0, num_shards=1):
+    _process_due_reminders(enums.PUSH, 'push', _mark_push_reminder_sent if mark_sent_only else _prepare_push_reminder,
+                           _dispatch_push_reminders, record_queued=_record_push_reminder_queued,
+                           prefetch_related=('user__push_tokens',), shard=shard, num_shards=num_shards)
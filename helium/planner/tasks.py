@@ -1,6 +1,8 @@
 import logging
+from datetime import timedelta
 from zoneinfo import ZoneInfo
 
+from celery import group
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import IntegrityError, OperationalError
@@ -13,6 +15,7 @@ from helium.common.utils import commonutils
 from helium.common.utils import metricutils, taskutils
 from helium.planner.models import Course, Category, Event, Homework
 from helium.planner.models import Reminder
+from helium.planner.services import coursescheduleservice
 from helium.planner.services import gradingservice
 from helium.planner.services import reminderservice
 
@@ -136,6 +139,30 @@ def recalculate_category_grades_for_course(self, course_id):
     metricutils.task_stop(metrics, value=count)
 
 
+@app.task(bind=True)
+def recalculate_pending_grades(self, user_id, retries=0, category_ids=(), course_ids=(), course_group_ids=()):
+    published_at_ms = metricutils.get_published_at_ms(self)
+    metrics = metricutils.task_start("grade.recalculate.pending", priority="low", published_at_ms=published_at_ms)
+
+    pending_category_ids, pending_course_ids, pending_course_group_ids = \
+        gradingservice.pop_pending_grade_recalculations(user_id)
+    # A retry carries the IDs its failed attempt took, as they are no longer queued
+    category_ids = set(category_ids).union(pending_category_ids)
+    course_ids = set(course_ids).union(pending_course_ids)
+    course_group_ids = set(course_group_ids).union(pending_course_group_ids)
+
+    try:
+        count = gradingservice.recalculate_grades(category_ids, course_ids, course_group_ids)
+
+        metricutils.task_stop(metrics, value=count)
+    except (IntegrityError, OperationalError) as ex:  # pragma: no cover
+        _retry_on_db_error(ex, metrics, 'grade.recalculate.pending',
+                           recalculate_pending_grades, (user_id, retries + 1), retries,
+                           kwargs={'category_ids': list(category_ids),
+                                   'course_ids': list(course_ids),
+                                   'course_group_ids': list(course_group_ids)})
+
+
 @app.task(bind=True)
 def adjust_reminder_times(self, calendar_item_id, calendar_item_type):
     published_at_ms = metricutils.get_published_at_ms(self)
@@ -156,6 +183,35 @@ def adjust_reminder_times(self, calendar_item_id, calendar_item_type):
     metricutils.task_stop(metrics, value=count)
 
 
+@app.task(bind=True)
+def cache_course_schedule_events(self, course_id):
+    published_at_ms = metricutils.get_published_at_ms(self)
+    metrics = metricutils.task_start("course-schedule.cache", priority="low", published_at_ms=published_at_ms)
+
+    try:
+        course = (Course.objects
+                  .select_related('course_group', 'course_group__user', 'course_group__user__settings')
+                  .prefetch_related('schedules')
+                  .get(pk=course_id))
+    except Course.DoesNotExist:
+        logger.info(f"Course {course_id} does not exist. Nothing to do.")
+        metricutils.task_stop(metrics, value=0)
+        return
+
+    built = coursescheduleservice.build_course_schedule_cache(course)
+
+    metricutils.task_stop(metrics, value=1 if built else 0)
+
+
+def _dispatch_reminder_shards(task):
+    num_shards = settings.REMINDER_DISPATCH_SHARDS
+
+    taskutils.safe_apply_async(group(task.signature(args=(shard, num_shards), priority=settings.CELERY_PRIORITY_HIGH)
+                                     for shard in range(num_shards)))
+
+    return num_shards
+
+
 @app.task(bind=True)
 def email_reminders(self):
     published_at_ms = metricutils.get_published_at_ms(self)
@@ -166,10 +222,23 @@ def email_reminders(self):
         metricutils.task_stop(metrics, value=0)
         return
 
+    if settings.REMINDER_DISPATCH_SHARDS > 1:
+        metricutils.task_stop(metrics, value=_dispatch_reminder_shards(email_reminders_shard))
+        return
+
     reminderservice.process_email_reminders()
     metricutils.task_stop(metrics)
 
 
+@app.task(bind=True)
+def email_reminders_shard(self, shard, num_shards):
+    published_at_ms = metricutils.get_published_at_ms(self)
+    metrics = metricutils.task_start("reminder.email.process-shard", priority="high", published_at_ms=published_at_ms)
+
+    reminderservice.process_email_reminders(shard=shard, num_shards=num_shards)
+    metricutils.task_stop(metrics)
+
+
 @app.task(bind=True)
 def push_reminders(self):
     published_at_ms = metricutils.get_published_at_ms(self)
@@ -180,17 +249,30 @@ def push_reminders(self):
         metricutils.task_stop(metrics, value=0)
         return
 
+    if settings.REMINDER_DISPATCH_SHARDS > 1:
+        metricutils.task_stop(metrics, value=_dispatch_reminder_shards(push_reminders_shard))
+        return
+
     reminderservice.process_push_reminders()
     metricutils.task_stop(metrics)
 
 
+@app.task(bind=True)
+def push_reminders_shard(self, shard, num_shards):
+    published_at_ms = metricutils.get_published_at_ms(self)
+    metrics = metricutils.task_start("reminder.push.process-shard", priority="high", published_at_ms=published_at_ms)
+
+    reminderservice.process_push_reminders(shard=shard, num_shards=num_shards)
+    metricutils.task_stop(metrics)
+
+
 @app.task(bind=True)
 def reminder_watchdog(self):
     published_at_ms = metricutils.get_published_at_ms(self)
     metrics = metricutils.task_start("reminder.watchdog", priority="low", published_at_ms=published_at_ms)
 
-    reminderservice.heal_orphaned_repeating_reminders()
-    metricutils.task_stop(metrics)
+    healed = reminderservice.heal_orphaned_repeating_reminders()
+    metricutils.task_stop(metrics, value=healed)
 
 
 @app.task(bind=True)
@@ -229,47 +311,8 @@ def send_email_reminder(self, email, subject, reminder_id, calendar_item_id, cal
     timezone.activate(ZoneInfo(reminder.user.settings.time_zone))
 
     try:
-        if calendar_item_type == enums.COURSE:
-            from datetime import timedelta
-            class_start = reminder.start_of_range + timedelta(
-                **{enums.REMINDER_OFFSET_TYPE_CHOICES[reminder.offset_type][1]: int(reminder.offset)})
-            local_start = timezone.localtime(class_start)
-            start_str = local_start.strftime(settings.NORMALIZED_DATE_TIME_FORMAT)
-
-            weekday_idx = enums.PYTHON_TO_HELIUM_DAY_OF_WEEK[local_start.weekday()]
-            day_name = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"][weekday_idx]
-            active_schedule = next(
-                (s for s in calendar_item.schedules.all() if s.days_of_week[weekday_idx] == "1"),
-                None,
-            )
-            if active_schedule:
-                end_time = getattr(active_schedule, f'{day_name}_end_time')
-                end_str = local_start.replace(
-                    hour=end_time.hour, minute=end_time.minute, second=0, microsecond=0
-                ).strftime('%I:%M %p')
-                normalized_datetime = f'{start_str} to {end_str}'
-            else:
-                normalized_datetime = start_str
-
-            comments = None
-        else:
-            start = timezone.localtime(calendar_item.start).strftime(
-                settings.NORMALIZED_DATE_FORMAT if calendar_item.all_day else settings.NORMALIZED_DATE_TIME_FORMAT)
-            end = timezone.localtime(calendar_item.end).strftime(
-                settings.NORMALIZED_DATE_FORMAT if calendar_item.all_day else settings.NORMALIZED_DATE_TIME_FORMAT)
-            normalized_datetime = f'{start} to {end}' if calendar_item.show_end_time else start
-
-            comments = calendar_item.comments if calendar_item.comments.strip() != '' else None
-
         commonutils.send_multipart_email('email/reminder',
-                                         {
-                                             'PROJECT_NAME': settings.PROJECT_NAME,
-                                             'reminder': reminder,
-                                             'calendar_item': calendar_item,
-                                             'normalized_datetime': normalized_datetime,
-                                             'comments': comments,
-                                             'notifications_url': f"{settings.PROJECT_APP_HOST}/notifications",
-                                         },
+                                         _get_reminder_email_context(reminder, calendar_item, calendar_item_type),
                                          subject, [email],
                                          email_type='reminder')
 
@@ -281,6 +324,98 @@ def send_email_reminder(self, email, subject, reminder_id, calendar_item_id, cal
     timezone.deactivate()
 
 
+@app.task(bind=True)
+def send_email_reminders(self, reminders):
+    """
+    Send a batch of email reminders, each given as the arguments ``send_email_reminder`` would take. The reminders and
+    their calendar items are loaded together, and the emails are sent over a single mail connection.
+    """
+    published_at_ms = metricutils.get_published_at_ms(self)
+    metrics = metricutils.task_start("email.reminder.batch.sent", priority="high", published_at_ms=published_at_ms)
+
+    if settings.DISABLE_EMAILS:
+        logger.warning(f'Emails disabled. Batch of {len(reminders)} reminder(s) not being sent.')
+        metricutils.task_stop(metrics, value=0)
+        return
+
+    reminders_by_id = (Reminder.objects
+                       .select_related('user', 'user__settings', 'event', 'homework', 'homework__course', 'course')
+                       .prefetch_related('course__schedules')
+                       .in_bulk([reminder_id for _, _, reminder_id, _, _ in reminders]))
+
+    messages = []
+    for email, subject, reminder_id, calendar_item_id, calendar_item_type in reminders:
+        reminder = reminders_by_id.get(reminder_id)
+        if not reminder:
+            logger.info(f'Reminder {reminder_id} does not exist. Nothing to do.')
+            continue
+
+        calendar_item = {enums.EVENT: reminder.event,
+                         enums.HOMEWORK: reminder.homework,
+                         enums.COURSE: reminder.course}.get(calendar_item_type)
+        if not calendar_item or calendar_item.pk != calendar_item_id:
+            logger.info(f'calendar_item_id {calendar_item_id} does not exist. Nothing to do.')
+            continue
+
+        timezone.activate(ZoneInfo(reminder.user.settings.time_zone))
+        try:
+            messages.append(commonutils.build_multipart_email('email/reminder',
+                                                              _get_reminder_email_context(reminder, calendar_item,
+                                                                                          calendar_item_type),
+                                                              subject, [email],
+                                                              email_type='reminder'))
+        except Exception:
+            logger.error("An error occurred building email reminder.", exc_info=True)
+        finally:
+            timezone.deactivate()
+
+    sent = commonutils.send_multipart_emails(messages, email_type='reminder') if messages else 0
+
+    metricutils.task_stop(metrics, value=sent)
+
+
+def _get_reminder_email_context(reminder, calendar_item, calendar_item_type):
+    if calendar_item_type == enums.COURSE:
+        class_start = reminder.start_of_range + timedelta(
+            **{enums.REMINDER_OFFSET_TYPE_CHOICES[reminder.offset_type][1]: int(reminder.offset)})
+        local_start = timezone.localtime(class_start)
+        start_str = local_start.strftime(settings.NORMALIZED_DATE_TIME_FORMAT)
+
+        weekday_idx = enums.PYTHON_TO_HELIUM_DAY_OF_WEEK[local_start.weekday()]
+        day_name = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"][weekday_idx]
+        active_schedule = next(
+            (s for s in calendar_item.schedules.all() if s.days_of_week[weekday_idx] == "1"),
+            None,
+        )
+        if active_schedule:
+            end_time = getattr(active_schedule, f'{day_name}_end_time')
+            end_str = local_start.replace(
+                hour=end_time.hour, minute=end_time.minute, second=0, microsecond=0
+            ).strftime('%I:%M %p')
+            normalized_datetime = f'{start_str} to {end_str}'
+        else:
+            normalized_datetime = start_str
+
+        comments = None
+    else:
+        start = timezone.localtime(calendar_item.start).strftime(
+            settings.NORMALIZED_DATE_FORMAT if calendar_item.all_day else settings.NORMALIZED_DATE_TIME_FORMAT)
+        end = timezone.localtime(calendar_item.end).strftime(
+            settings.NORMALIZED_DATE_FORMAT if calendar_item.all_day else settings.NORMALIZED_DATE_TIME_FORMAT)
+        normalized_datetime = f'{start} to {end}' if calendar_item.show_end_time else start
+
+        comments = calendar_item.comments if calendar_item.comments.strip() != '' else None
+
+    return {
+        'PROJECT_NAME': settings.PROJECT_NAME,
+        'reminder': reminder,
+        'calendar_item': calendar_item,
+        'normalized_datetime': normalized_datetime,
+        'comments': comments,
+        'notifications_url': f"{settings.PROJECT_APP_HOST}/notifications",
+    }
+
+
 register_periodic(email_reminders, 60,
                   manually_triggerable=False)
 register_periodic(push_reminders, 60,
@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from helium.auth.tests.helpers import userhelper
+from helium.planner.models import Homework
+from helium.planner.tests.helpers import coursegrouphelper, coursehelper, homeworkhelper
+
+
+class TestCaseHomework(TestCase):
+    def test_save_syncs_grade_values(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        course = coursehelper.given_course_exists(course_group)
+
+        # WHEN
+        homework = homeworkhelper.given_homework_exists(course, current_grade='-1/100')
+
+        # THEN
+        homework.refresh_from_db()
+        self.assertIsNone(homework.grade_earned)
+        self.assertEqual(homework.grade_possible, 100)
+
+        # WHEN
+        homework.current_grade = '17.5/20'
+        homework.save(update_fields=['current_grade'])
+
+        # THEN
+        homework.refresh_from_db()
+        self.assertEqual(homework.grade_earned, 17.5)
+        self.assertEqual(homework.grade_possible, 20)
+        self.assertEqual(homework.current_grade, '17.5/20')
+
+    def test_unparseable_grade_has_no_grade_values(self):
+        # GIVEN
+        homework = Homework(current_grade='')
+
+        # WHEN
+        homework.sync_grade_values()
+
+        # THEN
+        self.assertIsNone(homework.grade_earned)
+        self.assertIsNone(homework.grade_possible)
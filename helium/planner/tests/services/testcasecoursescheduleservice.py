@@ -1,17 +1,19 @@
 import datetime
 from unittest import mock
 
+from django.core.cache import cache
 from django.db import IntegrityError, transaction
-from django.test import TestCase
+from django.test import override_settings
 
 from helium.auth.tests.helpers import userhelper
+from helium.common.tests.test import CacheTestCase
 from helium.planner.models import CourseSchedule
 from helium.planner.services import coursescheduleservice
 from helium.planner.services.coursescheduleservice import HeliumCourseScheduleError
 from helium.planner.tests.helpers import coursegrouphelper, coursehelper, courseschedulehelper
 
 
-class TestCaseCourseScheduleService(TestCase):
+class TestCaseCourseScheduleService(CacheTestCase):
     def test_get_start_time_for_weekday(self):
         # GIVEN
         user = userhelper.given_a_user_exists()
@@ -437,6 +439,149 @@ class TestCaseCourseScheduleService(TestCase):
                          {datetime.date(2026, 3, 2), datetime.date(2026, 3, 4), datetime.date(2026, 3, 6)})
         self.assertTrue(all(event.start.time() == datetime.time(9, 0, 0) for event in events))
 
+    def test_course_schedules_to_events_window_expands_only_window_and_caches_full_term(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        user.settings.time_zone = 'America/Chicago'
+        user.settings.save()
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        course = coursehelper.given_course_exists(
+            course_group, start_date=datetime.date(2026, 1, 5), end_date=datetime.date(2026, 5, 8))
+        courseschedulehelper.given_course_schedule_exists(
+            course, days_of_week='0101010',
+            mon_start_time=datetime.time(9, 0, 0), mon_end_time=datetime.time(9, 50, 0),
+            wed_start_time=datetime.time(9, 0, 0), wed_end_time=datetime.time(9, 50, 0),
+            fri_start_time=datetime.time(9, 0, 0), fri_end_time=datetime.time(9, 50, 0))
+        _from = datetime.datetime(2026, 3, 9, 6, 0, 0, tzinfo=datetime.timezone.utc)
+        to = datetime.datetime(2026, 3, 16, 5, 0, 0, tzinfo=datetime.timezone.utc)
+
+        # WHEN
+        with mock.patch('helium.planner.services.coursescheduleservice.taskutils.safe_apply_async') \
+                as mock_apply_async:
+            events = coursescheduleservice.course_schedules_to_events(course, course.schedules, _from, to)
+
+        # THEN
+        self.assertEqual([event.start.date() for event in events],
+                         [datetime.date(2026, 3, 9), datetime.date(2026, 3, 11), datetime.date(2026, 3, 13)])
+        self.assertIsNone(cache.get(coursescheduleservice._get_cache_index_key(course)))
+        mock_apply_async.assert_called_once()
+        self.assertEqual(mock_apply_async.call_args.kwargs['args'], (course.pk,))
+
+        # WHEN
+        built = coursescheduleservice.build_course_schedule_cache(course)
+        cached_events = coursescheduleservice.course_schedules_to_events(course, course.schedules, _from, to)
+
+        # THEN
+        self.assertTrue(built)
+        self.assertFalse(coursescheduleservice.build_course_schedule_cache(course))
+        self.assertEqual([event.pk for event in cached_events], [event.pk for event in events])
+        self.assertEqual(len(coursescheduleservice.course_schedules_to_events(course, course.schedules)), 54)
+
+    def test_course_schedules_to_events_window_queues_one_cache_build(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        course = coursehelper.given_course_exists(
+            course_group, start_date=datetime.date(2026, 1, 5), end_date=datetime.date(2026, 5, 8))
+        courseschedulehelper.given_course_schedule_exists(
+            course, days_of_week='0100000',
+            mon_start_time=datetime.time(9, 0, 0), mon_end_time=datetime.time(9, 50, 0))
+        _from = datetime.datetime(2026, 3, 9, 0, 0, 0, tzinfo=datetime.timezone.utc)
+        to = datetime.datetime(2026, 3, 16, 0, 0, 0, tzinfo=datetime.timezone.utc)
+
+        # WHEN
+        with mock.patch('helium.planner.services.coursescheduleservice.taskutils.safe_apply_async') \
+                as mock_apply_async:
+            for _ in range(3):
+                coursescheduleservice.course_schedules_to_events(course, course.schedules, _from, to)
+
+        # THEN
+        mock_apply_async.assert_called_once()
+
+        # WHEN
+        with override_settings(FEED_MAX_CACHEABLE_SIZE=1):
+            coursescheduleservice.build_course_schedule_cache(course)
+        with mock.patch('helium.planner.services.coursescheduleservice.taskutils.safe_apply_async') \
+                as mock_apply_async:
+            events = coursescheduleservice.course_schedules_to_events(course, course.schedules, _from, to)
+
+        # THEN
+        self.assertEqual(len(events), 1)
+        self.assertIsNone(cache.get(coursescheduleservice._get_cache_index_key(course)))
+        mock_apply_async.assert_not_called()
+
+        # WHEN
+        coursescheduleservice.clear_cached_course_schedule(course)
+        with mock.patch('helium.planner.services.coursescheduleservice.taskutils.safe_apply_async') \
+                as mock_apply_async:
+            coursescheduleservice.course_schedules_to_events(course, course.schedules, _from, to)
+
+        # THEN
+        mock_apply_async.assert_called_once()
+
+    def test_course_schedules_to_events_cached_in_month_buckets(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        user.settings.time_zone = 'UTC'
+        user.settings.save()
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        course = coursehelper.given_course_exists(
+            course_group, start_date=datetime.date(2026, 1, 5), end_date=datetime.date(2026, 3, 27))
+        courseschedulehelper.given_course_schedule_exists(
+            course, days_of_week='0100000',
+            mon_start_time=datetime.time(9, 0, 0), mon_end_time=datetime.time(9, 50, 0))
+        _from = datetime.datetime(2026, 2, 1, 0, 0, 0, tzinfo=datetime.timezone.utc)
+        to = datetime.datetime(2026, 2, 28, 23, 59, 59, tzinfo=datetime.timezone.utc)
+
+        # WHEN
+        coursescheduleservice.build_course_schedule_cache(course)
+        with mock.patch('helium.planner.services.coursescheduleservice.cache.get_many',
+                        wraps=cache.get_many) as mock_get_many:
+            events = coursescheduleservice.course_schedules_to_events(course, course.schedules, _from, to)
+
+        # THEN
+        self.assertEqual([event.start.date() for event in events],
+                         [datetime.date(2026, 2, 2), datetime.date(2026, 2, 9), datetime.date(2026, 2, 16),
+                          datetime.date(2026, 2, 23)])
+        mock_get_many.assert_called_once_with([coursescheduleservice._get_cache_index_key(course),
+                                               coursescheduleservice._get_cache_bucket_key(course, '202601'),
+                                               coursescheduleservice._get_cache_bucket_key(course, '202602')])
+        self.assertEqual(len(coursescheduleservice.course_schedules_to_events(course, course.schedules)), 12)
+
+        # WHEN
+        cache.delete(coursescheduleservice._get_cache_bucket_key(course, '202602'))
+
+        # THEN
+        self.assertIsNone(coursescheduleservice._get_cached_values(course, _from, to))
+        self.assertIsNone(cache.get(coursescheduleservice._get_cache_index_key(course)))
+        self.assertEqual(len(coursescheduleservice.course_schedules_to_events(course, course.schedules, _from, to)),
+                         4)
+        self.assertIsNotNone(cache.get(coursescheduleservice._get_cache_bucket_key(course, '202602')))
+
+        # WHEN
+        coursescheduleservice.clear_cached_course_schedule(course)
+
+        # THEN
+        self.assertEqual(cache.keys(coursescheduleservice._get_cache_prefix(course) + "*"), [])
+
+    def test_resolve_cycle_index_matches_day_by_day_count_across_a_term(self):
+        # GIVEN
+        schedule = CourseSchedule(cycle_length=6, anchor_date=datetime.date(2026, 1, 7))
+        exceptions = {datetime.date(2026, 1, 19), datetime.date(2026, 3, 16), datetime.date(2026, 3, 17),
+                      datetime.date(2026, 3, 21), datetime.date(2025, 12, 25)}
+
+        # WHEN/THEN
+        school_days = 0
+        day = schedule.anchor_date
+        while day <= datetime.date(2026, 6, 30):
+            if day.weekday() < 5 and day not in exceptions:
+                school_days += 1
+                self.assertEqual(coursescheduleservice.resolve_cycle_index(schedule, day, exceptions),
+                                 (school_days - 1) % 6 + 1)
+            else:
+                self.assertIsNone(coursescheduleservice.resolve_cycle_index(schedule, day, exceptions))
+            day += datetime.timedelta(days=1)
+
     def test_course_schedule_to_recurrence_groups_exception_shares_utc_date_with_occurrence_in_positive_offset_tz(self):
         # GIVEN
         user = userhelper.given_a_user_exists()
@@ -463,3 +608,44 @@ class TestCaseCourseScheduleService(TestCase):
         # Occurrences all share the slot's UTC time-of-day, so an exception at that same time-of-day
         # lands on the same UTC date as the occurrence it cancels.
         self.assertEqual(groups[0].exception_dates[0].timetz(), groups[0].start.timetz())
+
+    def test_get_next_course_occurrence_start_bisects_cached_occurrences(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        user.settings.time_zone = 'America/Chicago'
+        user.settings.save()
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        course = coursehelper.given_course_exists(
+            course_group, start_date=datetime.date(2026, 1, 5), end_date=datetime.date(2026, 5, 8))
+        course_schedule = courseschedulehelper.given_course_schedule_exists(
+            course, days_of_week='0101010',
+            mon_start_time=datetime.time(9, 0, 0), mon_end_time=datetime.time(9, 50, 0),
+            wed_start_time=datetime.time(9, 0, 0), wed_end_time=datetime.time(9, 50, 0),
+            fri_start_time=datetime.time(9, 0, 0), fri_end_time=datetime.time(9, 50, 0))
+        # Across the DST change, 9am in Chicago moves from 15:00 to 14:00 UTC
+        after = datetime.datetime(2026, 3, 6, 15, 0, 0, tzinfo=datetime.timezone.utc)
+
+        # WHEN
+        next_start = coursescheduleservice.get_next_course_occurrence_start(course, after)
+
+        # THEN
+        self.assertEqual(next_start, datetime.datetime(2026, 3, 9, 14, 0, 0, tzinfo=datetime.timezone.utc))
+        self.assertEqual(len(coursescheduleservice.get_course_occurrences(course)), 54)
+
+        # WHEN
+        with self.assertNumQueries(0):
+            last_start = coursescheduleservice.get_next_course_occurrence_start(
+                course, datetime.datetime(2026, 5, 7, 0, 0, 0, tzinfo=datetime.timezone.utc))
+            no_start = coursescheduleservice.get_next_course_occurrence_start(
+                course, datetime.datetime(2026, 5, 8, 14, 0, 0, tzinfo=datetime.timezone.utc))
+
+        # THEN
+        self.assertEqual(last_start, datetime.datetime(2026, 5, 8, 14, 0, 0, tzinfo=datetime.timezone.utc))
+        self.assertIsNone(no_start)
+
+        # WHEN
+        course_schedule.delete()
+
+        # THEN
+        self.assertIsNone(cache.get(coursescheduleservice._get_cache_occurrences_key(course)))
+        self.assertIsNone(coursescheduleservice.get_next_course_occurrence_start(course, after))
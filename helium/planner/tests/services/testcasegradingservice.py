@@ -1,9 +1,15 @@
 import datetime
+import random
+import time
+from fractions import Fraction
+from unittest import mock
 
+from django.conf import settings
 from django.test import TestCase
 
 from helium.auth.tests.helpers import userhelper
-from helium.planner.models import Homework
+from helium.common.tests.test import CacheTestCase
+from helium.planner.models import Category, Course, CourseGroup, Homework
 from helium.planner.services import gradingservice
 from helium.planner.tests.helpers import coursegrouphelper, coursehelper, categoryhelper, homeworkhelper
 
@@ -1025,7 +1031,7 @@ class TestCaseGradingService(TestCase):
         poisoned = homeworkhelper.given_homework_exists(course, category=category, completed=True,
                                                        current_grade='50/100')
         # Bypass validators to simulate legacy poisoned data
-        Homework.objects.filter(pk=poisoned.pk).update(current_grade='5/0')
+        Homework.objects.filter(pk=poisoned.pk).update(current_grade='5/0', grade_earned=5, grade_possible=0)
 
         # WHEN
         gradingservice.recalculate_category_grade(category.pk)
@@ -1040,6 +1046,23 @@ class TestCaseGradingService(TestCase):
         self.assertEqual(float(course.current_grade), 80)
         self.assertEqual(float(course_group.overall_grade), 80)
 
+    def test_course_group_grade_points_running_average_matches_exact_average(self):
+        # GIVEN
+        rand = random.Random(42)
+        course_grade_points = [[[i * 10 + course_id, round(rand.uniform(0, 100), 4), i, 'Homework', course_id, 100,
+                                 course_id] for i in range(200)]
+                               for course_id in range(1, 6)]
+
+        # WHEN
+        grade_points = gradingservice._get_course_group_grade_points(course_grade_points)
+
+        # THEN
+        latest_grades = {}
+        for point in sorted((p for points in course_grade_points for p in points), key=lambda p: p[0]):
+            latest_grades[point[6]] = point[1]
+            expected = round(float(sum(map(Fraction, latest_grades.values())) / len(latest_grades)), 4)
+            self.assertEqual(grade_points.pop(0)[1], expected)
+
     def test_build_ungraded_series_items_empty(self):
         # GIVEN / WHEN
         result = gradingservice._build_ungraded_series_items(
@@ -1153,3 +1176,226 @@ class TestCaseGradingService(TestCase):
         self.assertFalse(result[1]['graded'])
         self.assertEqual(result[1]['id'], 20)
         self.assertIsNone(result[1]['cumulative_grade'])
+
+    def test_grade_data_query_count_does_not_grow_with_history(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        start = datetime.datetime(2017, 4, 8, 20, 0, tzinfo=datetime.timezone.utc)
+        course_groups = []
+        for i in range(3):
+            course_group = coursegrouphelper.given_course_group_exists(user, title=f'Term {i}')
+            course_groups.append(course_group)
+            for j in range(2):
+                course = coursehelper.given_course_exists(course_group, title=f'Course {j}')
+                category1 = categoryhelper.given_category_exists(course, title='Exams', weight=j * 60)
+                category2 = categoryhelper.given_category_exists(course, title='Quizzes', weight=j * 40)
+                for k, (completed, current_grade) in enumerate([(True, '8/10'), (True, '-1/100'), (False, '-1/100'),
+                                                                 (True, '45/50'), (False, '7/10')]):
+                    homeworkhelper.given_homework_exists(course, category=[category1, category2][k % 2],
+                                                         completed=completed, current_grade=current_grade,
+                                                         start=start + datetime.timedelta(days=i * 10 + j + k),
+                                                         end=start + datetime.timedelta(days=i * 10 + j + k))
+
+        # WHEN
+        with self.assertNumQueries(4):
+            grade_data = gradingservice.get_grade_data(user.pk)
+
+        # THEN
+        self.assertEqual(len(grade_data['course_groups']), 3)
+        for course_group, course_group_data in zip(course_groups, grade_data['course_groups']):
+            self.assertEqual(course_group_data['id'], course_group.pk)
+            self.assertEqual(course_group_data['num_homework'], 10)
+            self.assertEqual(course_group_data['num_homework_completed'], 6)
+            self.assertEqual(course_group_data['num_homework_graded'], 4)
+            self.assertEqual(course_group_data['grade_points'],
+                             gradingservice.get_grade_points_for_course_group(course_group.pk))
+            for course_data in course_group_data['courses']:
+                self.assertEqual(course_data['grade_points'],
+                                 gradingservice.get_grade_points_for_course(course_data['id']))
+                self.assertEqual([category['num_homework'] for category in course_data['categories']], [3, 2])
+                self.assertEqual([category['num_homework_graded'] for category in course_data['categories']], [1, 1])
+            self.assertFalse(course_group_data['courses'][0]['has_weighted_grading'])
+            self.assertTrue(course_group_data['courses'][1]['has_weighted_grading'])
+
+
+class TestCaseIncrementalGrading(TestCase):
+    @staticmethod
+    def _get_grade_values(entity):
+        if isinstance(entity, CourseGroup):
+            grade = entity.overall_grade
+        elif isinstance(entity, Course):
+            grade = entity.current_grade
+        else:
+            grade = entity.average_grade
+
+        return float(grade), entity.trend, entity.grade_count
+
+    def _assert_matches_full_recalculation(self, course_group, courses, categories):
+        entities = [course_group] + courses + categories
+        for entity in entities:
+            entity.refresh_from_db()
+        incremental = [self._get_grade_values(entity) for entity in entities]
+
+        for category in categories:
+            gradingservice.recalculate_category_grade(category.pk)
+        for course in courses:
+            gradingservice.recalculate_course_grade(course.pk)
+        gradingservice.recalculate_course_group_grade(course_group.pk)
+
+        for entity in entities:
+            entity.refresh_from_db()
+        full = [self._get_grade_values(entity) for entity in entities]
+
+        for (grade, trend, count), (full_grade, full_trend, full_count) in zip(incremental, full):
+            self.assertAlmostEqual(grade, full_grade, places=3)
+            self.assertEqual(count, full_count)
+            if full_trend is None:
+                self.assertIsNone(trend)
+            else:
+                self.assertAlmostEqual(trend, full_trend, places=9)
+
+    def test_latest_homework_changes_match_full_recalculation(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        course1 = coursehelper.given_course_exists(course_group)
+        course2 = coursehelper.given_course_exists(course_group, title='Other Course')
+        category1 = categoryhelper.given_category_exists(course1, weight=60)
+        category2 = categoryhelper.given_category_exists(course1, title='Other Category', weight=40)
+        category3 = categoryhelper.given_category_exists(course2)
+        start = datetime.datetime(2017, 4, 8, 20, 0, tzinfo=datetime.timezone.utc)
+        grades = ['80/100', '45/50', '7/10', '30/40', '0/20', '19/20']
+        for i, grade in enumerate(grades):
+            homeworkhelper.given_homework_exists([course1, course2][i % 2],
+                                                 category=[category1, category3, category2, category3][i % 4],
+                                                 completed=True, current_grade=grade,
+                                                 start=start + datetime.timedelta(days=i),
+                                                 end=start + datetime.timedelta(days=i, hours=1))
+        self._assert_matches_full_recalculation(course_group, [course1, course2], [category1, category2, category3])
+
+        with mock.patch('helium.planner.services.gradingservice.queue_grade_recalculation') as mock_queue:
+            # WHEN
+            homework = homeworkhelper.given_homework_exists(course1, category=category2, completed=True,
+                                                            current_grade='9/10',
+                                                            start=start + datetime.timedelta(days=10),
+                                                            end=start + datetime.timedelta(days=10, hours=1))
+            # THEN
+            self._assert_matches_full_recalculation(course_group, [course1, course2], [category1, category2, category3])
+
+            for current_grade, completed in [('3/10', True), ('3/10', False), ('10/10', True), ('-1/100', True)]:
+                # WHEN
+                homework = Homework.objects.get(pk=homework.pk)
+                homework.current_grade = current_grade
+                homework.completed = completed
+                homework.save()
+
+                # THEN
+                self._assert_matches_full_recalculation(course_group, [course1, course2],
+                                                        [category1, category2, category3])
+
+            # WHEN
+            homework.current_grade = '6/10'
+            homework.save()
+            Homework.objects.get(pk=homework.pk).delete()
+
+            # THEN
+            self._assert_matches_full_recalculation(course_group, [course1, course2], [category1, category2, category3])
+
+        # None of the changes fell back to a full recalculation
+        mock_queue.assert_not_called()
+
+    @mock.patch('helium.planner.services.gradingservice.queue_grade_recalculation')
+    def test_earlier_homework_change_falls_back_to_full_recalculation(self, mock_queue_grade_recalculation):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        course = coursehelper.given_course_exists(course_group)
+        category = categoryhelper.given_category_exists(course)
+        start = datetime.datetime(2017, 4, 8, 20, 0, tzinfo=datetime.timezone.utc)
+        homework = homeworkhelper.given_homework_exists(course, category=category, completed=True,
+                                                        current_grade='5/10', start=start, end=start)
+        homeworkhelper.given_homework_exists(course, category=category, completed=True, current_grade='6/10',
+                                             start=start + datetime.timedelta(days=1),
+                                             end=start + datetime.timedelta(days=1))
+        mock_queue_grade_recalculation.reset_mock()
+
+        # WHEN
+        homework = Homework.objects.get(pk=homework.pk)
+        homework.current_grade = '9/10'
+        homework.save()
+
+        # THEN
+        mock_queue_grade_recalculation.assert_called_once_with(user.pk, category_ids=[category.pk])
+
+
+class TestCaseGradeRecalculationQueue(CacheTestCase):
+    @mock.patch('helium.planner.services.gradingservice.taskutils.safe_apply_async')
+    def test_queued_recalculations_coalesce_into_one_task(self, mock_safe_apply_async):
+        # WHEN
+        gradingservice.queue_grade_recalculation(1, category_ids=[2])
+        gradingservice.queue_grade_recalculation(1, category_ids=[2, 3], course_ids=[4])
+        gradingservice.queue_grade_recalculation(1, course_group_ids=[5])
+
+        # THEN
+        self.assertEqual(mock_safe_apply_async.call_count, 1)
+        self.assertTrue(gradingservice.has_pending_grade_recalculations(1))
+        self.assertFalse(gradingservice.has_pending_grade_recalculations(2))
+        category_ids, course_ids, course_group_ids = gradingservice.pop_pending_grade_recalculations(1)
+        self.assertEqual(sorted(category_ids), [2, 3])
+        self.assertEqual(course_ids, [4])
+        self.assertEqual(course_group_ids, [5])
+        self.assertFalse(gradingservice.has_pending_grade_recalculations(1))
+
+        # WHEN
+        gradingservice.queue_grade_recalculation(1, category_ids=[2])
+
+        # THEN
+        self.assertEqual(mock_safe_apply_async.call_count, 2)
+
+    @mock.patch('helium.planner.services.gradingservice.taskutils.safe_apply_async')
+    def test_lost_recalculation_task_rescheduled(self, mock_safe_apply_async):
+        # GIVEN
+        gradingservice.queue_grade_recalculation(1, category_ids=[2])
+        mock_safe_apply_async.assert_called_once()
+        self.assertEqual(mock_safe_apply_async.call_args.kwargs['countdown'],
+                         settings.GRADE_RECALCULATION_DEBOUNCE_SECONDS)
+
+        # WHEN
+        gradingservice.queue_grade_recalculation(1, category_ids=[3])
+
+        # THEN
+        self.assertEqual(mock_safe_apply_async.call_count, 1)
+
+        # WHEN
+        with mock.patch('django.core.cache.backends.locmem.time.time',
+                        return_value=time.time() + settings.GRADE_RECALCULATION_SCHEDULED_TTL_SECONDS + 1):
+            # The task never ran, but the marks are still pending
+            self.assertTrue(gradingservice.has_pending_grade_recalculations(1))
+            gradingservice.queue_grade_recalculation(1, category_ids=[4])
+
+            # THEN
+            self.assertEqual(mock_safe_apply_async.call_count, 2)
+            category_ids, _, _ = gradingservice.pop_pending_grade_recalculations(1)
+            self.assertEqual(sorted(category_ids), [2, 3, 4])
+
+    def test_pending_recalculations_run_on_read(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        course = coursehelper.given_course_exists(course_group)
+        category = categoryhelper.given_category_exists(course)
+        homeworkhelper.given_homework_exists(course, category=category, completed=True, current_grade='3/4')
+        Category.objects.filter(pk=category.pk).update(average_grade=-1)
+        Course.objects.filter(pk=course.pk).update(current_grade=-1)
+        with mock.patch('helium.planner.services.gradingservice.taskutils.safe_apply_async'):
+            gradingservice.queue_grade_recalculation(user.pk, category_ids=[category.pk])
+
+        # WHEN
+        gradingservice.recalculate_pending_grades(user.pk)
+
+        # THEN
+        category.refresh_from_db()
+        course.refresh_from_db()
+        self.assertEqual(float(category.average_grade), 75)
+        self.assertEqual(float(course.current_grade), 75)
+        self.assertFalse(gradingservice.has_pending_grade_recalculations(user.pk))
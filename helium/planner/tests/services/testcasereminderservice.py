@@ -3,19 +3,20 @@ from unittest import mock
 from zoneinfo import ZoneInfo
 
 from django.conf import settings
-from django.test import TestCase
+from django.core import mail
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from helium.auth.tests.helpers import userhelper
 from helium.common import enums
+from helium.common.tests.helpers import commonhelper
 from helium.planner.models import CourseSchedule, Reminder
 from helium.planner.services import reminderservice
 from helium.planner.tests.helpers import coursegrouphelper, coursehelper, courseschedulehelper, homeworkhelper, eventhelper, reminderhelper
 
 
 class TestCaseReminderService(TestCase):
-    @mock.patch('helium.planner.tasks.commonutils.send_multipart_email')
-    def test_process_email_reminders(self, mock_send_multipart_email):
+    def test_process_email_reminders(self):
         # GIVEN
         user = userhelper.given_a_user_exists()
         course_group = coursegrouphelper.given_course_group_exists(user)
@@ -44,7 +45,7 @@ class TestCaseReminderService(TestCase):
         reminderservice.process_email_reminders()
 
         # THEN
-        self.assertEqual(mock_send_multipart_email.call_count, 2)
+        self.assertEqual(len(mail.outbox), 2)
         reminder1.refresh_from_db()
         reminder2.refresh_from_db()
         reminder3.refresh_from_db()
@@ -52,10 +53,38 @@ class TestCaseReminderService(TestCase):
         self.assertTrue(reminder2.sent)
         self.assertFalse(reminder3.sent)
 
-    @mock.patch('helium.common.tasks.send_notifications')
-    def test_process_push_reminders(self, mock_send_notifications):
+    def test_process_email_reminders_counts_only_claimed_as_queued(self):
         # GIVEN
         user = userhelper.given_a_user_exists()
+        event = eventhelper.given_event_exists(user,
+                                               start=timezone.now() + datetime.timedelta(minutes=settings.REMINDER_SEND_WINDOW_MINUTES),
+                                               end=timezone.now() + datetime.timedelta(minutes=10))
+        reminderhelper.given_reminder_exists(user, type=enums.EMAIL, event=event)
+        claimed_elsewhere = reminderhelper.given_reminder_exists(user, type=enums.EMAIL, event=event)
+        get_subject = reminderservice.get_subject
+
+        def get_subject_while_another_worker_claims(reminder):
+            # Another worker claims the reminder while this one is preparing the batch
+            Reminder.objects.filter(pk=claimed_elsewhere.pk).update(sent=True)
+            return get_subject(reminder)
+
+        # WHEN
+        with mock.patch('helium.planner.services.reminderservice.get_subject',
+                        side_effect=get_subject_while_another_worker_claims), \
+                mock.patch('helium.planner.services.reminderservice.metricutils.increment') as mock_increment:
+            reminderservice.process_email_reminders()
+
+        # THEN
+        self.assertEqual(len(mail.outbox), 1)
+        queued = [call for call in mock_increment.call_args_list
+                  if call.kwargs.get('extra_tags') == ['name:reminder.queue.email']]
+        self.assertEqual(len(queued), 1)
+
+    @mock.patch('helium.common.services.pushservice.messaging.send_each')
+    def test_process_push_reminders(self, mock_send_each):
+        # GIVEN
+        commonhelper.given_fcm_stand_in(mock_send_each)
+        user = userhelper.given_a_user_exists()
         userhelper.given_user_push_token_exists(user)
         course_group = coursegrouphelper.given_course_group_exists(user)
         course = coursehelper.given_course_exists(
@@ -105,7 +134,9 @@ class TestCaseReminderService(TestCase):
         reminderservice.process_push_reminders()
 
         # THEN
-        self.assertEqual(mock_send_notifications.call_count, 3)
+        # Every reminder's push goes out in a single FCM request
+        mock_send_each.assert_called_once()
+        self.assertEqual(len(mock_send_each.call_args[0][0]), 3)
         reminder1.refresh_from_db()
         reminder2.refresh_from_db()
         reminder3.refresh_from_db()
@@ -115,8 +146,46 @@ class TestCaseReminderService(TestCase):
         self.assertFalse(reminder3.sent)
         self.assertTrue(course_reminder.sent)
 
-    @mock.patch('helium.planner.tasks.commonutils.send_multipart_email')
-    def test_process_email_reminders_inactive_user(self, mock_send_multipart_email):
+    def test_process_email_reminders_sharded_by_user(self):
+        # GIVEN
+        users = [userhelper.given_a_user_exists(username=f'user{i}', email=f'user{i}@heliumedu.com')
+                 for i in range(4)]
+        reminders = []
+        for user in users:
+            event = eventhelper.given_event_exists(user,
+                                                   start=timezone.now() + datetime.timedelta(minutes=settings.REMINDER_SEND_WINDOW_MINUTES),
+                                                   end=timezone.now() + datetime.timedelta(minutes=10))
+            reminders.append(reminderhelper.given_reminder_exists(user, type=enums.EMAIL, event=event))
+
+        # WHEN
+        reminderservice.process_email_reminders(shard=1, num_shards=2)
+
+        # THEN
+        for reminder in reminders:
+            reminder.refresh_from_db()
+            self.assertEqual(reminder.sent, reminder.user_id % 2 == 1)
+        self.assertEqual(len(mail.outbox), 2)
+
+        # WHEN
+        reminderservice.process_email_reminders(shard=0, num_shards=2)
+        reminderservice.process_email_reminders(shard=1, num_shards=2)
+
+        # THEN
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertFalse(Reminder.objects.filter(sent=False).exists())
+
+    def test_dispatch_email_reminders_respects_send_rate(self):
+        # GIVEN
+        emails = [(f'user{i}@heliumedu.com', 'Subject', i, i, enums.EVENT) for i in range(10)]
+
+        # WHEN
+        signatures = reminderservice._dispatch_email_reminders(emails, 14, rate_per_sec=7)
+
+        # THEN
+        self.assertEqual([len(signature.args[0]) for signature in signatures], [7, 3])
+        self.assertEqual([signature.options['countdown'] for signature in signatures], [2, 3])
+
+    def test_process_email_reminders_inactive_user(self):
         # GIVEN
         user = userhelper.given_an_inactive_user_exists()
         event = eventhelper.given_event_exists(user,
@@ -129,12 +198,12 @@ class TestCaseReminderService(TestCase):
 
         # THEN
         # Inactive user should not receive email but reminder should be marked sent
-        mock_send_multipart_email.assert_not_called()
+        self.assertEqual(len(mail.outbox), 0)
         reminder.refresh_from_db()
         self.assertTrue(reminder.sent)
 
-    @mock.patch('helium.common.tasks.send_notifications')
-    def test_process_push_reminders_no_push_tokens(self, mock_send_notifications):
+    @mock.patch('helium.common.services.pushservice.messaging.send_each')
+    def test_process_push_reminders_no_push_tokens(self, mock_send_each):
         # GIVEN
         user = userhelper.given_a_user_exists()
         # No push tokens created for user
@@ -148,12 +217,12 @@ class TestCaseReminderService(TestCase):
 
         # THEN
         # No push sent when user has no push tokens
-        mock_send_notifications.assert_not_called()
+        mock_send_each.assert_not_called()
         reminder.refresh_from_db()
         self.assertTrue(reminder.sent)
 
-    @mock.patch('helium.common.tasks.send_notifications')
-    def test_process_push_reminders_mark_sent_only(self, mock_send_notifications):
+    @mock.patch('helium.common.services.pushservice.messaging.send_each')
+    def test_process_push_reminders_mark_sent_only(self, mock_send_each):
         # GIVEN
         user = userhelper.given_a_user_exists()
         userhelper.given_user_push_token_exists(user)
@@ -167,7 +236,7 @@ class TestCaseReminderService(TestCase):
 
         # THEN
         # No push sent when mark_sent_only=True, but reminder marked as sent
-        mock_send_notifications.assert_not_called()
+        mock_send_each.assert_not_called()
         reminder.refresh_from_db()
         self.assertTrue(reminder.sent)
 
@@ -266,8 +335,107 @@ class TestCaseReminderService(TestCase):
         self.assertEqual(Reminder.objects.filter(dismissed=False, sent=False).count(), 1)
         self.assertEqual(Reminder.objects.count(), 1)
 
-    @mock.patch('helium.planner.tasks.commonutils.send_multipart_email')
-    def test_process_email_reminders_course_creates_next(self, mock_send_multipart_email):
+    def test_heal_orphaned_repeating_reminders_reconciles_series_together(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        courses = []
+        for i in range(3):
+            course = coursehelper.given_course_exists(
+                course_group,
+                title=f'Course {i}',
+                start_date=datetime.date.today() - datetime.timedelta(days=7),
+                end_date=datetime.date.today() + datetime.timedelta(days=30)
+            )
+            courseschedulehelper.given_course_schedule_exists(course, days_of_week='0101010',
+                                                              mon_start_time=datetime.time(10, 0, 0),
+                                                              wed_start_time=datetime.time(10, 0, 0),
+                                                              fri_start_time=datetime.time(10, 0, 0))
+            courses.append(course)
+        healthy_course, stale_course, missing_course = courses
+
+        def _given_reminder(course, start_of_range, sent):
+            return Reminder(title='Test', message='Test', start_of_range=start_of_range,
+                            offset=30, offset_type=enums.MINUTES, type=enums.PUSH,
+                            sent=sent, dismissed=False, course=course, user=user)
+
+        Reminder.objects.bulk_create([
+            _given_reminder(healthy_course, timezone.now() + datetime.timedelta(days=2), False),
+            _given_reminder(stale_course, timezone.now() - datetime.timedelta(hours=3), False),
+            _given_reminder(missing_course, timezone.now() - datetime.timedelta(hours=2), True),
+        ])
+        healthy = Reminder.objects.get(course=healthy_course)
+
+        # WHEN
+        healed = reminderservice.heal_orphaned_repeating_reminders()
+
+        # THEN
+        self.assertEqual(healed, 2)
+        self.assertEqual(list(Reminder.objects.filter(course=healthy_course)), [healthy])
+        for course in [stale_course, missing_course]:
+            active = Reminder.objects.filter(course=course, sent=False, dismissed=False)
+            self.assertEqual(active.count(), 1)
+            self.assertGreater(active.get().start_of_range, timezone.now())
+        self.assertEqual(Reminder.objects.filter(course=stale_course).count(), 1)
+        self.assertEqual(Reminder.objects.filter(course=missing_course).count(), 2)
+
+        # WHEN
+        healed = reminderservice.heal_orphaned_repeating_reminders()
+
+        # THEN
+        self.assertEqual(healed, 0)
+
+    def test_heal_orphaned_repeating_reminders_tolerates_concurrent_changes(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        courses = []
+        for i in range(3):
+            course = coursehelper.given_course_exists(
+                course_group,
+                title=f'Course {i}',
+                start_date=datetime.date.today() - datetime.timedelta(days=7),
+                end_date=datetime.date.today() + datetime.timedelta(days=30)
+            )
+            courseschedulehelper.given_course_schedule_exists(course, days_of_week='0101010',
+                                                              mon_start_time=datetime.time(10, 0, 0),
+                                                              wed_start_time=datetime.time(10, 0, 0),
+                                                              fri_start_time=datetime.time(10, 0, 0))
+            courses.append(course)
+        racing_course, deleted_course, broken_course = courses
+        Reminder.objects.bulk_create([Reminder(
+            title='Test', message='Test',
+            start_of_range=timezone.now() - datetime.timedelta(hours=2),
+            offset=30, offset_type=enums.MINUTES, type=enums.PUSH,
+            sent=True, dismissed=False, course=course, user=user,
+        ) for course in courses])
+        build_next = reminderservice._build_next_repeating_reminder
+        concurrent = []
+
+        def delete_series_after_classifying(*args, **kwargs):
+            Reminder.objects.filter(course=deleted_course).delete()
+
+        def build_next_racing_processor(reminder):
+            # Another worker gives the series its successor after the watchdog found it still broken
+            if reminder.course_id == racing_course.pk and not concurrent:
+                concurrent.append(build_next(reminder))
+                concurrent[0].save()
+            return build_next(reminder)
+
+        # WHEN
+        with mock.patch('helium.planner.services.reminderservice.metricutils.gauge',
+                        side_effect=delete_series_after_classifying), \
+                mock.patch('helium.planner.services.reminderservice._build_next_repeating_reminder',
+                           side_effect=build_next_racing_processor):
+            reminderservice.heal_orphaned_repeating_reminders()
+
+        # THEN
+        self.assertEqual(list(Reminder.objects.filter(course=racing_course, sent=False).values_list('pk', flat=True)),
+                         [concurrent[0].pk])
+        self.assertFalse(Reminder.objects.filter(course=deleted_course).exists())
+        self.assertEqual(Reminder.objects.filter(course=broken_course, sent=False).count(), 1)
+
+    def test_process_email_reminders_course_creates_next(self):
         # GIVEN
         user = userhelper.given_a_user_exists()
         course_group = coursegrouphelper.given_course_group_exists(user)
@@ -301,10 +469,60 @@ class TestCaseReminderService(TestCase):
         self.assertEqual(Reminder.objects.filter(sent=False, course=course).count(), 1)
         self.assertEqual(Reminder.objects.count(), 2)
 
-    @mock.patch('helium.common.tasks.send_notifications')
-    def test_process_push_reminders_auto_deletes_excess_past(self, mock_send_notifications):
+    def test_process_email_reminders_course_keeps_concurrently_created_next(self):
         # GIVEN
         user = userhelper.given_a_user_exists()
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        courses = []
+        for _ in range(2):
+            course = coursehelper.given_course_exists(
+                course_group,
+                start_date=datetime.date.today() - datetime.timedelta(days=7),
+                end_date=datetime.date.today() + datetime.timedelta(days=30)
+            )
+            courseschedulehelper.given_course_schedule_exists(course, days_of_week='1111111',
+                                                              sun_start_time=datetime.time(10, 0, 0),
+                                                              mon_start_time=datetime.time(10, 0, 0),
+                                                              tue_start_time=datetime.time(10, 0, 0),
+                                                              wed_start_time=datetime.time(10, 0, 0),
+                                                              thu_start_time=datetime.time(10, 0, 0),
+                                                              fri_start_time=datetime.time(10, 0, 0),
+                                                              sat_start_time=datetime.time(10, 0, 0))
+            courses.append(course)
+        Reminder.objects.bulk_create([Reminder(
+            title='Test', message='Test',
+            start_of_range=timezone.now() - datetime.timedelta(minutes=1),
+            offset=15, offset_type=enums.MINUTES,
+            type=enums.EMAIL, sent=False, dismissed=False,
+            course=course, user=user,
+        ) for course in courses])
+        build_next = reminderservice._build_next_repeating_reminder
+        concurrent = []
+
+        def build_next_racing_watchdog(reminder):
+            # Another worker gives the first course's series its successor after this one found the series inactive
+            if reminder.course_id == courses[0].pk and not concurrent:
+                concurrent.append(build_next(reminder))
+                concurrent[0].save()
+            return build_next(reminder)
+
+        # WHEN
+        with mock.patch('helium.planner.services.reminderservice._build_next_repeating_reminder',
+                        side_effect=build_next_racing_watchdog):
+            reminderservice.process_email_reminders()
+
+        # THEN
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(Reminder.objects.filter(sent=True).count(), 2)
+        self.assertEqual(list(Reminder.objects.filter(sent=False, course=courses[0]).values_list('pk', flat=True)),
+                         [concurrent[0].pk])
+        self.assertEqual(Reminder.objects.filter(sent=False, course=courses[1]).count(), 1)
+
+    @mock.patch('helium.common.services.pushservice.messaging.send_each')
+    def test_process_push_reminders_auto_deletes_excess_past(self, mock_send_each):
+        # GIVEN
+        commonhelper.given_fcm_stand_in(mock_send_each)
+        user = userhelper.given_a_user_exists()
         userhelper.given_user_push_token_exists(user)
         course_group = coursegrouphelper.given_course_group_exists(user)
         course = coursehelper.given_course_exists(
@@ -346,9 +564,60 @@ class TestCaseReminderService(TestCase):
         # The old_past record must be gone
         self.assertFalse(Reminder.objects.filter(pk=old_past.pk).exists())
 
-    @mock.patch('helium.common.tasks.send_notifications')
-    def test_process_push_reminders_auto_deletes_past_with_different_offset(self, mock_send_notifications):
+    @override_settings(REMINDER_PROCESS_BATCH_SIZE=2)
+    @mock.patch('helium.common.services.pushservice.messaging.send_each')
+    def test_process_push_reminders_in_batches(self, mock_send_each):
+        # GIVEN
+        commonhelper.given_fcm_stand_in(mock_send_each)
+        user = userhelper.given_a_user_exists()
+        userhelper.given_user_push_token_exists(user)
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        courses = []
+        for i in range(3):
+            course = coursehelper.given_course_exists(
+                course_group,
+                title=f'Course {i}',
+                start_date=datetime.date.today() - datetime.timedelta(days=7),
+                end_date=datetime.date.today() + datetime.timedelta(days=30)
+            )
+            courseschedulehelper.given_course_schedule_exists(course, days_of_week='1111111',
+                                                              sun_start_time=datetime.time(10, 0, 0),
+                                                              mon_start_time=datetime.time(10, 0, 0),
+                                                              tue_start_time=datetime.time(10, 0, 0),
+                                                              wed_start_time=datetime.time(10, 0, 0),
+                                                              thu_start_time=datetime.time(10, 0, 0),
+                                                              fri_start_time=datetime.time(10, 0, 0),
+                                                              sat_start_time=datetime.time(10, 0, 0))
+            courses.append(course)
+        Reminder.objects.bulk_create([Reminder(title='Test', message='Test',
+                                               start_of_range=timezone.now() - datetime.timedelta(minutes=1),
+                                               offset=15, offset_type=enums.MINUTES,
+                                               type=enums.PUSH, sent=False, dismissed=False,
+                                               course=course, user=user) for course in courses])
+
+        # WHEN
+        with mock.patch('helium.planner.services.reminderservice.taskutils.safe_apply_async',
+                        wraps=reminderservice.taskutils.safe_apply_async) as mock_safe_apply_async:
+            reminderservice.process_push_reminders()
+
+        # THEN
+        self.assertEqual(mock_safe_apply_async.call_count, 2)
+        self.assertEqual(mock_send_each.call_count, 2)
+        self.assertEqual(sum(len(call[0][0]) for call in mock_send_each.call_args_list), 3)
+        for course in courses:
+            self.assertEqual(Reminder.objects.filter(sent=True, course=course).count(), 1)
+            self.assertEqual(Reminder.objects.filter(sent=False, course=course).count(), 1)
+
+        # WHEN
+        reminderservice.process_push_reminders()
+
+        # THEN
+        self.assertEqual(mock_send_each.call_count, 2)
+
+    @mock.patch('helium.common.services.pushservice.messaging.send_each')
+    def test_process_push_reminders_auto_deletes_past_with_different_offset(self, mock_send_each):
         # GIVEN
+        commonhelper.given_fcm_stand_in(mock_send_each)
         user = userhelper.given_a_user_exists()
         userhelper.given_user_push_token_exists(user)
         course_group = coursegrouphelper.given_course_group_exists(user)
@@ -2,24 +2,27 @@ import datetime
 from unittest import mock
 
 from django.conf import settings
+from django.core import mail
 from django.db import OperationalError
-from django.test import TestCase
+from django.test import override_settings
 from django.utils import timezone
 
 from helium.auth.tests.helpers import userhelper
 from helium.common import enums
+from helium.common.tests.test import CacheTestCase
 from helium.planner.tasks import (
     email_reminders, push_reminders,
     recalculate_course_grade,
     recalculate_course_grades_for_course_group,
-    recalculate_category_grades_for_course, adjust_reminder_times, send_email_reminder
+    recalculate_category_grades_for_course, recalculate_pending_grades, adjust_reminder_times, send_email_reminder,
+    send_email_reminders
 )
 from helium.planner.tests.helpers import (
     coursegrouphelper, coursehelper, categoryhelper, eventhelper, homeworkhelper, reminderhelper
 )
 
 
-class TestCasePlannerTasks(TestCase):
+class TestCasePlannerTasks(CacheTestCase):
     @mock.patch('helium.planner.services.reminderservice.process_email_reminders')
     def test_email_reminders(self, mock_process_email_reminders):
         # WHEN
@@ -36,6 +39,26 @@ class TestCasePlannerTasks(TestCase):
         # THEN
         mock_process_push_reminders.assert_called_once()
 
+    @override_settings(REMINDER_DISPATCH_SHARDS=3)
+    @mock.patch('helium.planner.services.reminderservice.process_email_reminders')
+    def test_email_reminders_sharded(self, mock_process_email_reminders):
+        # WHEN
+        email_reminders()
+
+        # THEN
+        self.assertEqual(mock_process_email_reminders.call_args_list,
+                         [mock.call(shard=shard, num_shards=3) for shard in range(3)])
+
+    @override_settings(REMINDER_DISPATCH_SHARDS=2)
+    @mock.patch('helium.planner.services.reminderservice.process_push_reminders')
+    def test_push_reminders_sharded(self, mock_process_push_reminders):
+        # WHEN
+        push_reminders()
+
+        # THEN
+        self.assertEqual(mock_process_push_reminders.call_args_list,
+                         [mock.call(shard=shard, num_shards=2) for shard in range(2)])
+
     @mock.patch('helium.planner.tasks.recalculate_course_grade')
     def test_recalculate_course_grades_for_course_group(self, mock_recalculate_course_grade):
         # GIVEN
@@ -65,6 +88,17 @@ class TestCasePlannerTasks(TestCase):
         # THEN
         self.assertEqual(mock_recalculate_category_grade.call_count, 2)
 
+    @mock.patch('helium.planner.tasks.gradingservice.recalculate_grades', return_value=3)
+    @mock.patch('helium.planner.tasks.gradingservice.pop_pending_grade_recalculations',
+                return_value=([1], [2], []))
+    def test_recalculate_pending_grades_includes_retried_ids(self, mock_pop_pending, mock_recalculate_grades):
+        # WHEN
+        recalculate_pending_grades(5, retries=1, category_ids=[1, 6], course_group_ids=[7])
+
+        # THEN
+        mock_pop_pending.assert_called_once_with(5)
+        mock_recalculate_grades.assert_called_once_with({1, 6}, {2}, {7})
+
     @mock.patch('helium.planner.tasks.taskutils.safe_apply_async')
     @mock.patch('helium.planner.tasks.gradingservice.recalculate_course_grade')
     def test_recalculate_course_grade_retries_on_deadlock(self, mock_recalculate, mock_safe_apply_async):
@@ -72,6 +106,7 @@ class TestCasePlannerTasks(TestCase):
         user = userhelper.given_a_user_exists()
         course_group = coursegrouphelper.given_course_group_exists(user)
         course = coursehelper.given_course_exists(course_group)
+        mock_safe_apply_async.reset_mock()
         mock_recalculate.side_effect = OperationalError(
             1213, 'Deadlock found when trying to get lock; try restarting transaction')
 
@@ -89,6 +124,7 @@ class TestCasePlannerTasks(TestCase):
         user = userhelper.given_a_user_exists()
         course_group = coursegrouphelper.given_course_group_exists(user)
         course = coursehelper.given_course_exists(course_group)
+        mock_safe_apply_async.reset_mock()
         mock_recalculate.side_effect = OperationalError(2006, 'MySQL server has gone away')
 
         # WHEN
@@ -106,6 +142,7 @@ class TestCasePlannerTasks(TestCase):
         user = userhelper.given_a_user_exists()
         course_group = coursegrouphelper.given_course_group_exists(user)
         course = coursehelper.given_course_exists(course_group)
+        mock_safe_apply_async.reset_mock()
         mock_recalculate.side_effect = OperationalError(
             1213, 'Deadlock found when trying to get lock; try restarting transaction')
 
@@ -185,6 +222,30 @@ class TestCasePlannerTasks(TestCase):
         # THEN
         mock_send_multipart_email.assert_called_once()
 
+    def test_send_email_reminders_batch(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists()
+        event = eventhelper.given_event_exists(user)
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        course = coursehelper.given_course_exists(course_group)
+        homework = homeworkhelper.given_homework_exists(course)
+        event_reminder = reminderhelper.given_reminder_exists(user, type=enums.EMAIL, event=event)
+        homework_reminder = reminderhelper.given_reminder_exists(user, type=enums.EMAIL, homework=homework)
+
+        # WHEN
+        with mock.patch('helium.common.utils.commonutils.get_connection',
+                        wraps=mail.get_connection) as mock_get_connection:
+            send_email_reminders([
+                (user.email, 'Event Subject', event_reminder.pk, event.pk, enums.EVENT),
+                (user.email, 'Homework Subject', homework_reminder.pk, homework.pk, enums.HOMEWORK),
+                (user.email, 'Missing Subject', 99999, event.pk, enums.EVENT),
+                (user.email, 'Mismatched Subject', event_reminder.pk, 99999, enums.EVENT),
+            ])
+
+        # THEN
+        mock_get_connection.assert_called_once()
+        self.assertEqual([message.subject for message in mail.outbox], ['Event Subject', 'Homework Subject'])
+
     @mock.patch('helium.planner.tasks.commonutils.send_multipart_email')
     def test_send_email_reminder_nonexistent_reminder(self, mock_send_multipart_email):
         # WHEN
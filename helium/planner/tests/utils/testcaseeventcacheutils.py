@@ -0,0 +1,102 @@
+import datetime
+import json
+import random
+import zlib
+
+from django.test import TestCase
+
+from helium.common import enums
+from helium.planner.models import Event
+from helium.planner.serializers.eventserializer import EventSerializer
+from helium.planner.utils import eventcacheutils
+
+
+def _given_event(pk, start, **kwargs):
+    return Event(id=pk,
+                 title=kwargs.get('title', 'Lecture'),
+                 all_day=kwargs.get('all_day', False),
+                 show_end_time=kwargs.get('show_end_time', True),
+                 start=start,
+                 end=start + datetime.timedelta(hours=1),
+                 url=kwargs.get('url'),
+                 owner_id=kwargs.get('owner_id', 7),
+                 user_id=kwargs.get('user_id', 3),
+                 calendar_item_type=kwargs.get('calendar_item_type', enums.EXTERNAL),
+                 comments=kwargs.get('comments', ''),
+                 recurrence_rule=kwargs.get('recurrence_rule'),
+                 exception_dates=kwargs.get('exception_dates'))
+
+
+class TestCaseEventCacheUtils(TestCase):
+    def test_round_trip_preserves_serialized_events(self):
+        # GIVEN
+        start = datetime.datetime(2026, 3, 2, 15, 0, 0, tzinfo=datetime.timezone.utc)
+        events = [
+            _given_event(1, start, url='https://example.com', comments='Room 101',
+                         recurrence_rule='FREQ=WEEKLY;BYDAY=MO', exception_dates=['2026-03-09T15:00:00Z']),
+            _given_event(2, start + datetime.timedelta(days=1), all_day=True, show_end_time=False),
+        ]
+        events[0].location = 'Hall A'
+        for event in events:
+            event.color = '#ffffff'
+
+        # WHEN
+        decoded = eventcacheutils.decode_events(eventcacheutils.encode_events(events), '#ffffff')
+
+        # THEN
+        self.assertEqual(EventSerializer(decoded, many=True).data, EventSerializer(events, many=True).data)
+        self.assertEqual(decoded[0].location, 'Hall A')
+        self.assertFalse(hasattr(decoded[1], 'location'))
+        self.assertEqual(decoded[0].start.tzinfo, datetime.timezone.utc)
+
+    def test_repeated_strings_are_interned(self):
+        # GIVEN
+        start = datetime.datetime(2026, 3, 2, 15, 0, 0, tzinfo=datetime.timezone.utc)
+        events = [_given_event(i, start + datetime.timedelta(days=i), title='Biology 101', comments='Room 101')
+                  for i in range(100)]
+
+        # WHEN
+        cached_value = eventcacheutils.encode_events(events)
+
+        # THEN
+        payload = json.loads(zlib.decompress(cached_value[1:]))
+        self.assertEqual(payload['strings'].count('Biology 101'), 1)
+        self.assertEqual(cached_value[0], eventcacheutils.CACHE_FORMAT_VERSION)
+
+    def test_decode_window_matches_linear_scan(self):
+        # GIVEN
+        rand = random.Random(42)
+        base = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        events = []
+        for i in range(500):
+            start = base + datetime.timedelta(hours=rand.randint(0, 24 * 365 * 5))
+            event = _given_event(i, start)
+            # A mix of short meetings and a few events spanning weeks or months
+            event.end = start + datetime.timedelta(hours=rand.choice([1, 1, 1, 2, 24 * 14, 24 * 90]))
+            events.append(event)
+        cached_value = eventcacheutils.encode_events(events)
+
+        for _ in range(50):
+            _from = base + datetime.timedelta(hours=rand.randint(0, 24 * 365 * 5))
+            to = _from + datetime.timedelta(days=rand.choice([1, 7, 31]))
+
+            # WHEN
+            decoded = eventcacheutils.decode_events(cached_value, _from=_from, to=to)
+
+            # THEN
+            expected = sorted((event.pk for event in events if event.start <= to and event.end >= _from))
+            self.assertEqual(sorted(event.pk for event in decoded), expected)
+
+        self.assertEqual([event.pk for event in eventcacheutils.decode_events(cached_value)],
+                         [event.pk for event in events])
+
+    def test_decode_rejects_other_formats(self):
+        # WHEN/THEN
+        self.assertRaises(ValueError, eventcacheutils.decode_events, '[{"id": 0}]')
+        self.assertRaises(ValueError, eventcacheutils.decode_events, b'')
+        self.assertRaises(ValueError, eventcacheutils.decode_events,
+                          bytes([eventcacheutils.CACHE_FORMAT_VERSION + 1]) + zlib.compress(b'{}'))
+        self.assertRaises(ValueError, eventcacheutils.decode_events,
+                          bytes([eventcacheutils.CACHE_FORMAT_VERSION]) + b'not compressed')
+        self.assertRaises(ValueError, eventcacheutils.decode_events,
+                          bytes([eventcacheutils.CACHE_FORMAT_VERSION]) + zlib.compress(b'{"strings": []}'))
@@ -1,5 +1,6 @@
 import datetime
 import json
+from unittest import mock
 
 from django.urls import reverse
 from rest_framework import status
@@ -248,6 +249,34 @@ class TestCaseCategoryViews(APITestCase):
         for response in responses:
             self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_update_weight_returns_recalculated_grade(self):
+        # GIVEN
+        user = userhelper.given_a_user_exists_and_is_authenticated(self.client)
+        course_group = coursegrouphelper.given_course_group_exists(user)
+        course = coursehelper.given_course_exists(course_group)
+        category = categoryhelper.given_category_exists(course, weight=30)
+        homeworkhelper.given_homework_exists(course, category=category, completed=True, current_grade='3/4')
+
+        # WHEN
+        data = {
+            'title': category.title,
+            'weight': 50,
+            'color': category.color
+        }
+        # The queued recalculation is left to the debounced task, which doesn't run here
+        with mock.patch('helium.planner.services.gradingservice.taskutils.safe_apply_async') as mock_safe_apply_async:
+            response = self.client.put(reverse('planner_coursegroups_courses_categories_detail',
+                                               kwargs={'course_group': course_group.pk, 'course': course.pk,
+                                                       'pk': category.pk}),
+                                       json.dumps(data), content_type='application/json')
+
+        # THEN
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_safe_apply_async.assert_called_once()
+        self.assertEqual(float(response.data['grade_by_weight']), 37.5)
+        category.refresh_from_db()
+        self.assertEqual(float(category.grade_by_weight), 37.5)
+
     def test_update_read_only_field_does_nothing(self):
         # GIVEN
         user = userhelper.given_a_user_exists_and_is_authenticated(self.client)
@@ -0,0 +1,162 @@
+import bisect
+import datetime
+import itertools
+import json
+import zlib
+
+from helium.planner.models import Event
+
+# The first byte of every encoded value, so a change to the layout below can't be misread as the old one (or as the
+# JSON that was cached before this format existed); a value with any other version byte is treated as invalid
+CACHE_FORMAT_VERSION = 2
+
+_ALL_DAY = 1
+_SHOW_END_TIME = 2
+
+# Marks a string column entry for an attribute that was never set on the event (as opposed to set to None)
+_UNSET = -1
+
+
+class _StringTable:
+    def __init__(self):
+        self.values = []
+        self._indices = {}
+
+    def intern(self, value):
+        index = self._indices.get(value)
+        if index is None:
+            index = self._indices[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+def _to_epoch(value):
+    return int(value.timestamp())
+
+
+def _from_epoch(value):
+    return datetime.datetime.fromtimestamp(value, datetime.timezone.utc)
+
+
+def encode_events(events):
+    """
+    Encode the given events into the compact cache format: a version byte followed by a zlib-compressed, columnar
+    payload, with start/end stored as epoch seconds and every string interned into a single table, so repeated
+    titles, URLs and comments are stored once.
+
+    Events are stored sorted by start, alongside a running maximum of their ends, which together form the interval
+    index ``decode_events`` bisects to find the events overlapping a window. Each event's position in ``events`` is
+    kept too, so they decode in the order they were given.
+
+    :param events: The events to encode.
+    :return: The encoded bytes.
+    """
+    strings = _StringTable()
+
+    columns = {
+        'id': [],
+        'start': [],
+        'end': [],
+        'flags': [],
+        'title': [],
+        'url': [],
+        'comments': [],
+        'location': [],
+        'recurrence_rule': [],
+        'exception_dates': [],
+        'owner_id': [],
+        'user_id': [],
+        'calendar_item_type': [],
+        'position': [],
+    }
+
+    for position, event in sorted(enumerate(events), key=lambda e: e[1].start):
+        columns['id'].append(event.pk)
+        columns['start'].append(_to_epoch(event.start))
+        columns['end'].append(_to_epoch(event.end))
+        columns['flags'].append((_ALL_DAY if event.all_day else 0) | (_SHOW_END_TIME if event.show_end_time else 0))
+        columns['title'].append(strings.intern(event.title))
+        columns['url'].append(strings.intern(event.url))
+        columns['comments'].append(strings.intern(event.comments))
+        columns['location'].append(strings.intern(event.location) if hasattr(event, 'location') else _UNSET)
+        columns['recurrence_rule'].append(strings.intern(event.recurrence_rule))
+        columns['exception_dates'].append(event.exception_dates)
+        columns['owner_id'].append(event.owner_id)
+        columns['user_id'].append(event.user_id)
+        columns['calendar_item_type'].append(event.calendar_item_type)
+        columns['position'].append(position)
+
+    columns['max_end'] = list(itertools.accumulate(columns['end'], max))
+
+    payload = json.dumps({'strings': strings.values, 'columns': columns}, separators=(',', ':'))
+
+    return bytes([CACHE_FORMAT_VERSION]) + zlib.compress(payload.encode('utf-8'))
+
+
+def _get_window_indices(columns, _from, to):
+    """
+    The range of indices of candidate events overlapping ``_from``/``to``: events are sorted by start, so those
+    starting after ``to`` are bisected off the end, and since the running maximum of ends never decreases, every
+    event before the first whose running maximum reaches ``_from`` must end before the window.
+    """
+    if not (_from and to):
+        return range(len(columns['id']))
+
+    lo = bisect.bisect_left(columns['max_end'], _from.timestamp())
+    hi = bisect.bisect_right(columns['start'], to.timestamp())
+
+    return range(lo, hi)
+
+
+def decode_events(cached_value, color=None, _from=None, to=None):
+    """
+    Decode events previously encoded with ``encode_events``, in the order they were encoded.
+
+    :param cached_value: The encoded bytes.
+    :param color: The color to give each event (it is not cached, as it comes from the owning entity).
+    :param _from: If given with ``to``, only events overlapping the window are decoded.
+    :param to: If given with ``_from``, only events overlapping the window are decoded.
+    :return: A list of events.
+    :raises ValueError: If the value is not in the current cache format, or is malformed.
+    """
+    if not isinstance(cached_value, bytes) or not cached_value or cached_value[0] != CACHE_FORMAT_VERSION:
+        raise ValueError("The cached value is not in the current event cache format.")
+
+    try:
+        payload = json.loads(zlib.decompress(cached_value[1:]))
+
+        strings = payload['strings']
+        columns = payload['columns']
+
+        positions = columns['position']
+
+        events = []
+        for i in sorted(_get_window_indices(columns, _from, to), key=positions.__getitem__):
+            # Within the candidate range, an event may still have ended before the window opened
+            if _from and to and columns['end'][i] < _from.timestamp():
+                continue
+
+            flags = columns['flags'][i]
+
+            event = Event(id=columns['id'][i],
+                          title=strings[columns['title'][i]],
+                          all_day=bool(flags & _ALL_DAY),
+                          show_end_time=bool(flags & _SHOW_END_TIME),
+                          start=_from_epoch(columns['start'][i]),
+                          end=_from_epoch(columns['end'][i]),
+                          url=strings[columns['url'][i]],
+                          owner_id=columns['owner_id'][i],
+                          user_id=columns['user_id'][i],
+                          calendar_item_type=columns['calendar_item_type'][i],
+                          comments=strings[columns['comments'][i]],
+                          recurrence_rule=strings[columns['recurrence_rule'][i]],
+                          exception_dates=columns['exception_dates'][i])
+            event.color = color
+            if columns['location'][i] != _UNSET:
+                event.location = strings[columns['location'][i]]
+
+            events.append(event)
+    except (zlib.error, KeyError, IndexError, TypeError) as ex:
+        raise ValueError(f"The cached value is malformed: {ex}")
+
+    return events
@@ -13,6 +13,7 @@ from helium.planner.filters import CategoryFilter
 from helium.planner.models import Category
 from helium.planner.permissions import IsCourseOwner, IsCourseGroupOwner
 from helium.planner.serializers.categoryserializer import CategorySerializer
+from helium.planner.services import gradingservice
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +32,7 @@ class UserCategoriesApiListView(HeliumAPIView, ListModelMixin):
             return Category.objects.for_user(user.pk).annotate(
                 annotated_num_homework=Count('homework'),
                 annotated_num_homework_completed=Count('homework', filter=Q(homework__completed=True)),
-                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True) & ~Q(homework__current_grade='-1/100'))
+                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True, homework__grade_earned__isnull=False))
             )
         else:
             return Category.objects.none()
@@ -41,6 +42,8 @@ class UserCategoriesApiListView(HeliumAPIView, ListModelMixin):
         """
         Return a list of all category instances for the authenticated user.
         """
+        gradingservice.recalculate_pending_grades(request.user.pk)
+
         response = self.list(request, *args, **kwargs)
 
         return response
@@ -60,7 +63,7 @@ class CourseGroupCourseCategoriesApiListView(HeliumAPIView, ListModelMixin, Crea
             return Category.objects.for_user(user.pk).for_course(self.kwargs['course']).annotate(
                 annotated_num_homework=Count('homework'),
                 annotated_num_homework_completed=Count('homework', filter=Q(homework__completed=True)),
-                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True) & ~Q(homework__current_grade='-1/100'))
+                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True, homework__grade_earned__isnull=False))
             )
         else:
             return Category.objects.none()
@@ -70,6 +73,8 @@ class CourseGroupCourseCategoriesApiListView(HeliumAPIView, ListModelMixin, Crea
         """
         Return a list of all category instances for the given course.
         """
+        gradingservice.recalculate_pending_grades(request.user.pk)
+
         response = self.list(request, *args, **kwargs)
 
         return response
@@ -126,16 +131,25 @@ class CourseGroupCourseCategoriesApiDetailView(HeliumAPIView, RetrieveModelMixin
             return Category.objects.for_user(user.pk).for_course(self.kwargs['course']).annotate(
                 annotated_num_homework=Count('homework'),
                 annotated_num_homework_completed=Count('homework', filter=Q(homework__completed=True)),
-                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True) & ~Q(homework__current_grade='-1/100'))
+                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True, homework__grade_earned__isnull=False))
             )
         else:
             return Category.objects.none()
 
+    def perform_update(self, serializer):
+        serializer.save()
+
+        # The update's effect on grades is recalculated now, rather than by the queued task, so it's returned
+        if gradingservice.recalculate_pending_grades(self.request.user.pk):
+            serializer.instance.refresh_from_db()
+
     @extend_schema(summary='Retrieve a Category')
     def get(self, request, *args, **kwargs):
         """
         Return the given category instance.
         """
+        gradingservice.recalculate_pending_grades(request.user.pk)
+
         response = self.retrieve(request, *args, **kwargs)
 
         return response
@@ -11,6 +11,7 @@ from helium.common.views.base import HeliumAPIView
 from helium.planner.filters import CourseGroupFilter
 from helium.planner.models import CourseGroup
 from helium.planner.serializers.coursegroupserializer import CourseGroupSerializer
+from helium.planner.services import gradingservice
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +30,7 @@ class CourseGroupsApiListView(HeliumAPIView, ListModelMixin, CreateModelMixin):
             return user.course_groups.all().annotate(
                 annotated_num_homework=Count('courses__homework', distinct=True),
                 annotated_num_homework_completed=Count('courses__homework', filter=Q(courses__homework__completed=True), distinct=True),
-                annotated_num_homework_graded=Count('courses__homework', filter=Q(courses__homework__completed=True) & ~Q(courses__homework__current_grade='-1/100'), distinct=True)
+                annotated_num_homework_graded=Count('courses__homework', filter=Q(courses__homework__completed=True, courses__homework__grade_earned__isnull=False), distinct=True)
             )
         else:
             return CourseGroup.objects.none()
@@ -42,6 +43,8 @@ class CourseGroupsApiListView(HeliumAPIView, ListModelMixin, CreateModelMixin):
         """
         Return a list of all course group instances for the authenticated user.
         """
+        gradingservice.recalculate_pending_grades(request.user.pk)
+
         response = self.list(request, *args, **kwargs)
 
         return response
@@ -78,16 +81,25 @@ class CourseGroupsApiDetailView(HeliumAPIView, RetrieveModelMixin, UpdateModelMi
             return user.course_groups.all().annotate(
                 annotated_num_homework=Count('courses__homework', distinct=True),
                 annotated_num_homework_completed=Count('courses__homework', filter=Q(courses__homework__completed=True), distinct=True),
-                annotated_num_homework_graded=Count('courses__homework', filter=Q(courses__homework__completed=True) & ~Q(courses__homework__current_grade='-1/100'), distinct=True)
+                annotated_num_homework_graded=Count('courses__homework', filter=Q(courses__homework__completed=True, courses__homework__grade_earned__isnull=False), distinct=True)
             )
         else:
             return CourseGroup.objects.none()
 
+    def perform_update(self, serializer):
+        serializer.save()
+
+        # The update's effect on grades is recalculated now, rather than by the queued task, so it's returned
+        if gradingservice.recalculate_pending_grades(self.request.user.pk):
+            serializer.instance.refresh_from_db()
+
     @extend_schema(summary='Retrieve a CourseGroup')
     def get(self, request, *args, **kwargs):
         """
         Return the given course group instance.
         """
+        gradingservice.recalculate_pending_grades(request.user.pk)
+
         response = self.retrieve(request, *args, **kwargs)
 
         return response
@@ -13,6 +13,7 @@ from helium.planner.filters import CourseFilter
 from helium.planner.models import Course, Category
 from helium.planner.permissions import IsCourseGroupOwner
 from helium.planner.serializers.courseserializer import CourseSerializer
+from helium.planner.services import gradingservice
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +32,7 @@ class UserCoursesApiListView(HeliumAPIView, ListModelMixin):
             return Course.objects.for_user(user.pk).select_related('course_group__user__settings').prefetch_related('schedules').annotate(
                 annotated_num_homework=Count('homework', distinct=True),
                 annotated_num_homework_completed=Count('homework', filter=Q(homework__completed=True), distinct=True),
-                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True) & ~Q(homework__current_grade='-1/100'), distinct=True),
+                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True, homework__grade_earned__isnull=False), distinct=True),
                 annotated_has_weighted_grading=Exists(Category.objects.filter(course_id=OuterRef('pk'), weight__gt=0))
             )
         else:
@@ -42,6 +43,8 @@ class UserCoursesApiListView(HeliumAPIView, ListModelMixin):
         """
         Return a list of all course instances for the authenticated user, including course schedule details.
         """
+        gradingservice.recalculate_pending_grades(request.user.pk)
+
         response = self.list(request, *args, **kwargs)
 
         return response
@@ -60,7 +63,7 @@ class CourseGroupCoursesApiListView(HeliumAPIView, ListModelMixin, CreateModelMi
             return Course.objects.for_user(user.pk).for_course_group(self.kwargs['course_group']).select_related('course_group__user__settings').prefetch_related('schedules').annotate(
                 annotated_num_homework=Count('homework', distinct=True),
                 annotated_num_homework_completed=Count('homework', filter=Q(homework__completed=True), distinct=True),
-                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True) & ~Q(homework__current_grade='-1/100'), distinct=True),
+                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True, homework__grade_earned__isnull=False), distinct=True),
                 annotated_has_weighted_grading=Exists(Category.objects.filter(course_id=OuterRef('pk'), weight__gt=0))
             )
         else:
@@ -71,6 +74,8 @@ class CourseGroupCoursesApiListView(HeliumAPIView, ListModelMixin, CreateModelMi
         """
         Return a list of all course instances, including course schedule details, for the given course group.
         """
+        gradingservice.recalculate_pending_grades(request.user.pk)
+
         response = self.list(request, *args, **kwargs)
 
         return response
@@ -148,17 +153,26 @@ class CourseGroupCoursesApiDetailView(HeliumAPIView, RetrieveModelMixin, UpdateM
             return Course.objects.for_user(user.pk).for_course_group(self.kwargs['course_group']).select_related('course_group__user__settings').prefetch_related('schedules').annotate(
                 annotated_num_homework=Count('homework', distinct=True),
                 annotated_num_homework_completed=Count('homework', filter=Q(homework__completed=True), distinct=True),
-                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True) & ~Q(homework__current_grade='-1/100'), distinct=True),
+                annotated_num_homework_graded=Count('homework', filter=Q(homework__completed=True, homework__grade_earned__isnull=False), distinct=True),
                 annotated_has_weighted_grading=Exists(Category.objects.filter(course_id=OuterRef('pk'), weight__gt=0))
             )
         else:
             return Course.objects.none()
 
+    def perform_update(self, serializer):
+        serializer.save()
+
+        # The update's effect on grades is recalculated now, rather than by the queued task, so it's returned
+        if gradingservice.recalculate_pending_grades(self.request.user.pk):
+            serializer.instance.refresh_from_db()
+
     @extend_schema(summary='Retrieve a Course')
     def get(self, request, *args, **kwargs):
         """
         Return the given course instance, including course schedule details.
         """
+        gradingservice.recalculate_pending_grades(request.user.pk)
+
         response = self.retrieve(request, *args, **kwargs)
 
         return response
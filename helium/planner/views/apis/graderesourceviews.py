@@ -34,6 +34,8 @@ class GradesApiResourceView(HeliumAPIView):
         `cumulative_grade`, and `impact_score`. Items with `graded: true` represent completed graded homework;
         items with `graded: false` represent pending homework with a projected `impact_score`.
         """
+        gradingservice.recalculate_pending_grades(request.user.pk)
+
         grade_data = gradingservice.get_grade_data(request.user.pk)
 
         serializer = GradeSerializer(grade_data)